@@ -0,0 +1,222 @@
+"""
+Fast JSON responses and a small cache of encoded response bodies.
+
+Search and context envelopes carry large `content` / `context` strings.
+FastJSONResponse encodes them with orjson when it is installed (it is an
+optional dependency) and falls back to the stdlib encoder otherwise.
+
+EncodedResponseCache keeps recently served bodies as bytes, plus a gzip copy
+made on first use, so a repeated query against an unchanged index is served
+without re-running the search, re-encoding or re-compressing. Keys include
+the loaded index's manifest `built_at` (not the snapshot generation, which
+restarts when an evicted index is reloaded), so a rebuild never serves a
+stale body.
+
+Only gzip is produced: brotli would need an optional dependency, and every
+client that accepts br also accepts gzip.
+
+CompressionMiddleware is Starlette's GZipMiddleware minus the responses it
+must not touch: bodies that already carry a Content-Encoding (the cached
+gzip copies) and SSE streams. Older Starlette releases compress both.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore[assignment]
+
+# Used by CompressionMiddleware in server.py; level 9 costs far more CPU for a few % fewer bytes.
+GZIP_LEVEL = 6
+GZIP_MINIMUM_SIZE = 1024
+
+
+def _default(obj: Any) -> Any:
+    # NumPy scalars (scores) and similar objects exposing .item() / .tolist().
+    for attr in ("tolist", "item"):
+        fn = getattr(obj, attr, None)
+        if fn is not None:
+            return fn()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def encode_json(content: Any) -> bytes:
+    """Encode `content` as compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+        )
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when available."""
+
+    def render(self, content: Any) -> bytes:
+        return encode_json(content)
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    return "gzip" in (accept_encoding or "").lower()
+
+
+class EncodedBody:
+    """
+    An encoded JSON body and its lazily built gzip copy. `on_gzip` is called
+    with the copy's size when it is made, so the owning cache can count it.
+    """
+
+    __slots__ = ("body", "_gzipped", "_on_gzip")
+
+    def __init__(self, body: bytes, on_gzip: Optional[Callable[[int], None]] = None) -> None:
+        self.body = body
+        self._gzipped: Optional[bytes] = None
+        self._on_gzip = on_gzip
+
+    def gzipped(self) -> bytes:
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=GZIP_LEVEL, mtime=0)
+            if self._on_gzip is not None:
+                self._on_gzip(len(self._gzipped))
+        return self._gzipped
+
+    def nbytes(self) -> int:
+        return len(self.body) + len(self._gzipped or b"")
+
+    def response(self, accept_encoding: Optional[str] = None, status_code: int = 200) -> Response:
+        """Serve the body, pre-compressed if the client accepts gzip (CompressionMiddleware passes it through)."""
+        headers: Dict[str, str] = {}
+        body = self.body
+        if len(body) >= GZIP_MINIMUM_SIZE and accepts_gzip(accept_encoding):
+            body = self.gzipped()
+            headers = {"Content-Encoding": "gzip", "Vary": "Accept-Encoding"}
+        return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
+
+
+class EncodedResponseCache:
+    """Thread-safe LRU of EncodedBody values bounded by entry count and bytes."""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 32 * 1024 * 1024) -> None:
+        self.max_entries = max(0, int(max_entries))
+        self.max_bytes = max(0, int(max_bytes))
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, EncodedBody]" = OrderedDict()
+        # Bytes counted per entry; _used is their sum.
+        self._sizes: Dict[Hashable, int] = {}
+        self._used = 0
+
+    def configure(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None) -> None:
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max(0, int(max_entries))
+            if max_bytes is not None:
+                self.max_bytes = max(0, int(max_bytes))
+            self._trim()
+
+    def get(self, key: Hashable) -> Optional[EncodedBody]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Hashable, content: Any) -> EncodedBody:
+        """Encode `content` once and keep it (if it fits); returns the encoded body."""
+        entry = EncodedBody(encode_json(content))
+        with self._lock:
+            if self.max_entries > 0 and len(entry.body) <= self.max_bytes:
+                entry._on_gzip = lambda nbytes: self._gzip_added(key, entry, nbytes)
+                self._remove(key)
+                self._entries[key] = entry
+                self._sizes[key] = len(entry.body)
+                self._used += len(entry.body)
+                self._trim()
+        return entry
+
+    def _gzip_added(self, key: Hashable, entry: EncodedBody, nbytes: int) -> None:
+        # The gzip copy is made after put(); count it then, or max_bytes only
+        # ever bounds the uncompressed bodies.
+        with self._lock:
+            if self._entries.get(key) is entry:
+                size = len(entry.body) + nbytes
+                self._used += size - self._sizes[key]
+                self._sizes[key] = size
+                self._trim()
+
+    def invalidate(self, prefix: Tuple[Hashable, ...]) -> None:
+        """Drop entries whose tuple key starts with `prefix` (e.g. one project)."""
+        n = len(prefix)
+        with self._lock:
+            for key in [k for k in self._entries if isinstance(k, tuple) and k[:n] == prefix]:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._used = 0
+
+    def _remove(self, key: Hashable) -> None:
+        if self._entries.pop(key, None) is not None:
+            self._used -= self._sizes.pop(key)
+
+    def _trim(self) -> None:
+        while self._entries and (len(self._entries) > self.max_entries or self._used > self.max_bytes):
+            key, _ = self._entries.popitem(last=False)
+            self._used -= self._sizes.pop(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "used_bytes": self._used, "max_entries": self.max_entries}
+
+
+class CompressionMiddleware:
+    """
+    GZipMiddleware that passes through responses with a Content-Encoding or
+    a text/event-stream body, whatever the installed Starlette version does.
+    The check runs on the response start message, before any body is sent.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = GZIP_MINIMUM_SIZE, compresslevel: int = GZIP_LEVEL) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not accepts_gzip(Headers(scope=scope).get("accept-encoding")):
+            await self.app(scope, receive, send)
+            return
+
+        passthrough = False
+
+        async def app_with_passthrough(scope: Scope, receive: Receive, gzip_send: Send) -> None:
+            async def send_message(message: Message) -> None:
+                nonlocal passthrough
+                if message["type"] == "http.response.start":
+                    headers = Headers(raw=message["headers"])
+                    media_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+                    passthrough = "content-encoding" in headers or media_type == "text/event-stream"
+                await (send if passthrough else gzip_send)(message)
+
+            await self.app(scope, receive, send_message)
+
+        gzip_app = GZipMiddleware(
+            app_with_passthrough, minimum_size=self.minimum_size, compresslevel=self.compresslevel
+        )
+        await gzip_app(scope, receive, send)
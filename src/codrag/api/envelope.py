@@ -47,12 +47,14 @@ class ApiException(Exception):
         message: str,
         hint: str | None = None,
         details: Dict[str, Any] | None = None,
+        headers: Dict[str, str] | None = None,
     ) -> None:
         self.status_code = int(status_code)
         self.code = str(code)
         self.message = str(message)
         self.hint = hint
         self.details = details
+        self.headers = headers
         super().__init__(message)
 
     def to_error_dict(self) -> Dict[str, Any]:
@@ -73,6 +75,8 @@ def _default_error_code_for_status(status_code: int) -> str:
         return "NOT_FOUND"
     if status_code == 409:
         return "CONFLICT"
+    if status_code == 429:
+        return "TOO_MANY_REQUESTS"
     if status_code >= 500:
         return "INTERNAL_ERROR"
     return "INTERNAL_ERROR"
@@ -101,6 +105,7 @@ def install_api_exception_handlers(app: FastAPI) -> None:
         return JSONResponse(
             status_code=exc.status_code,
             content={"success": False, "data": None, "error": exc.to_error_dict()},
+            headers=exc.headers,
         )
 
     @app.exception_handler(RequestValidationError)
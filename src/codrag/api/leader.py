@@ -0,0 +1,112 @@
+"""
+Forwarding of control-plane requests from worker processes to the leader.
+
+With `--workers N`, every uvicorn worker is a separate process. Builds, the
+build scheduler, watchers and the event bus must have one owner, or the
+global build limit multiplies by N, a cancel lands on a worker that does not
+own the build, and progress/SSE streams only see one worker's builds. The
+leader is a single in-process server that owns that state; workers serve
+queries themselves and hand the control routes to it.
+
+LeaderProxyMiddleware is plain ASGI: requests it does not forward go straight
+to the app, so the query hot path pays one predicate call and nothing else.
+Forwarded responses are streamed back unchanged (status, headers and raw,
+possibly gzip-encoded, body), which keeps SSE streams incremental.
+"""
+
+from __future__ import annotations
+
+from typing import Any, AsyncIterator, Callable, List, Optional, Tuple
+
+import httpx
+from starlette.requests import Request
+from starlette.responses import StreamingResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .encoding import FastJSONResponse
+from .envelope import fail
+
+# Request headers passed to the leader, and response headers not passed back
+# (hop-by-hop, or recomputed for the worker's own connection).
+_FORWARD_REQUEST_HEADERS = ("accept", "accept-encoding", "content-type", "last-event-id", "origin")
+_DROP_RESPONSE_HEADERS = {"connection", "keep-alive", "transfer-encoding", "content-length"}
+
+# Connecting to the leader is local and quick; reads are unbounded because
+# /events and build/stream stay open for as long as the client listens.
+_LEADER_TIMEOUT = httpx.Timeout(10.0, read=None)
+
+
+class LeaderProxyMiddleware:
+    """
+    Forward requests for which `routes(method, path)` is true to the server
+    at `leader_url()`; serve everything else locally. While `leader_url()`
+    is None (single process, or the leader itself) nothing is forwarded.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        leader_url: Callable[[], Optional[str]],
+        routes: Callable[[str, str], bool],
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self.app = app
+        self.leader_url = leader_url
+        self.routes = routes
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        base_url = self.leader_url()
+        if base_url is None or not self.routes(scope["method"], scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        await self._forward(base_url, scope, receive, send)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=_LEADER_TIMEOUT, transport=self.transport)
+        return self._client
+
+    async def _forward(self, base_url: str, scope: Scope, receive: Receive, send: Send) -> None:
+        request = Request(scope, receive)
+        headers = {k: v for k, v in request.headers.items() if k in _FORWARD_REQUEST_HEADERS}
+        client = self._get_client()
+        upstream = client.build_request(
+            request.method,
+            base_url.rstrip("/") + scope["path"],
+            params=request.query_params.multi_items(),
+            headers=headers,
+            content=await request.body(),
+        )
+        try:
+            resp = await client.send(upstream, stream=True)
+        except httpx.HTTPError as e:
+            response: Any = FastJSONResponse(
+                fail("LEADER_UNAVAILABLE", f"Build coordinator is unavailable: {e}", hint="Retry shortly."),
+                status_code=503,
+                headers={"Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+
+        out_headers: List[Tuple[str, str]] = [
+            (k, v) for k, v in resp.headers.multi_items() if k.lower() not in _DROP_RESPONSE_HEADERS
+        ]
+
+        async def body() -> AsyncIterator[bytes]:
+            # Closed here rather than in a background task, so a client that
+            # disconnects mid-stream also releases the leader connection.
+            try:
+                async for chunk in resp.aiter_raw():
+                    yield chunk
+            finally:
+                await resp.aclose()
+
+        response = StreamingResponse(body(), status_code=resp.status_code)
+        # Replace, not merge: the leader's headers (content-type included) are the response's.
+        response.raw_headers = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in out_headers]
+        await response(scope, receive, send)
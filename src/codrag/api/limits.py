@@ -0,0 +1,240 @@
+"""
+Per-endpoint-class concurrency limits and admission control for the async
+request path.
+
+Endpoints that wait on slow backends (Ollama embeddings, LLM probes) hold an
+EndpointLimiter slot while they run, so a burst of them cannot monopolise the
+daemon: cheap status endpoints keep their own threadpool capacity and other
+endpoint classes keep their own slots.
+
+Search and context additionally go through an AdmissionController: a short,
+bounded queue per project and globally, with a deadline. Requests that cannot
+be admitted are shed quickly (LimitExceeded) with a Retry-After estimate
+instead of piling up until every caller times out.
+
+The limiter is not tied to one event loop (waiters are plain futures on the
+loop that created them), so it works across the loops TestClient creates.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+# Weight of the newest sample in the hold-time moving average.
+_HOLD_EWMA_ALPHA = 0.2
+
+
+def _wake(fut: "asyncio.Future[None]") -> None:
+    if not fut.done():
+        fut.set_result(None)
+
+
+class LimitExceeded(Exception):
+    """A request was shed because its limiter's queue was full or its deadline passed."""
+
+    def __init__(self, limiter: str, reason: str, retry_after_s: int, scope: str = "global") -> None:
+        self.limiter = limiter
+        self.reason = reason
+        self.retry_after_s = int(retry_after_s)
+        self.scope = scope
+        super().__init__(f"{limiter}: {reason}")
+
+
+class EndpointLimiter:
+    """
+    Async context manager admitting at most `limit` concurrent requests.
+
+    With `max_waiting` set, acquire() raises LimitExceeded("queue_full") rather
+    than queueing behind that many waiters; with a `timeout`, it raises
+    LimitExceeded("queue_timeout") once the deadline passes.
+    """
+
+    def __init__(self, name: str, limit: int, max_waiting: Optional[int] = None) -> None:
+        self.name = name
+        self.limit = max(1, int(limit))
+        self.max_waiting = None if max_waiting is None else max(0, int(max_waiting))
+        self._active = 0
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+        self._hold_s = 0.0
+
+    def set_limit(self, limit: int, max_waiting: Optional[int] = None) -> None:
+        self.limit = max(1, int(limit))
+        if max_waiting is not None:
+            self.max_waiting = max(0, int(max_waiting))
+        self._wake_next()
+
+    async def acquire(self, timeout: Optional[float] = None) -> None:
+        if self._active >= self.limit or self._waiters:
+            if self.max_waiting is not None and len(self._waiters) >= self.max_waiting:
+                raise self._reject("queue_full")
+            loop = asyncio.get_running_loop()
+            deadline = None if timeout is None else loop.time() + max(0.0, timeout)
+            fut: "asyncio.Future[None]" = loop.create_future()
+            self._waiters.append(fut)
+            try:
+                while True:
+                    if deadline is None:
+                        await fut
+                    else:
+                        await asyncio.wait_for(fut, max(0.0, deadline - loop.time()))
+                    self._waiters.remove(fut)
+                    if self._active < self.limit:
+                        break
+                    # The slot was taken before we ran: wait again at the front.
+                    fut = loop.create_future()
+                    self._waiters.appendleft(fut)
+            except asyncio.TimeoutError:
+                self._abandon(fut)
+                raise self._reject("queue_timeout") from None
+            except BaseException:
+                self._abandon(fut)
+                raise
+        self._active += 1
+        # A raised limit may admit more than one waiter.
+        self._wake_next()
+
+    def release(self) -> None:
+        self._active = max(0, self._active - 1)
+        self._wake_next()
+
+    def observe_hold(self, seconds: float) -> None:
+        """Feed how long a slot was held; drives the Retry-After estimate."""
+        if self._hold_s <= 0.0:
+            self._hold_s = float(seconds)
+        else:
+            self._hold_s += _HOLD_EWMA_ALPHA * (float(seconds) - self._hold_s)
+
+    def retry_after_s(self) -> int:
+        """Whole seconds until a new request would likely be admitted (at least 1)."""
+        backlog = (len(self._waiters) + 1) / self.limit
+        return max(1, math.ceil(self._hold_s * backlog))
+
+    def _abandon(self, fut: "asyncio.Future[None]") -> None:
+        if fut in self._waiters:
+            self._waiters.remove(fut)
+        # A cancelled or timed-out waiter may have been woken; pass the wake-up on.
+        self._wake_next()
+
+    def _reject(self, reason: str) -> LimitExceeded:
+        return LimitExceeded(self.name, reason, self.retry_after_s())
+
+    def _wake_next(self) -> None:
+        if self._active >= self.limit:
+            return
+        for fut in self._waiters:
+            if not fut.done():
+                fut.get_loop().call_soon_threadsafe(_wake, fut)
+                return
+
+    def idle(self) -> bool:
+        return self._active == 0 and not self._waiters
+
+    def stats(self) -> Dict[str, Any]:
+        return {"limit": self.limit, "active": self._active, "waiting": len(self._waiters)}
+
+    async def __aenter__(self) -> "EndpointLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        self.release()
+
+
+class AdmissionController:
+    """
+    Two-level admission for one endpoint class: a per-key (project) limiter in
+    front of a global one, sharing a single queue deadline.
+
+    Queueing per project first means one project's burst waits in its own
+    short queue instead of filling the global one for everybody else.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limit: int,
+        per_key_limit: int,
+        max_waiting: int,
+        per_key_max_waiting: int,
+        queue_timeout_s: float,
+    ) -> None:
+        self.name = name
+        self.global_limiter = EndpointLimiter(name, limit, max_waiting=max_waiting)
+        self.per_key_limit = max(1, int(per_key_limit))
+        self.per_key_max_waiting = max(0, int(per_key_max_waiting))
+        self.queue_timeout_s = max(0.0, float(queue_timeout_s))
+        self._per_key: Dict[str, EndpointLimiter] = {}
+
+    def configure(
+        self,
+        limit: Optional[int] = None,
+        per_key_limit: Optional[int] = None,
+        max_waiting: Optional[int] = None,
+        per_key_max_waiting: Optional[int] = None,
+        queue_timeout_s: Optional[float] = None,
+    ) -> None:
+        if limit is not None or max_waiting is not None:
+            self.global_limiter.set_limit(
+                self.global_limiter.limit if limit is None else limit, max_waiting=max_waiting
+            )
+        if per_key_limit is not None:
+            self.per_key_limit = max(1, int(per_key_limit))
+        if per_key_max_waiting is not None:
+            self.per_key_max_waiting = max(0, int(per_key_max_waiting))
+        if queue_timeout_s is not None:
+            self.queue_timeout_s = max(0.0, float(queue_timeout_s))
+        for limiter in self._per_key.values():
+            limiter.set_limit(self.per_key_limit, max_waiting=self.per_key_max_waiting)
+
+    def _limiter_for(self, key: str) -> EndpointLimiter:
+        limiter = self._per_key.get(key)
+        if limiter is None:
+            limiter = EndpointLimiter(f"{self.name}:{key}", self.per_key_limit, self.per_key_max_waiting)
+            self._per_key[key] = limiter
+        return limiter
+
+    def _drop_if_idle(self, key: str) -> None:
+        limiter = self._per_key.get(key)
+        if limiter is not None and limiter.idle():
+            del self._per_key[key]
+
+    @asynccontextmanager
+    async def admit(self, key: str) -> AsyncIterator[None]:
+        """Hold a per-key and a global slot; raises LimitExceeded when shedding."""
+        started = time.monotonic()
+        local = self._limiter_for(key)
+        try:
+            await local.acquire(self.queue_timeout_s)
+        except LimitExceeded as e:
+            e.scope = "project"
+            self._drop_if_idle(key)
+            raise
+        except BaseException:
+            self._drop_if_idle(key)
+            raise
+        try:
+            remaining = self.queue_timeout_s - (time.monotonic() - started)
+            await self.global_limiter.acquire(max(0.0, remaining))
+            try:
+                held_from = time.monotonic()
+                yield
+            finally:
+                held = time.monotonic() - held_from
+                self.global_limiter.observe_hold(held)
+                local.observe_hold(held)
+                self.global_limiter.release()
+        finally:
+            local.release()
+            self._drop_if_idle(key)
+
+    def stats(self) -> Dict[str, Any]:
+        out = self.global_limiter.stats()
+        out["per_project_limit"] = self.per_key_limit
+        out["queue_timeout_s"] = self.queue_timeout_s
+        out["projects"] = {key: limiter.stats() for key, limiter in self._per_key.items()}
+        return out
@@ -88,6 +88,13 @@ def _get_json(url: str) -> Any:
         raise typer.Exit(1)
 
 
+def _unwrap_envelope(payload: Any) -> Any:
+    """Return the `data` of an API envelope ({"success", "data", "error"}), else `payload` as is."""
+    if isinstance(payload, dict) and "success" in payload and "data" in payload:
+        return payload["data"]
+    return payload
+
+
 def _resolve_project(base: str, project_id: Optional[str] = None, auto: bool = True) -> str:
     """Resolve project ID from argument, CWD (auto), or default if single project."""
     if project_id:
@@ -165,6 +172,33 @@ def serve(
     host: str = typer.Option("127.0.0.1", "--host", "-h", help="Host to bind to"),
     port: int = typer.Option(8400, "--port", "-p", help="Port to bind to"),
     reload: bool = typer.Option(False, "--reload", help="Enable auto-reload (dev mode)"),
+    workers: int = typer.Option(1, "--workers", "-w", help="Number of worker processes"),
+    index_dir: str = typer.Option("./codrag_data", "--index-dir", help="Directory to store the legacy index"),
+    max_concurrent_builds: int = typer.Option(
+        2, "--max-concurrent-builds", help="Maximum index + trace builds running at once across all projects"
+    ),
+    max_index_builds: int = typer.Option(1, "--max-index-builds", help="Maximum embedding (index) builds running at once"),
+    index_memory_budget_mb: int = typer.Option(
+        2048, "--index-memory-budget-mb", help="Memory budget for loaded project indexes (0 = unlimited)"
+    ),
+    warmup_projects: int = typer.Option(
+        3, "--warmup-projects", help="Preload this many most recently used projects at start-up (0 = no warm-up)"
+    ),
+    cpu_workers: Optional[int] = typer.Option(
+        None, "--cpu-workers", help="Threads for CPU-bound search scoring, per worker (default: CPU count, max 8)"
+    ),
+    max_concurrent_searches: int = typer.Option(
+        16, "--max-concurrent-searches", help="Search/context requests allowed in flight at once, per worker"
+    ),
+    max_concurrent_searches_per_project: int = typer.Option(
+        8, "--max-concurrent-searches-per-project", help="Search/context requests allowed in flight for one project"
+    ),
+    search_queue_size: int = typer.Option(
+        32, "--search-queue-size", help="Search/context requests allowed to wait for a slot; more get 503"
+    ),
+    search_queue_timeout_ms: int = typer.Option(
+        2000, "--search-queue-timeout-ms", help="How long a search/context request may wait for a slot"
+    ),
 ) -> None:
     """
     Start the CoDRAG daemon.
@@ -174,10 +208,28 @@ def serve(
     console.print(f"[green]Starting CoDRAG server on {host}:{port}...[/green]")
     
     import uvicorn
-    from codrag.server import app as fastapi_app, configure, mount_dashboard
+    from codrag.server import _start_warmup, app as fastapi_app, configure, mount_dashboard, run_workers
+
+    settings: Dict[str, Any] = {
+        "index_dir": index_dir,
+        "max_concurrent_builds": max_concurrent_builds,
+        "max_index_builds": max_index_builds,
+        "index_memory_budget_mb": index_memory_budget_mb,
+        "max_concurrent_searches": max_concurrent_searches,
+        "max_concurrent_searches_per_project": max_concurrent_searches_per_project,
+        "search_queue_size": search_queue_size,
+        "search_queue_timeout_ms": search_queue_timeout_ms,
+    }
+    if cpu_workers is not None:
+        settings["cpu_workers"] = cpu_workers
+
+    if workers > 1 and not reload:
+        run_workers(host, port, workers, settings, warmup_projects=warmup_projects)
+        return
 
-    configure()
+    configure(**settings)
     mount_dashboard()
+    _start_warmup(warmup_projects)
     
     uvicorn.run("codrag.server:app" if reload else fastapi_app, host=host, port=port, reload=reload)
 
@@ -773,7 +825,7 @@ def overview(
         pid = _resolve_project(base, project_id)
         
         # 1. Fetch Status (Health) from project-scoped endpoint
-        status_data = _get_json(f"{base}/projects/{pid}/status")
+        status_data = _unwrap_envelope(_get_json(f"{base}/projects/{pid}/status"))
         index = status_data.get("index", {})
         trace = status_data.get("trace", {})
         total_chunks = index.get("total_chunks", 0)
@@ -809,23 +861,26 @@ def overview(
                 days=days,
                 totals=act_data.get("totals", {"embeddings": 0, "trace": 0, "builds": 0}),
             )
-        except:
+        except (requests.exceptions.RequestException, ValueError, KeyError, TypeError):
             pass # Fallback to sample if endpoint missing
             
         # 3. Fetch Trace Stats
         try:
-            tr_data = _get_json(f"{base}/trace/stats")
+            r = requests.get(f"{base}/projects/{pid}/trace/stats", timeout=30)
+            r.raise_for_status()
+            tr_data = _unwrap_envelope(r.json())
             trace_stats = {
-                "node_count": tr_data.get("counts", {}).get("nodes", 0),
-                "edge_count": tr_data.get("counts", {}).get("edges", 0),
-                "avg_degree": (
-                    (2.0 * float(tr_data.get("counts", {}).get("edges", 0)))
-                    / float(tr_data.get("counts", {}).get("nodes", 0))
-                )
-                if float(tr_data.get("counts", {}).get("nodes", 0) or 0) > 0
-                else 0.0,
+                "node_count": tr_data.get("node_count", 0),
+                "edge_count": tr_data.get("edge_count", 0),
+                "density": tr_data.get("density", 0.0),
+                "avg_degree": tr_data.get("avg_degree", 0.0),
+                "communities": (tr_data.get("components") or {}).get("count", 0),
+                "top_hubs": [
+                    {"name": h.get("name"), "kind": h.get("symbol_type") or h.get("kind"), "degree": h.get("degree", 0)}
+                    for h in tr_data.get("top_hubs", [])[:10]
+                ],
             }
-        except:
+        except (requests.exceptions.RequestException, ValueError, AttributeError, TypeError):
             pass # Fallback to empty if endpoint missing
 
         render_dashboard(health_stats, activity_data, trace_stats, weeks=weeks, console=console)
@@ -15,12 +15,13 @@ TODO:
 
 from .embedder import Embedder, OllamaEmbedder, FakeEmbedder, EmbeddingResult
 from .chunking import Chunk, chunk_markdown, chunk_code
-from .index import CodeIndex, SearchResult
+from .index import CodeIndex, IndexSnapshot, SearchResult
 from .trace import TraceBuilder, TraceIndex, TraceNode, TraceEdge, build_trace
 
 __all__ = [
     "CodeIndex",
     "SearchResult",
+    "IndexSnapshot",
     "Embedder",
     "OllamaEmbedder",
     "FakeEmbedder",
@@ -0,0 +1,194 @@
+"""
+Memory-budgeted LRU caches for loaded indexes.
+
+The daemon keeps loaded CodeIndex / TraceIndex objects in IndexCache
+instances that share one MemoryBudget. Each cached value reports an
+approximate footprint via `memory_footprint()`. When the cached total goes
+over the budget, the least recently used entry across all caches is evicted;
+the next request for it reloads from disk (embeddings are memory-mapped, so
+a reload is cheap).
+
+IndexCache is dict-like (get / [] / pop / clear / items) so callers that
+used a plain dict keep working.
+"""
+
+from __future__ import annotations
+
+import itertools
+import threading
+from typing import Any, Callable, Dict, Generic, Iterator, List, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+def footprint_of(value: Any) -> int:
+    fn = getattr(value, "memory_footprint", None)
+    if fn is None:
+        return 0
+    try:
+        return max(0, int(fn()))
+    except Exception:
+        return 0
+
+
+class MemoryBudget:
+    """A byte budget shared by one or more IndexCache instances."""
+
+    def __init__(
+        self,
+        limit_bytes: int,
+        on_evict: Optional[Callable[[str, str], None]] = None,
+    ) -> None:
+        self.limit_bytes = max(0, int(limit_bytes))
+        self.evictions = 0
+        self._on_evict = on_evict
+        self._lock = threading.RLock()
+        self._ticks = itertools.count(1)
+        self._caches: List["IndexCache[Any]"] = []
+
+    def _register(self, cache: "IndexCache[Any]") -> None:
+        with self._lock:
+            self._caches.append(cache)
+
+    def _tick(self) -> int:
+        return next(self._ticks)
+
+    def set_limit(self, limit_bytes: int) -> None:
+        with self._lock:
+            self.limit_bytes = max(0, int(limit_bytes))
+            self.enforce()
+
+    def used_bytes(self) -> int:
+        with self._lock:
+            return sum(c.used_bytes() for c in self._caches)
+
+    def usage(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "budget_bytes": self.limit_bytes,
+                "used_bytes": self.used_bytes(),
+                "evictions": self.evictions,
+                "caches": {c.name: {"entries": len(c), "used_bytes": c.used_bytes()} for c in self._caches},
+            }
+
+    def enforce(self, keep: Optional[Tuple["IndexCache[Any]", str]] = None) -> List[Tuple[str, str]]:
+        """
+        Evict LRU entries until within budget (a limit of 0 disables eviction).
+
+        `keep` (cache, key) is never evicted, so a just-loaded index larger
+        than the whole budget still serves the request that loaded it.
+        Returns the evicted (cache name, key) pairs.
+        """
+        evicted: List[Tuple[str, str]] = []
+        with self._lock:
+            if self.limit_bytes <= 0:
+                return evicted
+            while self.used_bytes() > self.limit_bytes:
+                victim: Optional[Tuple[int, "IndexCache[Any]", str]] = None
+                for cache in self._caches:
+                    for key, tick in cache._ticks_snapshot():
+                        if keep is not None and keep[0] is cache and keep[1] == key:
+                            continue
+                        if victim is None or tick < victim[0]:
+                            victim = (tick, cache, key)
+                if victim is None:
+                    break
+                _, cache, key = victim
+                cache._evict(key)
+                self.evictions += 1
+                evicted.append((cache.name, key))
+        if self._on_evict is not None:
+            for cache_name, key in evicted:
+                try:
+                    self._on_evict(cache_name, key)
+                except Exception:
+                    pass
+        return evicted
+
+
+class IndexCache(Generic[V]):
+    """Dict-like LRU cache whose entries count against a MemoryBudget."""
+
+    def __init__(self, name: str, budget: MemoryBudget) -> None:
+        self.name = name
+        self.budget = budget
+        self._entries: Dict[str, Tuple[V, int]] = {}
+        budget._register(self)
+
+    def __len__(self) -> int:
+        with self.budget._lock:
+            return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        with self.budget._lock:
+            return key in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __getitem__(self, key: str) -> V:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: V) -> None:
+        with self.budget._lock:
+            self._entries[key] = (value, self.budget._tick())
+            self.budget.enforce(keep=(self, key))
+
+    def get(self, key: str, default: Optional[V] = None) -> Optional[V]:
+        """Return the cached value and mark it most recently used."""
+        with self.budget._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            self._entries[key] = (entry[0], self.budget._tick())
+            return entry[0]
+
+    def peek(self, key: str) -> Optional[V]:
+        """Return the cached value without touching its recency."""
+        with self.budget._lock:
+            entry = self._entries.get(key)
+            return entry[0] if entry is not None else None
+
+    def pop(self, key: str, default: Optional[V] = None) -> Optional[V]:
+        with self.budget._lock:
+            entry = self._entries.pop(key, None)
+            return entry[0] if entry is not None else default
+
+    def clear(self) -> None:
+        with self.budget._lock:
+            self._entries.clear()
+
+    def keys(self) -> List[str]:
+        with self.budget._lock:
+            return list(self._entries)
+
+    def items(self) -> List[Tuple[str, V]]:
+        with self.budget._lock:
+            return [(k, v) for k, (v, _) in self._entries.items()]
+
+    def values(self) -> List[V]:
+        with self.budget._lock:
+            return [v for v, _ in self._entries.values()]
+
+    def used_bytes(self) -> int:
+        with self.budget._lock:
+            return sum(footprint_of(v) for v, _ in self._entries.values())
+
+    def footprint(self, key: str) -> Optional[int]:
+        value = self.peek(key)
+        return footprint_of(value) if value is not None else None
+
+    def refresh(self, key: str) -> None:
+        """Re-check the budget after an entry grew (e.g. after a rebuild)."""
+        with self.budget._lock:
+            if key in self._entries:
+                self.budget.enforce(keep=(self, key))
+
+    def _ticks_snapshot(self) -> List[Tuple[str, int]]:
+        return [(k, tick) for k, (_, tick) in self._entries.items()]
+
+    def _evict(self, key: str) -> None:
+        self._entries.pop(key, None)
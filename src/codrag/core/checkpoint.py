@@ -0,0 +1,133 @@
+"""
+Build checkpoints for CoDRAG.
+
+While CodeIndex.build embeds chunks, freshly computed vectors are flushed to
+a checkpoint directory in small segments. If the build dies (embedder
+outage, daemon restart, cancellation), the next build loads the checkpoint
+and reuses every vector whose embed text is unchanged instead of calling the
+embedder again. The checkpoint is removed once a build is swapped in.
+
+Layout:
+    meta.json               {"model": ..., "created_at": ...}
+    seg_000001.npy          float32 [n, dim]
+    seg_000001.keys.json    [key, ...] (written last; marks the segment complete)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def checkpoint_key(text_for_embed: str) -> str:
+    """Stable key for an embed input."""
+    return hashlib.sha256(text_for_embed.encode("utf-8")).hexdigest()[:32]
+
+
+class BuildCheckpoint:
+    """Append-only store of embedded vectors keyed by checkpoint_key()."""
+
+    def __init__(self, path: Path, model: str) -> None:
+        self.path = Path(path)
+        self.model = str(model)
+        self._keys: List[str] = []
+        self._vectors: List[List[float]] = []
+        self._next_seg = 1
+
+    def exists(self) -> bool:
+        return (self.path / "meta.json").exists()
+
+    def load(self) -> Dict[str, np.ndarray]:
+        """
+        Load all complete segments.
+
+        A checkpoint written for a different embedding model is discarded.
+        """
+        meta_path = self.path / "meta.json"
+        if not meta_path.exists():
+            return {}
+
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+        except Exception:
+            meta = {}
+        if str(meta.get("model") or "") != self.model:
+            logger.info("Discarding build checkpoint for model %r", meta.get("model"))
+            self.clear()
+            return {}
+
+        out: Dict[str, np.ndarray] = {}
+        for keys_path in sorted(self.path.glob("seg_*.keys.json")):
+            seg = keys_path.name[: -len(".keys.json")]
+            try:
+                with open(keys_path, "r") as f:
+                    keys = json.load(f)
+                vecs = np.load(self.path / f"{seg}.npy")
+            except Exception as e:
+                logger.warning(f"Skipping unreadable checkpoint segment {seg}: {e}")
+                continue
+            if not isinstance(keys, list) or vecs.ndim != 2 or len(keys) != vecs.shape[0]:
+                continue
+            for k, v in zip(keys, vecs, strict=True):
+                out[str(k)] = v
+            try:
+                self._next_seg = max(self._next_seg, int(seg.split("_", 1)[1]) + 1)
+            except ValueError:
+                pass
+        return out
+
+    def add(self, key: str, vector: List[float]) -> None:
+        self._keys.append(key)
+        self._vectors.append(vector)
+
+    def pending(self) -> int:
+        return len(self._keys)
+
+    def flush(self) -> None:
+        """Write buffered vectors as a new segment."""
+        if not self._keys:
+            return
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        meta_path = self.path / "meta.json"
+        if not meta_path.exists():
+            _write_json_atomic(
+                meta_path,
+                {"model": self.model, "created_at": datetime.now(timezone.utc).isoformat()},
+            )
+
+        seg = f"seg_{self._next_seg:06d}"
+        tmp_npy = self.path / f".{seg}.npy.tmp"
+        with open(tmp_npy, "wb") as f:
+            np.save(f, np.array(self._vectors, dtype=np.float32))
+        os.replace(tmp_npy, self.path / f"{seg}.npy")
+        _write_json_atomic(self.path / f"{seg}.keys.json", self._keys)
+
+        self._next_seg += 1
+        self._keys = []
+        self._vectors = []
+
+    def clear(self) -> None:
+        self._keys = []
+        self._vectors = []
+        self._next_seg = 1
+        if self.path.exists():
+            shutil.rmtree(self.path, ignore_errors=True)
+
+
+def _write_json_atomic(path: Path, data: object) -> None:
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
@@ -2,19 +2,27 @@
 Embedder abstraction for CoDRAG.
 
 Provides a base class and Ollama implementation for generating embeddings.
+Every embedder has a blocking `embed` (builds, CLI) and an awaitable
+`aembed` (the daemon's async request path).
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import random
+import threading
 import time
+import weakref
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
+import httpx
 import requests
 
+from .metrics import EMBED_ERRORS, EMBED_LATENCY, EMBED_REQUESTS, EMBED_RETRIES
+
 logger = logging.getLogger(__name__)
 
 
@@ -38,6 +46,10 @@ class Embedder(ABC):
         """Generate embeddings for multiple texts."""
         pass
 
+    async def aembed(self, text: str) -> EmbeddingResult:
+        """Awaitable embed; the default runs `embed` in a worker thread."""
+        return await asyncio.to_thread(self.embed, text)
+
 
 class OllamaEmbedder(Embedder):
     """Ollama-based embedder using the /api/embeddings endpoint."""
@@ -65,17 +77,86 @@ class OllamaEmbedder(Embedder):
         self.timeout_s = timeout_s
         self.max_retries = max_retries
         self.keep_alive = keep_alive
-
-    def embed(self, text: str) -> EmbeddingResult:
-        """Generate an embedding for a single text."""
-        payload = {
+        # One pooled async client per event loop (httpx clients are loop-bound).
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._async_clients_lock = threading.Lock()
+
+    def _payload(self, text: str) -> Dict[str, Any]:
+        return {
             "model": self.model,
             "prompt": text,
             "keep_alive": self.keep_alive,
         }
 
+    def _parse_response(self, data: Any) -> EmbeddingResult:
+        data = data or {}
+        emb = data.get("embedding")
+        if not isinstance(emb, list) or not emb:
+            raise ValueError("Ollama embeddings response missing 'embedding'")
+        return EmbeddingResult(
+            vector=[float(x) for x in emb],
+            model=data.get("model") or self.model,
+        )
+
+    @staticmethod
+    def _retry_delay_s(attempt: int) -> float:
+        return 0.35 * (2**attempt) + random.random() * 0.25
+
+    def _async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._async_clients_lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                client = httpx.AsyncClient(
+                    base_url=self.base_url,
+                    timeout=self.timeout_s,
+                    limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+                )
+                self._async_clients[loop] = client
+            return client
+
+    async def aembed(self, text: str) -> EmbeddingResult:
+        """Generate an embedding without blocking the event loop (pooled connections)."""
+        client = self._async_client()
+        last_err: Optional[Exception] = None
+        for attempt in range(max(1, self.max_retries)):
+            EMBED_REQUESTS.inc(model=self.model)
+            t0 = time.perf_counter()
+            try:
+                resp = await client.post("/api/embeddings", json=self._payload(text))
+                resp.raise_for_status()
+                result = self._parse_response(resp.json())
+                EMBED_LATENCY.observe(time.perf_counter() - t0, model=self.model)
+                return result
+            except (httpx.HTTPError, ValueError) as e:
+                last_err = e
+                EMBED_ERRORS.inc(model=self.model)
+                if attempt >= self.max_retries - 1:
+                    break
+
+                EMBED_RETRIES.inc(model=self.model)
+                await asyncio.sleep(self._retry_delay_s(attempt))
+
+        raise last_err or RuntimeError("Ollama embedding failed")
+
+    async def aclose(self) -> None:
+        """Close the pooled client of the running event loop, if any."""
+        loop = asyncio.get_running_loop()
+        with self._async_clients_lock:
+            client = self._async_clients.pop(loop, None)
+        if client is not None:
+            await client.aclose()
+
+    def embed(self, text: str) -> EmbeddingResult:
+        """Generate an embedding for a single text."""
+        payload = self._payload(text)
+
         last_err: Optional[Exception] = None
         for attempt in range(max(1, self.max_retries)):
+            EMBED_REQUESTS.inc(model=self.model)
+            t0 = time.perf_counter()
             try:
                 resp = requests.post(
                     f"{self.base_url}/api/embeddings",
@@ -90,22 +171,17 @@ class OllamaEmbedder(Embedder):
                     )
 
                 resp.raise_for_status()
-                data = resp.json() or {}
-                emb = data.get("embedding")
-                if not isinstance(emb, list) or not emb:
-                    raise ValueError("Ollama embeddings response missing 'embedding'")
-                return EmbeddingResult(
-                    vector=[float(x) for x in emb],
-                    model=data.get("model") or self.model,
-                )
+                result = self._parse_response(resp.json())
+                EMBED_LATENCY.observe(time.perf_counter() - t0, model=self.model)
+                return result
             except (requests.RequestException, ValueError) as e:
                 last_err = e
+                EMBED_ERRORS.inc(model=self.model)
                 if attempt >= self.max_retries - 1:
                     break
 
-                base_delay_s = 0.35 * (2**attempt)
-                jitter_s = random.random() * 0.25
-                time.sleep(base_delay_s + jitter_s)
+                EMBED_RETRIES.inc(model=self.model)
+                time.sleep(self._retry_delay_s(attempt))
 
         raise last_err or RuntimeError("Ollama embedding failed")
 
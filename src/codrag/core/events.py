@@ -0,0 +1,175 @@
+"""
+In-process event bus for CoDRAG.
+
+Build workers and watchers publish small JSON-ready events (build progress,
+index swaps, watcher state transitions); the daemon fans them out to
+Server-Sent Events subscribers. Each subscriber has a bounded queue: a slow
+consumer loses its oldest events rather than blocking publishers.
+
+Events carry a monotonically increasing id and the most recent ones are kept
+in a ring buffer, so a reconnecting SSE client can resume via Last-Event-ID.
+
+Publishers are build and watcher threads; SSE handlers await `aget()`, which
+the publisher wakes through the subscriber's event loop
+(`call_soon_threadsafe`), so an event is delivered as soon as it is published
+and an idle subscriber costs nothing until then.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import queue
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, FrozenSet, List, Optional, Tuple
+
+EVENT_BUILD_PROGRESS = "build.progress"
+EVENT_INDEX_SWAPPED = "index.swapped"
+EVENT_WATCH_STATE = "watch.state"
+
+EVENT_TYPES = (EVENT_BUILD_PROGRESS, EVENT_INDEX_SWAPPED, EVENT_WATCH_STATE)
+
+
+@dataclass(frozen=True)
+class Event:
+    id: int
+    type: str
+    project_id: Optional[str]
+    data: Dict[str, Any]
+    at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "type": self.type, "project_id": self.project_id, "at": self.at, "data": self.data}
+
+
+class Subscription:
+    """A filtered, bounded view of the bus. Close it when done."""
+
+    def __init__(
+        self,
+        bus: "EventBus",
+        types: Optional[FrozenSet[str]],
+        project_id: Optional[str],
+        max_queue: int,
+    ) -> None:
+        self._bus = bus
+        self.types = types
+        self.project_id = project_id
+        self._queue: "queue.Queue[Event]" = queue.Queue(maxsize=max(1, int(max_queue)))
+        self.dropped = 0
+        # Set by aget(): the loop to wake when an event is offered.
+        self._waiter: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = None
+
+    def matches(self, event: Event) -> bool:
+        if self.types is not None and event.type not in self.types:
+            return False
+        if self.project_id is not None and event.project_id != self.project_id:
+            return False
+        return True
+
+    def _offer(self, event: Event) -> None:
+        while True:
+            try:
+                self._queue.put_nowait(event)
+                break
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+        waiter = self._waiter
+        if waiter is not None:
+            loop, wakeup = waiter
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:  # loop closed: the subscriber is gone
+                pass
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Event]:
+        """Next event, or None if none arrives within `timeout` seconds."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    async def aget(self, timeout: Optional[float] = None) -> Optional[Event]:
+        """Await the next event, or None if none arrives within `timeout` seconds."""
+        loop = asyncio.get_running_loop()
+        if self._waiter is None or self._waiter[0] is not loop:
+            self._waiter = (loop, asyncio.Event())
+        wakeup = self._waiter[1]
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            # Clear before checking: an offer after the check sets it again.
+            wakeup.clear()
+            try:
+                return self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            remaining = None if deadline is None else deadline - loop.time()
+            if remaining is not None and remaining <= 0:
+                return None
+            try:
+                await asyncio.wait_for(wakeup.wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
+
+    def close(self) -> None:
+        self._bus._unsubscribe(self)
+
+
+class EventBus:
+    """Thread-safe publish/subscribe hub."""
+
+    def __init__(self, history: int = 256) -> None:
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._subscribers: List[Subscription] = []
+        self._history: Deque[Event] = deque(maxlen=max(0, int(history)))
+
+    def publish(self, type: str, project_id: Optional[str], data: Dict[str, Any]) -> Event:
+        with self._lock:
+            event = Event(id=next(self._ids), type=type, project_id=project_id, data=data)
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            if sub.matches(event):
+                sub._offer(event)
+        return event
+
+    def subscribe(
+        self,
+        types: Optional[List[str]] = None,
+        project_id: Optional[str] = None,
+        last_event_id: Optional[int] = None,
+        max_queue: int = 1000,
+    ) -> Subscription:
+        """
+        Register a subscriber.
+
+        If `last_event_id` is given, buffered events newer than it are
+        replayed into the subscription before live events.
+        """
+        sub = Subscription(self, frozenset(types) if types else None, project_id, max_queue)
+        with self._lock:
+            if last_event_id is not None:
+                for event in self._history:
+                    if event.id > last_event_id and sub.matches(event):
+                        sub._offer(event)
+            self._subscribers.append(sub)
+        return sub
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def _unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            try:
+                self._subscribers.remove(sub)
+            except ValueError:
+                pass
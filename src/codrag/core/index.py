@@ -9,26 +9,104 @@ from __future__ import annotations
 import hashlib
 import json
 import logging
+import os
 import re
 import shutil
 import sqlite3
+import threading
+import time
 import uuid
-from dataclasses import dataclass
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from functools import cached_property
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 import numpy as np
 
+from .checkpoint import BuildCheckpoint, checkpoint_key
 from .chunking import Chunk, chunk_code, chunk_markdown
 from .embedder import Embedder
 from .ids import stable_file_hash, stable_file_node_id
+from .locking import FileLock
 from .manifest import ManifestBuildStats, build_manifest, write_manifest
+from .progress import BuildProgress
 from .repo_policy import ensure_repo_policy
 from .repo_profile import DEFAULT_ROLE_WEIGHTS, classify_rel_path
+from .timing import StageTimings
 
 logger = logging.getLogger(__name__)
 
+# Rough per-document cost of the dict, metadata strings and ids, on top of content.
+_DOC_OVERHEAD_BYTES = 512
+
+# How often (at most) queries stat manifest.json to notice external rebuilds.
+DEFAULT_RELOAD_INTERVAL_MS = 1000
+
+# (st_mtime_ns, st_ino, st_size) of manifest.json
+_FileSignature = Tuple[int, int, int]
+
+# Idle FTS connections kept per snapshot for reuse by later queries.
+_FTS_POOL_MAX = 8
+
+
+class BuildCancelled(Exception):
+    """Raised by CodeIndex.build when its cancel_event is set."""
+
+
+class BuildLocked(Exception):
+    """Raised by CodeIndex.build when another process is building the same index."""
+
+
+@dataclass(frozen=True)
+class IndexSnapshot:
+    """
+    One loaded index generation: documents, embeddings and manifest together.
+
+    CodeIndex publishes a new snapshot with a single reference assignment and
+    every query reads from the snapshot it grabbed on entry, so a query that
+    overlaps a rebuild sees the old generation or the new one, never a mix.
+    A superseded snapshot (and its memory-mapped embeddings) is released once
+    the last query holding it returns.
+    """
+
+    documents: Optional[List[Dict[str, Any]]] = None
+    embeddings: Optional[np.ndarray] = None
+    manifest: Dict[str, Any] = field(default_factory=dict)
+    generation: int = 0
+    # Read-only FTS connections opened for this generation; each is used by
+    # one query at a time (deque append/pop are atomic).
+    fts_pool: "deque[sqlite3.Connection]" = field(default_factory=deque, compare=False, repr=False)
+
+    def is_loaded(self) -> bool:
+        return bool(self.documents) and self.embeddings is not None
+
+    @cached_property
+    def row_norms(self) -> np.ndarray:
+        """L2 norm of every embedding row, computed once per generation."""
+        if self.embeddings is None:
+            return np.zeros(0, dtype=np.float32)
+        return np.linalg.norm(self.embeddings, axis=1)
+
+    @cached_property
+    def id_to_idx(self) -> Dict[str, int]:
+        return {str(d.get("id")): i for i, d in enumerate(self.documents or [])}
+
+    @cached_property
+    def footprint(self) -> int:
+        docs = self.documents or []
+        doc_bytes = sum(len(str(d.get("content") or "")) + _DOC_OVERHEAD_BYTES for d in docs)
+        emb_bytes = int(self.embeddings.nbytes) if self.embeddings is not None else 0
+        return doc_bytes + emb_bytes
+
+    def materialize(self) -> int:
+        """Compute the lazy per-generation fields now; returns the footprint."""
+        _ = self.row_norms
+        _ = self.id_to_idx
+        return self.footprint
+
 
 @dataclass(frozen=True)
 class SearchResult:
@@ -52,6 +130,8 @@ class CodeIndex:
         self,
         index_dir: Path | str,
         embedder: Embedder,
+        reload_interval_ms: int = DEFAULT_RELOAD_INTERVAL_MS,
+        on_reload: Optional[Callable[[IndexSnapshot], None]] = None,
     ):
         """
         Initialize a CodeIndex.
@@ -59,66 +139,213 @@ class CodeIndex:
         Args:
             index_dir: Directory to store index files
             embedder: Embedder instance for generating vectors
+            reload_interval_ms: Minimum time between checks for an index
+                rebuilt by another process (0 disables hot reload)
+            on_reload: Called with the new snapshot after a hot reload
         """
         self.index_dir = Path(index_dir)
         self.embedder = embedder
+        self.reload_interval_s = max(0, int(reload_interval_ms)) / 1000.0
+        self.on_reload = on_reload
 
         self.documents_path = self.index_dir / "documents.json"
         self.embeddings_path = self.index_dir / "embeddings.npy"
         self.manifest_path = self.index_dir / "manifest.json"
         self.fts_path = self.index_dir / "fts.sqlite3"
 
-        self._documents: Optional[List[Dict[str, Any]]] = None
-        self._embeddings: Optional[np.ndarray] = None
-        self._manifest: Dict[str, Any] = {}
+        self._snapshot = IndexSnapshot()
+        self._disk_sig: Optional[_FileSignature] = None
+        self._next_reload_check = 0.0
+        self._reload_lock = threading.Lock()
+        # (prior, weight, key) set by set_file_prior, and the boosts last
+        # computed as (documents list, that tuple, boosts).
+        self._file_prior: Tuple[Optional[Dict[str, float]], float, Optional[Any]] = (None, 0.0, None)
+        self._file_prior_boosts_cache: Optional[Tuple[List[Dict[str, Any]], tuple, np.ndarray]] = None
 
         self._load()
         self._cleanup_stale_builds()
 
     def _load(self) -> None:
-        """Load existing index from disk."""
+        """
+        Load existing index from disk.
+
+        Embeddings are memory-mapped read-only: pages are faulted in by
+        search and can be dropped by the OS, so loading (and re-loading an
+        evicted index) does not copy the matrix into the heap.
+        """
+        self._disk_sig = self._manifest_signature()
         if not self.documents_path.exists() or not self.embeddings_path.exists():
-            self._documents = None
-            self._embeddings = None
-            self._manifest = {}
+            self._publish(None, None, {})
             return
 
         try:
-            with open(self.documents_path, "r") as f:
-                self._documents = json.load(f)
-            self._embeddings = np.load(self.embeddings_path)
-            if self.manifest_path.exists():
-                with open(self.manifest_path, "r") as f:
-                    self._manifest = json.load(f) or {}
-            else:
-                self._manifest = {}
+            manifest = self._read_manifest()
+            documents, embeddings = self._read_index_files()
         except Exception as e:
             logger.warning(f"Failed to load index: {e}")
-            self._documents = None
-            self._embeddings = None
-            self._manifest = {}
+            self._publish(None, None, {})
+            return
+        self._publish(documents, embeddings, manifest)
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        if not self.manifest_path.exists():
+            return {}
+        with open(self.manifest_path, "r") as f:
+            return json.load(f) or {}
+
+    def _read_index_files(self) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+        with open(self.documents_path, "r") as f:
+            documents = json.load(f)
+        embeddings = np.load(self.embeddings_path, mmap_mode="r")
+        return documents, embeddings
+
+    def _manifest_signature(self) -> Optional[_FileSignature]:
+        try:
+            st = os.stat(self.manifest_path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_ino, st.st_size)
+
+    def maybe_reload(self) -> bool:
+        """
+        Cheap check, made on the query path, for an index rebuilt elsewhere.
+
+        Stats manifest.json at most once per `reload_interval_s`; if it has
+        changed, reloads in a background thread and returns True. The calling
+        query carries on with the current snapshot.
+        """
+        if self.reload_interval_s <= 0:
+            return False
+        now = time.monotonic()
+        if now < self._next_reload_check:
+            return False
+        self._next_reload_check = now + self.reload_interval_s
+        sig = self._manifest_signature()
+        if sig is None or sig == self._disk_sig or self._reload_lock.locked():
+            return False
+        threading.Thread(target=self.reload_if_changed, name="codrag-index-reload", daemon=True).start()
+        return True
+
+    def reload_if_changed(self) -> bool:
+        """
+        Reload from disk if manifest.json changed since this index was loaded.
+
+        Returns True if a new snapshot was published. A directory caught
+        mid-swap (files missing or not matching each other) is left alone and
+        picked up by a later check.
+        """
+        with self._reload_lock:
+            sig = self._manifest_signature()
+            if sig is None or sig == self._disk_sig:
+                return False
+            try:
+                manifest = self._read_manifest()
+                current = self._snapshot
+                if current.is_loaded() and manifest.get("built_at") == current.manifest.get("built_at"):
+                    self._disk_sig = sig
+                    return False
+                documents, embeddings = self._read_index_files()
+            except Exception as e:
+                logger.debug(f"Index reload of {self.index_dir} deferred: {e}")
+                return False
+            if self._manifest_signature() != sig or len(documents) != int(embeddings.shape[0]):
+                return False
+            snap = self._publish(documents, embeddings, manifest)
+            self._disk_sig = sig
+        logger.info(f"Reloaded index {self.index_dir} (generation {snap.generation})")
+        if self.on_reload is not None:
+            try:
+                self.on_reload(snap)
+            except Exception:
+                logger.exception("Index reload listener failed")
+        return True
+
+    def _publish(
+        self,
+        documents: Optional[List[Dict[str, Any]]],
+        embeddings: Optional[np.ndarray],
+        manifest: Dict[str, Any],
+    ) -> IndexSnapshot:
+        """Make a new generation visible to queries (one reference assignment)."""
+        snap = IndexSnapshot(
+            documents=documents,
+            embeddings=embeddings,
+            manifest=manifest,
+            generation=self._snapshot.generation + 1,
+        )
+        self._snapshot = snap
+        return snap
+
+    def snapshot(self) -> IndexSnapshot:
+        """The current loaded generation; stays valid across later rebuilds."""
+        return self._snapshot
+
+    def warm(self) -> Dict[str, Any]:
+        """
+        Pay first-query costs up front: fault in the embedding pages (via the
+        cached row norms), build the id lookup and open a pooled FTS connection.
+        """
+        snap = self._snapshot
+        if not snap.is_loaded():
+            return {"loaded": False, "documents": 0, "fts": False}
+        snap.materialize()
+        fts = False
+        with self._fts_connection(snap) as conn:
+            if conn is not None:
+                try:
+                    conn.execute("SELECT count(*) FROM fts").fetchone()
+                    fts = True
+                except sqlite3.Error:
+                    pass
+        return {"loaded": True, "documents": len(snap.documents or []), "fts": fts}
+
+    # Read-only views of the current snapshot, kept for callers that predate it.
+    @property
+    def _documents(self) -> Optional[List[Dict[str, Any]]]:
+        return self._snapshot.documents
+
+    @property
+    def _embeddings(self) -> Optional[np.ndarray]:
+        return self._snapshot.embeddings
+
+    @property
+    def _manifest(self) -> Dict[str, Any]:
+        return self._snapshot.manifest
 
     def is_loaded(self) -> bool:
         """Check if an index is loaded and ready for search."""
-        return bool(self._documents) and self._embeddings is not None
+        return self._snapshot.is_loaded()
+
+    def memory_footprint(self) -> int:
+        """
+        Approximate bytes held by this index (documents + embeddings).
+
+        Memory-mapped embeddings are counted at full size, since searching
+        touches every row.
+        """
+        return self._snapshot.footprint
 
     def stats(self) -> Dict[str, Any]:
         """Get index statistics."""
-        if not self.is_loaded():
+        self.maybe_reload()
+        snap = self._snapshot
+        if not snap.is_loaded():
             return {
                 "loaded": False,
                 "index_dir": str(self.index_dir),
             }
 
+        manifest = snap.manifest
         return {
             "loaded": True,
             "index_dir": str(self.index_dir),
-            "model": self._manifest.get("model", "unknown"),
-            "built_at": self._manifest.get("built_at"),
-            "roots": self._manifest.get("roots", []),
-            "total_documents": len(self._documents or []),
-            "embedding_dim": int(self._embeddings.shape[1]) if self._embeddings is not None else 0,
-            "config": self._manifest.get("config", {}),
+            "model": manifest.get("model", "unknown"),
+            "built_at": manifest.get("built_at"),
+            "roots": manifest.get("roots", []),
+            "total_documents": len(snap.documents or []),
+            "embedding_dim": int(snap.embeddings.shape[1]) if snap.embeddings is not None else 0,
+            "config": manifest.get("config", {}),
+            "generation": snap.generation,
         }
 
     def build(
@@ -129,6 +356,10 @@ class CodeIndex:
         exclude_globs: Optional[List[str]] = None,
         max_file_bytes: int = 500_000,
         progress_callback: Optional[Callable[[str, int, int], None]] = None,
+        timings: Optional[StageTimings] = None,
+        progress: Optional[BuildProgress] = None,
+        cancel_event: Optional[threading.Event] = None,
+        checkpoint_every: int = 256,
     ) -> Dict[str, Any]:
         """
         Build the index from a repository.
@@ -139,10 +370,62 @@ class CodeIndex:
             exclude_globs: Glob patterns for files to exclude
             max_file_bytes: Skip files larger than this
             progress_callback: Optional callback(file_path, current, total)
+            timings: Optional StageTimings to record build stage durations into
+            progress: Optional BuildProgress updated with phase, counts and throughput
+            cancel_event: When set, the build stops before its next file or chunk
+                and raises BuildCancelled
+            checkpoint_every: Flush newly embedded vectors to the build
+                checkpoint after this many chunks; an interrupted build resumes
+                from the checkpoint on the next run
 
         Returns:
             Build metadata
+
+        Raises:
+            BuildLocked: another process (or CodeIndex) is building this index dir
         """
+        lock = FileLock(self.build_lock_path())
+        if not lock.acquire():
+            pid = lock.owner_pid()
+            raise BuildLocked(f"Index {self.index_dir} is being built by another process (pid {pid})")
+        try:
+            return self._build(
+                repo_root,
+                roots,
+                include_globs,
+                exclude_globs,
+                max_file_bytes,
+                progress_callback,
+                timings,
+                progress,
+                cancel_event,
+                checkpoint_every,
+            )
+        finally:
+            lock.release()
+
+    def build_lock_path(self) -> Path:
+        # Beside the index dir, not inside it: the dir itself is replaced on swap.
+        return self.index_dir.parent / f".build_{self.index_dir.name}.lock"
+
+    def is_build_locked(self) -> bool:
+        """True while any process is building this index dir."""
+        return FileLock(self.build_lock_path()).is_locked()
+
+    def _build(
+        self,
+        repo_root: Path | str,
+        roots: Optional[List[str]],
+        include_globs: Optional[List[str]],
+        exclude_globs: Optional[List[str]],
+        max_file_bytes: int,
+        progress_callback: Optional[Callable[[str, int, int], None]],
+        timings: Optional[StageTimings],
+        progress: Optional[BuildProgress],
+        cancel_event: Optional[threading.Event],
+        checkpoint_every: int,
+    ) -> Dict[str, Any]:
+        t = timings if timings is not None else StageTimings()
         repo_root = Path(repo_root).resolve()
 
         policy = ensure_repo_policy(self.index_dir, repo_root)
@@ -165,9 +448,10 @@ class CodeIndex:
             except Exception:
                 role_weights = dict(DEFAULT_ROLE_WEIGHTS)
 
-        prev_docs = self._documents or []
-        prev_emb = self._embeddings
-        prev_model = str(self._manifest.get("model") or "")
+        prev = self._snapshot
+        prev_docs = prev.documents or []
+        prev_emb = prev.embeddings
+        prev_model = str(prev.manifest.get("model") or "")
         cur_model = str(getattr(self.embedder, "model", "unknown"))
         can_reuse = bool(prev_docs) and prev_emb is not None and prev_model == cur_model
 
@@ -191,105 +475,193 @@ class CodeIndex:
             cleaned = [r for r in cleaned if r]
             selected_roots = cleaned or None
 
-        files: List[Path] = []
-        if selected_roots:
-            for rel_root in selected_roots:
-                rel_path = Path(rel_root)
-                if rel_path.is_absolute() or ".." in rel_path.parts:
-                    continue
+        with self._phase("enumerate", t, progress):
+            files: List[Path] = []
+            if selected_roots:
+                for rel_root in selected_roots:
+                    rel_path = Path(rel_root)
+                    if rel_path.is_absolute() or ".." in rel_path.parts:
+                        continue
 
-                abs_root = (repo_root / rel_path).resolve()
-                if not abs_root.is_relative_to(repo_root):
+                    abs_root = (repo_root / rel_path).resolve()
+                    if not abs_root.is_relative_to(repo_root):
+                        continue
+                    if not abs_root.exists() or not abs_root.is_dir():
+                        continue
+                    for pat in include_globs:
+                        files.extend(abs_root.glob(pat))
+            else:
+                for pat in include_globs:
+                    files.extend(repo_root.glob(pat))
+            files = sorted(set(files))
+
+            filtered_files: List[Path] = []
+            for f in files:
+                if not f.is_file():
                     continue
-                if not abs_root.exists() or not abs_root.is_dir():
+                try:
+                    rel_path = str(f.relative_to(repo_root))
+                except ValueError:
                     continue
-                for pat in include_globs:
-                    files.extend(abs_root.glob(pat))
-        else:
-            for pat in include_globs:
-                files.extend(repo_root.glob(pat))
-        files = sorted(set(files))
-
-        filtered_files: List[Path] = []
-        for f in files:
-            if not f.is_file():
-                continue
-            try:
-                rel_path = str(f.relative_to(repo_root))
-            except ValueError:
-                continue
-            if any(Path(rel_path).match(pat) for pat in exclude_globs):
-                continue
-            if f.stat().st_size > max_file_bytes:
-                continue
-            filtered_files.append(f)
+                if any(Path(rel_path).match(pat) for pat in exclude_globs):
+                    continue
+                if f.stat().st_size > max_file_bytes:
+                    continue
+                filtered_files.append(f)
 
-        docs: List[Dict[str, Any]] = []
-        vectors: List[List[float]] = []
         total_files = len(filtered_files)
+        if progress is not None:
+            progress.set_files(0, total_files)
 
-        files_reused = 0
-        files_embedded = 0
         chunks_reused = 0
-        chunks_embedded = 0
 
-        for i, file_path in enumerate(filtered_files):
-            rel_path = str(file_path.relative_to(repo_root))
-            role = classify_rel_path(rel_path)
+        # The read phase keeps only each file's hash, so unchanged files can be
+        # reused; the text of changed files is read again when they are chunked.
+        # Each plan entry is (rel_path, role, file_hash, reused_idxs), with
+        # reused_idxs None for files to embed.
+        plan: List[Tuple[str, str, str, Optional[List[int]]]] = []
+        with self._phase("read", t, progress):
+            for i, file_path in enumerate(filtered_files):
+                self._check_cancelled(cancel_event)
+                rel_path = str(file_path.relative_to(repo_root))
+                role = classify_rel_path(rel_path)
+
+                if progress_callback:
+                    progress_callback(rel_path, i + 1, total_files)
+                if progress is not None:
+                    progress.set_files(i + 1)
+
+                try:
+                    raw = file_path.read_text(encoding="utf-8", errors="ignore")
+                except Exception:
+                    continue
 
-            if progress_callback:
-                progress_callback(rel_path, i + 1, total_files)
+                file_hash = stable_file_hash(raw)
 
-            try:
-                raw = file_path.read_text(encoding="utf-8", errors="ignore")
-            except Exception:
-                continue
+                if can_reuse:
+                    prev_hash = prev_hash_by_source.get(rel_path)
+                    if prev_hash and prev_hash == file_hash:
+                        plan.append((rel_path, role, file_hash, prev_by_source.get(rel_path) or []))
+                        continue
 
-            file_hash = stable_file_hash(raw)
-
-            if can_reuse:
-                prev_hash = prev_hash_by_source.get(rel_path)
-                if prev_hash and prev_hash == file_hash:
-                    idxs = prev_by_source.get(rel_path) or []
-                    for di in idxs:
-                        prev_doc = dict(prev_docs[int(di)])
-                        prev_doc["role"] = role
-                        prev_doc["file_hash"] = file_hash
-                        docs.append(prev_doc)
-                        vectors.append(prev_emb[int(di)].tolist())
-
-                    files_reused += 1
-                    chunks_reused += len(idxs)
-                    continue
+                plan.append((rel_path, role, file_hash, None))
 
-            files_embedded += 1
+        # Chunks go to a spill file as each file is chunked and are read back
+        # one at a time while embedding: memory holds one file's text and one
+        # chunk, not the whole repo, yet the number of chunks to embed is known
+        # before the embed phase starts. The build lock makes the name safe.
+        spill_path = self.index_dir.parent / f".index_chunks_{self.index_dir.name}.jsonl"
+        chunk_counts: Dict[str, int] = {}
+        checkpoint = BuildCheckpoint(self._checkpoint_dir(), model=cur_model)
+        resumed: Dict[str, np.ndarray] = {}
+        chunks_resumed = 0
+        to_embed = 0
 
-            if file_path.suffix.lower() in (".md", ".markdown"):
-                chunks = chunk_markdown(raw, source_path=rel_path)
-            else:
-                chunks = chunk_code(raw, source_path=rel_path)
-
-            for ch in chunks:
-                text_for_embed = self._format_chunk_for_embedding(ch, file_hash)
-                emb = self.embedder.embed(text_for_embed).vector
-
-                doc = {
-                    "id": ch.chunk_id,
-                    "source_path": rel_path,
-                    "file_hash": file_hash,
-                    "role": role,
-                    "section": ch.metadata.get("section", ""),
-                    "span": ch.metadata.get("span"),
-                    "content": ch.content,
-                }
-                docs.append(doc)
-                vectors.append(emb)
-                chunks_embedded += 1
+        files_reused = 0
+        files_embedded = 0
+        chunks_embedded = 0
+        every = max(1, int(checkpoint_every))
+
+        docs: List[Dict[str, Any]] = []
+        embeddings: Optional[np.ndarray] = None
 
-        if not docs:
+        try:
+            with self._phase("chunk", t, progress):
+                if any(reused_idxs is None for *_, reused_idxs in plan):
+                    resumed = checkpoint.load()
+                spill_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(spill_path, "w", encoding="utf-8") as spill:
+                    for rel_path, _role, file_hash, reused_idxs in plan:
+                        if reused_idxs is not None:
+                            chunks_reused += len(reused_idxs)
+                            continue
+                        self._check_cancelled(cancel_event)
+                        try:
+                            raw = (repo_root / rel_path).read_text(encoding="utf-8", errors="ignore")
+                        except Exception:
+                            raw = ""
+                        if Path(rel_path).suffix.lower() in (".md", ".markdown"):
+                            chunks = chunk_markdown(raw, source_path=rel_path)
+                        else:
+                            chunks = chunk_code(raw, source_path=rel_path)
+                        del raw
+                        for ch in chunks:
+                            text_for_embed = self._format_chunk_for_embedding(ch, file_hash)
+                            key = checkpoint_key(text_for_embed)
+                            if key in resumed:
+                                chunks_resumed += 1
+                            else:
+                                to_embed += 1
+                            entry = {
+                                "id": ch.chunk_id,
+                                "section": ch.metadata.get("section", ""),
+                                "span": ch.metadata.get("span"),
+                                "content": ch.content,
+                                "text": text_for_embed,
+                                "key": key,
+                            }
+                            spill.write(json.dumps(entry) + "\n")
+                        chunk_counts[rel_path] = len(chunks)
+
+            if chunks_resumed:
+                logger.info(f"Resuming build from checkpoint: {chunks_resumed} chunks already embedded")
+            chunks_total = chunks_reused + chunks_resumed + to_embed
+            if progress is not None:
+                progress.set_chunks(chunks_reused + chunks_resumed, total=chunks_total, to_embed=to_embed)
+
+            with self._phase("embed", t, progress):
+                try:
+                    with open(spill_path, encoding="utf-8") as spill:
+                        for rel_path, role, file_hash, reused_idxs in plan:
+                            if reused_idxs is not None:
+                                for di in reused_idxs:
+                                    prev_doc = dict(prev_docs[int(di)])
+                                    prev_doc["role"] = role
+                                    prev_doc["file_hash"] = file_hash
+                                    vec = prev_emb[int(di)]
+                                    embeddings = self._put_vector(embeddings, chunks_total, len(docs), vec)
+                                    docs.append(prev_doc)
+                                files_reused += 1
+                                continue
+
+                            files_embedded += 1
+                            for _ in range(chunk_counts.get(rel_path, 0)):
+                                entry = json.loads(spill.readline())
+                                cached = resumed.get(entry["key"])
+                                if cached is not None:
+                                    emb: Any = cached
+                                else:
+                                    self._check_cancelled(cancel_event)
+                                    emb = self.embedder.embed(entry["text"]).vector
+                                    checkpoint.add(entry["key"], emb)
+                                    if checkpoint.pending() >= every:
+                                        checkpoint.flush()
+                                    chunks_embedded += 1
+                                    if progress is not None:
+                                        progress.chunk_embedded()
+
+                                doc = {
+                                    "id": entry["id"],
+                                    "source_path": rel_path,
+                                    "file_hash": file_hash,
+                                    "role": role,
+                                    "section": entry["section"],
+                                    "span": entry["span"],
+                                    "content": entry["content"],
+                                }
+                                embeddings = self._put_vector(embeddings, chunks_total, len(docs), emb)
+                                docs.append(doc)
+                finally:
+                    # Keep whatever was embedded so a failed or cancelled build can resume.
+                    checkpoint.flush()
+        finally:
+            spill_path.unlink(missing_ok=True)
+
+        if not docs or embeddings is None:
             raise RuntimeError("No documents indexed")
 
-        embeddings = np.array(vectors, dtype=np.float32)
+        self._check_cancelled(cancel_event)
+        embeddings = embeddings[: len(docs)]
 
         # Atomic build: write to temporary directory first
         build_id = uuid.uuid4().hex
@@ -297,12 +669,14 @@ class CodeIndex:
         temp_dir.mkdir(parents=True, exist_ok=True)
 
         try:
-            with open(temp_dir / "documents.json", "w") as f:
-                json.dump(docs, f)
-            np.save(temp_dir / "embeddings.npy", embeddings)
+            with self._phase("write", t, progress):
+                with open(temp_dir / "documents.json", "w") as f:
+                    json.dump(docs, f)
+                np.save(temp_dir / "embeddings.npy", embeddings)
 
             try:
-                self._rebuild_fts(docs, target_dir=temp_dir)
+                with self._phase("fts", t, progress):
+                    self._rebuild_fts(docs, target_dir=temp_dir)
             except Exception as e:
                 logger.warning(f"FTS rebuild failed (continuing without keyword index): {e}")
 
@@ -319,6 +693,7 @@ class CodeIndex:
                     chunks_total=len(docs),
                     chunks_reused=chunks_reused,
                     chunks_embedded=chunks_embedded,
+                    chunks_resumed=chunks_resumed,
                 ),
                 config={
                     "include_globs": include_globs,
@@ -331,8 +706,17 @@ class CodeIndex:
             )
             write_manifest(temp_dir / "manifest.json", manifest)
 
-            # Atomic swap
-            self._swap_index_dir(temp_dir)
+            # Atomic swap, then publish. Holding the reload lock keeps our own
+            # swap from being mistaken for an external rebuild.
+            with self._reload_lock:
+                self._swap_index_dir(temp_dir)
+                try:
+                    loaded: np.ndarray = np.load(self.embeddings_path, mmap_mode="r")
+                except Exception:
+                    loaded = embeddings
+                self._publish(docs, loaded, manifest)
+                self._disk_sig = self._manifest_signature()
+            checkpoint.clear()
 
         except Exception:
             # Cleanup on failure
@@ -340,12 +724,34 @@ class CodeIndex:
                 shutil.rmtree(temp_dir, ignore_errors=True)
             raise
 
-        self._documents = docs
-        self._embeddings = embeddings
-        self._manifest = manifest
-
         return manifest
 
+    @staticmethod
+    @contextmanager
+    def _phase(name: str, timings: StageTimings, progress: Optional[BuildProgress]) -> Iterator[None]:
+        """Enter a build phase: time it and report it to progress, if any."""
+        if progress is not None:
+            progress.set_phase(name)
+        with timings.span(name):
+            yield
+
+    @staticmethod
+    def _put_vector(embeddings: Optional[np.ndarray], total: int, row: int, vector: Any) -> np.ndarray:
+        """Store `vector` at `row`, allocating the (total, dim) float32 matrix on first use."""
+        if embeddings is None:
+            embeddings = np.empty((total, len(vector)), dtype=np.float32)
+        embeddings[row] = vector
+        return embeddings
+
+    @staticmethod
+    def _check_cancelled(cancel_event: Optional[threading.Event]) -> None:
+        if cancel_event is not None and cancel_event.is_set():
+            raise BuildCancelled("Build cancelled")
+
+    def _checkpoint_dir(self) -> Path:
+        """Stable per-index checkpoint directory (not removed by stale-build cleanup)."""
+        return self.index_dir.parent / f".index_checkpoint_{self.index_dir.name}"
+
     def _swap_index_dir(self, new_dir: Path) -> None:
         """Atomically swap the new index directory with the current one."""
         # Ensure parent exists
@@ -474,10 +880,11 @@ class CodeIndex:
             return {"code": 1.08, "tests": 1.0, "docs": 0.93, "other": 0.9}
         return {}
 
-    def query_policy(self, query: str) -> Dict[str, Any]:
+    def query_policy(self, query: str, snapshot: Optional[IndexSnapshot] = None) -> Dict[str, Any]:
+        snap = snapshot if snapshot is not None else self._snapshot
         intent = self._classify_query_intent(query)
         intent_multipliers = self._intent_role_multipliers(intent)
-        role_weights = (self._manifest.get("config") or {}).get("role_weights")
+        role_weights = (snap.manifest.get("config") or {}).get("role_weights")
         if not isinstance(role_weights, dict):
             role_weights = {}
 
@@ -505,6 +912,8 @@ class CodeIndex:
         query: str,
         k: int = 8,
         min_score: float = 0.15,
+        timings: Optional[StageTimings] = None,
+        query_vector: Optional[List[float]] = None,
     ) -> List[SearchResult]:
         """
         Search the index.
@@ -513,71 +922,97 @@ class CodeIndex:
             query: Search query
             k: Number of results to return
             min_score: Minimum similarity score
+            timings: Optional StageTimings to record per-stage latency into
+            query_vector: Embedding of `query` if the caller already has it
+                (e.g. from `embedder.aembed`); skips the blocking embed call
 
         Returns:
             List of SearchResult objects
         """
-        if not self.is_loaded():
+        self.maybe_reload()
+        return self._search_snapshot(self._snapshot, query, k, min_score, timings, query_vector)
+
+    def _search_snapshot(
+        self,
+        snap: IndexSnapshot,
+        query: str,
+        k: int,
+        min_score: float,
+        timings: Optional[StageTimings],
+        query_vector: Optional[List[float]] = None,
+    ) -> List[SearchResult]:
+        if not snap.is_loaded():
             return []
 
-        qv = np.array(self.embedder.embed(query).vector, dtype=np.float32)
+        t = timings if timings is not None else StageTimings()
+
+        if query_vector is None:
+            with t.span("embedding"):
+                query_vector = self.embedder.embed(query).vector
+        qv = np.asarray(query_vector, dtype=np.float32)
         qn = np.linalg.norm(qv)
         if qn == 0.0:
             return []
 
-        emb = self._embeddings
-        docs = self._documents
+        emb = snap.embeddings
+        docs = snap.documents
         if emb is None or docs is None:
             return []
 
-        denom = np.linalg.norm(emb, axis=1) * qn
-        denom = np.where(denom == 0.0, 1e-8, denom)
-        sims = (emb @ qv) / denom
-
-        sims = sims + self._keyword_boosts(query, docs)
-        sims = sims + self._fts_boosts(query, docs, limit=max(10, k * 4))
-
-        # Apply primer score boost
-        sims = sims + self._primer_boosts(docs)
-
-        intent = self._classify_query_intent(query)
-        intent_mult = self._intent_role_multipliers(intent)
-        role_weights = (self._manifest.get("config") or {}).get("role_weights")
-        if not isinstance(role_weights, dict):
-            role_weights = {}
-
-        if role_weights or intent_mult:
-            for i, d in enumerate(docs):
-                role = str(d.get("role") or "")
-                if not role:
-                    sp = str(d.get("source_path") or "")
-                    role = classify_rel_path(sp) if sp else "other"
-
-                w = 1.0
-                base = role_weights.get(role)
-                if base is not None:
-                    try:
-                        w *= float(base)
-                    except (TypeError, ValueError):
-                        pass
-                mult = intent_mult.get(role)
-                if mult is not None:
-                    try:
-                        w *= float(mult)
-                    except (TypeError, ValueError):
-                        pass
-                if w != 1.0:
-                    sims[i] = sims[i] * w
-
-        top_idx = np.argsort(sims)[::-1]
-        out: List[SearchResult] = []
-        for idx in top_idx:
-            score = float(sims[idx])
-            if score < min_score:
-                break
-            out.append(SearchResult(doc=docs[int(idx)], score=score))
-            if len(out) >= k:
-                break
+        with t.span("vector"):
+            denom = snap.row_norms * qn
+            denom = np.where(denom == 0.0, 1e-8, denom)
+            sims = (emb @ qv) / denom
+
+        with t.span("keyword"):
+            sims = sims + self._keyword_boosts(query, docs)
+        with t.span("fts"):
+            sims = sims + self._fts_boosts(query, docs, limit=max(10, k * 4), snapshot=snap)
+
+        with t.span("boosts"):
+            # Apply primer score boost
+            sims = sims + self._primer_boosts(docs, snap.manifest)
+            sims = sims + self._file_prior_boosts(docs)
+
+            intent = self._classify_query_intent(query)
+            intent_mult = self._intent_role_multipliers(intent)
+            role_weights = (snap.manifest.get("config") or {}).get("role_weights")
+            if not isinstance(role_weights, dict):
+                role_weights = {}
+
+            if role_weights or intent_mult:
+                for i, d in enumerate(docs):
+                    role = str(d.get("role") or "")
+                    if not role:
+                        sp = str(d.get("source_path") or "")
+                        role = classify_rel_path(sp) if sp else "other"
+
+                    w = 1.0
+                    base = role_weights.get(role)
+                    if base is not None:
+                        try:
+                            w *= float(base)
+                        except (TypeError, ValueError):
+                            pass
+                    mult = intent_mult.get(role)
+                    if mult is not None:
+                        try:
+                            w *= float(mult)
+                        except (TypeError, ValueError):
+                            pass
+                    if w != 1.0:
+                        sims[i] = sims[i] * w
+
+        with t.span("topk"):
+            top_idx = np.argsort(sims)[::-1]
+            out: List[SearchResult] = []
+            for idx in top_idx:
+                score = float(sims[idx])
+                if score < min_score:
+                    break
+                out.append(SearchResult(doc=docs[int(idx)], score=score))
+                if len(out) >= k:
+                    break
 
         return out
 
@@ -589,11 +1024,25 @@ class CodeIndex:
         include_sources: bool = True,
         include_scores: bool = False,
         min_score: float = 0.15,
+        timings: Optional[StageTimings] = None,
+        query_vector: Optional[List[float]] = None,
     ) -> str:
-        results = self.search(query, k=k, min_score=min_score)
+        self.maybe_reload()
+        t = timings if timings is not None else StageTimings()
+        results = self._search_snapshot(self._snapshot, query, k, min_score, t, query_vector)
         if not results:
             return ""
 
+        with t.span("pack"):
+            return self._pack_context(results, max_chars, include_sources, include_scores)
+
+    def _pack_context(
+        self,
+        results: List[SearchResult],
+        max_chars: int,
+        include_sources: bool,
+        include_scores: bool,
+    ) -> str:
         parts: List[str] = []
         total = 0
 
@@ -633,16 +1082,44 @@ class CodeIndex:
         k: int = 5,
         max_chars: int = 6000,
         min_score: float = 0.15,
+        include_timings: bool = False,
     ) -> Dict[str, Any]:
-        policy = self.query_policy(query)
-        results = self.search(query, k=k, min_score=min_score)
-        
+        self.maybe_reload()
+        return self._context_structured(self._snapshot, query, k, max_chars, min_score, include_timings)
+
+    def _context_structured(
+        self,
+        snap: IndexSnapshot,
+        query: str,
+        k: int,
+        max_chars: int,
+        min_score: float,
+        include_timings: bool = False,
+    ) -> Dict[str, Any]:
+        timings = StageTimings()
+        policy = self.query_policy(query, snap)
+        results = self._search_snapshot(snap, query, k, min_score, timings)
+        with timings.span("pack"):
+            out = self._pack_structured_context(query, results, max_chars, policy, snap)
+        if include_timings:
+            out["meta"]["timings"] = timings.as_dict()
+        return out
+
+    def _pack_structured_context(
+        self,
+        query: str,
+        results: List[SearchResult],
+        max_chars: int,
+        policy: Dict[str, Any],
+        snapshot: Optional[IndexSnapshot] = None,
+    ) -> Dict[str, Any]:
+        snap = snapshot if snapshot is not None else self._snapshot
         parts: List[str] = []
         chunks_meta: List[Dict[str, Any]] = []
         total = 0
         
         # Check if we should always include primer chunks
-        config = self._manifest.get("config") or {}
+        config = snap.manifest.get("config") or {}
         primer_cfg = config.get("primer") or {}
         always_include = primer_cfg.get("always_include", False)
         max_primer_chars = int(primer_cfg.get("max_primer_chars", 2000))
@@ -650,8 +1127,8 @@ class CodeIndex:
         # Track which chunk IDs we've already included (to avoid duplicates)
         included_ids: set = set()
         
-        if always_include and self.is_loaded():
-            primer_chunks = self.get_primer_chunks()
+        if always_include and snap.is_loaded():
+            primer_chunks = self._primer_chunks(snap)
             primer_chars_used = 0
             
             for d in primer_chunks:
@@ -750,12 +1227,12 @@ class CodeIndex:
 
     def get_chunk(self, chunk_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific chunk by ID."""
-        if not self._documents:
+        self.maybe_reload()
+        snap = self._snapshot
+        if not snap.documents:
             return None
-        for d in self._documents:
-            if d.get("id") == chunk_id:
-                return d
-        return None
+        i = snap.id_to_idx.get(str(chunk_id))
+        return snap.documents[i] if i is not None else None
 
     def get_context_with_trace_expansion(
         self,
@@ -776,7 +1253,9 @@ class CodeIndex:
         After retrieving initial chunks, expands context by following trace edges
         to find related symbols/files and including their chunks.
         """
-        base_result = self.get_context_structured(query, k=k, max_chars=max_chars - max_additional_chars, min_score=min_score)
+        self.maybe_reload()
+        snap = self._snapshot
+        base_result = self._context_structured(snap, query, k, max_chars - max_additional_chars, min_score)
         
         if trace_index is None or not trace_index.is_loaded():
             base_result["trace_expanded"] = False
@@ -794,25 +1273,24 @@ class CodeIndex:
             base_result["trace_nodes_added"] = 0
             return base_result
         
+        # One BFS seeded with every retrieved file, so `trace_hops` reaches
+        # past direct neighbors and shared neighbors are only counted once.
+        start_ids = [stable_file_node_id(sp) for sp in sorted(source_paths)]
+        subgraph = trace_index.traverse(
+            start_ids,
+            direction=trace_direction,
+            edge_kinds=trace_edge_kinds,
+            hops=max(1, int(trace_hops)),
+            max_nodes=len(start_ids) + max(0, int(max_additional_nodes)),
+            # Only nodes are used here; keep the edge budget out of the way.
+            max_edges=10_000,
+        )
+
         related_paths: set = set()
-        for sp in source_paths:
-            file_node_id = stable_file_node_id(sp)
-            neighbors = trace_index.get_neighbors(
-                file_node_id,
-                direction=trace_direction,
-                edge_kinds=trace_edge_kinds,
-                max_nodes=max_additional_nodes,
-            )
-            
-            for node in neighbors.get("in_nodes", []):
-                fp = node.get("file_path")
-                if fp and fp not in source_paths:
-                    related_paths.add(fp)
-            
-            for node in neighbors.get("out_nodes", []):
-                fp = node.get("file_path")
-                if fp and fp not in source_paths:
-                    related_paths.add(fp)
+        for node in subgraph.get("nodes", []):
+            fp = node.get("file_path")
+            if fp and fp not in source_paths:
+                related_paths.add(fp)
         
         if not related_paths:
             base_result["trace_expanded"] = True
@@ -826,7 +1304,7 @@ class CodeIndex:
             if additional_chars >= max_additional_chars:
                 break
             
-            for d in self._documents or []:
+            for d in snap.documents or []:
                 if d.get("source_path") == rp:
                     content = str(d.get("content") or "")
                     if additional_chars + len(content) > max_additional_chars:
@@ -845,7 +1323,7 @@ class CodeIndex:
             additional_parts: List[str] = []
             for chunk in additional_chunks:
                 sp = chunk["source_path"]
-                for d in self._documents or []:
+                for d in snap.documents or []:
                     if d.get("source_path") == sp:
                         header = f"[trace-expanded | @{sp}]"
                         block = f"{header}\n{d.get('content', '')}"
@@ -876,6 +1354,41 @@ class CodeIndex:
         bits.append(chunk.content)
         return "\n".join(bits)
 
+    def set_file_prior(
+        self, prior: Optional[Dict[str, float]], weight: float = 0.0, key: Optional[Any] = None
+    ) -> None:
+        """
+        Add `weight * prior[source_path]` to every search score.
+
+        Used for trace file importance (TraceIndex.file_importance). None or
+        a weight <= 0 turns the prior off. `key` names the prior (e.g. trace
+        build time and weight) so callers can skip re-setting an unchanged
+        one and cache responses per prior.
+        """
+        if prior is None or weight <= 0:
+            prior, weight, key = None, 0.0, None
+        if key is not None and key == self._file_prior[2]:
+            return
+        self._file_prior = (prior, float(weight), key)
+
+    @property
+    def file_prior_key(self) -> Optional[Any]:
+        return self._file_prior[2]
+
+    def _file_prior_boosts(self, docs: List[Dict[str, Any]]) -> np.ndarray:
+        current = self._file_prior
+        prior, weight, _key = current
+        if not prior:
+            return np.zeros(len(docs), dtype=np.float32)
+        cached = self._file_prior_boosts_cache
+        if cached is not None and cached[0] is docs and cached[1] is current:
+            return cached[2]
+        boosts = np.asarray(
+            [prior.get(str(d.get("source_path") or ""), 0.0) for d in docs], dtype=np.float32
+        ) * np.float32(weight)
+        self._file_prior_boosts_cache = (docs, current, boosts)
+        return boosts
+
     def _keyword_boosts(self, query: str, docs: List[Dict[str, Any]]) -> np.ndarray:
         """Compute keyword-based score boosts."""
         q = query.lower()
@@ -886,8 +1399,8 @@ class CodeIndex:
         boosts = np.zeros(len(docs), dtype=np.float32)
         for i, d in enumerate(docs):
             score = 0.0
-            for field in ("source_path", "section"):
-                v = str(d.get(field, "")).lower()
+            for key in ("source_path", "section"):
+                v = str(d.get(key, "")).lower()
                 if not v:
                     continue
                 for t in tokens:
@@ -896,9 +1409,9 @@ class CodeIndex:
             boosts[i] = min(0.25, score)
         return boosts
 
-    def _primer_boosts(self, docs: List[Dict[str, Any]]) -> np.ndarray:
+    def _primer_boosts(self, docs: List[Dict[str, Any]], manifest: Optional[Dict[str, Any]] = None) -> np.ndarray:
         """Compute score boosts for primer documents (e.g., AGENTS.md)."""
-        config = self._manifest.get("config") or {}
+        config = (manifest if manifest is not None else self._manifest).get("config") or {}
         primer_cfg = config.get("primer") or {}
         
         if not primer_cfg.get("enabled", True):
@@ -924,10 +1437,13 @@ class CodeIndex:
 
     def get_primer_chunks(self) -> List[Dict[str, Any]]:
         """Get all chunks from primer documents for always-include functionality."""
-        if not self.is_loaded():
+        return self._primer_chunks(self._snapshot)
+
+    def _primer_chunks(self, snap: IndexSnapshot) -> List[Dict[str, Any]]:
+        if not snap.is_loaded():
             return []
         
-        config = self._manifest.get("config") or {}
+        config = snap.manifest.get("config") or {}
         primer_cfg = config.get("primer") or {}
         
         if not primer_cfg.get("enabled", True):
@@ -937,7 +1453,7 @@ class CodeIndex:
         primer_names = {f.lower() for f in filenames}
         
         primer_chunks = []
-        for d in (self._documents or []):
+        for d in (snap.documents or []):
             sp = str(d.get("source_path") or "")
             if not sp:
                 continue
@@ -988,32 +1504,57 @@ class CodeIndex:
         finally:
             conn.close()
 
-    def _fts_boosts(self, query: str, docs: List[Dict[str, Any]], limit: int) -> np.ndarray:
-        """Compute FTS5-based score boosts."""
-        if not self.fts_path.exists():
-            return np.zeros(len(docs), dtype=np.float32)
-
+    @contextmanager
+    def _fts_connection(self, snap: IndexSnapshot) -> Iterator[Optional[sqlite3.Connection]]:
+        """Borrow a read-only FTS connection from the snapshot's pool (None if there is no FTS index)."""
         try:
-            conn = sqlite3.connect(str(self.fts_path))
-        except Exception:
-            return np.zeros(len(docs), dtype=np.float32)
-
+            conn: Optional[sqlite3.Connection] = snap.fts_pool.pop()
+        except IndexError:
+            conn = None
+            if self.fts_path.exists():
+                try:
+                    conn = sqlite3.connect(
+                        self.fts_path.resolve().as_uri() + "?mode=ro",
+                        uri=True,
+                        check_same_thread=False,
+                    )
+                except sqlite3.Error:
+                    conn = None
         try:
-            self._ensure_fts_schema(conn)
-            cur = conn.execute(
-                "SELECT chunk_id, bm25(fts) AS rank FROM fts WHERE fts MATCH ? ORDER BY rank LIMIT ?",
-                (query, int(limit)),
-            )
-            rows = cur.fetchall()
-        except Exception:
-            rows = []
+            yield conn
         finally:
-            conn.close()
+            if conn is not None:
+                if len(snap.fts_pool) < _FTS_POOL_MAX:
+                    snap.fts_pool.append(conn)
+                else:
+                    conn.close()
+
+    def _fts_boosts(
+        self,
+        query: str,
+        docs: List[Dict[str, Any]],
+        limit: int,
+        snapshot: Optional[IndexSnapshot] = None,
+    ) -> np.ndarray:
+        """Compute FTS5-based score boosts."""
+        snap = snapshot if snapshot is not None else self._snapshot
+        rows: List[Tuple[Any, Any]] = []
+        with self._fts_connection(snap) as conn:
+            if conn is None:
+                return np.zeros(len(docs), dtype=np.float32)
+            try:
+                cur = conn.execute(
+                    "SELECT chunk_id, bm25(fts) AS rank FROM fts WHERE fts MATCH ? ORDER BY rank LIMIT ?",
+                    (query, int(limit)),
+                )
+                rows = cur.fetchall()
+            except Exception:
+                rows = []
 
         if not rows:
             return np.zeros(len(docs), dtype=np.float32)
 
-        id_to_idx = {str(d.get("id")): i for i, d in enumerate(docs)}
+        id_to_idx = snap.id_to_idx if snap.documents is docs else {str(d.get("id")): i for i, d in enumerate(docs)}
         boosts = np.zeros(len(docs), dtype=np.float32)
 
         for chunk_id, rank in rows:
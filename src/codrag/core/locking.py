@@ -0,0 +1,113 @@
+"""
+Inter-process file locks.
+
+Several processes can serve the same index directory (daemon workers, the
+CLI, MCP direct mode). Only one of them may build it at a time: the builder
+holds an exclusive, non-blocking lock on a small file next to the index dir.
+The lock is released by the OS if the holder dies, so a crashed build never
+leaves a stale lock behind.
+
+Uses fcntl.flock on POSIX and msvcrt.locking on Windows.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+    import msvcrt
+
+
+def _try_lock(fd: int) -> bool:
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:  # pragma: no cover - Windows
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _unlock(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:  # pragma: no cover - Windows
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+class FileLock:
+    """
+    Exclusive, non-blocking lock on `path`.
+
+    Locks are per FileLock instance: a second FileLock on the same path
+    conflicts even inside the same process.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        self._fd: Optional[int] = None
+
+    def acquire(self) -> bool:
+        """Take the lock; returns False immediately if someone else holds it."""
+        if self._fd is not None:
+            return True
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if not _try_lock(fd):
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        fd, self._fd = self._fd, None
+        if fd is None:
+            return
+        try:
+            _unlock(fd)
+        finally:
+            os.close(fd)
+
+    def held(self) -> bool:
+        """True if this instance holds the lock."""
+        return self._fd is not None
+
+    def is_locked(self) -> bool:
+        """True if anyone (another process or FileLock) holds the lock."""
+        if self._fd is not None:
+            return True
+        try:
+            fd = os.open(self.path, os.O_RDWR)
+        except FileNotFoundError:
+            return False
+        try:
+            if _try_lock(fd):
+                _unlock(fd)
+                return False
+            return True
+        finally:
+            os.close(fd)
+
+    def owner_pid(self) -> Optional[int]:
+        """PID recorded by the last holder (may be stale once released)."""
+        try:
+            return int(self.path.read_text().strip() or 0) or None
+        except (OSError, ValueError):
+            return None
+
+    def __enter__(self) -> "FileLock":
+        if not self.acquire():
+            raise BlockingIOError(f"Lock is held: {self.path}")
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.release()
@@ -37,6 +37,7 @@ class ManifestBuildStats:
     chunks_total: int
     chunks_reused: int
     chunks_embedded: int
+    chunks_resumed: int = 0
 
 
 def build_manifest(
@@ -65,6 +66,7 @@ def build_manifest(
             "chunks_total": int(build.chunks_total),
             "chunks_reused": int(build.chunks_reused),
             "chunks_embedded": int(build.chunks_embedded),
+            "chunks_resumed": int(build.chunks_resumed),
         },
         "config": dict(config),
     }
@@ -0,0 +1,148 @@
+"""
+Structured build progress for CoDRAG.
+
+BuildProgress is a thread-safe progress record updated by the build thread
+(CodeIndex.build) and read by API handlers. snapshot() returns a JSON-ready
+dict with the current phase, file/chunk counters, embedding throughput and an
+ETA derived from that throughput.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+# Phases in the order CodeIndex.build runs them.
+BUILD_PHASES = ("enumerate", "read", "chunk", "embed", "write", "fts")
+
+# Seconds of recent embed activity used to compute throughput.
+_RATE_WINDOW_S = 30.0
+
+
+class BuildProgress:
+    """Progress of a single index build."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._listeners: list[Callable[[Dict[str, Any]], None]] = []
+
+        self.state = "queued"  # queued | running | succeeded | failed | cancelled
+        self.phase = "pending"
+        self.error: Optional[str] = None
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+
+        self.files_total = 0
+        self.files_done = 0
+        self.chunks_total = 0
+        self.chunks_done = 0
+        self.chunks_to_embed = 0
+        self.chunks_embedded = 0
+
+        self._started_mono = clock()
+        self._phase_started_mono = self._started_mono
+        self._embed_samples: Deque[Tuple[float, int]] = deque(maxlen=256)
+
+    def add_listener(self, fn: Callable[[Dict[str, Any]], None]) -> None:
+        """Register a callback invoked with a snapshot after every update."""
+        with self._lock:
+            self._listeners.append(fn)
+
+    def set_phase(self, phase: str) -> None:
+        with self._lock:
+            if self.state == "queued":
+                self.state = "running"
+                self._started_mono = self._clock()
+                self.started_at = datetime.now(timezone.utc).isoformat()
+            self.phase = phase
+            self._phase_started_mono = self._clock()
+            if phase == "embed":
+                self._embed_samples.clear()
+                self._embed_samples.append((self._phase_started_mono, self.chunks_embedded))
+        self._notify()
+
+    def set_files(self, done: int, total: Optional[int] = None) -> None:
+        with self._lock:
+            self.files_done = int(done)
+            if total is not None:
+                self.files_total = int(total)
+        self._notify()
+
+    def set_chunks(self, done: int, total: Optional[int] = None, to_embed: Optional[int] = None) -> None:
+        with self._lock:
+            self.chunks_done = int(done)
+            if total is not None:
+                self.chunks_total = int(total)
+            if to_embed is not None:
+                self.chunks_to_embed = int(to_embed)
+        self._notify()
+
+    def chunk_embedded(self, n: int = 1) -> None:
+        with self._lock:
+            self.chunks_embedded += int(n)
+            self.chunks_done += int(n)
+            self._embed_samples.append((self._clock(), self.chunks_embedded))
+        self._notify()
+
+    def finish(self, state: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            self.state = state
+            self.error = error
+            self.phase = "done" if state == "succeeded" else self.phase
+            self.finished_at = datetime.now(timezone.utc).isoformat()
+        self._notify()
+
+    def _rate_locked(self) -> Optional[float]:
+        if len(self._embed_samples) < 2:
+            return None
+        newest_t, newest_n = self._embed_samples[-1]
+        oldest_t, oldest_n = self._embed_samples[0]
+        for t, n in self._embed_samples:
+            if newest_t - t <= _RATE_WINDOW_S:
+                oldest_t, oldest_n = t, n
+                break
+        dt = newest_t - oldest_t
+        if dt <= 0 or newest_n <= oldest_n:
+            return None
+        return (newest_n - oldest_n) / dt
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            now = self._clock()
+            rate = self._rate_locked() if self.phase == "embed" else None
+            remaining = max(0, self.chunks_to_embed - self.chunks_embedded)
+            eta_s = (remaining / rate) if rate else None
+            return {
+                "state": self.state,
+                "phase": self.phase,
+                "error": self.error,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "elapsed_s": round(now - self._started_mono, 3),
+                "phase_elapsed_s": round(now - self._phase_started_mono, 3),
+                "files": {"done": self.files_done, "total": self.files_total},
+                "chunks": {
+                    "done": self.chunks_done,
+                    "total": self.chunks_total,
+                    "to_embed": self.chunks_to_embed,
+                    "embedded": self.chunks_embedded,
+                },
+                "chunks_per_sec": round(rate, 3) if rate else None,
+                "eta_s": round(eta_s, 1) if eta_s is not None else None,
+            }
+
+    def _notify(self) -> None:
+        with self._lock:
+            listeners = list(self._listeners)
+        if not listeners:
+            return
+        snap = self.snapshot()
+        for fn in listeners:
+            try:
+                fn(snap)
+            except Exception:
+                pass
@@ -1,13 +1,16 @@
 from __future__ import annotations
 
 import json
+import os
 import shutil
 import sqlite3
+import threading
 import uuid
+import weakref
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 
 class ProjectRegistryError(Exception):
@@ -52,14 +55,54 @@ def _now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+def _close_quietly(conn: sqlite3.Connection) -> None:
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+class _ThreadConnection:
+    """
+    Holds one thread's connection in its thread-local storage. The connection
+    is closed when the holder is freed, which happens when the thread exits
+    (anyio's worker threads exit after idling), or by close().
+    """
+
+    __slots__ = ("conn", "close", "__weakref__")
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+        self.close = weakref.finalize(self, _close_quietly, conn)
+
+
 class ProjectRegistry:
+    """
+    SQLite-backed project registry.
+
+    Each thread keeps one persistent connection for writes, closed when the
+    thread exits. Project rows are
+    cached in process: writes through this registry invalidate the cache, and
+    writes by other processes (e.g. `codrag add` while the daemon runs) are
+    noticed through `PRAGMA data_version`, so project lookups on the request
+    path do not query the projects table.
+    """
+
     def __init__(self, db_path: Optional[Path | str] = None):
         self.db_path = Path(db_path) if db_path is not None else default_registry_db_path()
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._conns_lock = threading.Lock()
+        self._conns: "weakref.WeakSet[_ThreadConnection]" = weakref.WeakSet()
+        self._cache_lock = threading.Lock()
+        self._cache: Optional[Tuple[Dict[str, Project], List[str]]] = None
+        self._cache_version: Optional[int] = None
+        self._probe: Optional[sqlite3.Connection] = None
+        self._probe_pid: Optional[int] = None
         self._init_db()
 
-    def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(str(self.db_path), timeout=30)
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
         conn.row_factory = sqlite3.Row
         conn.execute("PRAGMA foreign_keys = ON")
         try:
@@ -68,6 +111,55 @@ class ProjectRegistry:
             pass
         return conn
 
+    def _connect(self) -> sqlite3.Connection:
+        """This thread's connection (opened, with PRAGMAs applied, on first use)."""
+        holder: Optional[_ThreadConnection] = getattr(self._local, "conn", None)
+        if holder is None or getattr(self._local, "pid", None) != os.getpid():
+            holder = _ThreadConnection(self._open())
+            with self._conns_lock:
+                self._conns.add(holder)
+            self._local.conn = holder
+            self._local.pid = os.getpid()
+        return holder.conn
+
+    def close(self) -> None:
+        """Close every thread's connection; the registry reconnects on next use."""
+        with self._conns_lock:
+            holders, self._conns = list(self._conns), weakref.WeakSet()
+        for holder in holders:
+            holder.close()
+        self._local = threading.local()
+        with self._cache_lock:
+            if self._probe is not None:
+                _close_quietly(self._probe)
+            self._probe = None
+            self._cache = None
+
+    def invalidate_cache(self) -> None:
+        with self._cache_lock:
+            self._cache = None
+
+    def _cached_projects(self) -> Tuple[Dict[str, Project], List[str]]:
+        """Projects by id plus ids in list order (updated_at DESC), reloaded when stale."""
+        with self._cache_lock:
+            if self._probe is None or self._probe_pid != os.getpid():
+                self._probe = self._open()
+                self._probe_pid = os.getpid()
+                self._cache = None
+            # The probe connection never writes, so its data_version moves on
+            # every commit by any other connection: our own writer threads,
+            # the CLI, or another daemon worker.
+            version = self._probe.execute("PRAGMA data_version").fetchone()[0]
+            if self._cache is not None and self._cache_version == version:
+                return self._cache
+            rows = self._probe.execute(
+                "SELECT id, name, path, mode, config, created_at, updated_at FROM projects ORDER BY updated_at DESC"
+            ).fetchall()
+            projects = [self._row_to_project(r) for r in rows]
+            self._cache = ({p.id: p for p in projects}, [p.id for p in projects])
+            self._cache_version = version
+            return self._cache
+
     def _init_db(self) -> None:
         with self._connect() as conn:
             conn.execute(
@@ -149,6 +241,7 @@ class ProjectRegistry:
                 )
         except sqlite3.IntegrityError as e:
             raise ProjectAlreadyExists(abs_path) from e
+        self.invalidate_cache()
 
         return Project(
             id=project_id,
@@ -161,21 +254,12 @@ class ProjectRegistry:
         )
 
     def get_project(self, project_id: str) -> Optional[Project]:
-        with self._connect() as conn:
-            row = conn.execute(
-                "SELECT id, name, path, mode, config, created_at, updated_at FROM projects WHERE id = ?",
-                (str(project_id),),
-            ).fetchone()
-        if row is None:
-            return None
-        return self._row_to_project(row)
+        by_id, _ = self._cached_projects()
+        return by_id.get(str(project_id))
 
     def list_projects(self) -> List[Project]:
-        with self._connect() as conn:
-            rows = conn.execute(
-                "SELECT id, name, path, mode, config, created_at, updated_at FROM projects ORDER BY updated_at DESC"
-            ).fetchall()
-        return [self._row_to_project(r) for r in rows]
+        by_id, order = self._cached_projects()
+        return [by_id[pid] for pid in order]
 
     def update_project(
         self,
@@ -197,6 +281,7 @@ class ProjectRegistry:
                 "UPDATE projects SET name = ?, config = ?, updated_at = ? WHERE id = ?",
                 (new_name, json.dumps(new_config), now, str(project_id)),
             )
+        self.invalidate_cache()
 
         updated = self.get_project(project_id)
         if updated is None:
@@ -225,3 +310,4 @@ class ProjectRegistry:
 
         with self._connect() as conn:
             conn.execute("DELETE FROM projects WHERE id = ?", (str(project_id),))
+        self.invalidate_cache()
@@ -0,0 +1,182 @@
+"""
+Build scheduler for CoDRAG.
+
+All index and trace builds go through one BuildScheduler so the daemon never
+runs more than `max_workers` builds at once, however many projects and
+watchers request them. Queued jobs are ordered by priority (interactive >
+watcher > background), then by arrival. A job is keyed by (kind, project_id):
+submitting a key that is already queued coalesces into the queued job instead
+of adding another, and a key that is already running is rejected.
+
+Per-kind limits (e.g. at most one embedding-heavy "index" build) keep a burst
+of index builds from monopolising the embedder while cheaper builds proceed.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_WATCHER = 1
+PRIORITY_BACKGROUND = 2
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_WATCHER: "watcher",
+    PRIORITY_BACKGROUND: "background",
+}
+
+JobKey = Tuple[str, str]  # (kind, project_id)
+
+
+class BuildJob:
+    """A queued or running build. Thread-like: is_alive() and join()."""
+
+    def __init__(self, key: JobKey, fn: Callable[[], None], priority: int, seq: int) -> None:
+        self.key = key
+        self.fn = fn
+        self.priority = int(priority)
+        self.seq = seq
+        self.state = "queued"  # queued | running | done | cancelled
+        self.queued_at = datetime.now(timezone.utc).isoformat()
+        self.started_at: Optional[str] = None
+        self._done = threading.Event()
+
+    @property
+    def kind(self) -> str:
+        return self.key[0]
+
+    def is_alive(self) -> bool:
+        return not self._done.is_set()
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+
+class BuildScheduler:
+    """Bounded, prioritised, coalescing build queue."""
+
+    def __init__(self, max_workers: int = 2, kind_limits: Optional[Mapping[str, int]] = None) -> None:
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self._queued: Dict[JobKey, BuildJob] = {}
+        self._running: Dict[JobKey, BuildJob] = {}
+        self.max_workers = max(1, int(max_workers))
+        self.kind_limits: Dict[str, int] = dict(kind_limits or {})
+
+    def configure(self, max_workers: int, kind_limits: Optional[Mapping[str, int]] = None) -> None:
+        with self._lock:
+            self.max_workers = max(1, int(max_workers))
+            if kind_limits is not None:
+                self.kind_limits = {k: max(1, int(v)) for k, v in kind_limits.items()}
+        self._dispatch()
+
+    def submit(self, key: JobKey, fn: Callable[[], None], priority: int = PRIORITY_INTERACTIVE) -> Optional[BuildJob]:
+        """
+        Queue `fn` under `key`.
+
+        Returns the (possibly coalesced) queued job, or None if a job with
+        this key is already running.
+        """
+        with self._lock:
+            if key in self._running:
+                return None
+            job = self._queued.get(key)
+            if job is not None:
+                # Coalesce: latest arguments win, priority only ever rises.
+                job.fn = fn
+                job.priority = min(job.priority, int(priority))
+            else:
+                job = BuildJob(key, fn, priority, next(self._seq))
+                self._queued[key] = job
+        self._dispatch()
+        return job
+
+    def cancel_queued(self, key: JobKey) -> bool:
+        """Drop a queued (not yet running) job. Returns True if one was removed."""
+        with self._lock:
+            job = self._queued.pop(key, None)
+        if job is None:
+            return False
+        job.state = "cancelled"
+        job._done.set()
+        return True
+
+    def get(self, key: JobKey) -> Optional[BuildJob]:
+        with self._lock:
+            return self._running.get(key) or self._queued.get(key)
+
+    def describe(self, key: JobKey) -> Optional[Dict[str, Any]]:
+        """Queue state for `key`: None if idle, else state/priority/position."""
+        with self._lock:
+            job = self._running.get(key)
+            position: Optional[int] = None
+            if job is None:
+                job = self._queued.get(key)
+                if job is None:
+                    return None
+                position = self._order_locked().index(job) + 1
+            return {
+                "state": job.state,
+                "priority": PRIORITY_NAMES.get(job.priority, str(job.priority)),
+                "position": position,
+                "queued_at": job.queued_at,
+                "started_at": job.started_at,
+            }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "kind_limits": dict(self.kind_limits),
+                "running": len(self._running),
+                "queued": len(self._queued),
+            }
+
+    def _order_locked(self) -> List[BuildJob]:
+        return sorted(self._queued.values(), key=lambda j: (j.priority, j.seq))
+
+    def _next_locked(self) -> Optional[BuildJob]:
+        if len(self._running) >= self.max_workers:
+            return None
+        running_by_kind: Dict[str, int] = {}
+        for job in self._running.values():
+            running_by_kind[job.kind] = running_by_kind.get(job.kind, 0) + 1
+        for job in self._order_locked():
+            limit = self.kind_limits.get(job.kind)
+            if limit is not None and running_by_kind.get(job.kind, 0) >= limit:
+                continue
+            return job
+        return None
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._lock:
+                job = self._next_locked()
+                if job is None:
+                    return
+                del self._queued[job.key]
+                job.state = "running"
+                job.started_at = datetime.now(timezone.utc).isoformat()
+                self._running[job.key] = job
+            t = threading.Thread(target=self._run, args=(job,), name=f"codrag-build-{job.kind}", daemon=True)
+            t.start()
+
+    def _run(self, job: BuildJob) -> None:
+        try:
+            job.fn()
+        except Exception:
+            logger.exception(f"Build job {job.key} failed")
+        finally:
+            with self._lock:
+                if self._running.get(job.key) is job:
+                    del self._running[job.key]
+                job.state = "done"
+            job._done.set()
+            self._dispatch()
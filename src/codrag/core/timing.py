@@ -0,0 +1,57 @@
+"""
+Lightweight stage timing for CoDRAG query paths.
+
+A StageTimings instance records wall-clock spans (in milliseconds) for the
+named stages of a search or context request. Spans with the same name
+accumulate, so a stage entered more than once reports its total time.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+# Stages that make up "retrieval" and "rerank" in the RAG flow view
+# (see viz/flow.py: render_rag_flow).
+RETRIEVAL_STAGES = ("vector", "keyword", "fts")
+RERANK_STAGES = ("boosts", "topk")
+
+
+class StageTimings:
+    """Accumulates named timing spans for a single request."""
+
+    def __init__(self) -> None:
+        self._spans_ms: Dict[str, float] = {}
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - t0) * 1000.0)
+
+    def add(self, name: str, ms: float) -> None:
+        self._spans_ms[name] = self._spans_ms.get(name, 0.0) + float(ms)
+
+    def get(self, name: str) -> float:
+        return self._spans_ms.get(name, 0.0)
+
+    def spans(self) -> Dict[str, float]:
+        return dict(self._spans_ms)
+
+    def as_dict(self) -> Dict[str, float]:
+        """
+        Return spans as `<stage>_ms` keys plus flow-level aggregates.
+
+        Aggregates (`embedding_ms`, `retrieval_ms`, `rerank_ms`) match the
+        keys expected by `render_rag_flow`; `total_ms` is wall time since
+        this object was created.
+        """
+        out: Dict[str, float] = {f"{k}_ms": round(v, 3) for k, v in self._spans_ms.items()}
+        out["retrieval_ms"] = round(sum(self.get(s) for s in RETRIEVAL_STAGES), 3)
+        out["rerank_ms"] = round(sum(self.get(s) for s in RERANK_STAGES), 3)
+        out["total_ms"] = round((time.perf_counter() - self._started) * 1000.0, 3)
+        return out
@@ -9,13 +9,19 @@ from __future__ import annotations
 import ast
 import json
 import logging
+import multiprocessing
 import os
+import posixpath
 import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from fnmatch import fnmatch
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
 
 from .ids import (
     stable_edge_id,
@@ -24,6 +30,9 @@ from .ids import (
     stable_file_node_id,
     stable_symbol_node_id,
 )
+from .trace_graph import TraceGraph
+from .trace_imports import ImportConfig, ImportResolver, load_import_config, scan_source
+from .trace_stats import compute_trace_stats
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +45,28 @@ RUST_EXTENSIONS = {".rs"}
 
 SUPPORTED_EXTENSIONS = PYTHON_EXTENSIONS | TYPESCRIPT_EXTENSIONS | GO_EXTENSIONS | RUST_EXTENSIONS
 
+# Source files are analyzed in worker processes once a build has at least
+# this many of them; below that, starting the pool costs more than it saves.
+PARALLEL_MIN_FILES = 64
+# Files sent to a worker per task (amortizes pickling and IPC round-trips).
+_PARALLEL_CHUNK_FILES = 32
+# Bump when analyzer output changes, so stale per-file caches are dropped.
+_FILE_CACHE_VERSION = 4
+
+# Confidence of a resolved `calls` edge: a name bound by a def or import in
+# scope, versus self./cls. method calls, which a subclass may override.
+CALL_CONFIDENCE = 0.9
+METHOD_CALL_CONFIDENCE = 0.7
+
+# A call site as recorded by PythonAnalyzer: (caller node id, module, level,
+# name, lineno, confidence). `module` None means `name` is a qualname in the
+# caller's own file; otherwise it is resolved like an import.
+CallRef = Tuple[str, Optional[str], int, str, int, float]
+
+# What a file cache was built against: (analyzed files, Python source roots,
+# ImportConfig.to_dict()).
+_CacheState = Tuple[Set[str], List[str], Dict[str, Any]]
+
 
 @dataclass
 class TraceNode:
@@ -58,6 +89,10 @@ class TraceNode:
             "metadata": self.metadata,
         }
 
+    def to_tuple(self) -> Tuple[Any, ...]:
+        """Compact form for passing nodes between processes (TraceNode(*t) restores it)."""
+        return (self.id, self.kind, self.name, self.file_path, self.span, self.language, self.metadata)
+
 
 @dataclass
 class TraceEdge:
@@ -76,6 +111,10 @@ class TraceEdge:
             "metadata": self.metadata,
         }
 
+    def to_tuple(self) -> Tuple[Any, ...]:
+        """Compact form for passing edges between processes (TraceEdge(*t) restores it)."""
+        return (self.id, self.kind, self.source, self.target, self.metadata)
+
 
 @dataclass
 class FileError:
@@ -84,6 +123,60 @@ class FileError:
     message: str
 
 
+@dataclass
+class _FileRecord:
+    """
+    Analysis of one source file, cached between builds (trace_file_cache.json).
+
+    Import edges are kept apart from the file's other edges, together with the
+    raw imports and the paths probed to resolve them, so they can be
+    re-resolved without re-parsing when one of those paths appears or goes.
+    Call sites are kept unresolved: their targets live in other files, so
+    they are resolved against all files' symbols on every build.
+    """
+
+    hash: str
+    mtime_ns: int
+    size: int
+    nodes: List[TraceNode]
+    edges: List[TraceEdge]
+    imports: List[Tuple[str, int, int]]
+    candidates: List[str]
+    import_edges: List[TraceEdge]
+    calls: List[CallRef]
+    error: Optional[Tuple[str, str]]
+
+    def to_tuple(self) -> Tuple[Any, ...]:
+        return (
+            self.hash,
+            self.mtime_ns,
+            self.size,
+            [n.to_tuple() for n in self.nodes],
+            [e.to_tuple() for e in self.edges],
+            self.imports,
+            self.candidates,
+            [e.to_tuple() for e in self.import_edges],
+            self.calls,
+            self.error,
+        )
+
+    @classmethod
+    def from_tuple(cls, t: Any) -> "_FileRecord":
+        file_hash, mtime_ns, size, nodes, edges, imports, candidates, import_edges, calls, error = t
+        return cls(
+            hash=file_hash,
+            mtime_ns=int(mtime_ns),
+            size=int(size),
+            nodes=[TraceNode(*n) for n in nodes],
+            edges=[TraceEdge(*e) for e in edges],
+            imports=[(str(m), int(level), int(line)) for m, level, line in imports],
+            candidates=list(candidates),
+            import_edges=[TraceEdge(*e) for e in import_edges],
+            calls=[(str(c), m, int(lv), str(n), int(line), float(conf)) for c, m, lv, n, line, conf in calls],
+            error=None if error is None else (str(error[0]), str(error[1])),
+        )
+
+
 @dataclass
 class TraceBuildResult:
     nodes: List[TraceNode]
@@ -139,30 +232,125 @@ def _is_relevant(rel_posix: str, include_globs: List[str], exclude_globs: List[s
     return True
 
 
+def _source_roots(python_files: FrozenSet[str]) -> List[str]:
+    """The repo root ("") followed by every src-layout root, sorted."""
+    packages = {rel[: -len("/__init__.py")] for rel in python_files if rel.endswith("/__init__.py")}
+    roots: Set[str] = set()
+    for rel in python_files:
+        parts = rel.split("/")[:-1]
+        for i, part in enumerate(parts):
+            if part == "src":
+                roots.add("/".join(parts[: i + 1]))
+    return [""] + sorted(roots - packages)
+
+
+class ModuleResolver:
+    """
+    Maps Python module names to repo-relative files, built once per trace build
+    from the enumerated file list so resolving imports never touches the disk.
+
+    Absolute imports are looked up from the repo root, then from src-layout
+    roots (any `src/` directory that is not itself a package). Within a root,
+    `pkg/mod.py` wins over `pkg/mod/__init__.py`.
+    """
+
+    def __init__(self, python_files: Iterable[str]):
+        self.files: FrozenSet[str] = frozenset(python_files)
+        self.roots: List[str] = _source_roots(self.files)
+        ranked: Dict[str, Tuple[int, int, str]] = {}
+        for rel in self.files:
+            for root_rank, root in enumerate(self.roots):
+                if root and not rel.startswith(root + "/"):
+                    continue
+                sub = rel[len(root) + 1 :] if root else rel
+                if sub.endswith("/__init__.py"):
+                    module, init_rank = sub[: -len("/__init__.py")], 1
+                elif sub.endswith(".py"):
+                    module, init_rank = sub[: -len(".py")], 0
+                else:
+                    continue
+                rank = (root_rank, init_rank, rel)
+                name = module.replace("/", ".")
+                if name not in ranked or rank < ranked[name]:
+                    ranked[name] = rank
+        self._modules: Dict[str, str] = {name: rank[2] for name, rank in ranked.items()}
+
+    def resolve(self, module: str) -> Optional[str]:
+        return self._modules.get(module)
+
+    def candidates(self, module: str) -> List[str]:
+        """Every path that would make `module` resolve, in lookup order."""
+        base = module.replace(".", "/")
+        out: List[str] = []
+        for root in self.roots:
+            prefix = f"{root}/" if root else ""
+            out += [f"{prefix}{base}.py", f"{prefix}{base}/__init__.py"]
+        return out
+
+    def relative_candidates(self, file_path: str, module: str, level: int) -> List[str]:
+        parts = file_path.split("/")[:-1]
+        parts = parts[: max(0, len(parts) - (level - 1))]
+        if module:
+            parts += module.split(".")
+        base = "/".join(parts)
+        if not base:
+            return ["__init__.py"]
+        return [f"{base}.py", f"{base}/__init__.py"]
+
+    def resolve_relative(self, file_path: str, module: str, level: int) -> Optional[str]:
+        for c in self.relative_candidates(file_path, module, level):
+            if c in self.files:
+                return c
+        return None
+
+
 class PythonAnalyzer:
     """
-    Python AST-based analyzer for extracting symbols and imports.
+    Python AST-based analyzer for extracting symbols, imports and call sites.
     """
 
-    def __init__(self, file_path: str, source: str, repo_root: Path):
+    def __init__(self, file_path: str, source: str, resolver: ModuleResolver):
         self.file_path = file_path
         self.source = source
-        self.repo_root = repo_root
+        self.resolver = resolver
         self.nodes: List[TraceNode] = []
         self.edges: List[TraceEdge] = []
+        # Raw import statements as (module, level, lineno), in source order.
+        self.imports: List[Tuple[str, int, int]] = []
+        # Repo-relative paths probed while resolving imports. If one of them
+        # appears or disappears, this file's import edges must be re-resolved.
+        self.candidates: Set[str] = set()
+        # Call sites inside functions and methods; see CallRef.
+        self.calls: List[CallRef] = []
+        # (node id, def node, enclosing class qualname) per function/method.
+        self._functions: List[Tuple[str, ast.AST, Optional[str]]] = []
         self._file_node_id = stable_file_node_id(file_path)
 
     def analyze(self) -> Tuple[List[TraceNode], List[TraceEdge]]:
         try:
             tree = ast.parse(self.source, filename=self.file_path)
         except SyntaxError as e:
-            raise ValueError(f"Syntax error: {e}")
+            raise ValueError(f"Syntax error: {e}") from e
 
         self._extract_symbols(tree)
         self._extract_imports(tree)
+        self.edges.extend(self.resolve_imports(self.imports))
+        self._extract_calls(tree)
 
         return self.nodes, self.edges
 
+    def resolve_imports(self, imports: List[Tuple[str, int, int]]) -> List[TraceEdge]:
+        """Turn raw (module, level, lineno) imports into import edges."""
+        edges: List[TraceEdge] = []
+        for module, level, lineno in imports:
+            if level > 0:
+                edge = self._relative_import_edge(module, level, lineno)
+            else:
+                edge = self._import_edge(module, lineno)
+            if edge is not None:
+                edges.append(edge)
+        return edges
+
     def _extract_symbols(self, tree: ast.Module) -> None:
         for node in ast.iter_child_nodes(tree):
             if isinstance(node, ast.FunctionDef):
@@ -206,6 +394,7 @@ class PythonAnalyzer:
             },
         )
         self.nodes.append(trace_node)
+        self._functions.append((node_id, node, parent_qualname))
 
         edge_id = stable_edge_id("contains", self._file_node_id, node_id)
         self.edges.append(
@@ -266,100 +455,302 @@ class PythonAnalyzer:
         for node in ast.walk(tree):
             if isinstance(node, ast.Import):
                 for alias in node.names:
-                    self._add_import_edge(alias.name, node.lineno)
+                    self.imports.append((alias.name, 0, node.lineno))
             elif isinstance(node, ast.ImportFrom):
-                module = node.module or ""
-                level = node.level
-                if level > 0:
-                    self._add_relative_import(module, level, node.lineno)
+                self.imports.append((node.module or "", node.level, node.lineno))
+
+    def _extract_calls(self, tree: ast.Module) -> None:
+        """
+        Record the calls made in each function body whose callee is a name
+        bound in scope: a def or class of this module, an import, or a method
+        reached through self./cls. Calls on anything else (locals, attributes
+        of objects) are skipped.
+        """
+        module_scope = self._module_bindings(tree)
+        for caller_id, func, class_qualname in self._functions:
+            scope = self._function_scope(func, module_scope)
+            for stmt in func.body:  # type: ignore[attr-defined]
+                for node in ast.walk(stmt):
+                    if not isinstance(node, ast.Call):
+                        continue
+                    ref = self._callee(node.func, scope, class_qualname)
+                    if ref is not None:
+                        module, level, name, confidence = ref
+                        self.calls.append((caller_id, module, level, name, node.lineno, confidence))
+
+    @staticmethod
+    def _import_bindings(node: ast.stmt) -> Iterator[Tuple[str, Tuple[Optional[str], int, str]]]:
+        """Names bound by an import statement -> (module, level, name within module)."""
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.asname:
+                    yield alias.asname, (alias.name, 0, "")
                 else:
-                    self._add_import_edge(module, node.lineno)
-
-    def _add_import_edge(self, module: str, lineno: int) -> None:
-        resolved_path = self._resolve_import(module)
+                    head = alias.name.split(".")[0]
+                    yield head, (head, 0, "")
+        elif isinstance(node, ast.ImportFrom):
+            for alias in node.names:
+                if alias.name != "*":
+                    yield alias.asname or alias.name, (node.module or "", node.level, alias.name)
+
+    def _module_bindings(self, tree: ast.Module) -> Dict[str, Tuple[Optional[str], int, str]]:
+        """Module-level names in source order (later bindings win)."""
+        scope: Dict[str, Tuple[Optional[str], int, str]] = {}
+        # Top-level statements, including those nested in if/try/with blocks.
+        pending: List[ast.AST] = list(tree.body)
+        while pending:
+            node = pending.pop(0)
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                scope[node.name] = (None, 0, node.name)
+            elif isinstance(node, (ast.Import, ast.ImportFrom)):
+                scope.update(self._import_bindings(node))
+            elif isinstance(node, (ast.If, ast.Try, ast.With, ast.AsyncWith)):
+                children = [c for c in ast.iter_child_nodes(node) if isinstance(c, ast.stmt)]
+                handlers = [s for h in getattr(node, "handlers", []) for s in h.body]
+                pending = children + handlers + pending
+        return scope
+
+    def _function_scope(
+        self, func: ast.AST, module_scope: Dict[str, Tuple[Optional[str], int, str]]
+    ) -> Dict[str, Tuple[Optional[str], int, str]]:
+        """Module names visible in `func`, plus its own imports, minus names it rebinds."""
+        scope = dict(module_scope)
+        shadowed: Set[str] = set()
+        args = func.args  # type: ignore[attr-defined]
+        for arg in args.posonlyargs + args.args + args.kwonlyargs + [args.vararg, args.kwarg]:
+            if arg is not None:
+                shadowed.add(arg.arg)
+        for stmt in func.body:  # type: ignore[attr-defined]
+            for node in ast.walk(stmt):
+                if isinstance(node, (ast.Import, ast.ImportFrom)):
+                    scope.update(self._import_bindings(node))
+                elif isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+                    shadowed.add(node.id)
+                elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                    shadowed.add(node.name)
+        for name in shadowed:
+            scope.pop(name, None)
+        return scope
+
+    @staticmethod
+    def _callee(
+        func: ast.expr, scope: Dict[str, Tuple[Optional[str], int, str]], class_qualname: Optional[str]
+    ) -> Optional[Tuple[Optional[str], int, str, float]]:
+        parts: List[str] = []
+        while isinstance(func, ast.Attribute):
+            parts.append(func.attr)
+            func = func.value
+        if not isinstance(func, ast.Name):
+            return None
+        head, rest = func.id, parts[::-1]
+        if head in ("self", "cls") and class_qualname and len(rest) == 1:
+            return None, 0, f"{class_qualname}.{rest[0]}", METHOD_CALL_CONFIDENCE
+        binding = scope.get(head)
+        if binding is None:
+            return None
+        module, level, prefix = binding
+        name = ".".join(p for p in [prefix, *rest] if p)
+        if not name:
+            # Calling a module object.
+            return None
+        return module, level, name, CALL_CONFIDENCE
+
+    def _import_edge(self, module: str, lineno: int) -> TraceEdge:
+        self.candidates.update(self.resolver.candidates(module))
+        resolved_path = self.resolver.resolve(module)
         if resolved_path:
             target_id = stable_file_node_id(resolved_path)
             disambiguator = f"{module}:{lineno}"
             edge_id = stable_edge_id("imports", self._file_node_id, target_id, disambiguator)
-            self.edges.append(
-                TraceEdge(
-                    id=edge_id,
-                    kind="imports",
-                    source=self._file_node_id,
-                    target=target_id,
-                    metadata={"confidence": 1.0, "import": module, "line": lineno},
+            return TraceEdge(
+                id=edge_id,
+                kind="imports",
+                source=self._file_node_id,
+                target=target_id,
+                metadata={"confidence": 1.0, "import": module, "line": lineno},
+            )
+        ext_id = stable_external_module_id(module)
+        disambiguator = f"{module}:{lineno}"
+        edge_id = stable_edge_id("imports", self._file_node_id, ext_id, disambiguator)
+        return TraceEdge(
+            id=edge_id,
+            kind="imports",
+            source=self._file_node_id,
+            target=ext_id,
+            metadata={"confidence": 0.5, "import": module, "line": lineno, "external": True},
+        )
+
+    def _relative_import_edge(self, module: str, level: int, lineno: int) -> Optional[TraceEdge]:
+        self.candidates.update(self.resolver.relative_candidates(self.file_path, module, level))
+        resolved = self.resolver.resolve_relative(self.file_path, module, level)
+        if not resolved:
+            return None
+        target_id = stable_file_node_id(resolved)
+        import_str = "." * level + (module or "")
+        disambiguator = f"{import_str}:{lineno}"
+        edge_id = stable_edge_id("imports", self._file_node_id, target_id, disambiguator)
+        return TraceEdge(
+            id=edge_id,
+            kind="imports",
+            source=self._file_node_id,
+            target=target_id,
+            metadata={"confidence": 1.0, "import": import_str, "line": lineno, "relative": True},
+        )
+
+
+class ScanAnalyzer:
+    """
+    Regex-based analyzer for TS/JS, Go and Rust (see trace_imports): import
+    edges and top-level declarations. Call sites are not recorded.
+    """
+
+    def __init__(self, file_path: str, language: str, source: str, resolver: ImportResolver):
+        self.file_path = file_path
+        self.language = language
+        self.source = source
+        self.resolver = resolver
+        self.nodes: List[TraceNode] = []
+        self.edges: List[TraceEdge] = []
+        # Raw imports as (specifier, 0, lineno), the shape PythonAnalyzer uses.
+        self.imports: List[Tuple[str, int, int]] = []
+        self.candidates: Set[str] = set()
+        self.calls: List[CallRef] = []
+        self._file_node_id = stable_file_node_id(file_path)
+
+    def analyze(self) -> Tuple[List[TraceNode], List[TraceEdge]]:
+        imports, symbols = scan_source(self.source, self.language)
+        seen: Set[str] = set()
+        for name, qualname, symbol_type, start_line, end_line, is_public in symbols:
+            node_id = stable_symbol_node_id(qualname, self.file_path, start_line)
+            if node_id in seen:
+                continue
+            seen.add(node_id)
+            self.nodes.append(
+                TraceNode(
+                    id=node_id,
+                    kind="symbol",
+                    name=name,
+                    file_path=self.file_path,
+                    span={"start_line": start_line, "end_line": end_line},
+                    language=self.language,
+                    metadata={"symbol_type": symbol_type, "qualname": qualname, "is_public": is_public},
                 )
             )
-        else:
-            ext_id = stable_external_module_id(module)
-            disambiguator = f"{module}:{lineno}"
-            edge_id = stable_edge_id("imports", self._file_node_id, ext_id, disambiguator)
+            edge_id = stable_edge_id("contains", self._file_node_id, node_id)
             self.edges.append(
-                TraceEdge(
-                    id=edge_id,
-                    kind="imports",
-                    source=self._file_node_id,
-                    target=ext_id,
-                    metadata={"confidence": 0.5, "import": module, "line": lineno, "external": True},
-                )
+                TraceEdge(id=edge_id, kind="contains", source=self._file_node_id, target=node_id, metadata={"confidence": 1.0})
             )
 
-    def _add_relative_import(self, module: str, level: int, lineno: int) -> None:
-        file_dir = Path(self.file_path).parent
-        for _ in range(level - 1):
-            file_dir = file_dir.parent
+        self.imports = [(spec, 0, lineno) for spec, lineno in imports]
+        self.edges.extend(self.resolve_imports(self.imports))
+        return self.nodes, self.edges
 
-        if module:
-            parts = module.split(".")
-            target_rel = file_dir / "/".join(parts)
+    def resolve_imports(self, imports: List[Tuple[str, int, int]]) -> List[TraceEdge]:
+        """Turn raw (specifier, 0, lineno) imports into import edges."""
+        edges: Dict[str, TraceEdge] = {}
+        for spec, _level, lineno in imports:
+            targets, external, candidates = self.resolver.resolve(self.file_path, self.language, spec)
+            self.candidates.update(candidates)
+            disambiguator = f"{spec}:{lineno}"
+            for path in targets:
+                if path == self.file_path:
+                    continue
+                target_id = stable_file_node_id(path)
+                edge_id = stable_edge_id("imports", self._file_node_id, target_id, disambiguator)
+                edges.setdefault(
+                    edge_id,
+                    TraceEdge(
+                        id=edge_id,
+                        kind="imports",
+                        source=self._file_node_id,
+                        target=target_id,
+                        metadata={"confidence": 1.0, "import": spec, "line": lineno},
+                    ),
+                )
+            if external is not None:
+                ext_id = stable_external_module_id(external)
+                edge_id = stable_edge_id("imports", self._file_node_id, ext_id, disambiguator)
+                metadata: Dict[str, Any] = {"confidence": 0.5, "import": spec, "line": lineno, "external": True}
+                if external != spec:
+                    # Rust paths name items; the external node is their crate.
+                    metadata["module"] = external
+                edges.setdefault(
+                    edge_id,
+                    TraceEdge(id=edge_id, kind="imports", source=self._file_node_id, target=ext_id, metadata=metadata),
+                )
+        return list(edges.values())
+
+
+def _analyze_file(rel_path: str, abs_path: str, resolver: ModuleResolver, imports: ImportResolver) -> _FileRecord:
+    """Analyze one source file; parse errors are recorded, not raised."""
+    file_hash, mtime_ns, size = "", 0, 0
+    analyzer: Optional[PythonAnalyzer | ScanAnalyzer] = None
+    try:
+        # stat before reading: a write racing the read shows up as a changed
+        # mtime next build instead of being cached under the old one.
+        st = os.stat(abs_path)
+        mtime_ns, size = st.st_mtime_ns, st.st_size
+        source = Path(abs_path).read_text(encoding="utf-8", errors="ignore")
+        file_hash = stable_file_hash(source)
+        language = _detect_language(rel_path)
+        if language == "python":
+            analyzer = PythonAnalyzer(rel_path, source, resolver)
         else:
-            target_rel = file_dir
+            analyzer = ScanAnalyzer(rel_path, str(language), source, imports)
+        nodes, edges = analyzer.analyze()
+    except Exception as e:
+        return _FileRecord(file_hash, mtime_ns, size, [], [], [], [], [], [], (type(e).__name__, str(e)))
+    return _FileRecord(
+        hash=file_hash,
+        mtime_ns=mtime_ns,
+        size=size,
+        nodes=nodes,
+        edges=[e for e in edges if e.kind != "imports"],
+        imports=analyzer.imports,
+        candidates=sorted(analyzer.candidates),
+        import_edges=[e for e in edges if e.kind == "imports"],
+        calls=analyzer.calls,
+        error=None,
+    )
 
-        candidates = [
-            f"{target_rel}.py",
-            f"{target_rel}/__init__.py",
-        ]
 
-        resolved = None
-        for c in candidates:
-            c_posix = _to_posix(str(c))
-            full = self.repo_root / c_posix
-            if full.exists():
-                resolved = c_posix
-                break
+# Set once per worker process by _init_trace_worker, rather than pickled per batch.
+_worker_resolver: Optional[ModuleResolver] = None
+_worker_imports: Optional[ImportResolver] = None
 
-        if resolved:
-            target_id = stable_file_node_id(resolved)
-            import_str = "." * level + (module or "")
-            disambiguator = f"{import_str}:{lineno}"
-            edge_id = stable_edge_id("imports", self._file_node_id, target_id, disambiguator)
-            self.edges.append(
-                TraceEdge(
-                    id=edge_id,
-                    kind="imports",
-                    source=self._file_node_id,
-                    target=target_id,
-                    metadata={"confidence": 1.0, "import": import_str, "line": lineno, "relative": True},
-                )
-            )
 
-    def _resolve_import(self, module: str) -> Optional[str]:
-        parts = module.split(".")
-        candidates = [
-            "/".join(parts) + ".py",
-            "/".join(parts) + "/__init__.py",
-        ]
+def _init_trace_worker(files: List[str], import_config: Dict[str, Any]) -> None:
+    global _worker_resolver, _worker_imports
+    _worker_resolver = ModuleResolver(rel for rel in files if _detect_language(rel) == "python")
+    _worker_imports = ImportResolver(files, ImportConfig.from_dict(import_config))
 
-        for c in candidates:
-            full = self.repo_root / c
-            if full.exists():
-                return c
-        return None
+
+def _analyze_batch(batch: List[Tuple[str, str]]) -> List[Tuple[Any, ...]]:
+    """Worker-process entry point: analyze a batch and return compact tuples."""
+    assert _worker_resolver is not None and _worker_imports is not None
+    return [
+        _analyze_file(rel_path, abs_path, _worker_resolver, _worker_imports).to_tuple() for rel_path, abs_path in batch
+    ]
 
 
 class TraceBuilder:
     """
-    Builds trace index files: trace_manifest.json, trace_nodes.jsonl, trace_edges.jsonl.
+    Builds trace index files: trace_manifest.json, trace_graph.bin (the
+    memory-mappable graph TraceIndex opens) and trace_stats.json (centrality
+    and per-file importance, see trace_stats), plus trace_nodes.jsonl and
+    trace_edges.jsonl unless `write_jsonl` is False.
+
+    Source files are analyzed in up to `workers` processes (default: CPU
+    count; 1 analyzes in-process): Python with PythonAnalyzer, TS/JS, Go and
+    Rust with ScanAnalyzer. Results are merged in path order, so the output
+    is byte-identical to a serial build.
+
+    Per-file results are cached in trace_file_cache.json. A rebuild re-parses
+    only files in `changed_paths` or whose content hash changed, and re-resolves
+    the imports of cached files whose candidate targets were added or removed
+    (or, for TS/JS, Go and Rust, whose tsconfig/package.json/go.mod/Cargo.toml
+    settings changed); everything else is reused, with the same output as a
+    full build.
     """
 
     def __init__(
@@ -373,10 +764,20 @@ class TraceBuilder:
         max_nodes: int = 100_000,
         max_edges: int = 500_000,
         max_failures: int = 50,
+        workers: Optional[int] = None,
+        write_jsonl: bool = True,
     ):
         self.repo_root = Path(repo_root).resolve()
         self.index_dir = Path(index_dir).resolve()
-        self.include_globs = include_globs or ["**/*.py", "**/*.ts", "**/*.tsx", "**/*.js", "**/*.jsx"]
+        self.include_globs = include_globs or [
+            "**/*.py",
+            "**/*.ts",
+            "**/*.tsx",
+            "**/*.js",
+            "**/*.jsx",
+            "**/*.go",
+            "**/*.rs",
+        ]
         self.exclude_globs = exclude_globs or [
             "**/node_modules/**",
             "**/.git/**",
@@ -390,16 +791,29 @@ class TraceBuilder:
         self.max_nodes = max_nodes
         self.max_edges = max_edges
         self.max_failures = max_failures
+        self.workers = max(1, int(workers)) if workers else (os.cpu_count() or 1)
+        self.write_jsonl = write_jsonl
 
         self.manifest_path = self.index_dir / "trace_manifest.json"
+        self.graph_path = self.index_dir / "trace_graph.bin"
         self.nodes_path = self.index_dir / "trace_nodes.jsonl"
         self.edges_path = self.index_dir / "trace_edges.jsonl"
+        self.file_cache_path = self.index_dir / "trace_file_cache.json"
+        self.stats_path = self.index_dir / "trace_stats.json"
 
     def build(
         self,
         progress_callback: Optional[Callable[[str, int, int], None]] = None,
         changed_paths: Optional[Set[str]] = None,
+        full: bool = False,
     ) -> Dict[str, Any]:
+        """
+        Build the trace index.
+
+        `changed_paths` (repo-relative POSIX paths, e.g. from the watcher) are
+        always re-parsed; other files are reused from the per-file cache unless
+        their stat or content hash changed. `full=True` ignores the cache.
+        """
         self.index_dir.mkdir(parents=True, exist_ok=True)
 
         files = self._enumerate_files()
@@ -414,6 +828,19 @@ class TraceBuilder:
         files_parsed = 0
         files_failed = 0
 
+        rel_paths = [_to_posix(str(p.relative_to(self.repo_root))) for p in files]
+        jobs = [(rel, str(p)) for rel, p in zip(rel_paths, files, strict=True) if _detect_language(rel) is not None]
+        by_language: Dict[str, List[str]] = {}
+        for rel, _abs in jobs:
+            by_language.setdefault(str(_detect_language(rel)), []).append(rel)
+        resolver = ModuleResolver(by_language.get("python", []))
+        imports = ImportResolver((rel for rel, _abs in jobs), load_import_config(self.repo_root, by_language))
+        cached, cached_state = ({}, None) if full else self._load_file_cache()
+        reused, reresolved = self._reuse_cached(jobs, resolver, imports, cached, cached_state, changed_paths)
+        analyze_jobs = [(rel, abs_path) for rel, abs_path in jobs if rel not in reused]
+        analyses = self._iter_analyses(analyze_jobs, resolver, imports)
+        records: Dict[str, _FileRecord] = {}
+
         for i, file_path in enumerate(files):
             if progress_callback:
                 progress_callback("trace_scan", i, len(files))
@@ -432,16 +859,20 @@ class TraceBuilder:
             nodes.append(file_node)
 
             language = _detect_language(rel_path)
-            if language == "python":
-                try:
-                    source = file_path.read_text(encoding="utf-8", errors="ignore")
-                    analyzer = PythonAnalyzer(rel_path, source, self.repo_root)
-                    sym_nodes, sym_edges = analyzer.analyze()
+            if language is not None:
+                record = reused.get(rel_path) or next(analyses)
+                records[rel_path] = record
+                sym_nodes, sym_edges, error = record.nodes, record.edges + record.import_edges, record.error
+                if error is not None:
+                    files_failed += 1
+                    if len(file_errors) < self.max_failures:
+                        file_errors.append(FileError(rel_path, error[0], error[1]))
+                else:
                     nodes.extend(sym_nodes)
 
                     for edge in sym_edges:
                         if edge.metadata.get("external"):
-                            ext_name = str(edge.metadata.get("import", ""))
+                            ext_name = str(edge.metadata.get("module") or edge.metadata.get("import", ""))
                             if ext_name and ext_name not in external_modules:
                                 ext_node = TraceNode(
                                     id=stable_external_module_id(ext_name),
@@ -456,10 +887,6 @@ class TraceBuilder:
 
                     edges.extend(sym_edges)
                     files_parsed += 1
-                except Exception as e:
-                    files_failed += 1
-                    if len(file_errors) < self.max_failures:
-                        file_errors.append(FileError(rel_path, type(e).__name__, str(e)))
             else:
                 files_parsed += 1
 
@@ -470,7 +897,22 @@ class TraceBuilder:
                 logger.warning(f"Edge count exceeds max_edges {self.max_edges}, stopping")
                 break
 
+        analyses.close()
         nodes.extend(external_modules.values())
+        call_edges, calls_dropped = self._call_edges(records, resolver, budget=self.max_edges - len(edges))
+        edges.extend(call_edges)
+        # Only files reached this build are cached: after an early stop, the
+        # rest may have changed without being re-read.
+        self._write_file_cache(records, resolver, imports)
+        files_reused = sum(1 for rel in records if rel in reused)
+        build_stats = {
+            "mode": "full" if cached_state is None else "incremental",
+            "files_analyzed": len(records) - files_reused,
+            "files_reused": files_reused,
+            "importers_reresolved": reresolved,
+            "call_edges": len(call_edges),
+            "call_edges_dropped": calls_dropped,
+        }
 
         valid, validation_error = self._validate(nodes, edges)
         if not valid:
@@ -482,6 +924,7 @@ class TraceBuilder:
                 files_failed=files_failed,
                 file_errors=file_errors,
                 last_error=validation_error,
+                build_stats=build_stats,
             )
             self._write_manifest(manifest)
             return manifest
@@ -495,6 +938,7 @@ class TraceBuilder:
             files_failed=files_failed,
             file_errors=file_errors,
             last_error=None,
+            build_stats=build_stats,
         )
         self._write_manifest(manifest)
 
@@ -503,6 +947,186 @@ class TraceBuilder:
 
         return manifest
 
+    def _reuse_cached(
+        self,
+        jobs: List[Tuple[str, str]],
+        resolver: ModuleResolver,
+        imports: ImportResolver,
+        cached: Dict[str, _FileRecord],
+        cached_state: Optional[_CacheState],
+        changed_paths: Optional[Set[str]],
+    ) -> Tuple[Dict[str, _FileRecord], int]:
+        """
+        Pick the cached records still valid for this build.
+
+        Returns (rel_path -> record, number of importers re-resolved).
+        """
+        if cached_state is None:
+            return {}, 0
+        cached_files, cached_roots, cached_config = cached_state
+        changed = set(changed_paths or ())
+        # Imports resolve to analyzed files only, so added/removed files (or
+        # a changed set of src roots / project config) are the only way a
+        # cached file's import edges can go stale. Go imports name package
+        # directories, probed as "dir/".
+        touched = cached_files.symmetric_difference(imports.files)
+        touched |= {posixpath.dirname(rel) + "/" for rel in touched}
+        reresolve_python = cached_roots != resolver.roots
+        reresolve_scanned = cached_config != imports.config.to_dict()
+
+        reused: Dict[str, _FileRecord] = {}
+        reresolved = 0
+        for rel, abs_path in jobs:
+            record = cached.get(rel)
+            if record is None or rel in changed:
+                continue
+            try:
+                st = os.stat(abs_path)
+            except OSError:
+                continue
+            if (st.st_mtime_ns, st.st_size) != (record.mtime_ns, record.size):
+                try:
+                    source = Path(abs_path).read_text(encoding="utf-8", errors="ignore")
+                except OSError:
+                    continue
+                if stable_file_hash(source) != record.hash:
+                    continue
+                record.mtime_ns, record.size = st.st_mtime_ns, st.st_size
+            language = str(_detect_language(rel))
+            reresolve_all = reresolve_python if language == "python" else reresolve_scanned
+            if record.error is None and (reresolve_all or touched.intersection(record.candidates)):
+                analyzer: PythonAnalyzer | ScanAnalyzer
+                if language == "python":
+                    analyzer = PythonAnalyzer(rel, "", resolver)
+                else:
+                    analyzer = ScanAnalyzer(rel, language, "", imports)
+                record.import_edges = analyzer.resolve_imports(record.imports)
+                record.candidates = sorted(analyzer.candidates)
+                reresolved += 1
+            reused[rel] = record
+        return reused, reresolved
+
+    def _call_edges(
+        self, records: Dict[str, _FileRecord], resolver: ModuleResolver, budget: int
+    ) -> Tuple[List[TraceEdge], int]:
+        """
+        Resolve every recorded call site against the symbols of all analyzed
+        files: one `calls` edge per (caller, callee) pair, in file order, up
+        to `budget` edges. Returns (edges, pairs dropped for the budget).
+        """
+        symbols: Dict[Tuple[str, str], str] = {}
+        for rel, record in records.items():
+            if record.error is None:
+                for n in record.nodes:
+                    # Redefinitions: the last def is the one a call reaches.
+                    symbols[(rel, str(n.metadata.get("qualname") or n.name))] = n.id
+
+        def _target(rel: str, module: Optional[str], level: int, name: str) -> Optional[str]:
+            if module is None:
+                return symbols.get((rel, name))
+            # `pkg.sub.func` may name a symbol of pkg, or of the module pkg.sub.
+            parts = name.split(".")
+            for split in range(len(parts)):
+                mod = ".".join(p for p in [module, *parts[:split]] if p)
+                path = resolver.resolve_relative(rel, mod, level) if level else resolver.resolve(mod)
+                target = symbols.get((path, ".".join(parts[split:]))) if path else None
+                if target is not None:
+                    return target
+            return None
+
+        pairs: Dict[Tuple[str, str], TraceEdge] = {}
+        dropped: Set[Tuple[str, str]] = set()
+        for rel, record in records.items():
+            if record.error is not None:
+                continue
+            for caller, module, level, name, lineno, confidence in record.calls:
+                target = _target(rel, module, level, name)
+                if target is None or target == caller:
+                    continue
+                edge = pairs.get((caller, target))
+                if edge is not None:
+                    edge.metadata["call_sites"] += 1
+                    edge.metadata["confidence"] = max(edge.metadata["confidence"], confidence)
+                elif len(pairs) < budget:
+                    pairs[(caller, target)] = TraceEdge(
+                        id=stable_edge_id("calls", caller, target),
+                        kind="calls",
+                        source=caller,
+                        target=target,
+                        metadata={"confidence": confidence, "line": lineno, "call_sites": 1},
+                    )
+                else:
+                    dropped.add((caller, target))
+        if dropped:
+            logger.warning(f"Edge budget max_edges {self.max_edges} reached, dropped {len(dropped)} call edges")
+        return list(pairs.values()), len(dropped)
+
+    def _load_file_cache(self) -> Tuple[Dict[str, _FileRecord], Optional[_CacheState]]:
+        """
+        Returns (records, (analyzed files, Python source roots, import config)
+        of the previous build), or ({}, None) if there is no usable cache.
+        """
+        try:
+            data = json.loads(self.file_cache_path.read_text(encoding="utf-8"))
+            if data.get("version") != _FILE_CACHE_VERSION:
+                return {}, None
+            records = {rel: _FileRecord.from_tuple(t) for rel, t in data["records"].items()}
+            return records, (set(data["files"]), list(data["roots"]), dict(data["import_config"]))
+        except FileNotFoundError:
+            return {}, None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable trace file cache: {e}")
+            return {}, None
+
+    def _write_file_cache(
+        self, records: Dict[str, _FileRecord], resolver: ModuleResolver, imports: ImportResolver
+    ) -> None:
+        payload = {
+            "version": _FILE_CACHE_VERSION,
+            "files": sorted(imports.files),
+            "roots": resolver.roots,
+            "import_config": imports.config.to_dict(),
+            "records": {rel: record.to_tuple() for rel, record in records.items()},
+        }
+        try:
+            self._write_json_atomic(self.file_cache_path, payload, indent=None, separators=(",", ":"))
+        except OSError as e:
+            logger.warning(f"Could not write trace file cache: {e}")
+
+    def _iter_analyses(
+        self, jobs: List[Tuple[str, str]], resolver: ModuleResolver, imports: ImportResolver
+    ) -> Iterator[_FileRecord]:
+        """Yield one analysis per (rel_path, abs_path) job, in job order."""
+        done = 0
+        if self.workers > 1 and len(jobs) >= PARALLEL_MIN_FILES:
+            try:
+                for analysis in self._parallel_analyses(jobs, imports):
+                    done += 1
+                    yield analysis
+                return
+            except (BrokenProcessPool, OSError) as e:
+                logger.warning(f"Parallel trace parsing failed ({e}); continuing in-process")
+        for rel_path, abs_path in jobs[done:]:
+            yield _analyze_file(rel_path, abs_path, resolver, imports)
+
+    def _parallel_analyses(self, jobs: List[Tuple[str, str]], imports: ImportResolver) -> Iterator[_FileRecord]:
+        chunks = [jobs[i : i + _PARALLEL_CHUNK_FILES] for i in range(0, len(jobs), _PARALLEL_CHUNK_FILES)]
+        # spawn, not fork: the daemon is multi-threaded, and forking it can
+        # deadlock a child on a lock held by another thread.
+        with ProcessPoolExecutor(
+            max_workers=min(self.workers, len(chunks)),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_trace_worker,
+            initargs=(sorted(imports.files), imports.config.to_dict()),
+        ) as pool:
+            try:
+                for batch in pool.map(_analyze_batch, chunks):
+                    for record in batch:
+                        yield _FileRecord.from_tuple(record)
+            finally:
+                # Stopped early (node/edge caps) or failed: drop queued chunks.
+                pool.shutdown(wait=False, cancel_futures=True)
+
     def _enumerate_files(self) -> List[Path]:
         all_files: List[Path] = []
 
@@ -570,6 +1194,26 @@ class TraceBuilder:
         sorted_nodes = self._sort_nodes(nodes)
         sorted_edges = self._sort_edges(edges)
 
+        graph = TraceGraph()
+        for n in sorted_nodes:
+            graph.add_node(n.to_dict())
+        for e in sorted_edges:
+            graph.add_edge(e.to_dict())
+        graph.finalize()
+        graph.save(self.graph_path)
+        self._write_json_atomic(self.stats_path, compute_trace_stats(graph), sort_keys=True)
+
+        if self.write_jsonl:
+            self._write_jsonl(sorted_nodes, sorted_edges)
+        else:
+            # Drop a previous export so nothing reads it as current.
+            for path in (self.nodes_path, self.edges_path):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+
+    def _write_jsonl(self, sorted_nodes: List[TraceNode], sorted_edges: List[TraceEdge]) -> None:
         tmp_nodes = tempfile.NamedTemporaryFile(
             mode="w", suffix=".jsonl", dir=self.index_dir, delete=False, encoding="utf-8"
         )
@@ -612,6 +1256,7 @@ class TraceBuilder:
         files_failed: int,
         file_errors: List[FileError],
         last_error: Optional[str],
+        build_stats: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         return {
             "version": TRACE_MANIFEST_VERSION,
@@ -630,20 +1275,24 @@ class TraceBuilder:
                 "files_parsed": files_parsed,
                 "files_failed": files_failed,
             },
+            "build": build_stats or {},
             "file_errors": [{"file_path": e.file_path, "error_type": e.error_type, "message": e.message} for e in file_errors],
             "last_error": last_error,
         }
 
     def _write_manifest(self, manifest: Dict[str, Any]) -> None:
+        self._write_json_atomic(self.manifest_path, manifest, indent=2, sort_keys=True)
+
+    def _write_json_atomic(self, path: Path, payload: Any, **dump_kwargs: Any) -> None:
         tmp = tempfile.NamedTemporaryFile(
             mode="w", suffix=".json", dir=self.index_dir, delete=False, encoding="utf-8"
         )
         try:
-            json.dump(manifest, tmp, indent=2, sort_keys=True)
+            json.dump(payload, tmp, **dump_kwargs)
             tmp.flush()
             os.fsync(tmp.fileno())
             tmp.close()
-            os.rename(tmp.name, self.manifest_path)
+            os.rename(tmp.name, path)
         except Exception:
             try:
                 os.unlink(tmp.name)
@@ -655,23 +1304,33 @@ class TraceBuilder:
 class TraceIndex:
     """
     Query interface for a built trace index.
+
+    The graph is a TraceGraph memory-mapped from trace_graph.bin (interned
+    node table plus CSR adjacency), so loading is cheap and node and edge
+    dicts are built only for returned results.
     """
 
     def __init__(self, index_dir: Path):
         self.index_dir = Path(index_dir).resolve()
         self.manifest_path = self.index_dir / "trace_manifest.json"
+        self.graph_path = self.index_dir / "trace_graph.bin"
         self.nodes_path = self.index_dir / "trace_nodes.jsonl"
         self.edges_path = self.index_dir / "trace_edges.jsonl"
+        self.stats_path = self.index_dir / "trace_stats.json"
 
         self._manifest: Optional[Dict[str, Any]] = None
-        self._nodes: Dict[str, Dict[str, Any]] = {}
-        self._edges: List[Dict[str, Any]] = []
-        self._edges_by_source: Dict[str, List[Dict[str, Any]]] = {}
-        self._edges_by_target: Dict[str, List[Dict[str, Any]]] = {}
+        self._graph: Optional[TraceGraph] = None
+        self._stats: Optional[Dict[str, Any]] = None
         self._loaded = False
 
     def exists(self) -> bool:
-        return self.manifest_path.exists() and self.nodes_path.exists() and self.edges_path.exists()
+        if not self.manifest_path.exists():
+            return False
+        return self.graph_path.exists() or (self.nodes_path.exists() and self.edges_path.exists())
+
+    def memory_footprint(self) -> int:
+        """Approximate bytes held by the loaded graph."""
+        return self._graph.nbytes() if self._loaded and self._graph is not None else 0
 
     def load(self) -> bool:
         if not self.exists():
@@ -681,37 +1340,36 @@ class TraceIndex:
             with open(self.manifest_path, "r", encoding="utf-8") as f:
                 self._manifest = json.load(f)
 
-            self._nodes = {}
-            with open(self.nodes_path, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if line:
-                        node = json.loads(line)
-                        self._nodes[node["id"]] = node
-
-            self._edges = []
-            self._edges_by_source = {}
-            self._edges_by_target = {}
-            with open(self.edges_path, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if line:
-                        edge = json.loads(line)
-                        self._edges.append(edge)
-                        src = edge["source"]
-                        tgt = edge["target"]
-                        self._edges_by_source.setdefault(src, []).append(edge)
-                        self._edges_by_target.setdefault(tgt, []).append(edge)
-
+            self._graph = self._open_graph()
+            self._stats = None
             self._loaded = True
             return True
         except Exception as e:
             logger.error(f"Failed to load trace index: {e}")
             return False
 
+    def _open_graph(self) -> TraceGraph:
+        # Traces built before trace_graph.bin existed only have the JSONL files.
+        if self.graph_path.exists():
+            try:
+                return TraceGraph.open(self.graph_path)
+            except (OSError, ValueError) as e:
+                if not self.nodes_path.exists():
+                    raise
+                logger.warning(f"Unreadable {self.graph_path.name} ({e}); loading JSONL instead")
+        return TraceGraph.from_jsonl(self.nodes_path, self.edges_path)
+
     def is_loaded(self) -> bool:
         return self._loaded
 
+    def _require_graph(self) -> TraceGraph:
+        if not self._loaded:
+            self.load()
+        if self._graph is None:
+            self._graph = TraceGraph()
+            self._graph.finalize()
+        return self._graph
+
     def status(self) -> Dict[str, Any]:
         if not self.exists():
             return {
@@ -723,10 +1381,9 @@ class TraceIndex:
                 "last_error": None,
             }
 
-        if not self._loaded:
-            self.load()
-
-        manifest = self._manifest or {}
+        # The manifest is enough here; don't open the graph just for status.
+        manifest = self._manifest if self._loaded else self._read_manifest()
+        manifest = manifest or {}
         counts = manifest.get("counts", {})
         return {
             "enabled": True,
@@ -734,43 +1391,55 @@ class TraceIndex:
             "building": False,
             "counts": {"nodes": counts.get("nodes", 0), "edges": counts.get("edges", 0)},
             "last_build_at": manifest.get("built_at"),
+            "last_build": manifest.get("build") or {},
             "last_error": manifest.get("last_error"),
         }
 
-    def get_node(self, node_id: str) -> Optional[Dict[str, Any]]:
-        if not self._loaded:
-            self.load()
-        return self._nodes.get(node_id)
-
-    def search_nodes(self, query: str, kind: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
-        if not self._loaded:
-            self.load()
-
-        query_lower = query.lower()
-        results: List[Tuple[float, Dict[str, Any]]] = []
-
-        for node in self._nodes.values():
-            if kind and node.get("kind") != kind:
-                continue
+    def _read_manifest(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Graph statistics from trace_stats.json (see trace_stats).
+
+        Traces built before the file existed get them computed from the
+        loaded graph instead.
+        """
+        if self._stats is None:
+            try:
+                with open(self.stats_path, "r", encoding="utf-8") as f:
+                    self._stats = json.load(f)
+            except (OSError, ValueError):
+                self._stats = compute_trace_stats(self._require_graph())
+        return self._stats
 
-            name = str(node.get("name", "")).lower()
-            qualname = str(node.get("metadata", {}).get("qualname", "")).lower()
+    def file_importance(self) -> Dict[str, float]:
+        """Per-file importance in [0, 1] (1.0 for the most central file)."""
+        return self.stats().get("file_importance") or {}
 
-            score = 0.0
-            if name == query_lower:
-                score = 1.0
-            elif name.startswith(query_lower):
-                score = 0.8
-            elif query_lower in name:
-                score = 0.6
-            elif query_lower in qualname:
-                score = 0.4
+    def get_node(self, node_id: str) -> Optional[Dict[str, Any]]:
+        graph = self._require_graph()
+        idx = graph.index_of(node_id)
+        return None if idx is None else graph.node_dict(idx)
 
-            if score > 0:
-                results.append((score, node))
+    def degree(self, node_id: str) -> Tuple[int, int]:
+        """(in_degree, out_degree) over all edge kinds; (0, 0) for unknown nodes."""
+        graph = self._require_graph()
+        idx = graph.index_of(node_id)
+        return (0, 0) if idx is None else graph.degree(idx)
 
-        results.sort(key=lambda x: (-x[0], x[1].get("file_path", ""), x[1].get("name", "")))
-        return [r[1] for r in results[:limit]]
+    def search_nodes(self, query: str, kind: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        graph = self._require_graph()
+        kind_code = None
+        if kind:
+            kind_code = graph.labels.lookup(kind)
+            if kind_code is None:
+                return []
+        return graph.nodes(graph.symbols.search(query, kind_code=kind_code, limit=limit))
 
     def get_neighbors(
         self,
@@ -779,35 +1448,58 @@ class TraceIndex:
         edge_kinds: Optional[List[str]] = None,
         max_nodes: int = 50,
     ) -> Dict[str, Any]:
-        if not self._loaded:
-            self.load()
-
-        in_edges: List[Dict[str, Any]] = []
-        out_edges: List[Dict[str, Any]] = []
-
-        if direction in ("in", "both"):
-            for edge in self._edges_by_target.get(node_id, []):
-                if edge_kinds and edge["kind"] not in edge_kinds:
-                    continue
-                in_edges.append(edge)
-
-        if direction in ("out", "both"):
-            for edge in self._edges_by_source.get(node_id, []):
-                if edge_kinds and edge["kind"] not in edge_kinds:
-                    continue
-                out_edges.append(edge)
+        graph = self._require_graph()
+        idx = graph.index_of(node_id)
+        kind_codes = graph.edge_kind_codes(edge_kinds) if edge_kinds else None
+
+        in_ids = np.zeros(0, dtype=np.int32)
+        out_ids = np.zeros(0, dtype=np.int32)
+        if idx is not None:
+            if direction in ("in", "both"):
+                in_ids = graph.in_edge_ids(idx, kind_codes)[:max_nodes]
+            if direction in ("out", "both"):
+                out_ids = graph.out_edge_ids(idx, kind_codes)[:max_nodes]
 
-        in_edges = in_edges[:max_nodes]
-        out_edges = out_edges[:max_nodes]
-
-        in_nodes = [self._nodes.get(e["source"]) for e in in_edges if self._nodes.get(e["source"])]
-        out_nodes = [self._nodes.get(e["target"]) for e in out_edges if self._nodes.get(e["target"])]
+        return {
+            "in_edges": graph.edges(in_ids),
+            "out_edges": graph.edges(out_ids),
+            "in_nodes": graph.nodes(graph.edge_src[in_ids]),
+            "out_nodes": graph.nodes(graph.edge_dst[out_ids]),
+        }
 
+    def traverse(
+        self,
+        node_ids: List[str],
+        direction: str = "both",
+        edge_kinds: Optional[List[str]] = None,
+        hops: int = 1,
+        max_nodes: int = 50,
+        max_edges: int = 200,
+        max_fanout: int = 0,
+    ) -> Dict[str, Any]:
+        """
+        Multi-hop subgraph around `node_ids` (see TraceGraph.traverse).
+
+        Returns {"nodes", "edges", "truncated", "hops"}: start nodes first,
+        then nodes in BFS order, and each edge between them once.
+        """
+        graph = self._require_graph()
+        start = [i for i in (graph.index_of(n) for n in node_ids) if i is not None]
+        kind_codes = graph.edge_kind_codes(edge_kinds) if edge_kinds else None
+        result = graph.traverse(
+            start,
+            direction=direction,
+            kind_codes=kind_codes,
+            hops=max(0, int(hops)),
+            max_nodes=max(0, int(max_nodes)),
+            max_edges=max(0, int(max_edges)),
+            max_fanout=max(0, int(max_fanout)),
+        )
         return {
-            "in_edges": in_edges,
-            "out_edges": out_edges,
-            "in_nodes": in_nodes,
-            "out_nodes": out_nodes,
+            "nodes": graph.nodes(result.nodes),
+            "edges": graph.edges(result.edges),
+            "truncated": result.truncated,
+            "hops": result.hops,
         }
 
 
@@ -818,6 +1510,9 @@ def build_trace(
     exclude_globs: Optional[List[str]] = None,
     max_file_bytes: int = 500_000,
     progress_callback: Optional[Callable[[str, int, int], None]] = None,
+    workers: Optional[int] = None,
+    changed_paths: Optional[Set[str]] = None,
+    write_jsonl: bool = True,
 ) -> Dict[str, Any]:
     """
     Convenience function to build trace index.
@@ -828,5 +1523,7 @@ def build_trace(
         include_globs=include_globs,
         exclude_globs=exclude_globs,
         max_file_bytes=max_file_bytes,
+        workers=workers,
+        write_jsonl=write_jsonl,
     )
-    return builder.build(progress_callback=progress_callback)
+    return builder.build(progress_callback=progress_callback, changed_paths=changed_paths)
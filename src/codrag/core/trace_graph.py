@@ -0,0 +1,751 @@
+"""
+Compact trace graph, in memory and on disk.
+
+TraceGraph stores nodes as an integer-id table whose strings are interned,
+and edges as NumPy columns (source, target, kind) with forward and reverse
+CSR adjacency. Neighbor queries are array slices; node and edge dicts are
+materialized only for the results handed back, with the same keys (and key
+order) as the rows of trace_nodes.jsonl / trace_edges.jsonl.
+
+Every part of a finalized graph is a flat NumPy array (string tables are
+UTF-8 bytes plus offsets), so `save()` writes them into one file,
+trace_graph.bin, that `open()` memory-maps: opening is O(1), and processes
+serving the same project share the pages through the OS cache. The name
+search index (SymbolIndex) is stored the same way.
+
+File layout (little-endian):
+    8 bytes   magic b"CODRAGTG"
+    8 bytes   header length (uint64)
+    header    UTF-8 JSON: {"version", "arrays": {name: [dtype, length, offset]}, "odd_spans"}
+    arrays    each starting on a 64-byte boundary
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+import sys
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+GRAPH_FORMAT_VERSION = 1
+_MAGIC = b"CODRAGTG"
+_ALIGN = 64
+
+_NODE_COLUMNS = ("kind", "name", "qualname", "file", "language", "start", "end", "meta")
+_EDGE_COLUMNS = ("src", "dst", "kind", "meta", "id", "id_full")
+_DTYPES = {
+    "node_kind": np.uint8,
+    "edge_kind": np.uint8,
+    "edge_id_full": np.bool_,
+    "out_ptr": np.int64,
+    "in_ptr": np.int64,
+}
+_STRING_TABLES = ("node_ids", "labels", "edge_kinds", "names", "paths", "blobs")
+
+
+def _compact_json(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"))
+
+
+class StringTable:
+    """Interns strings to dense integer codes while a graph is being built."""
+
+    def __init__(self) -> None:
+        self._codes: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def code(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self._codes[value] = code
+            self.values.append(value)
+        return code
+
+
+class PackedStrings:
+    """Read-only string table: UTF-8 bytes plus an offsets array (len + 1)."""
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+        self._lookup: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def pack(cls, values: Sequence[str]) -> "PackedStrings":
+        encoded = [v.encode("utf-8") for v in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8).copy()
+        return cls(data, offsets)
+
+    def __len__(self) -> int:
+        return int(self.offsets.shape[0]) - 1
+
+    def __getitem__(self, code: int) -> str:
+        return self.data[int(self.offsets[code]) : int(self.offsets[code + 1])].tobytes().decode("utf-8")
+
+    @property
+    def values(self) -> List[str]:
+        return [self[i] for i in range(len(self))]
+
+    def lookup(self, value: str) -> Optional[int]:
+        """Code of `value`; builds a dict on first use, so keep to small tables."""
+        if self._lookup is None:
+            self._lookup = {v: i for i, v in enumerate(self.values)}
+        return self._lookup.get(value)
+
+
+@dataclass
+class Traversal:
+    """Result of TraceGraph.traverse: node and edge indices in discovery order."""
+
+    nodes: List[int]
+    edges: List[int]
+    truncated: bool
+    hops: int
+
+
+# Bits per code point in a packed trigram key (Unicode needs 21).
+_CP_BITS = 21
+_CP_MASK = (1 << _CP_BITS) - 1
+# Trigram occurrences are packed as (key id << _POS_BITS) | position.
+_POS_BITS = 24
+_POS_MASK = (1 << _POS_BITS) - 1
+
+
+def _trigram_key(a: int, b: int, c: int) -> int:
+    return (a << (2 * _CP_BITS)) | (b << _CP_BITS) | c
+
+
+def _ranks(values: Sequence[str]) -> np.ndarray:
+    """Position of each value in sorted order (ties keep their original order)."""
+    ranks = np.empty(len(values), dtype=np.int64)
+    ranks[sorted(range(len(values)), key=values.__getitem__)] = np.arange(len(values))
+    return ranks
+
+
+def _postings(owner: np.ndarray, items: np.ndarray, order_key: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """CSR (ptr, items) grouping `items` by `owner`, each group sorted by `order_key`."""
+    order = np.lexsort((order_key, owner))
+    ptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(owner, minlength=n), out=ptr[1:])
+    return ptr, items[order].astype(np.int32)
+
+
+def _gather_ranges(ptr: np.ndarray, items: np.ndarray, groups: np.ndarray) -> np.ndarray:
+    """Concatenation of items[ptr[g]:ptr[g + 1]] for every g in `groups`."""
+    starts = ptr[groups]
+    lens = ptr[groups + 1] - starts
+    within = np.arange(int(lens.sum()), dtype=np.int64) - np.repeat(np.cumsum(lens) - lens, lens)
+    return items[np.repeat(starts, lens) + within]
+
+
+class SymbolIndex:
+    """
+    Name search over a TraceGraph without scanning every node.
+
+    Works on the distinct lowercased names and qualnames ("keys"), stored
+    sorted: an exact match is a binary search and a prefix match is a
+    contiguous key range. Substring matches intersect trigram postings
+    (key id and position of every occurrence), so a match is exact without
+    re-reading any key; keys shorter than three characters are listed
+    separately. Each key points at its nodes through postings ordered
+    by (file_path, name), the tie order of search results, so a tier only
+    needs its first `limit` nodes.
+
+    Scoring tiers match the old scan: 1.0 exact name, 0.8 name prefix,
+    0.6 name substring, 0.4 qualname substring.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], node_kind: np.ndarray, node_name: np.ndarray):
+        self.keys = PackedStrings(arrays["sym_keys_data"], arrays["sym_keys_offsets"])
+        self.key_of_name = arrays["sym_key_of_name"]
+        self.rank = arrays["sym_rank"]
+        self.name_ptr, self.name_nodes = arrays["sym_name_ptr"], arrays["sym_name_nodes"]
+        self.qual_ptr, self.qual_nodes = arrays["sym_qual_ptr"], arrays["sym_qual_nodes"]
+        self.tri_keys, self.tri_ptr, self.tri_occ = arrays["sym_tri_keys"], arrays["sym_tri_ptr"], arrays["sym_tri_occ"]
+        self.short = arrays["sym_short"]
+        self.node_kind = node_kind
+        self.node_name = node_name
+
+    @staticmethod
+    def build(
+        names: Sequence[str],
+        paths: Sequence[str],
+        node_name: np.ndarray,
+        node_qualname: np.ndarray,
+        node_file: np.ndarray,
+    ) -> Dict[str, np.ndarray]:
+        """The index arrays ("sym_*") for a graph's name and path tables."""
+        lowered = [v.lower() for v in names]
+        keys = sorted(set(lowered))
+        code = {k: i for i, k in enumerate(keys)}
+        key_of_name = np.asarray([code[v] for v in lowered], dtype=np.int32)
+
+        # Node order by (file_path, name); lexsort is stable, so node index breaks ties.
+        order = np.lexsort((_ranks(names)[node_name], _ranks(paths)[node_file]))
+        rank = np.empty(node_name.shape[0], dtype=np.int32)
+        rank[order] = np.arange(node_name.shape[0], dtype=np.int32)
+
+        all_nodes = np.arange(node_name.shape[0], dtype=np.int64)
+        name_ptr, name_nodes = _postings(key_of_name[node_name], all_nodes, rank, len(keys))
+        with_qual = np.flatnonzero(node_qualname >= 0)
+        qual_ptr, qual_nodes = _postings(
+            key_of_name[node_qualname[with_qual]], with_qual, rank[with_qual], len(keys)
+        )
+
+        # Every trigram occurrence of every key: (packed trigram, key id, position).
+        lengths = np.asarray([len(k) for k in keys], dtype=np.int64)
+        cps = np.frombuffer("".join(keys).encode("utf-32-le", "surrogatepass"), dtype=np.uint32).astype(np.int64)
+        pos = np.arange(cps.shape[0], dtype=np.int64) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        at = np.flatnonzero(pos <= np.repeat(lengths, lengths) - 3)
+        tri = (cps[at] << (2 * _CP_BITS)) | (cps[at + 1] << _CP_BITS) | cps[at + 2]
+        owner = np.repeat(np.arange(len(keys), dtype=np.int64), lengths)[at]
+        pos = pos[at]
+        order = np.lexsort((pos, owner, tri))
+        tri, owner, pos = tri[order], owner[order], pos[order]
+        tri_keys, counts = np.unique(tri, return_counts=True)
+        tri_ptr = np.zeros(tri_keys.shape[0] + 1, dtype=np.int64)
+        np.cumsum(counts, out=tri_ptr[1:])
+
+        packed = PackedStrings.pack(keys)
+        return {
+            "sym_keys_data": packed.data,
+            "sym_keys_offsets": packed.offsets,
+            "sym_key_of_name": key_of_name,
+            "sym_rank": rank,
+            "sym_name_ptr": name_ptr,
+            "sym_name_nodes": name_nodes,
+            "sym_qual_ptr": qual_ptr,
+            "sym_qual_nodes": qual_nodes,
+            "sym_tri_keys": tri_keys.astype(np.int64),
+            "sym_tri_ptr": tri_ptr,
+            "sym_tri_occ": (owner << _POS_BITS) | pos,
+            "sym_short": np.flatnonzero(lengths < 3).astype(np.int32),
+        }
+
+    def search(self, query: str, kind_code: Optional[int] = None, limit: int = 50) -> List[int]:
+        """Indices of the best-scoring nodes, best first, ties by (file_path, name)."""
+        q = query.lower()
+        lo = self._first_at_least(q)
+        hi = self._prefix_end(q, lo)
+        exact_hi = lo + 1 if lo < hi and self.keys[lo] == q else lo
+        substring: List[np.ndarray] = []
+
+        def substring_keys() -> np.ndarray:
+            if not substring:
+                substring.append(self._substring_keys(q))
+            return substring[0]
+
+        def name_substring() -> np.ndarray:
+            keys = substring_keys()
+            return _gather_ranges(self.name_ptr, self.name_nodes, keys[(keys < lo) | (keys >= hi)])
+
+        def qualname_substring() -> np.ndarray:
+            keys = substring_keys()
+            nodes = _gather_ranges(self.qual_ptr, self.qual_nodes, keys)
+            return nodes[~np.isin(self.key_of_name[self.node_name[nodes]], keys)]
+
+        # Tiers are disjoint and best first; later ones are only computed if needed.
+        tiers = (
+            lambda: self.name_nodes[self.name_ptr[lo] : self.name_ptr[exact_hi]],
+            lambda: self.name_nodes[self.name_ptr[exact_hi] : self.name_ptr[hi]],
+            name_substring,
+            qualname_substring,
+        )
+        hits: List[int] = []
+        for tier in tiers:
+            need = limit - len(hits)
+            if need <= 0:
+                break
+            nodes = tier()
+            if kind_code is not None:
+                nodes = nodes[self.node_kind[nodes] == kind_code]
+            ranks = self.rank[nodes]
+            if nodes.shape[0] > need:
+                top = np.argpartition(ranks, need - 1)[:need]
+                nodes, ranks = nodes[top], ranks[top]
+            hits.extend(nodes[np.argsort(ranks, kind="stable")].tolist())
+        return hits
+
+    def _first_at_least(self, q: str) -> int:
+        lo, hi = 0, len(self.keys)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.keys[mid] < q:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _prefix_end(self, q: str, lo: int) -> int:
+        """First key at or after `lo` that does not start with `q`."""
+        hi = len(self.keys)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.keys[mid][: len(q)] <= q:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _substring_keys(self, q: str) -> np.ndarray:
+        """Sorted ids of the keys containing `q`."""
+        if not q:
+            return np.arange(len(self.keys), dtype=np.int64)
+        cps = [ord(c) for c in q]
+        if len(cps) >= 3:
+            spans = []
+            for i in range(len(cps) - 2):
+                key = _trigram_key(*cps[i : i + 3])
+                at = int(np.searchsorted(self.tri_keys, key))
+                if at >= self.tri_keys.shape[0] or self.tri_keys[at] != key:
+                    return np.zeros(0, dtype=np.int64)
+                spans.append((int(self.tri_ptr[at + 1] - self.tri_ptr[at]), i, int(self.tri_ptr[at])))
+            # Candidate (key, start) pairs come from the rarest trigram; each
+            # other trigram i must then occur at (key, start + i). Occurrences
+            # are sorted within a posting, so that is a binary search.
+            spans.sort()
+            count, i, first = spans[0]
+            occ = self.tri_occ[first : first + count]
+            starts = occ[(occ & _POS_MASK) >= i] - i
+            for count, i, first in spans[1:]:
+                if not starts.shape[0]:
+                    break
+                posting = self.tri_occ[first : first + count]
+                at = np.minimum(np.searchsorted(posting, starts + i), count - 1)
+                starts = starts[posting[at] == starts + i]
+            return np.unique(starts >> _POS_BITS)
+
+        # One or two characters: match inside the trigram table, plus the short keys.
+        c0 = self.tri_keys >> (2 * _CP_BITS)
+        c1 = (self.tri_keys >> _CP_BITS) & _CP_MASK
+        c2 = self.tri_keys & _CP_MASK
+        if len(cps) == 1:
+            hit = (c0 == cps[0]) | (c1 == cps[0]) | (c2 == cps[0])
+        else:
+            hit = ((c0 == cps[0]) & (c1 == cps[1])) | ((c1 == cps[0]) & (c2 == cps[1]))
+        ids = _gather_ranges(self.tri_ptr, self.tri_occ, np.flatnonzero(hit)) >> _POS_BITS
+        short = [int(i) for i in self.short if q in self.keys[int(i)]]
+        return np.union1d(ids, np.asarray(short, dtype=np.int64)).astype(np.int64)
+
+
+class TraceGraph:
+    """
+    Read-only trace graph with integer node ids.
+
+    Build with `from_jsonl()` (or `add_node` / `add_edge` then `finalize()`),
+    or memory-map a saved one with `open()`. Edges whose endpoints are not in
+    the node table are dropped.
+    """
+
+    def __init__(self) -> None:
+        self._index: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._tables = {name: StringTable() for name in _STRING_TABLES if name != "node_ids"}
+        self._cols: Dict[str, List[int]] = {k: [] for k in _NODE_COLUMNS}
+        self._ecols: Dict[str, List[int]] = {k: [] for k in _EDGE_COLUMNS}
+        # Spans that are not a plain {start_line, end_line} pair.
+        self.odd_spans: Dict[int, Any] = {}
+        self.arrays: Dict[str, np.ndarray] = {}
+        self._symbols: Optional[SymbolIndex] = None
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_jsonl(cls, nodes_path: Path, edges_path: Path) -> "TraceGraph":
+        graph = cls()
+        with open(nodes_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    graph.add_node(json.loads(line))
+        with open(edges_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    graph.add_edge(json.loads(line))
+        graph.finalize()
+        return graph
+
+    def add_node(self, node: Dict[str, Any]) -> None:
+        node_id = str(node["id"])
+        if node_id in self._index:
+            return
+        idx = len(self._ids)
+        self._index[node_id] = idx
+        self._ids.append(node_id)
+
+        metadata = node.get("metadata") or {}
+        qualname = metadata.get("qualname") if isinstance(metadata, dict) else None
+        language = node.get("language")
+        span = node.get("span")
+        start = end = -1
+        if isinstance(span, dict) and set(span) == {"start_line", "end_line"}:
+            start, end = int(span["start_line"]), int(span["end_line"])
+        elif span is not None:
+            self.odd_spans[idx] = span
+
+        t, c = self._tables, self._cols
+        c["kind"].append(t["labels"].code(str(node.get("kind", ""))))
+        c["name"].append(t["names"].code(str(node.get("name", ""))))
+        c["qualname"].append(t["names"].code(str(qualname)) if qualname else -1)
+        c["file"].append(t["paths"].code(str(node.get("file_path") or "")))
+        c["language"].append(t["labels"].code(str(language)) if language is not None else -1)
+        c["start"].append(start)
+        c["end"].append(end)
+        c["meta"].append(t["blobs"].code(_compact_json(metadata)))
+
+    def add_edge(self, edge: Dict[str, Any]) -> None:
+        src = self._index.get(str(edge["source"]))
+        dst = self._index.get(str(edge["target"]))
+        if src is None or dst is None:
+            return
+        kind = str(edge.get("kind", ""))
+        edge_id = str(edge.get("id", ""))
+        # Edge ids are "edge:{kind}:{source}:{target}[:disambiguator]"; keep
+        # only the part that cannot be rebuilt from the other columns.
+        prefix = f"edge:{kind}:{edge['source']}:{edge['target']}"
+        full = not edge_id.startswith(prefix)
+
+        t, c = self._tables, self._ecols
+        c["src"].append(src)
+        c["dst"].append(dst)
+        c["kind"].append(t["edge_kinds"].code(kind))
+        c["meta"].append(t["blobs"].code(_compact_json(edge.get("metadata") or {})))
+        c["id"].append(t["blobs"].code(edge_id if full else edge_id[len(prefix) :]))
+        c["id_full"].append(1 if full else 0)
+
+    def finalize(self) -> None:
+        a: Dict[str, np.ndarray] = {}
+        for col, values in self._cols.items():
+            name = f"node_{col}"
+            a[name] = np.asarray(values, dtype=_DTYPES.get(name, np.int32))
+        for col, values in self._ecols.items():
+            name = f"edge_{col}"
+            a[name] = np.asarray(values, dtype=_DTYPES.get(name, np.int32))
+
+        n = len(self._ids)
+        a["out_ptr"], a["out_edges"] = self._csr(a["edge_src"], n)
+        a["in_ptr"], a["in_edges"] = self._csr(a["edge_dst"], n)
+        # Node-id lookups binary-search this permutation; no dict is needed
+        # once the graph is packed.
+        a["id_order"] = np.asarray(sorted(range(n), key=self._ids.__getitem__), dtype=np.int32)
+
+        tables = {name: table.values for name, table in self._tables.items()}
+        tables["node_ids"] = self._ids
+        for name, values in tables.items():
+            packed = PackedStrings.pack(values)
+            a[f"{name}_data"], a[f"{name}_offsets"] = packed.data, packed.offsets
+        a.update(
+            SymbolIndex.build(tables["names"], tables["paths"], a["node_name"], a["node_qualname"], a["node_file"])
+        )
+
+        self._index, self._ids, self._tables, self._cols, self._ecols = {}, [], {}, {}, {}
+        self._attach(a)
+
+    @staticmethod
+    def _csr(keys: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        # Stable sort keeps each node's edges in file order.
+        order = np.argsort(keys, kind="stable").astype(np.int32)
+        ptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys, minlength=n), out=ptr[1:])
+        return ptr, order
+
+    def _attach(self, arrays: Dict[str, np.ndarray]) -> None:
+        self.arrays = arrays
+        self._symbols: Optional[SymbolIndex] = None
+        for name in _STRING_TABLES:
+            setattr(self, name, PackedStrings(arrays[f"{name}_data"], arrays[f"{name}_offsets"]))
+        for name, arr in arrays.items():
+            if not name.endswith(("_data", "_offsets")):
+                setattr(self, name, arr)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, path: Path) -> None:
+        """Write the graph to `path` atomically (temp file + rename)."""
+        path = Path(path)
+        directory: Dict[str, List[Any]] = {}
+        offset = 0
+        for name, arr in self.arrays.items():
+            arr = np.ascontiguousarray(arr)
+            directory[name] = [arr.dtype.str, int(arr.shape[0]), offset]
+            offset += -(-arr.nbytes // _ALIGN) * _ALIGN
+
+        def _header(base: int) -> bytes:
+            arrays = {k: [d, n, base + o] for k, (d, n, o) in directory.items()}
+            odd = {str(k): v for k, v in self.odd_spans.items()}
+            return json.dumps({"version": GRAPH_FORMAT_VERSION, "arrays": arrays, "odd_spans": odd}).encode()
+
+        # Header size depends on the offsets it lists; settle on a base that fits.
+        base = _ALIGN
+        while len(_MAGIC) + 8 + len(_header(base)) > base:
+            base += _ALIGN
+        header = _header(base)
+
+        tmp = tempfile.NamedTemporaryFile(mode="wb", suffix=".bin", dir=path.parent, delete=False)
+        try:
+            tmp.write(_MAGIC + struct.pack("<Q", len(header)) + header)
+            for name, arr in self.arrays.items():
+                tmp.seek(base + directory[name][2])
+                tmp.write(np.ascontiguousarray(arr).tobytes())
+            tmp.truncate(base + offset)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+            tmp.close()
+            os.replace(tmp.name, path)
+        except Exception:
+            tmp.close()
+            try:
+                os.unlink(tmp.name)
+            except OSError:
+                pass
+            raise
+
+    @classmethod
+    def open(cls, path: Path) -> "TraceGraph":
+        """Memory-map a graph written by save(); raises ValueError if it is not one."""
+        mm = np.memmap(path, dtype=np.uint8, mode="r")
+        if mm.shape[0] < 16 or mm[:8].tobytes() != _MAGIC:
+            raise ValueError(f"Not a trace graph file: {path}")
+        (header_len,) = struct.unpack("<Q", mm[8:16].tobytes())
+        header = json.loads(mm[16 : 16 + header_len].tobytes().decode("utf-8"))
+        if header.get("version") != GRAPH_FORMAT_VERSION:
+            raise ValueError(f"Unsupported trace graph version: {header.get('version')}")
+
+        arrays: Dict[str, np.ndarray] = {}
+        for name, (dtype, length, offset) in header["arrays"].items():
+            if length == 0:
+                arrays[name] = np.zeros(0, dtype=dtype)
+            else:
+                arrays[name] = np.frombuffer(mm, dtype=dtype, count=length, offset=offset)
+
+        graph = cls()
+        graph._tables, graph._cols, graph._ecols = {}, {}, {}
+        graph.odd_spans = {int(k): v for k, v in header.get("odd_spans", {}).items()}
+        graph._attach(arrays)
+        return graph
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    @property
+    def node_count(self) -> int:
+        return int(self.node_kind.shape[0])
+
+    @property
+    def edge_count(self) -> int:
+        return int(self.edge_src.shape[0])
+
+    def index_of(self, node_id: str) -> Optional[int]:
+        order = self.id_order
+        lo, hi = 0, int(order.shape[0])
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.node_ids[int(order[mid])] < node_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < order.shape[0] and self.node_ids[int(order[lo])] == node_id:
+            return int(order[lo])
+        return None
+
+    @property
+    def symbols(self) -> SymbolIndex:
+        """Name search index; built here for graph files saved without one."""
+        if self._symbols is None:
+            if "sym_key_of_name" not in self.arrays:
+                self.arrays.update(
+                    SymbolIndex.build(
+                        self.names.values, self.paths.values, self.node_name, self.node_qualname, self.node_file
+                    )
+                )
+            self._symbols = SymbolIndex(self.arrays, self.node_kind, self.node_name)
+        return self._symbols
+
+    def degree(self, idx: int) -> Tuple[int, int]:
+        """(in_degree, out_degree) of node `idx`."""
+        return (
+            int(self.in_ptr[idx + 1] - self.in_ptr[idx]),
+            int(self.out_ptr[idx + 1] - self.out_ptr[idx]),
+        )
+
+    def edge_kind_codes(self, kinds: Iterable[str]) -> np.ndarray:
+        codes = [self.edge_kinds.lookup(k) for k in kinds]
+        return np.asarray([c for c in codes if c is not None], dtype=np.uint8)
+
+    def out_edge_ids(self, idx: int, kind_codes: Optional[np.ndarray] = None) -> np.ndarray:
+        """Edge indices leaving node `idx` (in file order), optionally filtered by kind."""
+        return self._slice(self.out_ptr, self.out_edges, idx, kind_codes)
+
+    def in_edge_ids(self, idx: int, kind_codes: Optional[np.ndarray] = None) -> np.ndarray:
+        return self._slice(self.in_ptr, self.in_edges, idx, kind_codes)
+
+    def _slice(
+        self, ptr: np.ndarray, edges: np.ndarray, idx: int, kind_codes: Optional[np.ndarray]
+    ) -> np.ndarray:
+        ids = edges[int(ptr[idx]) : int(ptr[idx + 1])]
+        if kind_codes is not None:
+            ids = ids[np.isin(self.edge_kind[ids], kind_codes)]
+        return ids
+
+    def traverse(
+        self,
+        start: Sequence[int],
+        direction: str = "both",
+        kind_codes: Optional[np.ndarray] = None,
+        hops: int = 1,
+        max_nodes: int = 50,
+        max_edges: int = 200,
+        max_fanout: int = 0,
+    ) -> "Traversal":
+        """
+        Breadth-first expansion from `start`, one whole frontier per hop.
+
+        Each frontier node follows at most `max_fanout` matching edges
+        (0 = no cap). Stops after `hops`, when nothing new is reached, or when
+        the node / edge budget is spent (then `truncated` is set). Edges are
+        kept only between visited nodes, each once.
+        """
+        visited = np.zeros(self.node_count, dtype=np.bool_)
+        frontier = np.unique(np.asarray(start, dtype=np.int64))[: max(0, max_nodes)]
+        visited[frontier] = True
+        nodes: List[int] = list(dict.fromkeys(int(i) for i in start if visited[int(i)]))
+        edges: List[int] = []
+        seen_edges: set = set()
+        truncated = False
+        depth = 0
+
+        while depth < hops and frontier.size:
+            eids, nbrs, _group = self._expand(frontier, direction, kind_codes, max_fanout)
+            depth += 1
+            # New nodes in discovery order, within the node budget.
+            _, first = np.unique(nbrs, return_index=True)
+            candidates = nbrs[np.sort(first)]
+            fresh = candidates[~visited[candidates]]
+            room = max_nodes - len(nodes)
+            if fresh.size > room:
+                fresh, truncated = fresh[: max(0, room)], True
+            visited[fresh] = True
+            nodes.extend(int(i) for i in fresh)
+
+            for eid in eids[visited[nbrs]].tolist():
+                if eid in seen_edges:
+                    continue
+                if len(edges) >= max_edges:
+                    truncated = True
+                    break
+                seen_edges.add(eid)
+                edges.append(eid)
+
+            if truncated:
+                break
+            frontier = fresh.astype(np.int64)
+
+        return Traversal(nodes=nodes, edges=edges, truncated=truncated, hops=depth)
+
+    def _expand(
+        self, frontier: np.ndarray, direction: str, kind_codes: Optional[np.ndarray], max_fanout: int
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(edge ids, far-end nodes, frontier position) for every edge leaving the frontier."""
+        parts = []
+        if direction in ("out", "both"):
+            parts.append(self._gather(self.out_ptr, self.out_edges, self.edge_dst, frontier, kind_codes))
+        if direction in ("in", "both"):
+            parts.append(self._gather(self.in_ptr, self.in_edges, self.edge_src, frontier, kind_codes))
+        if not parts:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty
+        eids = np.concatenate([p[0] for p in parts])
+        nbrs = np.concatenate([p[1] for p in parts])
+        group = np.concatenate([p[2] for p in parts])
+        # Group by frontier node (out-edges before in-edges within a node).
+        order = np.argsort(group, kind="stable")
+        eids, nbrs, group = eids[order], nbrs[order], group[order]
+        if max_fanout > 0 and group.size:
+            rank = np.arange(group.size) - np.searchsorted(group, group, side="left")
+            keep = rank < max_fanout
+            eids, nbrs, group = eids[keep], nbrs[keep], group[keep]
+        return eids, nbrs, group
+
+    def _gather(
+        self,
+        ptr: np.ndarray,
+        adjacency: np.ndarray,
+        far_end: np.ndarray,
+        frontier: np.ndarray,
+        kind_codes: Optional[np.ndarray],
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        starts = ptr[frontier]
+        lens = ptr[frontier + 1] - starts
+        total = int(lens.sum())
+        group = np.repeat(np.arange(frontier.size, dtype=np.int64), lens)
+        within = np.arange(total, dtype=np.int64) - np.repeat(np.cumsum(lens) - lens, lens)
+        eids = adjacency[np.repeat(starts, lens) + within].astype(np.int64)
+        if kind_codes is not None:
+            keep = np.isin(self.edge_kind[eids], kind_codes)
+            eids, group = eids[keep], group[keep]
+        return eids, far_end[eids].astype(np.int64), group
+
+    def node_file_path(self, idx: int) -> str:
+        return self.paths[int(self.node_file[idx])]
+
+    def node_name_str(self, idx: int) -> str:
+        return self.names[int(self.node_name[idx])]
+
+    def node_dict(self, idx: int) -> Dict[str, Any]:
+        idx = int(idx)
+        if idx in self.odd_spans:
+            span: Any = self.odd_spans[idx]
+        elif self.node_start[idx] >= 0:
+            span = {"end_line": int(self.node_end[idx]), "start_line": int(self.node_start[idx])}
+        else:
+            span = None
+        language = int(self.node_language[idx])
+        return {
+            "file_path": self.paths[int(self.node_file[idx])],
+            "id": self.node_ids[idx],
+            "kind": self.labels[int(self.node_kind[idx])],
+            "language": self.labels[language] if language >= 0 else None,
+            "metadata": json.loads(self.blobs[int(self.node_meta[idx])]),
+            "name": self.names[int(self.node_name[idx])],
+            "span": span,
+        }
+
+    def edge_dict(self, eidx: int) -> Dict[str, Any]:
+        eidx = int(eidx)
+        kind = self.edge_kinds[int(self.edge_kind[eidx])]
+        source = self.node_ids[int(self.edge_src[eidx])]
+        target = self.node_ids[int(self.edge_dst[eidx])]
+        id_part = self.blobs[int(self.edge_id[eidx])]
+        edge_id = id_part if self.edge_id_full[eidx] else f"edge:{kind}:{source}:{target}{id_part}"
+        return {
+            "id": edge_id,
+            "kind": kind,
+            "metadata": json.loads(self.blobs[int(self.edge_meta[eidx])]),
+            "source": source,
+            "target": target,
+        }
+
+    def nodes(self, indices: Sequence[int]) -> List[Dict[str, Any]]:
+        return [self.node_dict(i) for i in indices]
+
+    def edges(self, indices: Sequence[int]) -> List[Dict[str, Any]]:
+        return [self.edge_dict(i) for i in indices]
+
+    def nbytes(self) -> int:
+        """Bytes of the graph's arrays (memory-mapped ones counted at full size)."""
+        return sum(int(a.nbytes) for a in self.arrays.values()) + sys.getsizeof(self.odd_spans)
@@ -0,0 +1,666 @@
+"""
+Import scanners for the non-Python languages of a trace: TypeScript/JavaScript,
+Go and Rust.
+
+No parser per language: comments are dropped and string literals replaced by
+placeholders with one tokenizing regex, so import statements and top-level
+declarations can be matched with regular expressions without tripping over
+text inside strings or comments. Line numbers survive (newlines are kept).
+
+Specifiers resolve against the enumerated file list, like ModuleResolver does
+for Python, plus the project files that decide where they point (read once
+per build by `load_import_config`):
+
+- TS/JS: relative paths (extension, `.js` -> `.ts` and `index` probing),
+  tsconfig/jsconfig `baseUrl` and `paths` (nearest config, `extends` followed),
+  and workspace packages by their package.json `name`
+- Go: import paths under a go.mod `module` prefix, to the package's non-test
+  files
+- Rust: `mod x;` and `crate::` / `self::` / `super::` / workspace-crate paths in
+  `use`, to the module's file (Cargo.toml `[package]` marks the crate)
+
+Everything else is an external module. Relative specifiers that do not
+resolve (TS/JS `./x`, Rust `crate::x`) are dropped, like relative Python
+imports.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+import posixpath
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+JS_RESOLVE_EXTENSIONS = (".ts", ".tsx", ".d.ts", ".js", ".jsx")
+_JS_ESM_EXTENSIONS = {".js": (".ts", ".tsx"), ".jsx": (".tsx",), ".mjs": (".mts",), ".cjs": (".cts",)}
+_PACKAGE_ENTRY_FIELDS = ("source", "types", "module", "main")
+_TSCONFIG_NAMES = ("tsconfig.json", "jsconfig.json")
+_MAX_EXTENDS_DEPTH = 8
+
+# (symbol name, qualname, symbol_type, start line, end line, is_public)
+ScannedSymbol = Tuple[str, str, str, int, int, bool]
+# (specifier, line)
+ScannedImport = Tuple[str, int]
+
+
+# ---------------------------------------------------------------------------
+# Tokenizing
+# ---------------------------------------------------------------------------
+
+_STR = r"\x00(\d+)\x00"
+
+_TOKEN_PATTERNS = {
+    "js": re.compile(
+        r"""//[^\n]*|/\*.*?\*/|"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'|`(?:\\.|[^`\\])*`""", re.S
+    ),
+    "go": re.compile(r"""//[^\n]*|/\*.*?\*/|"(?:\\.|[^"\\\n])*"|`[^`]*`|'(?:\\.|[^'\\\n])*'""", re.S),
+    # Raw strings first; a quote only opens a char literal when it closes one
+    # character later, otherwise it is a lifetime.
+    "rust": re.compile(r"""//[^\n]*|/\*.*?\*/|r(#*)".*?"\1|b?"(?:\\.|[^"\\])*"|b?'(?:\\.|[^'\\\n])'""", re.S),
+}
+
+
+class _Source:
+    """Source with comments removed and string literals replaced by `\\x00n\\x00`."""
+
+    def __init__(self, source: str, syntax: str):
+        self.strings: List[str] = []
+
+        def _sub(m: "re.Match[str]") -> str:
+            text = m.group()
+            newlines = "\n" * text.count("\n")
+            if text.startswith("/"):
+                return newlines or " "
+            body = text.lstrip("rb#")
+            self.strings.append(body[1:].rstrip("#")[:-1])
+            return f"\x00{len(self.strings) - 1}\x00{newlines}"
+
+        self.code = _TOKEN_PATTERNS[syntax].sub(_sub, source)
+        self._line_starts = [0] + [m.end() for m in re.finditer("\n", self.code)]
+
+    def string(self, m: "re.Match[str]", group: int = 1) -> str:
+        return self.strings[int(m.group(group))]
+
+    def line(self, pos: int) -> int:
+        return bisect.bisect_right(self._line_starts, pos)
+
+    def end_line(self, pos: int) -> int:
+        """Last line of the declaration starting before `pos` (see _declaration_end)."""
+        return self.line(_declaration_end(self.code, pos))
+
+
+_OPENERS = {"(": ")", "[": "]", "{": "}"}
+_CONTINUATION_CHARS = set("{}()[].,?:|&=+-*/<>")
+
+
+def _declaration_end(code: str, pos: int) -> int:
+    """
+    Offset where a declaration starting at `pos` ends: after its body's
+    closing brace, at a top-level `;`, or at a line break whose next line
+    starts a new statement at column 0.
+    """
+    depth = 0
+    i, n = pos, len(code)
+    while i < n:
+        c = code[i]
+        if c in _OPENERS:
+            depth += 1
+        elif c in ")]}":
+            depth -= 1
+            if depth <= 0 and c == "}":
+                return i
+        elif depth == 0:
+            if c == ";":
+                return i
+            if c == "\n" and i + 1 < n and not code[i + 1].isspace() and code[i + 1] not in _CONTINUATION_CHARS:
+                return i - 1
+        i += 1
+    return n - 1
+
+
+# ---------------------------------------------------------------------------
+# Scanners
+# ---------------------------------------------------------------------------
+
+_JS_FROM = re.compile(r"(?<![\w$.])(?:import|export)\b[\w$*{},\s]*?\bfrom\s*" + _STR)
+_JS_BARE_IMPORT = re.compile(r"(?<![\w$.])import\s*" + _STR)
+_JS_CALL = re.compile(r"(?<![\w$.])(?:require|import)\s*\(\s*" + _STR + r"\s*\)")
+_JS_EXPORT = re.compile(
+    r"^[ \t]*export\s+(?:default\s+)?(?:declare\s+)?(?:abstract\s+)?(?:async\s+)?"
+    r"(function\*?|class|interface|type|enum|const|let|var|namespace)\s+([\w$]+)",
+    re.M,
+)
+_JS_SYMBOL_TYPES = {"function*": "function", "const": "variable", "let": "variable", "var": "variable"}
+
+_GO_IMPORT = re.compile(r"^[ \t]*import\s+(?:[\w.]+\s+)?" + _STR, re.M)
+_GO_IMPORT_BLOCK = re.compile(r"^[ \t]*import\s*\(([^)]*)\)", re.M)
+_GO_BLOCK_SPEC = re.compile(_STR)
+_GO_FUNC = re.compile(r"^func\s*(?:\(\s*(?:\w+\s+)?\*?\s*(\w+)[^)]*\)\s*)?(\w+)\s*[\[(]", re.M)
+_GO_TYPE = re.compile(r"^type\s+(\w+)(?:\[[^\]]*\])?\s+(struct|interface)?", re.M)
+
+_RUST_MOD = re.compile(r"^[ \t]*(?:pub(?:\([^)]*\))?\s+)?mod\s+(\w+)\s*;", re.M)
+_RUST_USE = re.compile(r"(?<![\w:])use\s+([^;]+);")
+_RUST_EXTERN_CRATE = re.compile(r"(?<![\w:])extern\s+crate\s+(\w+)")
+_RUST_ITEM = re.compile(
+    r"^(pub(?:\([^)]*\))?\s+)?(?:(?:const|async|unsafe|default)\s+)*(?:extern\s+(?:\x00\d+\x00\s+)?)?"
+    r"(fn|struct|enum|trait|type|union|const|static)\s+(\w+)",
+    re.M,
+)
+_RUST_SYMBOL_TYPES = {"fn": "function", "const": "constant", "static": "static"}
+
+
+def scan_source(source: str, language: str) -> Tuple[List[ScannedImport], List[ScannedSymbol]]:
+    """Raw imports (specifier, line) and top-level declarations of one file, in source order."""
+    if language in ("typescript", "javascript"):
+        return _scan_js(_Source(source, "js"))
+    if language == "go":
+        return _scan_go(_Source(source, "go"))
+    if language == "rust":
+        return _scan_rust(_Source(source, "rust"))
+    return [], []
+
+
+def _scan_js(src: _Source) -> Tuple[List[ScannedImport], List[ScannedSymbol]]:
+    found: Dict[int, ScannedImport] = {}
+    for pattern in (_JS_FROM, _JS_BARE_IMPORT, _JS_CALL):
+        for m in pattern.finditer(src.code):
+            # Keyed by the string's position: each specifier is counted once.
+            found.setdefault(m.start(1), (src.string(m), src.line(m.start())))
+    imports = [found[pos] for pos in sorted(found)]
+
+    symbols: List[ScannedSymbol] = []
+    for m in _JS_EXPORT.finditer(src.code):
+        keyword, name = m.group(1), m.group(2)
+        symbol_type = _JS_SYMBOL_TYPES.get(keyword, keyword)
+        symbols.append((name, name, symbol_type, src.line(m.start(2)), src.end_line(m.end()), True))
+    return imports, symbols
+
+
+def _scan_go(src: _Source) -> Tuple[List[ScannedImport], List[ScannedSymbol]]:
+    imports: List[ScannedImport] = []
+    for m in _GO_IMPORT.finditer(src.code):
+        imports.append((src.string(m), src.line(m.start())))
+    for block in _GO_IMPORT_BLOCK.finditer(src.code):
+        for m in _GO_BLOCK_SPEC.finditer(block.group(1)):
+            imports.append((src.string(m), src.line(block.start(1) + m.start())))
+    imports.sort(key=lambda imp: imp[1])
+
+    symbols: List[ScannedSymbol] = []
+    for m in _GO_FUNC.finditer(src.code):
+        receiver, name = m.group(1), m.group(2)
+        qualname = f"{receiver}.{name}" if receiver else name
+        symbol_type = "method" if receiver else "function"
+        symbols.append((name, qualname, symbol_type, src.line(m.start()), src.end_line(m.end()), name[:1].isupper()))
+    for m in _GO_TYPE.finditer(src.code):
+        name = m.group(1)
+        symbol_type = m.group(2) or "type"
+        symbols.append((name, name, symbol_type, src.line(m.start()), src.end_line(m.end()), name[:1].isupper()))
+    symbols.sort(key=lambda s: s[3])
+    return imports, symbols
+
+
+def _scan_rust(src: _Source) -> Tuple[List[ScannedImport], List[ScannedSymbol]]:
+    imports: List[ScannedImport] = []
+    for m in _RUST_MOD.finditer(src.code):
+        # `mod x;` loads the file of module x, exactly what `self::x` names.
+        imports.append((f"self::{m.group(1)}", src.line(m.start(1))))
+    for m in _RUST_USE.finditer(src.code):
+        line = src.line(m.start())
+        imports.extend((path, line) for path in expand_use_tree(m.group(1)))
+    for m in _RUST_EXTERN_CRATE.finditer(src.code):
+        imports.append((m.group(1), src.line(m.start())))
+    imports.sort(key=lambda imp: imp[1])
+
+    symbols: List[ScannedSymbol] = []
+    for m in _RUST_ITEM.finditer(src.code):
+        keyword, name = m.group(2), m.group(3)
+        symbol_type = _RUST_SYMBOL_TYPES.get(keyword, keyword)
+        symbols.append((name, name, symbol_type, src.line(m.start(3)), src.end_line(m.end()), bool(m.group(1))))
+    return imports, symbols
+
+
+def expand_use_tree(tree: str) -> List[str]:
+    """`a::{b, c::{d as e, self}}` -> ["a::b", "a::c::d", "a::c"]; globs keep their prefix."""
+    paths: List[str] = []
+
+    def _walk(prefix: str, text: str) -> None:
+        for item in _split_top_level(text):
+            brace = item.find("{")
+            if brace >= 0 and item.endswith("}"):
+                _walk(_join_path(prefix, item[:brace].rstrip(":").strip()), item[brace + 1 : -1])
+                continue
+            item = re.split(r"\s+as\s+", item)[0].strip()
+            if item in ("self", "*"):
+                item = ""
+            elif item.endswith("::*"):
+                item = item[:-3]
+            path = _join_path(prefix, item)
+            if path and path not in paths:
+                paths.append(path)
+
+    _walk("", " ".join(tree.split()).lstrip(":").strip())
+    return paths
+
+
+def _split_top_level(text: str) -> List[str]:
+    items, depth, start = [], 0, 0
+    for i, c in enumerate(text):
+        if c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+        elif c == "," and depth == 0:
+            items.append(text[start:i].strip())
+            start = i + 1
+    items.append(text[start:].strip())
+    return [item for item in items if item]
+
+
+def _join_path(prefix: str, item: str) -> str:
+    item = item.replace(" ", "")
+    return f"{prefix}::{item}" if prefix and item else prefix or item
+
+
+# ---------------------------------------------------------------------------
+# Project configuration
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class ImportConfig:
+    """
+    What the project files say about import specifiers, keyed by the
+    repo-relative directory that holds them ("" for the repo root):
+
+    - ts_paths: tsconfig/jsconfig, as {"base_url", "paths_base", "paths"}
+      with directories already resolved against the config that set them
+    - packages: package.json name -> {"dir", "entries"}
+    - go_modules: go.mod module path -> directory
+    - crates: Cargo.toml crate directory -> crate name (`-` as `_`)
+    """
+
+    ts_paths: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    packages: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    go_modules: Dict[str, str] = field(default_factory=dict)
+    crates: Dict[str, str] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ts_paths": self.ts_paths,
+            "packages": self.packages,
+            "go_modules": self.go_modules,
+            "crates": self.crates,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ImportConfig":
+        return cls(
+            ts_paths=dict(data.get("ts_paths") or {}),
+            packages=dict(data.get("packages") or {}),
+            go_modules=dict(data.get("go_modules") or {}),
+            crates=dict(data.get("crates") or {}),
+        )
+
+
+def _ancestor_dirs(files: Iterable[str]) -> List[str]:
+    dirs: Set[str] = set()
+    for rel in files:
+        d = posixpath.dirname(rel)
+        while d not in dirs:
+            dirs.add(d)
+            if not d:
+                break
+            d = posixpath.dirname(d)
+    return sorted(dirs)
+
+
+def _rel_dir(base: str, path: str) -> Optional[str]:
+    """`path` (relative to repo dir `base`) as a repo-relative dir; None outside the repo."""
+    joined = posixpath.normpath(posixpath.join(base, path)) if path else base or "."
+    if joined == "..":
+        return None
+    if joined.startswith("../"):
+        return None
+    return "" if joined == "." else joined
+
+
+def _read_text(path: Path) -> Optional[str]:
+    try:
+        return path.read_text(encoding="utf-8", errors="ignore")
+    except OSError:
+        return None
+
+
+def _load_jsonc(text: str) -> Any:
+    """JSON with comments and trailing commas, as tsconfig allows."""
+    src = _Source(text, "js")
+    code = re.sub(r",(\s*[}\]])", r"\1", src.code)
+    code = re.sub(_STR, lambda m: json.dumps(_unescape_json(src.strings[int(m.group(1))])), code)
+    return json.loads(code)
+
+
+def _unescape_json(body: str) -> str:
+    try:
+        return json.loads(f'"{body}"')
+    except ValueError:
+        return body
+
+
+def _load_tsconfig(repo_root: Path, rel_dir: str, name: str, depth: int = 0) -> Dict[str, Any]:
+    """compilerOptions baseUrl/paths of one config, merged over the configs it extends."""
+    text = _read_text(repo_root / rel_dir / name)
+    if text is None:
+        return {}
+    try:
+        data = _load_jsonc(text)
+    except ValueError as e:
+        logger.warning(f"Ignoring unreadable {posixpath.join(rel_dir, name)}: {e}")
+        return {}
+    if not isinstance(data, dict):
+        return {}
+
+    merged: Dict[str, Any] = {}
+    extends = data.get("extends")
+    # Only relative extends: package configs (e.g. @tsconfig/node18) live in node_modules.
+    if isinstance(extends, str) and extends.startswith(".") and depth < _MAX_EXTENDS_DEPTH:
+        target = posixpath.normpath(posixpath.join(rel_dir, extends))
+        if not target.endswith(".json"):
+            target += ".json"
+        if not target.startswith("../"):
+            merged = _load_tsconfig(repo_root, posixpath.dirname(target), posixpath.basename(target), depth + 1)
+
+    options = data.get("compilerOptions") or {}
+    if isinstance(options.get("baseUrl"), str):
+        merged["base_url"] = _rel_dir(rel_dir, options["baseUrl"])
+    if isinstance(options.get("paths"), dict):
+        merged["paths"] = {
+            str(pattern): [str(t) for t in targets if isinstance(t, str)]
+            for pattern, targets in options["paths"].items()
+            if isinstance(targets, list)
+        }
+        merged["paths_base"] = rel_dir
+    return merged
+
+
+def _load_package(repo_root: Path, rel_dir: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    text = _read_text(repo_root / rel_dir / "package.json")
+    if text is None:
+        return None
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or not isinstance(data.get("name"), str):
+        return None
+    entries = [str(data[f]) for f in _PACKAGE_ENTRY_FIELDS if isinstance(data.get(f), str)]
+    return data["name"], {"dir": rel_dir, "entries": entries}
+
+
+_GO_MODULE = re.compile(r"^\s*module\s+\"?([^\s\"]+)", re.M)
+_CARGO_SECTION = re.compile(r"^\s*\[([^\]]+)\]\s*$", re.M)
+_CARGO_NAME = re.compile(r"^\s*name\s*=\s*\"([^\"]+)\"", re.M)
+
+
+def _cargo_crate_name(text: str) -> Optional[str]:
+    """[lib] name, else [package] name; None for a virtual workspace manifest."""
+    sections: Dict[str, str] = {}
+    matches = list(_CARGO_SECTION.finditer(text))
+    for i, m in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        sections.setdefault(m.group(1).strip(), text[m.end() : end])
+    if "package" not in sections:
+        return None
+    for section in ("lib", "package"):
+        name = _CARGO_NAME.search(sections.get(section, ""))
+        if name:
+            return name.group(1).replace("-", "_")
+    return None
+
+
+def load_import_config(repo_root: Path, files_by_language: Dict[str, List[str]]) -> ImportConfig:
+    """
+    Read the project files that steer resolution, probing only the
+    directories that hold files of that language and their ancestors.
+    """
+    repo_root = Path(repo_root)
+    config = ImportConfig()
+
+    js_files = files_by_language.get("typescript", []) + files_by_language.get("javascript", [])
+    for d in _ancestor_dirs(js_files):
+        for name in _TSCONFIG_NAMES:
+            if (repo_root / d / name).is_file():
+                options = _load_tsconfig(repo_root, d, name)
+                if options.get("base_url") is not None or options.get("paths"):
+                    config.ts_paths[d] = options
+                # Like tsc, a directory's tsconfig.json shadows its jsconfig.json.
+                break
+        package = _load_package(repo_root, d)
+        if package is not None:
+            config.packages.setdefault(package[0], package[1])
+
+    for d in _ancestor_dirs(files_by_language.get("go", [])):
+        text = _read_text(repo_root / d / "go.mod")
+        module = _GO_MODULE.search(text) if text else None
+        if module:
+            config.go_modules[module.group(1)] = d
+
+    for d in _ancestor_dirs(files_by_language.get("rust", [])):
+        text = _read_text(repo_root / d / "Cargo.toml")
+        name = _cargo_crate_name(text) if text else None
+        if name:
+            config.crates[d] = name
+    return config
+
+
+# ---------------------------------------------------------------------------
+# Resolution
+# ---------------------------------------------------------------------------
+
+
+def _nearest(dirs: Dict[str, Any], file_path: str) -> Optional[str]:
+    """The deepest key of `dirs` that is an ancestor directory of `file_path`."""
+    d = posixpath.dirname(file_path)
+    while True:
+        if d in dirs:
+            return d
+        if not d:
+            return None
+        d = posixpath.dirname(d)
+
+
+class ImportResolver:
+    """
+    Resolves scanned TS/JS, Go and Rust specifiers to repo-relative files.
+
+    `resolve` returns (target paths, external module name or None, candidate
+    paths probed). Candidates are files, or directories with a trailing "/"
+    for Go packages: if one appears or disappears, the importer's edges must
+    be re-resolved.
+    """
+
+    def __init__(self, files: Iterable[str], config: Optional[ImportConfig] = None):
+        self.files: Set[str] = set(files)
+        self.config = config or ImportConfig()
+        self._go_dirs: Dict[str, List[str]] = {}
+        for rel in sorted(self.files):
+            if rel.endswith(".go") and not rel.endswith("_test.go"):
+                self._go_dirs.setdefault(posixpath.dirname(rel), []).append(rel)
+        # Longest module path first, so nested modules win over their parents.
+        self._go_modules = sorted(self.config.go_modules.items(), key=lambda kv: -len(kv[0]))
+        self._crate_dirs = {name: d for d, name in sorted(self.config.crates.items())}
+
+    def resolve(self, file_path: str, language: str, spec: str) -> Tuple[List[str], Optional[str], List[str]]:
+        if language in ("typescript", "javascript"):
+            return self._resolve_js(file_path, spec)
+        if language == "go":
+            return self._resolve_go(spec)
+        if language == "rust":
+            return self._resolve_rust(file_path, spec)
+        return [], None, []
+
+    def _first(self, candidates: List[str]) -> List[str]:
+        for c in candidates:
+            if c in self.files:
+                return [c]
+        return []
+
+    # -- TS/JS ---------------------------------------------------------------
+
+    def _resolve_js(self, file_path: str, spec: str) -> Tuple[List[str], Optional[str], List[str]]:
+        if spec.startswith(("./", "../")) or spec in (".", ".."):
+            base = _rel_dir(posixpath.dirname(file_path), spec)
+            candidates = _js_candidates(base) if base is not None else []
+            return self._first(candidates), None, candidates
+
+        candidates: List[str] = []
+        ts_dir = _nearest(self.config.ts_paths, file_path)
+        if ts_dir is not None:
+            options = self.config.ts_paths[ts_dir]
+            for target in _match_ts_paths(options.get("paths") or {}, spec):
+                root = options["base_url"] if options.get("base_url") is not None else options["paths_base"]
+                base = _rel_dir(root, target)
+                if base is not None:
+                    candidates += _js_candidates(base)
+            if options.get("base_url") is not None:
+                base = _rel_dir(options["base_url"], spec)
+                if base is not None:
+                    candidates += _js_candidates(base)
+
+        package, sub = _split_package(spec)
+        info = self.config.packages.get(package)
+        if info is not None:
+            pkg_dir = info["dir"]
+            if sub:
+                for root in (pkg_dir, _rel_dir(pkg_dir, "src")):
+                    base = _rel_dir(root or "", sub)
+                    if base is not None:
+                        candidates += _js_candidates(base)
+            else:
+                for entry in info["entries"]:
+                    base = _rel_dir(pkg_dir, entry)
+                    if base is not None:
+                        candidates += _js_candidates(base)
+                for fallback in ("src/index", "index"):
+                    candidates += _js_candidates(_rel_dir(pkg_dir, fallback) or fallback)
+
+        targets = self._first(candidates)
+        return targets, None if targets else spec, candidates
+
+    # -- Go ------------------------------------------------------------------
+
+    def _resolve_go(self, spec: str) -> Tuple[List[str], Optional[str], List[str]]:
+        for module, mod_dir in self._go_modules:
+            if spec == module or spec.startswith(module + "/"):
+                pkg_dir = _rel_dir(mod_dir, spec[len(module) + 1 :])
+                if pkg_dir is None:
+                    break
+                targets = self._go_dirs.get(pkg_dir, [])
+                return list(targets), None if targets else spec, [pkg_dir + "/"]
+        return [], spec, []
+
+    # -- Rust ----------------------------------------------------------------
+
+    def _resolve_rust(self, file_path: str, spec: str) -> Tuple[List[str], Optional[str], List[str]]:
+        segments = spec.split("::")
+        head, rest = segments[0], segments[1:]
+        crate_dir = _nearest(self.config.crates, file_path)
+        crate_src = posixpath.join(crate_dir, "src") if crate_dir is not None else None
+
+        if head == "crate":
+            if crate_src is None:
+                return [], None, []
+            base, own = crate_src, _crate_root_files(crate_src)
+        elif head in ("self", "super"):
+            base = _rust_module_dir(file_path)
+            if head == "super":
+                rest = segments
+            # Each `super` is the parent module, whose submodules are one directory up.
+            while rest and rest[0] == "super":
+                base, rest = posixpath.dirname(base), rest[1:]
+            own = _rust_module_files(base, crate_src)
+        elif head in self._crate_dirs:
+            base = posixpath.join(self._crate_dirs[head], "src")
+            own = _crate_root_files(base)
+        else:
+            # 2018 paths: a module declared next to this file needs no `self::`.
+            local = _rust_module_candidates(_rust_module_dir(file_path), [head])
+            targets = self._first(local)
+            if not targets:
+                return [], head, local
+            base, rest, own = _rust_module_dir(file_path), segments, []
+
+        candidates = _rust_module_candidates(base, rest) + own
+        candidates = [c for c in candidates if c != file_path]
+        return self._first(candidates), None, candidates
+
+
+def _js_candidates(base: str) -> List[str]:
+    stem, ext = posixpath.splitext(base)
+    out: List[str] = []
+    if ext in (".ts", ".tsx", ".js", ".jsx"):
+        out.append(base)
+    # TS ESM style: `./x.js` names the file compiled from x.ts.
+    out += [stem + alt for alt in _JS_ESM_EXTENSIONS.get(ext, ())]
+    out += [base + e for e in JS_RESOLVE_EXTENSIONS]
+    out += [posixpath.join(base, "index") + e for e in JS_RESOLVE_EXTENSIONS] if base else []
+    return out
+
+
+def _match_ts_paths(paths: Dict[str, List[str]], spec: str) -> List[str]:
+    """Substituted targets of the best `paths` pattern: exact match, else longest prefix."""
+    if spec in paths:
+        return list(paths[spec])
+    best: Optional[Tuple[int, str]] = None
+    for pattern in paths:
+        prefix, star, suffix = pattern.partition("*")
+        if not star or not spec.startswith(prefix) or not spec.endswith(suffix):
+            continue
+        if len(spec) < len(prefix) + len(suffix):
+            continue
+        if best is None or len(prefix) > best[0]:
+            best = (len(prefix), pattern)
+    if best is None:
+        return []
+    prefix, _, suffix = best[1].partition("*")
+    matched = spec[len(prefix) : len(spec) - len(suffix)]
+    return [t.replace("*", matched) for t in paths[best[1]]]
+
+
+def _split_package(spec: str) -> Tuple[str, str]:
+    """`@scope/pkg/a/b` -> ("@scope/pkg", "a/b"); `pkg/a` -> ("pkg", "a")."""
+    parts = spec.split("/")
+    n = 2 if spec.startswith("@") else 1
+    return "/".join(parts[:n]), "/".join(parts[n:])
+
+
+def _rust_module_dir(file_path: str) -> str:
+    """Directory holding the submodules of the module defined by `file_path`."""
+    d, name = posixpath.split(file_path)
+    if name in ("mod.rs", "lib.rs", "main.rs"):
+        return d
+    return posixpath.join(d, name[: -len(".rs")])
+
+
+def _rust_module_candidates(base: str, segments: List[str]) -> List[str]:
+    """Module files for the longest prefix of `segments` first: the rest may be items."""
+    out: List[str] = []
+    for k in range(len(segments), 0, -1):
+        path = posixpath.join(base, *segments[:k])
+        out += [path + ".rs", posixpath.join(path, "mod.rs")]
+    return out
+
+
+def _crate_root_files(src_dir: str) -> List[str]:
+    return [posixpath.join(src_dir, "lib.rs"), posixpath.join(src_dir, "main.rs")]
+
+
+def _rust_module_files(module_dir: str, crate_src: Optional[str]) -> List[str]:
+    if module_dir == crate_src:
+        return _crate_root_files(module_dir)
+    return [module_dir + ".rs", posixpath.join(module_dir, "mod.rs")]
@@ -0,0 +1,166 @@
+"""
+Whole-graph statistics for a trace index.
+
+Computed once per build from a finalized TraceGraph, with vectorized NumPy
+iterations over the edge columns, and stored next to the graph as
+trace_stats.json:
+
+- counts, density and average degree
+- weakly connected components (label propagation with pointer jumping)
+- PageRank over reference edges, i.e. every kind except `contains`, which
+  only records where a symbol is defined
+- top hubs: nodes with the most reference edges
+- per-file importance: PageRank of the file-level graph (reference edges
+  projected onto the files of their endpoints), scaled so the top file is 1.0
+
+Per-file importance is what retrieval uses as an optional prior.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+from .trace_graph import TraceGraph
+
+TRACE_STATS_VERSION = 1
+
+PAGERANK_DAMPING = 0.85
+PAGERANK_TOL = 1e-6
+PAGERANK_MAX_ITER = 100
+
+# Edge kinds that describe containment rather than one node referring to another.
+STRUCTURAL_EDGE_KINDS = ("contains",)
+
+
+def pagerank(
+    src: np.ndarray,
+    dst: np.ndarray,
+    n: int,
+    damping: float = PAGERANK_DAMPING,
+    tol: float = PAGERANK_TOL,
+    max_iter: int = PAGERANK_MAX_ITER,
+) -> Tuple[np.ndarray, int, bool]:
+    """
+    Power-iteration PageRank on the directed edges src -> dst.
+
+    Rank of nodes without out-edges is spread evenly. Returns
+    (scores summing to 1, iterations run, converged).
+    """
+    if n == 0:
+        return np.zeros(0, dtype=np.float64), 0, True
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    out_degree = np.bincount(src, minlength=n).astype(np.float64)
+    dangling = out_degree == 0
+    share = np.divide(1.0, out_degree, out=np.zeros(n, dtype=np.float64), where=~dangling)
+
+    rank = np.full(n, 1.0 / n)
+    for iteration in range(1, max_iter + 1):
+        flow = np.bincount(dst, weights=(rank * share)[src], minlength=n)
+        new = (1.0 - damping) / n + damping * (flow + rank[dangling].sum() / n)
+        delta = float(np.abs(new - rank).sum())
+        rank = new
+        if delta < tol:
+            return rank, iteration, True
+    return rank, max_iter, False
+
+
+def connected_components(src: np.ndarray, dst: np.ndarray, n: int) -> np.ndarray:
+    """Weakly connected component label per node (the smallest node index in it)."""
+    labels = np.arange(n, dtype=np.int64)
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    while True:
+        low = np.minimum(labels[src], labels[dst])
+        new = labels.copy()
+        np.minimum.at(new, src, low)
+        np.minimum.at(new, dst, low)
+        # A label is always a node of the same component with a smaller index,
+        # so following labels twice per round only shortens the chains.
+        new = new[new]
+        if np.array_equal(new, labels):
+            return labels
+        labels = new
+
+
+def compute_trace_stats(graph: TraceGraph, top_k: int = 20) -> Dict[str, Any]:
+    """Statistics for `graph` as stored in trace_stats.json."""
+    n, m = graph.node_count, graph.edge_count
+    src = graph.edge_src.astype(np.int64)
+    dst = graph.edge_dst.astype(np.int64)
+    structural = graph.edge_kind_codes(STRUCTURAL_EDGE_KINDS)
+    ref = ~np.isin(graph.edge_kind, structural)
+    ref_src, ref_dst = src[ref], dst[ref]
+
+    in_degree = np.bincount(ref_dst, minlength=n)
+    out_degree = np.bincount(ref_src, minlength=n)
+    degree = in_degree + out_degree
+    rank, iterations, converged = pagerank(ref_src, ref_dst, n)
+
+    labels = connected_components(src, dst, n)
+    _, sizes = np.unique(labels, return_counts=True)
+
+    hubs = []
+    if n:
+        # Most reference edges first, then PageRank; lexsort keeps node order for ties.
+        order = np.lexsort((-rank, -degree))
+        for i in order[:top_k].tolist():
+            if degree[i] == 0:
+                break
+            node = graph.node_dict(i)
+            hubs.append(
+                {
+                    "id": node["id"],
+                    "name": node["name"],
+                    "kind": node["kind"],
+                    "symbol_type": (node.get("metadata") or {}).get("symbol_type"),
+                    "file_path": node["file_path"],
+                    "degree": int(degree[i]),
+                    "in_degree": int(in_degree[i]),
+                    "out_degree": int(out_degree[i]),
+                    "pagerank": round(float(rank[i]), 8),
+                }
+            )
+
+    importance = file_importance(graph, ref_src, ref_dst)
+    top_files = sorted(importance.items(), key=lambda kv: (-kv[1], kv[0]))[:top_k]
+
+    return {
+        "version": TRACE_STATS_VERSION,
+        "node_count": n,
+        "edge_count": m,
+        "reference_edge_count": int(ref.sum()),
+        "density": (m / (n * (n - 1))) if n > 1 else 0.0,
+        "avg_degree": (2.0 * m / n) if n else 0.0,
+        "components": {
+            "count": int(sizes.shape[0]),
+            "largest": int(sizes.max()) if sizes.shape[0] else 0,
+            "isolated": int((sizes == 1).sum()),
+        },
+        "pagerank": {"damping": PAGERANK_DAMPING, "iterations": iterations, "converged": converged},
+        "top_hubs": hubs,
+        "top_files": [{"file_path": path, "importance": score} for path, score in top_files],
+        "file_importance": importance,
+    }
+
+
+def file_importance(graph: TraceGraph, ref_src: np.ndarray, ref_dst: np.ndarray) -> Dict[str, float]:
+    """PageRank of the file-level reference graph, scaled to a maximum of 1.0."""
+    file_kind = graph.labels.lookup("file")
+    if file_kind is None:
+        return {}
+    file_nodes = np.flatnonzero(graph.node_kind == file_kind)
+    # Dense file numbering over path codes; -1 for paths without a file node.
+    file_of_path = np.full(len(graph.paths), -1, dtype=np.int64)
+    file_of_path[graph.node_file[file_nodes]] = np.arange(file_nodes.shape[0])
+
+    fsrc = file_of_path[graph.node_file[ref_src]]
+    fdst = file_of_path[graph.node_file[ref_dst]]
+    keep = (fsrc >= 0) & (fdst >= 0) & (fsrc != fdst)
+    rank, _, _ = pagerank(fsrc[keep], fdst[keep], int(file_nodes.shape[0]))
+    if not rank.shape[0]:
+        return {}
+    scaled = rank / rank.max()
+    return {graph.node_file_path(int(node)): round(float(s), 6) for node, s in zip(file_nodes, scaled, strict=True)}
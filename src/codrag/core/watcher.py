@@ -21,6 +21,7 @@ class AutoRebuildWatcher:
         is_building: Callable[[], bool],
         debounce_ms: int = 5000,
         min_rebuild_gap_ms: int = 2000,
+        on_state_change: Optional[Callable[[Dict[str, Any]], None]] = None,
     ) -> None:
         self.repo_root = Path(repo_root).resolve()
         self.index_dir = Path(index_dir).resolve()
@@ -29,6 +30,8 @@ class AutoRebuildWatcher:
 
         self._on_trigger_build = on_trigger_build
         self._is_building = is_building
+        self._on_state_change = on_state_change
+        self._last_notified: Optional[tuple] = None
 
         self._lock = threading.Lock()
         self._enabled = False
@@ -42,7 +45,8 @@ class AutoRebuildWatcher:
         self._next_rebuild_at: Optional[str] = None
         self._stale_since: Optional[str] = None  # ISO timestamp when index became stale
 
-        self._extra_exclude_globs: List[str] = ["**/.codrag/**"]
+        # CodeIndex.build's lock file lives beside the index dir (see core/locking.py).
+        self._extra_exclude_globs: List[str] = ["**/.codrag/**", ".build_*.lock"]
 
         try:
             rel_index_dir = self.index_dir.relative_to(self.repo_root)
@@ -76,6 +80,8 @@ class AutoRebuildWatcher:
 
             self._observer = observer
 
+        self._notify_state()
+
     def stop(self) -> None:
         with self._lock:
             self._enabled = False
@@ -100,6 +106,8 @@ class AutoRebuildWatcher:
             except Exception:
                 pass
 
+        self._notify_state()
+
     def status(self) -> Dict[str, Any]:
         with self._lock:
             enabled = self._enabled
@@ -131,6 +139,21 @@ class AutoRebuildWatcher:
             "last_rebuild_at": last_rebuild_at,
         }
 
+    def _notify_state(self) -> None:
+        """Report status() to on_state_change if state or staleness changed."""
+        if self._on_state_change is None:
+            return
+        status = self.status()
+        key = (status["enabled"], status["state"], status["stale"])
+        with self._lock:
+            if key == self._last_notified:
+                return
+            self._last_notified = key
+        try:
+            self._on_state_change(status)
+        except Exception:
+            pass
+
     def on_event(self, event: FileSystemEvent) -> None:
         if getattr(event, "is_directory", False):
             return
@@ -155,6 +178,8 @@ class AutoRebuildWatcher:
             if dest_path is not None:
                 self._queue_path(dest_path)
 
+        self._notify_state()
+
     def _queue_path(self, abs_path: Path) -> None:
         try:
             rel = abs_path.relative_to(self.repo_root)
@@ -202,6 +227,12 @@ class AutoRebuildWatcher:
             self._timer.start()
 
     def _on_debounce_fire(self) -> None:
+        try:
+            self._debounce_fire()
+        finally:
+            self._notify_state()
+
+    def _debounce_fire(self) -> None:
         with self._lock:
             self._timer = None
             if not self._enabled:
@@ -267,6 +298,12 @@ class AutoRebuildWatcher:
         t.start()
 
     def _wait_for_build_complete(self) -> None:
+        try:
+            self._await_build()
+        finally:
+            self._notify_state()
+
+    def _await_build(self) -> None:
         while True:
             with self._lock:
                 enabled = self._enabled
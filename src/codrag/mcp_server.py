@@ -88,11 +88,29 @@ INDEX_NOT_READY = -32001
 BUILD_IN_PROGRESS = -32002
 PROJECT_NOT_FOUND = -32003
 PROJECT_SELECTION_AMBIGUOUS = -32004
+DAEMON_BUSY = -32005
 
 MAX_SEARCH_K = 50
 MAX_CONTEXT_K = 50
 MAX_CONTEXT_CHARS = 20_000
 
+# Load shedding: how often, and for how long at most, to honour Retry-After.
+MAX_BUSY_RETRIES = 2
+MAX_RETRY_AFTER_S = 5.0
+
+
+def _retry_after_s(resp: httpx.Response) -> Optional[float]:
+    """Seconds from a 429/503 Retry-After header (None if absent or not delta-seconds)."""
+    if resp.status_code not in (429, 503):
+        return None
+    raw = resp.headers.get("Retry-After")
+    if raw is None:
+        return None
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        return None
+
 
 from codrag.mcp_tools import TOOLS
 
@@ -163,51 +181,57 @@ class MCPServer:
 
     async def _api_get(self, path: str) -> Any:
         """GET request to daemon API."""
-        client = await self._get_client()
-        if not path.startswith("/"):
-            path = "/" + path
-        url = f"{self.daemon_url}{path}"
-        logger.debug(f"GET {url}")
-        try:
-            resp = await client.get(url)
-            resp.raise_for_status()
-        except httpx.ConnectError:
-            raise DaemonUnavailableError(f"Cannot connect to CoDRAG daemon at {self.daemon_url}")
-        except httpx.HTTPStatusError as e:
-            try:
-                self._unwrap_envelope(e.response.json())
-            except DaemonError as de:
-                raise de
-            except Exception:
-                pass
-            raise DaemonError(f"Daemon returned {e.response.status_code}: {e.response.text}")
-
-        try:
-            payload = resp.json()
-        except Exception:
-            raise DaemonError(f"Daemon returned invalid JSON: {resp.text}")
-        return self._unwrap_envelope(payload)
+        return await self._api_request("GET", path)
 
     async def _api_post(self, path: str, payload: Dict[str, Any]) -> Any:
         """POST request to daemon API."""
+        return await self._api_request("POST", path, payload)
+
+    async def _api_request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Send a request to the daemon API and unwrap its envelope.
+
+        When the daemon sheds load (429/503 with Retry-After), waits as told
+        and retries a couple of times before giving up with DaemonBusyError,
+        so agents get a clear "busy, retry later" instead of a timeout.
+        """
         client = await self._get_client()
         if not path.startswith("/"):
             path = "/" + path
         url = f"{self.daemon_url}{path}"
-        logger.debug(f"POST {url} payload_keys={list(payload.keys())}")
-        try:
-            resp = await client.post(url, json=payload)
-            resp.raise_for_status()
-        except httpx.ConnectError:
-            raise DaemonUnavailableError(f"Cannot connect to CoDRAG daemon at {self.daemon_url}")
-        except httpx.HTTPStatusError as e:
+        if payload is None:
+            logger.debug(f"{method} {url}")
+        else:
+            logger.debug(f"{method} {url} payload_keys={list(payload.keys())}")
+
+        attempt = 0
+        while True:
             try:
-                self._unwrap_envelope(e.response.json())
-            except DaemonError as de:
-                raise de
-            except Exception:
-                pass
-            raise DaemonError(f"Daemon returned {e.response.status_code}: {e.response.text}")
+                resp = await client.request(method, url, json=payload)
+                resp.raise_for_status()
+                break
+            except httpx.ConnectError:
+                raise DaemonUnavailableError(f"Cannot connect to CoDRAG daemon at {self.daemon_url}")
+            except httpx.TimeoutException:
+                raise DaemonBusyError(f"CoDRAG daemon at {self.daemon_url} did not respond in time; retry later")
+            except httpx.HTTPStatusError as e:
+                retry_after = _retry_after_s(e.response)
+                if retry_after is not None:
+                    if attempt < MAX_BUSY_RETRIES and retry_after <= MAX_RETRY_AFTER_S:
+                        attempt += 1
+                        logger.debug(f"Daemon busy ({e.response.status_code}); retrying in {retry_after}s")
+                        await asyncio.sleep(retry_after)
+                        continue
+                    raise DaemonBusyError(
+                        f"CoDRAG daemon is busy ({e.response.status_code}); retry after {retry_after:g}s"
+                    )
+                try:
+                    self._unwrap_envelope(e.response.json())
+                except DaemonError as de:
+                    raise de
+                except Exception:
+                    pass
+                raise DaemonError(f"Daemon returned {e.response.status_code}: {e.response.text}")
 
         try:
             payload_out = resp.json()
@@ -588,6 +612,10 @@ class ProjectSelectionAmbiguousError(DaemonError):
     code = PROJECT_SELECTION_AMBIGUOUS
 
 
+class DaemonBusyError(DaemonError):
+    code = DAEMON_BUSY
+
+
 # =============================================================================
 # stdio Transport
 # =============================================================================
@@ -10,24 +10,54 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import asyncio
 import fnmatch
+import functools
 import hashlib
 import json
 import logging
+import os
+import re
+import socket
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple, TypeVar
 
+import httpx
 import requests
-from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi import FastAPI, Header, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
 from codrag import __version__
+from codrag.api.encoding import (
+    GZIP_LEVEL,
+    GZIP_MINIMUM_SIZE,
+    CompressionMiddleware,
+    EncodedResponseCache,
+    FastJSONResponse,
+)
 from codrag.api.envelope import ApiException, install_api_exception_handlers, ok
-from codrag.core import CodeIndex, OllamaEmbedder
+from codrag.api.leader import LeaderProxyMiddleware
+from codrag.api.limits import AdmissionController, EndpointLimiter, LimitExceeded
+from codrag.core import CodeIndex, Embedder, OllamaEmbedder, SearchResult
+from codrag.core.cache import IndexCache, MemoryBudget
+from codrag.core.events import (
+    EVENT_BUILD_PROGRESS,
+    EVENT_INDEX_SWAPPED,
+    EVENT_TYPES,
+    EVENT_WATCH_STATE,
+    EventBus,
+)
+from codrag.core.index import DEFAULT_RELOAD_INTERVAL_MS, BuildCancelled, IndexSnapshot
+from codrag.core.metrics import BUILD_DURATION_BUCKETS, REGISTRY, process_rss_bytes
+from codrag.core.progress import BuildProgress
 from codrag.core.project_registry import (
     Project,
     ProjectAlreadyExists,
@@ -37,20 +67,45 @@ from codrag.core.project_registry import (
 )
 from codrag.core.repo_policy import ensure_repo_policy
 from codrag.core.repo_profile import profile_repo
+from codrag.core.scheduler import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_WATCHER,
+    BuildJob,
+    BuildScheduler,
+)
+from codrag.core.timing import StageTimings
 from codrag.core.trace import TraceBuilder, TraceIndex
 from codrag.core.watcher import AutoRebuildWatcher
 from codrag.mcp_config import generate_mcp_configs
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+# Workers forward control routes to the leader through httpx; uvicorn logs them already.
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
+    _configure_worker_from_env()
+    yield
+    if _embedder is not None:
+        await _embedder.aclose()
+
 
 app = FastAPI(
     title="CoDRAG",
     description="Code Documentation and RAG - Multi-project semantic search platform",
     version=__version__,
+    lifespan=_lifespan,
+    default_response_class=FastJSONResponse,
 )
 install_api_exception_handlers(app)
 
+# Compress JSON bodies for clients that send Accept-Encoding: gzip. SSE
+# (/events, build/stream) and bodies that already carry a Content-Encoding
+# (cached search/context responses) pass through as-is.
+app.add_middleware(CompressionMiddleware, minimum_size=GZIP_MINIMUM_SIZE, compresslevel=GZIP_LEVEL)
+
 # CORS for dashboard
 app.add_middleware(
     CORSMiddleware,
@@ -60,6 +115,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# With --workers N, builds, the build scheduler, watchers and the event bus
+# live in one leader server that run_workers() starts in the parent process;
+# workers forward the routes that touch that state (_routes_to_leader) and
+# serve queries themselves. Registered last, so it is the outermost layer and
+# forwarded responses are not compressed twice.
+_leader_url: Optional[str] = None
+
+_LEADER_PROJECT_ROUTE = re.compile(
+    r"^/projects/[^/]+/(status|build|build/cancel|build/stream|trace/status|trace/build|watch/(start|stop|status))$"
+)
+
+
+def _routes_to_leader(method: str, path: str) -> bool:
+    """Whether a worker forwards `method path` to the leader."""
+    if path == "/events" or path.startswith("/api/code-index/"):
+        return True
+    if _LEADER_PROJECT_ROUTE.match(path):
+        return True
+    return method == "DELETE" and path.startswith("/projects/") and path.count("/") == 2
+
+
+app.add_middleware(LeaderProxyMiddleware, leader_url=lambda: _leader_url, routes=_routes_to_leader)
+
 # Global state
 _index: Optional[CodeIndex] = None
 _trace_index: Optional[TraceIndex] = None
@@ -73,16 +151,162 @@ _watcher: Optional[AutoRebuildWatcher] = None
 _SERVER_STARTED_AT = datetime.now(timezone.utc).isoformat()
 
 _registry: Optional[ProjectRegistry] = None
-_project_indexes: Dict[str, CodeIndex] = {}
-_project_trace_indexes: Dict[str, TraceIndex] = {}
+_embedder: Optional[OllamaEmbedder] = None
+_embedder_lock = threading.Lock()
+# Loaded indexes share one memory budget; cold projects are evicted LRU-first
+# and reloaded from disk on demand.
+_DEFAULT_INDEX_MEMORY_BUDGET_MB = 2048
+
+
+def _on_index_evicted(cache_name: str, project_id: str) -> None:
+    logger.info(f"Evicted {cache_name} for project {project_id} (memory budget)")
+    _INDEX_CACHE_EVICTIONS.inc(cache=cache_name)
+
+
+_index_memory_budget = MemoryBudget(_DEFAULT_INDEX_MEMORY_BUDGET_MB * 1024 * 1024, on_evict=_on_index_evicted)
+_project_indexes: IndexCache[CodeIndex] = IndexCache("index", _index_memory_budget)
+_project_trace_indexes: IndexCache[TraceIndex] = IndexCache("trace", _index_memory_budget)
 _project_build_lock = threading.Lock()
-_project_build_threads: Dict[str, threading.Thread] = {}
+_project_build_threads: Dict[str, BuildJob] = {}
 _project_last_build_result: Dict[str, Dict[str, Any]] = {}
 _project_last_build_error: Dict[str, str] = {}
+_project_build_progress: Dict[str, BuildProgress] = {}
+_project_build_cancel: Dict[str, threading.Event] = {}
 _project_trace_build_lock = threading.Lock()
-_project_trace_build_threads: Dict[str, threading.Thread] = {}
+_project_trace_build_threads: Dict[str, BuildJob] = {}
+# What the next trace build per project must re-parse: (changed paths, full).
+# Merged while a build is queued, since the scheduler keeps only the latest fn.
+_project_trace_pending: Dict[str, Tuple[Optional[Set[str]], bool]] = {}
+
+# Every index and trace build runs through this bounded, prioritised queue.
+_DEFAULT_MAX_CONCURRENT_BUILDS = 2
+_DEFAULT_MAX_INDEX_BUILDS = 1
+_build_scheduler = BuildScheduler(
+    max_workers=_DEFAULT_MAX_CONCURRENT_BUILDS,
+    kind_limits={"index": _DEFAULT_MAX_INDEX_BUILDS},
+)
 _project_watchers: Dict[str, AutoRebuildWatcher] = {}
 
+# Build/index/watcher transitions pushed to GET /events subscribers.
+_events = EventBus()
+_BUILD_PROGRESS_EVENT_INTERVAL_S = 0.25
+
+# Async request path: search/context await the embedder and run NumPy scoring
+# on a dedicated executor; each endpoint class has its own concurrency cap so
+# slow Ollama calls cannot starve cheap status requests on the threadpool.
+_DEFAULT_CPU_WORKERS = min(8, os.cpu_count() or 1)
+_DEFAULT_MAX_CONCURRENT_SEARCHES = 16
+_DEFAULT_MAX_CONCURRENT_LLM_PROBES = 4
+_cpu_workers = _DEFAULT_CPU_WORKERS
+_cpu_executor = ThreadPoolExecutor(max_workers=_cpu_workers, thread_name_prefix="codrag-cpu")
+
+# Admission control for search/context: beyond the in-flight limits, only a
+# short queue may wait (per project and globally), and only until the queue
+# deadline. Everything else is shed at once with 429/503 and Retry-After.
+_DEFAULT_MAX_CONCURRENT_SEARCHES_PER_PROJECT = 8
+_DEFAULT_SEARCH_QUEUE_SIZE = 32
+_DEFAULT_SEARCH_QUEUE_TIMEOUT_MS = 2000
+_search_admission = AdmissionController(
+    "search",
+    limit=_DEFAULT_MAX_CONCURRENT_SEARCHES,
+    per_key_limit=_DEFAULT_MAX_CONCURRENT_SEARCHES_PER_PROJECT,
+    max_waiting=_DEFAULT_SEARCH_QUEUE_SIZE,
+    per_key_max_waiting=_DEFAULT_SEARCH_QUEUE_SIZE // 2,
+    queue_timeout_s=_DEFAULT_SEARCH_QUEUE_TIMEOUT_MS / 1000.0,
+)
+_search_limiter = _search_admission.global_limiter
+
+# Encoded search/context bodies, keyed by project, index build and request,
+# so repeated queries against an unchanged index skip search and encoding.
+_response_cache = EncodedResponseCache()
+_llm_limiter = EndpointLimiter("llm", _DEFAULT_MAX_CONCURRENT_LLM_PROBES)
+
+_T = TypeVar("_T")
+
+
+async def _run_cpu(fn: Callable[..., _T], *args: Any, **kwargs: Any) -> _T:
+    """Run blocking/CPU-bound work on the sized executor, off the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_cpu_executor, functools.partial(fn, *args, **kwargs))
+
+
+# Startup warm-up of the most recently used projects (reported by /health).
+_DEFAULT_WARMUP_PROJECTS = 3
+_warmup_lock = threading.Lock()
+_warmup_thread: Optional[threading.Thread] = None
+_warmup_state: Dict[str, Any] = {"state": "disabled"}
+
+
+# Metrics (served at /metrics)
+_SEARCH_LATENCY = REGISTRY.histogram(
+    "codrag_search_duration_seconds", "End-to-end latency of project search requests."
+)
+_SEARCH_STAGE_LATENCY = REGISTRY.histogram(
+    "codrag_search_stage_duration_seconds", "Per-stage latency of search and context requests.", ["stage"]
+)
+_CONTEXT_LATENCY = REGISTRY.histogram(
+    "codrag_context_duration_seconds", "End-to-end latency of project context requests.", ["structured"]
+)
+_TRACE_QUERY_LATENCY = REGISTRY.histogram(
+    "codrag_trace_query_duration_seconds", "Latency of trace queries.", ["op"]
+)
+_BUILD_DURATION = REGISTRY.histogram(
+    "codrag_build_duration_seconds",
+    "Duration of index and trace builds.",
+    ["kind", "status"],
+    buckets=BUILD_DURATION_BUCKETS,
+)
+_BUILD_STAGE_DURATION = REGISTRY.histogram(
+    "codrag_build_stage_duration_seconds",
+    "Duration of index build stages.",
+    ["stage"],
+    buckets=BUILD_DURATION_BUCKETS,
+)
+_INDEX_CACHE_LOOKUPS = REGISTRY.counter(
+    "codrag_index_cache_lookups_total", "Lookups of loaded project indexes.", ["cache", "result"]
+)
+_INDEX_CACHE_EVICTIONS = REGISTRY.counter(
+    "codrag_index_cache_evictions_total", "Loaded indexes evicted to stay within the memory budget.", ["cache"]
+)
+_INDEX_CACHE_BYTES = REGISTRY.gauge(
+    "codrag_index_cache_bytes", "Approximate memory held by loaded indexes.", ["cache"]
+)
+_INDEX_CACHE_BUDGET_BYTES = REGISTRY.gauge(
+    "codrag_index_cache_budget_bytes", "Memory budget for loaded indexes (0 = unlimited)."
+)
+_INDEX_CHUNKS = REGISTRY.gauge("codrag_index_chunks", "Chunks in a loaded project index.", ["project"])
+_INDEX_BYTES = REGISTRY.gauge("codrag_index_bytes", "On-disk size of a project index.", ["project"])
+_TRACE_NODES = REGISTRY.gauge("codrag_trace_nodes", "Nodes in a loaded trace index.", ["project"])
+_TRACE_EDGES = REGISTRY.gauge("codrag_trace_edges", "Edges in a loaded trace index.", ["project"])
+_WATCHER_PENDING = REGISTRY.gauge(
+    "codrag_watcher_pending_paths", "Changed paths queued by a project watcher.", ["project"]
+)
+_WATCHER_STATE = REGISTRY.gauge(
+    "codrag_watcher_state", "Current watcher state (1 for the active state).", ["project", "state"]
+)
+_BUILDS_RUNNING = REGISTRY.gauge("codrag_builds_running", "Builds currently running.", ["kind"])
+_BUILDS_QUEUED = REGISTRY.gauge("codrag_builds_queued", "Builds waiting for a scheduler slot.", ["kind"])
+_REQUESTS_ACTIVE = REGISTRY.gauge(
+    "codrag_requests_active", "Requests holding a concurrency slot, by endpoint class.", ["endpoint_class"]
+)
+_REQUESTS_WAITING = REGISTRY.gauge(
+    "codrag_requests_waiting", "Requests waiting for a concurrency slot, by endpoint class.", ["endpoint_class"]
+)
+_RESPONSE_CACHE_LOOKUPS = REGISTRY.counter(
+    "codrag_response_cache_lookups_total", "Lookups of cached search/context responses.", ["endpoint", "result"]
+)
+_REQUESTS_REJECTED = REGISTRY.counter(
+    "codrag_requests_rejected_total",
+    "Requests shed by admission control.",
+    ["endpoint_class", "scope", "reason"],
+)
+_PROCESS_RSS = REGISTRY.gauge("codrag_process_resident_memory_bytes", "Resident memory of the daemon.")
+
+
+def _observe_stage_timings(timings: StageTimings) -> None:
+    for stage, ms in timings.spans().items():
+        _SEARCH_STAGE_LATENCY.observe(ms / 1000.0, stage=stage)
+
 
 _DEFAULT_UI_CONFIG: Dict[str, Any] = {
     "repo_root": "",
@@ -276,6 +500,7 @@ def _project_index_status(idx: CodeIndex, last_build_error: Optional[str] = None
         "embedding_model": st.get("model"),
         "last_build_at": st.get("built_at"),
         "last_error": last_error,
+        "generation": int(st.get("generation") or 0),
     }
 
 
@@ -512,6 +737,7 @@ def _start_trace_build(repo_root: str, include_globs: Optional[List[str]] = None
                 index_dir=index_dir,
                 include_globs=include_globs,
                 exclude_globs=exclude_globs,
+                workers=_config.get("trace_workers"),
             )
             builder.build()
             _trace_index = TraceIndex(index_dir)
@@ -532,6 +758,8 @@ def _start_trace_build(repo_root: str, include_globs: Optional[List[str]] = None
 class HealthResponse(BaseModel):
     status: str
     version: str
+    ready: bool = True
+    warmup: Optional[Dict[str, Any]] = None
 
 
 class BuildRequest(BaseModel):
@@ -610,17 +838,53 @@ class LLMModelTestRequest(BaseModel):
 # Index Helpers
 # =============================================================================
 
+def _get_embedder() -> OllamaEmbedder:
+    """
+    The daemon's one embedder. Every CodeIndex shares it, so its pooled async
+    client (one per event loop) outlives index eviction and is closed once,
+    at shutdown, instead of one pool leaking per index ever loaded.
+    """
+    global _embedder
+    with _embedder_lock:
+        if _embedder is None:
+            _embedder = OllamaEmbedder(
+                model=_config.get("model", "nomic-embed-text"),
+                base_url=_config.get("ollama_url", "http://localhost:11434"),
+            )
+        return _embedder
+
+
 def _get_index() -> CodeIndex:
     global _index
     if _index is None:
         index_dir = Path(_config.get("index_dir", "./codrag_data"))
-        ollama_url = _config.get("ollama_url", "http://localhost:11434")
-        model = _config.get("model", "nomic-embed-text")
-        embedder = OllamaEmbedder(model=model, base_url=ollama_url)
-        _index = CodeIndex(index_dir=index_dir, embedder=embedder)
+        _index = CodeIndex(index_dir=index_dir, embedder=_get_embedder(), reload_interval_ms=_index_reload_interval_ms())
     return _index
 
 
+def _index_reload_interval_ms() -> int:
+    return int(_config.get("index_reload_interval_ms", DEFAULT_RELOAD_INTERVAL_MS))
+
+
+def _index_reload_listener(project_id: str):
+    """on_reload callback: account for the new size and announce the swap."""
+
+    def on_reload(snap: IndexSnapshot) -> None:
+        _project_indexes.refresh(project_id)
+        _events.publish(
+            EVENT_INDEX_SWAPPED,
+            project_id,
+            {
+                "kind": "index",
+                "built_at": snap.manifest.get("built_at"),
+                "count": len(snap.documents or []),
+                "reloaded": True,
+            },
+        )
+
+    return on_reload
+
+
 def _is_building() -> bool:
     return _build_thread is not None and _build_thread.is_alive()
 
@@ -678,18 +942,128 @@ def _build_worker(
 def _get_project_index(project: Project) -> CodeIndex:
     idx = _project_indexes.get(project.id)
     idx_dir = project_index_dir(project)
-    if idx is None or Path(idx.index_dir).resolve() != Path(idx_dir).resolve():
-        ollama_url = _config.get("ollama_url", "http://localhost:11434")
-        model = _config.get("model", "nomic-embed-text")
-        embedder = OllamaEmbedder(model=model, base_url=ollama_url)
-        idx = CodeIndex(index_dir=idx_dir, embedder=embedder)
+    if idx is not None and Path(idx.index_dir).resolve() == Path(idx_dir).resolve():
+        _INDEX_CACHE_LOOKUPS.inc(cache="index", result="hit")
+    else:
+        _INDEX_CACHE_LOOKUPS.inc(cache="index", result="miss")
+        idx = CodeIndex(
+            index_dir=idx_dir,
+            embedder=_get_embedder(),
+            reload_interval_ms=_index_reload_interval_ms(),
+            on_reload=_index_reload_listener(project.id),
+        )
         _project_indexes[project.id] = idx
     return idx
 
 
+def _start_warmup(max_projects: int) -> Optional[threading.Thread]:
+    """Preload the `max_projects` most recently used projects in the background."""
+    global _warmup_thread, _warmup_state
+    with _warmup_lock:
+        if max_projects <= 0:
+            _warmup_state = {"state": "disabled"}
+            return None
+        if _warmup_thread is not None and _warmup_thread.is_alive():
+            return _warmup_thread
+        _warmup_state = {
+            "state": "warming",
+            "projects_total": 0,
+            "projects_warmed": 0,
+            "embedder": None,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "finished_at": None,
+            "errors": [],
+        }
+        _warmup_thread = threading.Thread(
+            target=_warmup_worker, args=(int(max_projects),), name="codrag-warmup", daemon=True
+        )
+        thread = _warmup_thread
+    thread.start()
+    return thread
+
+
+def _warmup_update(**fields: Any) -> None:
+    with _warmup_lock:
+        _warmup_state.update(fields)
+
+
+def _warmup_error(project_id: Optional[str], error: Exception) -> None:
+    with _warmup_lock:
+        _warmup_state["errors"].append({"project_id": project_id, "error": str(error)})
+
+
+def _warmup_worker(max_projects: int) -> None:
+    try:
+        projects = _get_registry().list_projects()[:max_projects]
+    except Exception as e:
+        logger.warning(f"Warm-up could not list projects: {e}")
+        _warmup_error(None, e)
+        projects = []
+    _warmup_update(projects_total=len(projects))
+
+    embedder: Optional[Embedder] = None
+    for i, proj in enumerate(projects, start=1):
+        try:
+            idx = _get_project_index(proj)
+            if idx.warm().get("loaded") and embedder is None:
+                embedder = idx.embedder
+            trace_cfg = (proj.config or {}).get("trace") if isinstance(proj.config, dict) else None
+            if bool((trace_cfg or {}).get("enabled", False)):
+                _get_project_trace_index(proj)
+        except Exception as e:
+            logger.warning(f"Warm-up of project {proj.id} failed: {e}")
+            _warmup_error(proj.id, e)
+        _warmup_update(projects_warmed=i)
+
+    # One tiny request makes Ollama load the model; it then stays resident
+    # for the embedder's keep_alive.
+    if embedder is None:
+        embedder = _get_embedder()
+    try:
+        embedder.embed("warmup")
+        _warmup_update(embedder="ready")
+    except Exception as e:
+        logger.warning(f"Warm-up embed request failed: {e}")
+        _warmup_error(None, e)
+        _warmup_update(embedder="unavailable")
+
+    _warmup_update(state="ready", finished_at=datetime.now(timezone.utc).isoformat())
+    logger.info(f"Warm-up finished ({len(projects)} project(s))")
+
+
+def _warmup_status() -> Dict[str, Any]:
+    with _warmup_lock:
+        out = dict(_warmup_state)
+        if "errors" in out:
+            out["errors"] = list(out["errors"])
+        return out
+
+
 def _is_project_building(project_id: str) -> bool:
-    t = _project_build_threads.get(project_id)
-    return t is not None and t.is_alive()
+    """True while an index build for the project is queued or running, here or in another process."""
+    job = _project_build_threads.get(project_id)
+    if job is not None and job.is_alive():
+        return True
+    idx = _project_indexes.peek(project_id)
+    return idx is not None and idx.is_build_locked()
+
+
+def _build_progress_publisher(project_id: str):
+    """BuildProgress listener that publishes throttled build.progress events."""
+    last = {"at": 0.0, "key": None}
+    lock = threading.Lock()
+
+    def publish(snap: Dict[str, Any]) -> None:
+        key = (snap.get("state"), snap.get("phase"))
+        now = time.monotonic()
+        with lock:
+            if key == last["key"] and now - last["at"] < _BUILD_PROGRESS_EVENT_INTERVAL_S:
+                return
+            last["key"] = key
+            last["at"] = now
+        _events.publish(EVENT_BUILD_PROGRESS, project_id, {"kind": "index", **snap})
+
+    return publish
 
 
 def _start_project_build(
@@ -698,18 +1072,36 @@ def _start_project_build(
     include_globs: Optional[List[str]],
     exclude_globs: Optional[List[str]],
     max_file_bytes: int,
+    priority: int = PRIORITY_INTERACTIVE,
 ) -> bool:
+    """
+    Queue an index build. A request for a project whose build is still queued
+    coalesces into it; returns False if the project's build is already running,
+    including in another process sharing the index (daemon worker, CLI, MCP).
+    """
+    idx = _get_project_index(project)
     with _project_build_lock:
-        if _is_project_building(project.id):
+        job = _project_build_threads.get(project.id)
+        if (job is None or not job.is_alive()) and idx.is_build_locked():
             return False
+        progress = _project_build_progress.get(project.id)
+        cancel_event = _project_build_cancel.get(project.id)
+        if job is None or not job.is_alive() or progress is None or cancel_event is None:
+            progress = BuildProgress()
+            progress.add_listener(_build_progress_publisher(project.id))
+            cancel_event = threading.Event()
+
+        def run(progress: BuildProgress = progress, cancel_event: threading.Event = cancel_event) -> None:
+            _project_build_worker(
+                project, roots, include_globs, exclude_globs, max_file_bytes, progress, cancel_event
+            )
 
-        t = threading.Thread(
-            target=_project_build_worker,
-            args=(project, roots, include_globs, exclude_globs, max_file_bytes),
-            daemon=True,
-        )
-        _project_build_threads[project.id] = t
-        t.start()
+        job = _build_scheduler.submit(("index", project.id), run, priority=priority)
+        if job is None:
+            return False
+        _project_build_threads[project.id] = job
+        _project_build_progress[project.id] = progress
+        _project_build_cancel[project.id] = cancel_event
         return True
 
 
@@ -719,7 +1111,12 @@ def _project_build_worker(
     include_globs: Optional[List[str]],
     exclude_globs: Optional[List[str]],
     max_file_bytes: int,
+    progress: Optional[BuildProgress] = None,
+    cancel_event: Optional[threading.Event] = None,
 ):
+    started = time.perf_counter()
+    timings = StageTimings()
+    status = "error"
     try:
         idx = _get_project_index(project)
         meta = idx.build(
@@ -728,31 +1125,56 @@ def _project_build_worker(
             include_globs=include_globs,
             exclude_globs=exclude_globs,
             max_file_bytes=max_file_bytes,
+            timings=timings,
+            progress=progress,
+            cancel_event=cancel_event,
         )
         _project_last_build_result[project.id] = meta
         _project_last_build_error.pop(project.id, None)
+        _project_indexes.refresh(project.id)
+        status = "ok"
+        if progress is not None:
+            progress.finish("succeeded")
+        _events.publish(
+            EVENT_INDEX_SWAPPED,
+            project.id,
+            {"kind": "index", "built_at": meta.get("built_at"), "count": meta.get("count")},
+        )
+    except BuildCancelled:
+        logger.info(f"Build cancelled for project {project.id}")
+        status = "cancelled"
+        if progress is not None:
+            progress.finish("cancelled")
     except Exception as e:
         logger.exception("Build failed")
         _project_last_build_error[project.id] = str(e)
+        if progress is not None:
+            progress.finish("failed", error=str(e))
     finally:
-        with _project_build_lock:
-            cur = threading.current_thread()
-            if _project_build_threads.get(project.id) is cur:
-                _project_build_threads.pop(project.id, None)
+        _BUILD_DURATION.observe(time.perf_counter() - started, kind="index", status=status)
+        for stage, ms in timings.spans().items():
+            _BUILD_STAGE_DURATION.observe(ms / 1000.0, stage=stage)
 
 
 def _get_project_trace_index(project: Project) -> TraceIndex:
     idx = _project_trace_indexes.get(project.id)
     idx_dir = project_index_dir(project)
-    if idx is None or Path(idx.index_dir).resolve() != Path(idx_dir).resolve():
+    if idx is not None and Path(idx.index_dir).resolve() == Path(idx_dir).resolve():
+        _INDEX_CACHE_LOOKUPS.inc(cache="trace", result="hit")
+    else:
+        _INDEX_CACHE_LOOKUPS.inc(cache="trace", result="miss")
         idx = TraceIndex(idx_dir)
+        # Load before caching so the entry's footprint counts against the budget.
+        if idx.exists():
+            idx.load()
         _project_trace_indexes[project.id] = idx
     return idx
 
 
 def _is_project_trace_building(project_id: str) -> bool:
-    t = _project_trace_build_threads.get(project_id)
-    return t is not None and t.is_alive()
+    """True while a trace build for the project is queued or running."""
+    job = _project_trace_build_threads.get(project_id)
+    return job is not None and job.is_alive()
 
 
 def _start_project_trace_build(
@@ -760,18 +1182,31 @@ def _start_project_trace_build(
     include_globs: Optional[List[str]] = None,
     exclude_globs: Optional[List[str]] = None,
     max_file_bytes: int = 500_000,
+    priority: int = PRIORITY_INTERACTIVE,
+    changed_paths: Optional[Set[str]] = None,
+    full: bool = False,
 ) -> bool:
-    with _project_trace_build_lock:
-        if _is_project_trace_building(project.id):
-            return False
+    """
+    Queue a trace build; coalesces like _start_project_build.
 
-        t = threading.Thread(
-            target=_project_trace_build_worker,
-            args=(project, include_globs, exclude_globs, max_file_bytes),
-            daemon=True,
+    `changed_paths` (watcher builds) are re-parsed for certain; without them
+    the builder falls back to stat/hash checks. `full` ignores the file cache.
+    """
+    with _project_trace_build_lock:
+        pending_paths, pending_full = _project_trace_pending.get(project.id, (set(), False))
+        if pending_paths is None or changed_paths is None:
+            merged_paths: Optional[Set[str]] = None
+        else:
+            merged_paths = pending_paths | set(changed_paths)
+        _project_trace_pending[project.id] = (merged_paths, pending_full or full)
+        job = _build_scheduler.submit(
+            ("trace", project.id),
+            lambda: _project_trace_build_worker(project, include_globs, exclude_globs, max_file_bytes),
+            priority=priority,
         )
-        _project_trace_build_threads[project.id] = t
-        t.start()
+        if job is None:
+            return False
+        _project_trace_build_threads[project.id] = job
         return True
 
 
@@ -781,6 +1216,10 @@ def _project_trace_build_worker(
     exclude_globs: Optional[List[str]],
     max_file_bytes: int,
 ):
+    started = time.perf_counter()
+    status = "error"
+    with _project_trace_build_lock:
+        changed_paths, full = _project_trace_pending.pop(project.id, (None, False))
     try:
         idx_dir = project_index_dir(project)
         builder = TraceBuilder(
@@ -789,19 +1228,25 @@ def _project_trace_build_worker(
             include_globs=include_globs,
             exclude_globs=exclude_globs,
             max_file_bytes=max_file_bytes,
+            workers=_config.get("trace_workers"),
+            write_jsonl=_project_trace_jsonl(project),
         )
-        builder.build()
+        builder.build(changed_paths=changed_paths, full=full)
 
         trace_idx = TraceIndex(idx_dir)
         trace_idx.load()
         _project_trace_indexes[project.id] = trace_idx
+        status = "ok"
+        trace_status = trace_idx.status()
+        _events.publish(
+            EVENT_INDEX_SWAPPED,
+            project.id,
+            {"kind": "trace", "built_at": trace_status.get("last_build_at"), "counts": trace_status.get("counts")},
+        )
     except Exception as e:
         logger.error(f"Trace build failed: {e}")
     finally:
-        with _project_trace_build_lock:
-            cur = threading.current_thread()
-            if _project_trace_build_threads.get(project.id) is cur:
-                _project_trace_build_threads.pop(project.id, None)
+        _BUILD_DURATION.observe(time.perf_counter() - started, kind="trace", status=status)
 
 
 # =============================================================================
@@ -810,8 +1255,131 @@ def _project_trace_build_worker(
 
 @app.get("/health", response_model=HealthResponse)
 def health() -> HealthResponse:
-    """Health check endpoint."""
-    return HealthResponse(status="ok", version=__version__)
+    """Health check endpoint; `ready` is false while start-up warm-up runs."""
+    warmup = _warmup_status()
+    return HealthResponse(
+        status="ok",
+        version=__version__,
+        ready=warmup.get("state") != "warming",
+        warmup=warmup,
+    )
+
+
+def _dir_size_bytes(path: Path) -> int:
+    total = 0
+    try:
+        for p in path.iterdir():
+            if p.is_file():
+                total += p.stat().st_size
+    except OSError:
+        pass
+    return total
+
+
+def _collect_scrape_gauges() -> None:
+    """Refresh gauges that reflect current state rather than accumulated events."""
+    for g in (_INDEX_CHUNKS, _INDEX_BYTES, _TRACE_NODES, _TRACE_EDGES, _WATCHER_PENDING, _WATCHER_STATE):
+        g.clear()
+
+    for project_id, idx in list(_project_indexes.items()):
+        st = idx.stats()
+        if not st.get("loaded"):
+            continue
+        _INDEX_CHUNKS.set(int(st.get("total_documents") or 0), project=project_id)
+        _INDEX_BYTES.set(_dir_size_bytes(Path(idx.index_dir)), project=project_id)
+
+    for project_id, trace_idx in list(_project_trace_indexes.items()):
+        if not trace_idx.is_loaded():
+            continue
+        counts = trace_idx.status().get("counts") or {}
+        _TRACE_NODES.set(int(counts.get("nodes") or 0), project=project_id)
+        _TRACE_EDGES.set(int(counts.get("edges") or 0), project=project_id)
+
+    for project_id, watcher in list(_project_watchers.items()):
+        st = watcher.status()
+        _WATCHER_PENDING.set(int(st.get("pending_paths_count") or 0), project=project_id)
+        _WATCHER_STATE.set(1, project=project_id, state=str(st.get("state") or "unknown"))
+
+    for kind, jobs, lock in (
+        ("index", _project_build_threads, _project_build_lock),
+        ("trace", _project_trace_build_threads, _project_trace_build_lock),
+    ):
+        with lock:
+            states = [j.state for j in jobs.values() if j.is_alive()]
+        _BUILDS_RUNNING.set(states.count("running"), kind=kind)
+        _BUILDS_QUEUED.set(states.count("queued"), kind=kind)
+
+    for limiter in (_search_limiter, _llm_limiter):
+        st = limiter.stats()
+        _REQUESTS_ACTIVE.set(st["active"], endpoint_class=limiter.name)
+        _REQUESTS_WAITING.set(st["waiting"], endpoint_class=limiter.name)
+
+    usage = _index_memory_budget.usage()
+    _INDEX_CACHE_BUDGET_BYTES.set(usage["budget_bytes"])
+    for cache_name, cache_usage in usage["caches"].items():
+        _INDEX_CACHE_BYTES.set(cache_usage["used_bytes"], cache=cache_name)
+
+    rss = process_rss_bytes()
+    if rss is not None:
+        _PROCESS_RSS.set(rss)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    """Prometheus text-format metrics."""
+    _collect_scrape_gauges()
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+_EVENTS_HEARTBEAT_S = 15.0
+
+
+@app.get("/events")
+def stream_events(
+    project_id: Optional[str] = None,
+    types: Optional[str] = None,
+    max_events: Optional[int] = Query(None, ge=1),
+    last_event_id: Optional[str] = Header(None),
+) -> StreamingResponse:
+    """Server-Sent Events stream of build, index and watcher transitions."""
+    wanted = [t.strip() for t in str(types or "").split(",") if t.strip()]
+    unknown = [t for t in wanted if t not in EVENT_TYPES]
+    if unknown:
+        raise ApiException(
+            status_code=400,
+            code="VALIDATION_ERROR",
+            message=f"Unknown event type(s): {', '.join(unknown)}",
+            hint=f"Use one or more of: {', '.join(EVENT_TYPES)}",
+        )
+    if project_id:
+        _require_project(project_id)
+
+    try:
+        resume_from = int(last_event_id) if last_event_id else None
+    except ValueError:
+        resume_from = None
+
+    sub = _events.subscribe(types=wanted or None, project_id=project_id or None, last_event_id=resume_from)
+
+    async def stream():
+        sent = 0
+        try:
+            yield ": connected\n\n"
+            while max_events is None or sent < max_events:
+                event = await sub.aget(timeout=_EVENTS_HEARTBEAT_S)
+                if event is None:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"id: {event.id}\nevent: {event.type}\ndata: {json.dumps(event.to_dict())}\n\n"
+                sent += 1
+        finally:
+            sub.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
 
 
 @app.get("/")
@@ -926,17 +1494,35 @@ def delete_project(project_id: str, purge: bool = False) -> Dict[str, Any]:
         )
 
     _project_indexes.pop(project_id, None)
+    _response_cache.invalidate((project_id,))
     _project_trace_indexes.pop(project_id, None)
     with _project_build_lock:
+        _build_scheduler.cancel_queued(("index", project_id))
         _project_build_threads.pop(project_id, None)
         _project_last_build_result.pop(project_id, None)
         _project_last_build_error.pop(project_id, None)
+        _project_build_progress.pop(project_id, None)
+        cancel_event = _project_build_cancel.pop(project_id, None)
+        if cancel_event is not None:
+            cancel_event.set()
     with _project_trace_build_lock:
+        _build_scheduler.cancel_queued(("trace", project_id))
         _project_trace_build_threads.pop(project_id, None)
 
     return ok({"removed": True, "purged": bool(purge)})
 
 
+def _project_memory_status(project_id: str) -> Dict[str, Any]:
+    usage = _index_memory_budget.usage()
+    return {
+        "budget_bytes": usage["budget_bytes"],
+        "used_bytes": usage["used_bytes"],
+        "evictions": usage["evictions"],
+        "project_bytes": (_project_indexes.footprint(project_id) or 0)
+        + (_project_trace_indexes.footprint(project_id) or 0),
+    }
+
+
 @app.get("/projects/{project_id}/status")
 def get_project_status(project_id: str) -> Dict[str, Any]:
     proj = _require_project(project_id)
@@ -947,6 +1533,12 @@ def get_project_status(project_id: str) -> Dict[str, Any]:
         "building": _is_project_building(proj.id),
         "stale": bool(watch.get("stale", False)),
         "stale_since": watch.get("stale_since"),
+        "progress": _project_build_progress_snapshot(proj.id),
+        "queue": {
+            "index": _build_scheduler.describe(("index", proj.id)),
+            "trace": _build_scheduler.describe(("trace", proj.id)),
+        },
+        "memory": _project_memory_status(proj.id),
         "index": _project_index_status(idx, _project_last_build_error.get(proj.id)),
         "trace": _project_trace_status(proj),
         "watch": watch,
@@ -954,6 +1546,28 @@ def get_project_status(project_id: str) -> Dict[str, Any]:
     return ok(data)
 
 
+def _trigger_watcher_builds(proj: Project, paths: List[str]) -> bool:
+    """
+    Queue the builds for a watcher change: the index at watcher priority and
+    the trace graph, a derived refresh, at background priority, so manual
+    builds of any project and other watchers' index builds go first.
+    """
+    include_globs, exclude_globs, max_file_bytes = _project_build_settings(proj)
+    started = _start_project_build(
+        proj, None, include_globs, exclude_globs, max_file_bytes, priority=PRIORITY_WATCHER
+    )
+    if started and _project_trace_enabled(proj):
+        _start_project_trace_build(
+            proj,
+            include_globs,
+            exclude_globs,
+            max_file_bytes=max_file_bytes,
+            priority=PRIORITY_BACKGROUND,
+            changed_paths=set(paths),
+        )
+    return started
+
+
 @app.post("/projects/{project_id}/watch/start")
 def start_project_watch(
     project_id: str,
@@ -970,11 +1584,14 @@ def start_project_watch(
         existing.stop()
     
     def trigger_build(paths: List[str]) -> bool:
-        return _start_project_build(proj) is not None
+        return _trigger_watcher_builds(proj, paths)
     
     def is_building() -> bool:
         return _is_project_building(proj.id)
-    
+
+    def on_state_change(status: Dict[str, Any]) -> None:
+        _events.publish(EVENT_WATCH_STATE, proj.id, status)
+
     watcher = AutoRebuildWatcher(
         repo_root=Path(proj.path),
         index_dir=idx.index_dir,
@@ -982,6 +1599,7 @@ def start_project_watch(
         is_building=is_building,
         debounce_ms=debounce_ms,
         min_rebuild_gap_ms=min_gap_ms,
+        on_state_change=on_state_change,
     )
     watcher.start()
     _project_watchers[proj.id] = watcher
@@ -1181,10 +1799,8 @@ def get_project_roots(project_id: str) -> Dict[str, Any]:
     return ok({"roots": roots})
 
 
-@app.post("/projects/{project_id}/build")
-def build_project(project_id: str, full: bool = False) -> Dict[str, Any]:
-    proj = _require_project(project_id)
-
+def _project_build_settings(proj: Project) -> tuple[Optional[List[str]], Optional[List[str]], int]:
+    """(include_globs, exclude_globs, max_file_bytes) for a project's index build."""
     cfg = proj.config or {}
     include_raw = cfg.get("include_globs") if isinstance(cfg, dict) else None
     exclude_raw = cfg.get("exclude_globs") if isinstance(cfg, dict) else None
@@ -1197,24 +1813,129 @@ def build_project(project_id: str, full: bool = False) -> Dict[str, Any]:
             exclude_globs = []
         if "**/.codrag/**" not in exclude_globs:
             exclude_globs.append("**/.codrag/**")
+    return include_globs, exclude_globs, max_file_bytes
+
+
+def _project_trace_enabled(proj: Project) -> bool:
+    cfg = proj.config or {}
+    trace_cfg = cfg.get("trace") if isinstance(cfg, dict) else None
+    return bool((trace_cfg or {}).get("enabled", False))
+
+
+def _project_trace_importance_weight(proj: Project) -> float:
+    """Weight of the trace file-importance prior in search scores (0 = off, the default)."""
+    cfg = proj.config or {}
+    trace_cfg = cfg.get("trace") if isinstance(cfg, dict) else None
+    try:
+        return max(0.0, float((trace_cfg or {}).get("importance_weight", 0.0) or 0.0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _trace_prior_weight(proj: Project) -> float:
+    return _project_trace_importance_weight(proj) if _project_trace_enabled(proj) else 0.0
+
+
+def _sync_trace_prior(proj: Project, idx: CodeIndex, weight: float) -> None:
+    """Give the project's index the trace importance prior at `weight` (> 0)."""
+    trace_idx = _get_project_trace_index(proj)
+    if trace_idx is None or not trace_idx.exists():
+        idx.set_file_prior(None)
+        return
+    key = (trace_idx.status().get("last_build_at"), weight)
+    if key != idx.file_prior_key:
+        idx.set_file_prior(trace_idx.file_importance(), weight, key=key)
+
+
+def _project_trace_jsonl(proj: Project) -> bool:
+    """Whether trace builds also export trace_nodes/edges.jsonl (default on)."""
+    cfg = proj.config or {}
+    trace_cfg = cfg.get("trace") if isinstance(cfg, dict) else None
+    return bool((trace_cfg or {}).get("export_jsonl", True))
+
+
+@app.post("/projects/{project_id}/build")
+def build_project(project_id: str, full: bool = False) -> Dict[str, Any]:
+    proj = _require_project(project_id)
+
+    include_globs, exclude_globs, max_file_bytes = _project_build_settings(proj)
 
     started = _start_project_build(proj, None, include_globs, exclude_globs, max_file_bytes)
     if not started:
         raise ApiException(status_code=409, code="BUILD_ALREADY_RUNNING", message="Build already running")
 
-    trace_cfg = cfg.get("trace") if isinstance(cfg, dict) else None
-    if bool((trace_cfg or {}).get("enabled", False)):
-        _start_project_trace_build(proj, include_globs, exclude_globs, max_file_bytes=max_file_bytes)
-    return ok({"started": True, "building": True, "build_id": None})
+    if _project_trace_enabled(proj):
+        _start_project_trace_build(proj, include_globs, exclude_globs, max_file_bytes=max_file_bytes, full=full)
+    return ok({
+        "started": True,
+        "building": True,
+        "build_id": None,
+        "queue": _build_scheduler.describe(("index", proj.id)),
+    })
 
 
-@app.post("/projects/{project_id}/search")
-def search_project(project_id: str, req: SearchRequest) -> Dict[str, Any]:
+@app.post("/projects/{project_id}/build/cancel")
+def cancel_project_build(project_id: str) -> Dict[str, Any]:
+    """Ask the running build to stop; embedded chunks stay checkpointed for the next build."""
     proj = _require_project(project_id)
-    if not req.query.strip():
+    with _project_build_lock:
+        cancel_event = _project_build_cancel.get(proj.id)
+        if cancel_event is None or not _is_project_building(proj.id):
+            raise ApiException(
+                status_code=409,
+                code="BUILD_NOT_RUNNING",
+                message="No build is running for this project",
+                hint="Start a build first.",
+            )
+        cancel_event.set()
+        if _build_scheduler.cancel_queued(("index", proj.id)):
+            progress = _project_build_progress.get(proj.id)
+            if progress is not None:
+                progress.finish("cancelled")
+    return ok({"cancelling": True})
+
+
+def _project_build_progress_snapshot(project_id: str) -> Optional[Dict[str, Any]]:
+    progress = _project_build_progress.get(project_id)
+    return progress.snapshot() if progress is not None else None
+
+
+@app.get("/projects/{project_id}/build/stream")
+def stream_project_build(
+    project_id: str,
+    interval_ms: int = Query(500, ge=50, le=10000),
+) -> StreamingResponse:
+    """Stream build progress as Server-Sent Events until the build finishes."""
+    proj = _require_project(project_id)
+    interval_s = interval_ms / 1000.0
+
+    # Async like /events: a sync generator would hold a threadpool thread
+    # (time.sleep) for as long as each client watches a build.
+    async def events():
+        while True:
+            snap = _project_build_progress_snapshot(proj.id)
+            yield f"event: progress\ndata: {json.dumps(snap)}\n\n"
+            if snap is None or snap.get("state") not in ("queued", "running"):
+                return
+            await asyncio.sleep(interval_s)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+def _debug_flags(debug: Optional[str]) -> set[str]:
+    return {p.strip().lower() for p in str(debug or "").split(",") if p.strip()}
+
+
+async def _require_loaded_index(project_id: str, query: str) -> CodeIndex:
+    proj = _require_project(project_id)  # served from the registry's in-process cache
+    if not query.strip():
         raise ApiException(status_code=400, code="VALIDATION_ERROR", message="query is required")
 
-    idx = _get_project_index(proj)
+    idx = await _run_cpu(_get_project_index, proj)
     if not idx.is_loaded():
         raise ApiException(
             status_code=409,
@@ -1222,8 +1943,95 @@ def search_project(project_id: str, req: SearchRequest) -> Dict[str, Any]:
             message="Index has not been built yet",
             hint="Run a build first.",
         )
+    weight = _trace_prior_weight(proj)
+    if weight > 0:
+        await _run_cpu(_sync_trace_prior, proj, idx, weight)
+    else:
+        # The common case (prior off) stays on the event loop: no executor hop.
+        idx.set_file_prior(None)
+    return idx
 
-    results = idx.search(req.query, k=req.k, min_score=req.min_score)
+
+@asynccontextmanager
+async def _admit_search(project_id: str) -> AsyncIterator[None]:
+    """Hold a search slot for `project_id`, or shed the request with 429/503."""
+    try:
+        async with _search_admission.admit(project_id):
+            yield
+    except LimitExceeded as e:
+        _REQUESTS_REJECTED.inc(endpoint_class=_search_admission.name, scope=e.scope, reason=e.reason)
+        details = {"scope": e.scope, "reason": e.reason, "retry_after_s": e.retry_after_s}
+        headers = {"Retry-After": str(e.retry_after_s)}
+        if e.scope == "project":
+            raise ApiException(
+                status_code=429,
+                code="TOO_MANY_REQUESTS",
+                message="Too many concurrent search requests for this project",
+                hint=f"Retry after {e.retry_after_s}s.",
+                details=details,
+                headers=headers,
+            ) from None
+        raise ApiException(
+            status_code=503,
+            code="SERVER_OVERLOADED",
+            message="Server is overloaded",
+            hint=f"Retry after {e.retry_after_s}s.",
+            details=details,
+            headers=headers,
+        ) from None
+
+
+async def _embed_query(idx: CodeIndex, query: str, timings: StageTimings) -> List[float]:
+    with timings.span("embedding"):
+        return (await idx.embedder.aembed(query)).vector
+
+
+def _response_cache_key(endpoint: str, project_id: str, idx: CodeIndex, req: BaseModel) -> Optional[tuple]:
+    built_at = idx.snapshot().manifest.get("built_at")
+    if not built_at:
+        return None
+    return (project_id, str(built_at), idx.file_prior_key, endpoint, tuple(sorted(req.model_dump().items())))
+
+
+def _cached_response(endpoint: str, key: Optional[tuple], request: Request) -> Optional[Response]:
+    if key is None:
+        return None
+    entry = _response_cache.get(key)
+    _RESPONSE_CACHE_LOOKUPS.inc(endpoint=endpoint, result="hit" if entry is not None else "miss")
+    if entry is None:
+        return None
+    return entry.response(request.headers.get("accept-encoding"))
+
+
+def _encoded_response(key: Optional[tuple], data: Dict[str, Any], request: Request) -> Response:
+    """Encode the envelope once; keep it for identical requests when `key` is set."""
+    if key is None:
+        return FastJSONResponse(ok(data))
+    return _response_cache.put(key, ok(data)).response(request.headers.get("accept-encoding"))
+
+
+@app.post("/projects/{project_id}/search")
+async def search_project(
+    project_id: str, req: SearchRequest, request: Request, debug: Optional[str] = None
+) -> Response:
+    idx = await _require_loaded_index(project_id, req.query)
+
+    started = time.perf_counter()
+    want_timings = "timings" in _debug_flags(debug)
+    cache_key = None if want_timings else _response_cache_key("search", project_id, idx, req)
+    cached = _cached_response("search", cache_key, request)
+    if cached is not None:
+        _SEARCH_LATENCY.observe(time.perf_counter() - started)
+        return cached
+
+    timings = StageTimings()
+    async with _admit_search(project_id):
+        qv = await _embed_query(idx, req.query, timings)
+        results = await _run_cpu(
+            idx.search, req.query, k=req.k, min_score=req.min_score, timings=timings, query_vector=qv
+        )
+    _SEARCH_LATENCY.observe(time.perf_counter() - started)
+    _observe_stage_timings(timings)
     out: List[Dict[str, Any]] = []
     for r in results:
         d = r.doc
@@ -1240,36 +2048,66 @@ def search_project(project_id: str, req: SearchRequest) -> Dict[str, Any]:
                 "score": float(r.score),
             }
         )
-    return ok({"results": out})
 
+    data: Dict[str, Any] = {"results": out}
+    if want_timings:
+        data["meta"] = {"timings": timings.as_dict()}
+    return _encoded_response(cache_key, data, request)
 
-@app.post("/projects/{project_id}/context")
-def context_project(project_id: str, req: ContextRequest) -> Dict[str, Any]:
-    proj = _require_project(project_id)
-    if not req.query.strip():
-        raise ApiException(status_code=400, code="VALIDATION_ERROR", message="query is required")
 
-    idx = _get_project_index(proj)
-    if not idx.is_loaded():
-        raise ApiException(
-            status_code=409,
-            code="INDEX_NOT_BUILT",
-            message="Index has not been built yet",
-            hint="Run a build first.",
-        )
+@app.post("/projects/{project_id}/context")
+async def context_project(
+    project_id: str, req: ContextRequest, request: Request, debug: Optional[str] = None
+) -> Response:
+    idx = await _require_loaded_index(project_id, req.query)
+
+    started = time.perf_counter()
+    structured = "true" if req.structured else "false"
+    want_timings = "timings" in _debug_flags(debug)
+    cache_key = None if want_timings else _response_cache_key("context", project_id, idx, req)
+    cached = _cached_response("context", cache_key, request)
+    if cached is not None:
+        _CONTEXT_LATENCY.observe(time.perf_counter() - started, structured=structured)
+        return cached
+
+    timings = StageTimings()
 
     if not req.structured:
-        ctx = idx.get_context(
-            req.query,
-            k=req.k,
-            max_chars=req.max_chars,
-            include_sources=req.include_sources,
-            include_scores=req.include_scores,
-            min_score=req.min_score,
+        async with _admit_search(project_id):
+            qv = await _embed_query(idx, req.query, timings)
+            ctx = await _run_cpu(
+                idx.get_context,
+                req.query,
+                k=req.k,
+                max_chars=req.max_chars,
+                include_sources=req.include_sources,
+                include_scores=req.include_scores,
+                min_score=req.min_score,
+                timings=timings,
+                query_vector=qv,
+            )
+        _CONTEXT_LATENCY.observe(time.perf_counter() - started, structured="false")
+        _observe_stage_timings(timings)
+        data: Dict[str, Any] = {"context": ctx}
+        if want_timings:
+            data["meta"] = {"timings": timings.as_dict()}
+        return _encoded_response(cache_key, data, request)
+
+    async with _admit_search(project_id):
+        qv = await _embed_query(idx, req.query, timings)
+        results = await _run_cpu(
+            idx.search, req.query, k=req.k, min_score=req.min_score, timings=timings, query_vector=qv
         )
-        return ok({"context": ctx})
+    with timings.span("pack"):
+        data = _pack_structured_context(results, int(req.max_chars))
+    _CONTEXT_LATENCY.observe(time.perf_counter() - started, structured="true")
+    _observe_stage_timings(timings)
+    if want_timings:
+        data["meta"] = {"timings": timings.as_dict()}
+    return _encoded_response(cache_key, data, request)
 
-    results = idx.search(req.query, k=req.k, min_score=req.min_score)
+
+def _pack_structured_context(results: List[SearchResult], max_chars: int) -> Dict[str, Any]:
     parts: List[str] = []
     chunks: List[Dict[str, Any]] = []
     total = 0
@@ -1291,7 +2129,7 @@ def context_project(project_id: str, req: ContextRequest) -> Dict[str, Any]:
         header = " | ".join(header_bits) if header_bits else source_path
 
         sep = "\n\n---\n\n" if parts else ""
-        remaining = int(req.max_chars) - total
+        remaining = int(max_chars) - total
         if remaining <= 0 or len(sep) >= remaining:
             break
 
@@ -1324,14 +2162,12 @@ def context_project(project_id: str, req: ContextRequest) -> Dict[str, Any]:
             break
 
     context_str = "".join(parts)
-    return ok(
-        {
-            "context": context_str,
-            "chunks": chunks,
-            "total_chars": total,
-            "estimated_tokens": total // 4,
-        }
-    )
+    return {
+        "context": context_str,
+        "chunks": chunks,
+        "total_chars": total,
+        "estimated_tokens": total // 4,
+    }
 
 
 @app.get("/projects/{project_id}/trace/status")
@@ -1376,6 +2212,32 @@ def build_trace_project(project_id: str) -> Dict[str, Any]:
     return ok({"started": True, "building": True})
 
 
+@app.get("/projects/{project_id}/trace/stats")
+def get_trace_stats(project_id: str, include_files: bool = False) -> Dict[str, Any]:
+    """
+    Graph statistics computed at trace build time: counts, density, average
+    degree, components, PageRank top hubs and the most important files.
+    `include_files` adds the importance score of every file.
+    """
+    proj = _require_project(project_id)
+    if not _project_trace_enabled(proj):
+        raise ApiException(
+            status_code=409,
+            code="TRACE_DISABLED",
+            message="Trace is disabled for this project",
+            hint="Enable trace in project settings and build the trace index.",
+        )
+
+    trace_idx = _get_project_trace_index(proj)
+    if not trace_idx.exists():
+        raise ApiException(status_code=409, code="TRACE_NOT_BUILT", message="Trace index has not been built yet")
+
+    stats = dict(trace_idx.stats())
+    if not include_files:
+        stats.pop("file_importance", None)
+    return ok(stats)
+
+
 @app.get("/projects/{project_id}/trace/search")
 def search_trace_project(project_id: str, query: str, kind: Optional[str] = None, limit: int = 50) -> Dict[str, Any]:
     proj = _require_project(project_id)
@@ -1402,10 +2264,11 @@ def search_trace_project(project_id: str, query: str, kind: Optional[str] = None
             hint="Run a trace build first.",
         )
     
-    if not trace_idx.is_loaded():
-        trace_idx.load()
-    
-    results = trace_idx.search_nodes(query, kind=kind, limit=min(limit, 100))
+    with _TRACE_QUERY_LATENCY.time(op="search"):
+        if not trace_idx.is_loaded():
+            trace_idx.load()
+
+        results = trace_idx.search_nodes(query, kind=kind, limit=min(limit, 100))
     return ok({"nodes": results})
 
 
@@ -1435,15 +2298,15 @@ def trace_search_project(project_id: str, req: TraceSearchRequest) -> Dict[str,
             hint="Run a trace build first.",
         )
 
-    if not trace_idx.is_loaded():
-        trace_idx.load()
-
     hard_cap = 100
     limit = min(int(req.limit or 0) if req.limit is not None else 20, hard_cap)
     if limit <= 0:
         limit = 20
 
-    nodes = trace_idx.search_nodes(req.query, kind=None, limit=hard_cap)
+    with _TRACE_QUERY_LATENCY.time(op="search"):
+        if not trace_idx.is_loaded():
+            trace_idx.load()
+        nodes = trace_idx.search_nodes(req.query, kind=None, limit=hard_cap)
     if isinstance(req.kinds, list) and req.kinds:
         kinds = {str(k).strip() for k in req.kinds if isinstance(k, str) and k.strip()}
         if kinds:
@@ -1472,18 +2335,22 @@ def get_trace_node(project_id: str, node_id: str) -> Dict[str, Any]:
     if not trace_idx.exists():
         raise ApiException(status_code=409, code="TRACE_NOT_BUILT", message="Trace index has not been built yet")
     
-    if not trace_idx.is_loaded():
-        trace_idx.load()
-    
-    node = trace_idx.get_node(node_id)
+    with _TRACE_QUERY_LATENCY.time(op="node"):
+        if not trace_idx.is_loaded():
+            trace_idx.load()
+
+        node = trace_idx.get_node(node_id)
+        in_degree, out_degree = trace_idx.degree(node_id)
     if node is None:
         raise ApiException(status_code=404, code="NODE_NOT_FOUND", message=f"Node not found: {node_id}")
-    
-    in_degree = len(getattr(trace_idx, "_edges_by_target", {}).get(node_id, []) or [])
-    out_degree = len(getattr(trace_idx, "_edges_by_source", {}).get(node_id, []) or [])
+
     return ok({"node": node, "in_degree": in_degree, "out_degree": out_degree})
 
 
+# Deepest neighbors expansion a single request may ask for.
+_TRACE_MAX_HOPS = 5
+
+
 @app.get("/projects/{project_id}/trace/neighbors/{node_id}")
 @app.get("/projects/{project_id}/trace/nodes/{node_id}/neighbors")
 def get_trace_node_neighbors(
@@ -1494,7 +2361,14 @@ def get_trace_node_neighbors(
     hops: int = 1,
     max_nodes: int = 25,
     max_edges: int = 50,
+    max_fanout: int = 0,
 ) -> Dict[str, Any]:
+    """
+    Subgraph around a node, up to `hops` hops away, in one call.
+
+    BFS with edge-kind filter, direction, per-node fan-out cap and node / edge
+    budgets; `truncated` is true when a budget stopped the expansion.
+    """
     proj = _require_project(project_id)
 
     cfg = proj.config or {}
@@ -1531,46 +2405,35 @@ def get_trace_node_neighbors(
     if edge_kinds_list is None:
         edge_kinds_list = ["imports"]
 
-    neighbors = trace_idx.get_neighbors(
-        node_id,
-        direction=direction,
-        edge_kinds=edge_kinds_list,
-        max_nodes=min(max_nodes, 100),
-    )
-
-    edges: List[Dict[str, Any]] = []
-    seen_edges: set[str] = set()
-    for e in list(neighbors.get("in_edges") or []) + list(neighbors.get("out_edges") or []):
-        eid = str(e.get("id") or "")
-        if eid and eid in seen_edges:
-            continue
-        if eid:
-            seen_edges.add(eid)
-        edges.append(e)
-
     max_edges_cap = 200
-    edges = edges[: min(int(max_edges), max_edges_cap)] if int(max_edges) > 0 else edges[:50]
+    with _TRACE_QUERY_LATENCY.time(op="neighbors"):
+        subgraph = trace_idx.traverse(
+            [node_id],
+            direction=direction,
+            edge_kinds=edge_kinds_list,
+            hops=min(max(1, int(hops)), _TRACE_MAX_HOPS),
+            max_nodes=min(max(1, int(max_nodes)), 100),
+            max_edges=min(int(max_edges), max_edges_cap) if int(max_edges) > 0 else 50,
+            max_fanout=max(0, int(max_fanout)),
+        )
+
+    return ok(subgraph)
 
-    nodes_out: List[Dict[str, Any]] = []
-    seen_nodes: set[str] = set()
-    for n in [node] + list(neighbors.get("in_nodes") or []) + list(neighbors.get("out_nodes") or []):
-        nid = str((n or {}).get("id") or "")
-        if not nid or nid in seen_nodes:
-            continue
-        seen_nodes.add(nid)
-        nodes_out.append(n)
 
-    return ok({"nodes": nodes_out, "edges": edges})
+async def _ollama_tags(ollama_url: str) -> httpx.Response:
+    async with _llm_limiter:
+        async with httpx.AsyncClient(timeout=2) as client:
+            return await client.get(f"{ollama_url}/api/tags")
 
 
 @app.get("/llm/status")
 @app.get("/api/llm/status")
-def get_llm_status() -> Dict[str, Any]:
+async def get_llm_status() -> Dict[str, Any]:
     ollama_url = str(_config.get("ollama_url") or "http://localhost:11434").rstrip("/")
     connected = False
     models: List[str] = []
     try:
-        r = requests.get(f"{ollama_url}/api/tags", timeout=2)
+        r = await _ollama_tags(ollama_url)
         if r.status_code == 200:
             payload = r.json()
             raw_models = payload.get("models") if isinstance(payload, dict) else None
@@ -1593,11 +2456,11 @@ def get_llm_status() -> Dict[str, Any]:
 
 @app.post("/llm/test")
 @app.post("/api/llm/test")
-def test_llm() -> Dict[str, Any]:
+async def test_llm() -> Dict[str, Any]:
     ollama_url = str(_config.get("ollama_url") or "http://localhost:11434").rstrip("/")
     ollama_connected = False
     try:
-        r = requests.get(f"{ollama_url}/api/tags", timeout=2)
+        r = await _ollama_tags(ollama_url)
         if r.status_code == 200:
             ollama_connected = True
     except Exception:
@@ -2038,9 +2901,19 @@ def configure(
     index_dir: str = "./codrag_data",
     ollama_url: str = "http://localhost:11434",
     model: str = "nomic-embed-text",
+    max_concurrent_builds: int = _DEFAULT_MAX_CONCURRENT_BUILDS,
+    max_index_builds: int = _DEFAULT_MAX_INDEX_BUILDS,
+    index_memory_budget_mb: int = _DEFAULT_INDEX_MEMORY_BUDGET_MB,
+    index_reload_interval_ms: int = DEFAULT_RELOAD_INTERVAL_MS,
+    cpu_workers: int = _DEFAULT_CPU_WORKERS,
+    max_concurrent_searches: int = _DEFAULT_MAX_CONCURRENT_SEARCHES,
+    max_concurrent_searches_per_project: int = _DEFAULT_MAX_CONCURRENT_SEARCHES_PER_PROJECT,
+    search_queue_size: int = _DEFAULT_SEARCH_QUEUE_SIZE,
+    search_queue_timeout_ms: int = _DEFAULT_SEARCH_QUEUE_TIMEOUT_MS,
+    trace_workers: Optional[int] = None,
 ):
     """Configure the server before starting."""
-    global _config, _index, _watcher
+    global _config, _index, _watcher, _cpu_executor, _cpu_workers, _embedder
     if _watcher is not None:
         try:
             _watcher.stop()
@@ -2052,8 +2925,88 @@ def configure(
         "index_dir": index_dir,
         "ollama_url": ollama_url,
         "model": model,
+        "index_reload_interval_ms": index_reload_interval_ms,
+        "trace_workers": trace_workers,
     }
     _index = None
+    with _embedder_lock:
+        if _embedder is not None and (_embedder.model, _embedder.base_url) != (model, ollama_url.rstrip("/")):
+            _embedder = None
+    _build_scheduler.configure(max_concurrent_builds, kind_limits={"index": max_index_builds})
+    _index_memory_budget.set_limit(int(index_memory_budget_mb) * 1024 * 1024)
+    cpu_workers = max(1, int(cpu_workers))
+    if cpu_workers != _cpu_workers:
+        old_executor = _cpu_executor
+        _cpu_workers = cpu_workers
+        _cpu_executor = ThreadPoolExecutor(max_workers=cpu_workers, thread_name_prefix="codrag-cpu")
+        old_executor.shutdown(wait=False)
+    _search_admission.configure(
+        limit=max_concurrent_searches,
+        per_key_limit=max_concurrent_searches_per_project,
+        max_waiting=search_queue_size,
+        per_key_max_waiting=search_queue_size // 2,
+        queue_timeout_s=search_queue_timeout_ms / 1000.0,
+    )
+
+
+# main() hands its settings to uvicorn worker processes (--workers > 1) here.
+_WORKER_CONFIG_ENV = "CODRAG_SERVER_CONFIG"
+
+
+def _configure_worker_from_env() -> None:
+    """Apply main()'s settings in a worker process started by uvicorn (runs at startup)."""
+    global _leader_url
+
+    raw = os.environ.get(_WORKER_CONFIG_ENV)
+    if not raw:
+        return
+    settings = json.loads(raw)
+    warmup_projects = int(settings.pop("warmup_projects", 0))
+    _leader_url = settings.pop("leader_url", None)
+    configure(**settings)
+    mount_dashboard()
+    _start_warmup(warmup_projects)
+
+
+def run_workers(host: str, port: int, workers: int, settings: Dict[str, Any], warmup_projects: int = 0) -> None:
+    """
+    Serve with `workers` processes. Each worker imports this module afresh and
+    configures itself from the environment. Embeddings and trace graphs are
+    memory-mapped, so workers share their pages through the OS page cache;
+    documents (documents.json) are not: every worker parses its own copy,
+    so their memory grows with `workers`.
+
+    This process also runs the leader: a loopback-only server that owns
+    builds, watchers and events, so the build limits, cancellation and SSE
+    streams are global rather than per worker.
+    """
+    import uvicorn
+
+    configure(**settings)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("127.0.0.1", 0))
+    leader_port = sock.getsockname()[1]
+    # lifespan="off": the leader is configured above, not from the worker env.
+    leader = uvicorn.Server(uvicorn.Config(app, lifespan="off", log_level="warning"))
+    leader_thread = threading.Thread(
+        target=leader.run, kwargs={"sockets": [sock]}, name="codrag-leader", daemon=True
+    )
+    leader_thread.start()
+    while not leader.started:
+        if not leader_thread.is_alive():
+            raise RuntimeError("CoDRAG leader server failed to start")
+        time.sleep(0.05)
+    logger.info(f"Leader (builds, watchers, events) listening on 127.0.0.1:{leader_port}")
+
+    os.environ[_WORKER_CONFIG_ENV] = json.dumps(
+        {**settings, "warmup_projects": warmup_projects, "leader_url": f"http://127.0.0.1:{leader_port}"}
+    )
+    try:
+        uvicorn.run("codrag.server:app", host=host, port=port, workers=workers)
+    finally:
+        leader.should_exit = True
+        leader_thread.join(timeout=10)
 
 
 def mount_dashboard():
@@ -2074,16 +3027,106 @@ def main():
     parser.add_argument("--model", default="nomic-embed-text", help="Embedding model name")
     parser.add_argument("--host", default="127.0.0.1", help="Host to bind to")
     parser.add_argument("--port", type=int, default=8400, help="Port to bind to")
+    parser.add_argument(
+        "--max-concurrent-builds",
+        type=int,
+        default=_DEFAULT_MAX_CONCURRENT_BUILDS,
+        help="Maximum index + trace builds running at once across all projects",
+    )
+    parser.add_argument(
+        "--max-index-builds",
+        type=int,
+        default=_DEFAULT_MAX_INDEX_BUILDS,
+        help="Maximum embedding (index) builds running at once",
+    )
+    parser.add_argument(
+        "--index-memory-budget-mb",
+        type=int,
+        default=_DEFAULT_INDEX_MEMORY_BUDGET_MB,
+        help="Memory budget for loaded project indexes; least recently used are evicted (0 = unlimited)",
+    )
+    parser.add_argument(
+        "--index-reload-interval-ms",
+        type=int,
+        default=DEFAULT_RELOAD_INTERVAL_MS,
+        help="How often queries check for indexes rebuilt by another process (0 = never)",
+    )
+    parser.add_argument(
+        "--warmup-projects",
+        type=int,
+        default=_DEFAULT_WARMUP_PROJECTS,
+        help="Preload this many most recently used projects at start-up (0 = no warm-up)",
+    )
+    parser.add_argument(
+        "--cpu-workers",
+        type=int,
+        default=_DEFAULT_CPU_WORKERS,
+        help="Threads for CPU-bound search scoring (per worker process)",
+    )
+    parser.add_argument(
+        "--max-concurrent-searches",
+        type=int,
+        default=_DEFAULT_MAX_CONCURRENT_SEARCHES,
+        help="Search/context requests allowed in flight at once (per worker process)",
+    )
+    parser.add_argument(
+        "--max-concurrent-searches-per-project",
+        type=int,
+        default=_DEFAULT_MAX_CONCURRENT_SEARCHES_PER_PROJECT,
+        help="Search/context requests allowed in flight at once for one project",
+    )
+    parser.add_argument(
+        "--search-queue-size",
+        type=int,
+        default=_DEFAULT_SEARCH_QUEUE_SIZE,
+        help="Search/context requests allowed to wait for a slot; more are rejected with 503",
+    )
+    parser.add_argument(
+        "--search-queue-timeout-ms",
+        type=int,
+        default=_DEFAULT_SEARCH_QUEUE_TIMEOUT_MS,
+        help="How long a search/context request may wait for a slot before it is rejected",
+    )
+    parser.add_argument(
+        "--trace-workers",
+        type=int,
+        default=None,
+        help="Processes for parsing files during trace builds (default: CPU count; 1 = in-process)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Serve with this many worker processes sharing the on-disk indexes",
+    )
     args = parser.parse_args()
 
-    configure(
-        repo_root=args.repo_root,
-        index_dir=args.index_dir,
-        ollama_url=args.ollama_url,
-        model=args.model,
-    )
+    settings: Dict[str, Any] = {
+        "repo_root": args.repo_root,
+        "index_dir": args.index_dir,
+        "ollama_url": args.ollama_url,
+        "model": args.model,
+        "max_concurrent_builds": args.max_concurrent_builds,
+        "max_index_builds": args.max_index_builds,
+        "index_memory_budget_mb": args.index_memory_budget_mb,
+        "index_reload_interval_ms": args.index_reload_interval_ms,
+        "cpu_workers": args.cpu_workers,
+        "max_concurrent_searches": args.max_concurrent_searches,
+        "max_concurrent_searches_per_project": args.max_concurrent_searches_per_project,
+        "search_queue_size": args.search_queue_size,
+        "search_queue_timeout_ms": args.search_queue_timeout_ms,
+        "trace_workers": args.trace_workers,
+    }
+
+    if args.workers > 1:
+        logger.info(f"Starting CoDRAG server on {args.host}:{args.port} with {args.workers} workers")
+        run_workers(args.host, args.port, args.workers, settings, warmup_projects=args.warmup_projects)
+        return
+
+    configure(**settings)
 
     mount_dashboard()
+    _start_warmup(args.warmup_projects)
 
     import uvicorn
     logger.info(f"Starting CoDRAG server on {args.host}:{args.port}")
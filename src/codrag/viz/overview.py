@@ -77,7 +77,7 @@ def render_dashboard(
     render_activity_heatmap(activity_data, weeks=weeks, console=console)
     console.print("")
     
-    render_trace_stats(trace_stats, console=console)
+    render_trace_stats(trace_stats, top_hubs=trace_stats.get("top_hubs"), console=console)
 
 if __name__ == "__main__":
     # Demo data
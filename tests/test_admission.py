@@ -0,0 +1,122 @@
+"""
+Tests for admission control and load shedding on search/context.
+
+Uses FakeEmbedder so no Ollama dependency is required.
+Run with: pytest tests/test_admission.py -v
+"""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import Iterator, Tuple
+
+import pytest
+from fastapi.testclient import TestClient
+
+import codrag.server as server
+from codrag.api.limits import AdmissionController, EndpointLimiter, LimitExceeded
+from codrag.core import CodeIndex, FakeEmbedder
+from codrag.core.project_registry import ProjectRegistry, project_index_dir
+from codrag.server import app
+
+
+@pytest.fixture
+def project(mini_repo: Path, tmp_path: Path) -> Iterator[Tuple[TestClient, str]]:
+    server._registry = ProjectRegistry(db_path=tmp_path / "registry.db")
+    server._project_indexes.clear()
+    proj = server._registry.add_project(path=mini_repo, name="p", mode="embedded")
+    idx = CodeIndex(index_dir=project_index_dir(proj), embedder=FakeEmbedder())
+    idx.build(repo_root=mini_repo)
+    server._project_indexes[proj.id] = idx
+    try:
+        yield TestClient(app), proj.id
+    finally:
+        server._search_admission.configure(
+            limit=server._DEFAULT_MAX_CONCURRENT_SEARCHES,
+            per_key_limit=server._DEFAULT_MAX_CONCURRENT_SEARCHES_PER_PROJECT,
+            max_waiting=server._DEFAULT_SEARCH_QUEUE_SIZE,
+            per_key_max_waiting=server._DEFAULT_SEARCH_QUEUE_SIZE // 2,
+            queue_timeout_s=server._DEFAULT_SEARCH_QUEUE_TIMEOUT_MS / 1000.0,
+        )
+
+
+def test_limiter_rejects_when_queue_full_or_deadline_passes() -> None:
+    limiter = EndpointLimiter("test", 1, max_waiting=1)
+    limiter.observe_hold(2.5)
+
+    async def main() -> None:
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire(timeout=5))
+        await asyncio.sleep(0)
+        with pytest.raises(LimitExceeded) as full:
+            await limiter.acquire()
+        assert full.value.reason == "queue_full"
+        assert full.value.retry_after_s == 5  # two requests ahead of one slot at ~2.5s each
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+
+        with pytest.raises(LimitExceeded) as late:
+            await limiter.acquire(timeout=0.01)
+        assert late.value.reason == "queue_timeout"
+        limiter.release()
+
+    asyncio.run(main())
+    assert limiter.stats() == {"limit": 1, "active": 0, "waiting": 0}
+
+
+def test_admission_scopes_and_cleanup() -> None:
+    ctl = AdmissionController("t", limit=2, per_key_limit=1, max_waiting=0, per_key_max_waiting=0, queue_timeout_s=1)
+
+    async def main() -> None:
+        async with ctl.admit("a"):
+            with pytest.raises(LimitExceeded) as per_project:
+                async with ctl.admit("a"):
+                    pass
+            assert per_project.value.scope == "project"
+            async with ctl.admit("b"):
+                with pytest.raises(LimitExceeded) as global_:
+                    async with ctl.admit("c"):
+                        pass
+                assert global_.value.scope == "global"
+
+    asyncio.run(main())
+    assert ctl.stats()["active"] == 0 and ctl.stats()["projects"] == {}
+
+
+def _hold(limiter: EndpointLimiter) -> None:
+    asyncio.run(limiter.acquire())
+
+
+def test_search_sheds_with_429_for_busy_project(project: Tuple[TestClient, str]) -> None:
+    client, pid = project
+    server._search_admission.configure(per_key_limit=1, per_key_max_waiting=0)
+    busy = server._search_admission._limiter_for(pid)
+    _hold(busy)
+    try:
+        res = client.post(f"/projects/{pid}/search", json={"query": "add"})
+        assert res.status_code == 429
+        assert int(res.headers["Retry-After"]) >= 1
+        err = res.json()["error"]
+        assert err["code"] == "TOO_MANY_REQUESTS"
+        assert err["details"]["scope"] == "project" and err["details"]["reason"] == "queue_full"
+    finally:
+        busy.release()
+    assert client.post(f"/projects/{pid}/search", json={"query": "add"}).status_code == 200
+
+
+def test_context_sheds_with_503_when_overloaded(project: Tuple[TestClient, str]) -> None:
+    client, pid = project
+    server._search_admission.configure(limit=1, max_waiting=1, queue_timeout_s=0.05)
+    _hold(server._search_limiter)
+    try:
+        res = client.post(f"/projects/{pid}/context", json={"query": "add"})
+        assert res.status_code == 503
+        assert "Retry-After" in res.headers
+        err = res.json()["error"]
+        assert err["code"] == "SERVER_OVERLOADED" and err["details"]["reason"] == "queue_timeout"
+    finally:
+        server._search_limiter.release()
+
+    metrics = client.get("/metrics").text
+    assert 'codrag_requests_rejected_total{endpoint_class="search",scope="global",reason="queue_timeout"}' in metrics
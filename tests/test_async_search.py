@@ -0,0 +1,159 @@
+"""
+Tests for the async request path (async embedder, executor offload, limits).
+
+Uses FakeEmbedder or a local HTTP stub server, so no Ollama is required.
+Run with: pytest tests/test_async_search.py -v
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+import codrag.server as server
+from codrag.api.limits import EndpointLimiter
+from codrag.core import CodeIndex, EmbeddingResult, FakeEmbedder, OllamaEmbedder
+from codrag.core.project_registry import ProjectRegistry, project_index_dir
+from codrag.server import app
+
+
+class CountingEmbedder(FakeEmbedder):
+    def __init__(self) -> None:
+        super().__init__()
+        self.sync_calls = 0
+
+    def embed(self, text: str) -> EmbeddingResult:
+        self.sync_calls += 1
+        return super().embed(text)
+
+
+@pytest.fixture
+def ollama_stub() -> Iterator[str]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length))
+            body = json.dumps({"embedding": [float(len(payload["prompt"])), 1.0]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args: object) -> None:
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def test_limiter_caps_concurrency() -> None:
+    limiter = EndpointLimiter("test", 2)
+    running = 0
+    peak = 0
+
+    async def work() -> None:
+        nonlocal running, peak
+        async with limiter:
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    async def main() -> None:
+        await asyncio.gather(*(work() for _ in range(6)))
+
+    asyncio.run(main())
+    assert peak == 2
+    assert limiter.stats() == {"limit": 2, "active": 0, "waiting": 0}
+
+
+def test_limiter_cancelled_waiter_passes_slot_on() -> None:
+    limiter = EndpointLimiter("test", 1)
+    order: List[str] = []
+
+    async def main() -> None:
+        await limiter.acquire()
+        cancelled = asyncio.create_task(limiter.acquire())
+        later = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.stats()["waiting"] == 2
+        limiter.release()
+        cancelled.cancel()
+        await asyncio.wait_for(later, 1)
+        order.append("later")
+        limiter.release()
+
+    asyncio.run(main())
+    assert order == ["later"]
+    assert limiter.stats()["active"] == 0
+
+
+def test_ollama_aembed_uses_pooled_client(ollama_stub: str) -> None:
+    embedder = OllamaEmbedder(model="stub", base_url=ollama_stub, max_retries=1)
+
+    async def main() -> List[List[float]]:
+        first = await embedder.aembed("abc")
+        client = embedder._async_client()
+        second = await embedder.aembed("abcdef")
+        assert embedder._async_client() is client
+        await embedder.aclose()
+        return [first.vector, second.vector]
+
+    assert asyncio.run(main()) == [[3.0, 1.0], [6.0, 1.0]]
+
+
+def test_search_with_query_vector_skips_embedder(mini_repo: Path, tmp_path: Path) -> None:
+    embedder = CountingEmbedder()
+    idx = CodeIndex(index_dir=tmp_path / "index", embedder=embedder)
+    idx.build(repo_root=mini_repo)
+    expected = idx.search("add numbers", k=3, min_score=-1.0)
+
+    embedder.sync_calls = 0
+    qv = FakeEmbedder().embed("add numbers").vector
+    got = idx.search("add numbers", k=3, min_score=-1.0, query_vector=qv)
+    assert embedder.sync_calls == 0
+    assert [r.doc["id"] for r in got] == [r.doc["id"] for r in expected]
+
+
+def test_search_endpoint_runs_async(mini_repo: Path, tmp_path: Path) -> None:
+    server._registry = ProjectRegistry(db_path=tmp_path / "registry.db")
+    server._project_indexes.clear()
+    proj = server._registry.add_project(path=mini_repo, name="p", mode="embedded")
+    embedder = CountingEmbedder()
+    idx = CodeIndex(index_dir=project_index_dir(proj), embedder=embedder)
+    idx.build(repo_root=mini_repo)
+    server._project_indexes[proj.id] = idx
+
+    client = TestClient(app)
+    res = client.post(f"/projects/{proj.id}/search?debug=timings", json={"query": "add numbers", "min_score": -1.0})
+    assert res.status_code == 200
+    data = res.json()["data"]
+    assert data["results"]
+    assert "embedding_ms" in data["meta"]["timings"]
+
+    res = client.post(f"/projects/{proj.id}/context", json={"query": "add numbers", "min_score": -1.0})
+    assert res.status_code == 200 and res.json()["data"]["context"]
+    assert server._search_limiter.stats()["active"] == 0
+
+
+def test_llm_status_unreachable_is_async_and_fast(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(server._config, "ollama_url", "http://127.0.0.1:9")
+    res = TestClient(app).get("/llm/status")
+    assert res.status_code == 200
+    assert res.json()["data"]["ollama"]["connected"] is False
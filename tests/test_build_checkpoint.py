@@ -0,0 +1,140 @@
+"""
+Tests for build checkpoints (resume after failure) and cooperative cancel.
+
+Uses FakeEmbedder so no Ollama dependency is required.
+Run with: pytest tests/test_build_checkpoint.py -v
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+import codrag.server as server
+from codrag.core import CodeIndex, EmbeddingResult, FakeEmbedder
+from codrag.core.index import BuildCancelled
+from codrag.core.progress import BuildProgress
+from codrag.core.project_registry import ProjectRegistry
+from codrag.server import app
+
+
+class CountingEmbedder(FakeEmbedder):
+    """FakeEmbedder that counts calls and can fail after a number of them."""
+
+    def __init__(self, fail_after: int | None = None, model: str = "fake-embed") -> None:
+        super().__init__(model=model)
+        self.calls = 0
+        self.fail_after = fail_after
+
+    def embed(self, text: str) -> EmbeddingResult:
+        if self.fail_after is not None and self.calls >= self.fail_after:
+            raise RuntimeError("embedder went away")
+        self.calls += 1
+        return super().embed(text)
+
+
+@pytest.fixture
+def big_repo(tmp_path: Path) -> Path:
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    for i in range(6):
+        (repo / f"mod_{i}.py").write_text(f"def func_{i}(x):\n    return x + {i}\n")
+    return repo
+
+
+def _checkpoint_dir(idx_dir: Path) -> Path:
+    return idx_dir.parent / f".index_checkpoint_{idx_dir.name}"
+
+
+def test_failed_build_resumes_from_checkpoint(big_repo: Path, tmp_path: Path) -> None:
+    idx_dir = tmp_path / "index"
+    flaky = CountingEmbedder(fail_after=4)
+    idx = CodeIndex(index_dir=idx_dir, embedder=flaky)
+
+    with pytest.raises(RuntimeError, match="went away"):
+        idx.build(repo_root=big_repo, checkpoint_every=2)
+    assert _checkpoint_dir(idx_dir).exists()
+    assert not (idx_dir / "manifest.json").exists()
+
+    healthy = CountingEmbedder()
+    idx2 = CodeIndex(index_dir=idx_dir, embedder=healthy)
+    manifest = idx2.build(repo_root=big_repo)
+
+    stats = manifest["build"]
+    assert stats["chunks_resumed"] == 4
+    assert healthy.calls == stats["chunks_embedded"] == stats["chunks_total"] - 4
+    assert not _checkpoint_dir(idx_dir).exists()
+
+
+def test_chunk_spill_is_removed_after_failed_and_finished_builds(big_repo: Path, tmp_path: Path) -> None:
+    idx_dir = tmp_path / "index"
+    spill = idx_dir.parent / f".index_chunks_{idx_dir.name}.jsonl"
+
+    with pytest.raises(RuntimeError):
+        CodeIndex(index_dir=idx_dir, embedder=CountingEmbedder(fail_after=2)).build(repo_root=big_repo)
+    assert not spill.exists()
+
+    idx = CodeIndex(index_dir=idx_dir, embedder=CountingEmbedder())
+    manifest = idx.build(repo_root=big_repo)
+    assert not spill.exists()
+    snap = idx.snapshot()
+    assert snap.embeddings.shape == (manifest["build"]["chunks_total"], 384)
+    assert [d["source_path"] for d in snap.documents] == sorted(d["source_path"] for d in snap.documents)
+    assert all(d["content"] in (big_repo / d["source_path"]).read_text() for d in snap.documents)
+
+
+def test_checkpoint_for_other_model_is_discarded(big_repo: Path, tmp_path: Path) -> None:
+    idx_dir = tmp_path / "index"
+    with pytest.raises(RuntimeError):
+        CodeIndex(index_dir=idx_dir, embedder=CountingEmbedder(fail_after=3)).build(
+            repo_root=big_repo, checkpoint_every=1
+        )
+
+    other = CountingEmbedder(model="other-model")
+    manifest = CodeIndex(index_dir=idx_dir, embedder=other).build(repo_root=big_repo)
+    assert manifest["build"]["chunks_resumed"] == 0
+    assert other.calls == manifest["build"]["chunks_total"]
+
+
+def test_cancel_stops_build_and_keeps_progress(big_repo: Path, tmp_path: Path) -> None:
+    idx_dir = tmp_path / "index"
+    cancel = threading.Event()
+    progress = BuildProgress()
+    progress.add_listener(lambda snap: cancel.set() if snap["chunks"]["embedded"] >= 2 else None)
+
+    idx = CodeIndex(index_dir=idx_dir, embedder=CountingEmbedder())
+    with pytest.raises(BuildCancelled):
+        idx.build(repo_root=big_repo, progress=progress, cancel_event=cancel)
+    assert not (idx_dir / "manifest.json").exists()
+
+    manifest = CodeIndex(index_dir=idx_dir, embedder=CountingEmbedder()).build(repo_root=big_repo)
+    assert manifest["build"]["chunks_resumed"] == 2
+
+
+def test_stale_cleanup_keeps_checkpoint(tmp_path: Path) -> None:
+    idx_dir = tmp_path / "index"
+    ckpt = _checkpoint_dir(idx_dir)
+    ckpt.mkdir(parents=True)
+    old = time.time() - 7200
+    os.utime(ckpt, (old, old))
+
+    CodeIndex(index_dir=idx_dir, embedder=FakeEmbedder())
+    assert ckpt.exists()
+
+
+def test_cancel_endpoint_requires_running_build(tmp_path: Path) -> None:
+    server._registry = ProjectRegistry(db_path=tmp_path / "registry.db")
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    client = TestClient(app)
+    res = client.post("/projects", json={"path": str(repo), "name": "p", "mode": "embedded"})
+    pid = res.json()["data"]["project"]["id"]
+
+    res = client.post(f"/projects/{pid}/build/cancel")
+    assert res.status_code == 409
+    assert res.json()["error"]["code"] == "BUILD_NOT_RUNNING"
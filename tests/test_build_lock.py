@@ -0,0 +1,82 @@
+"""
+Tests for the inter-process build lock and multi-worker configuration.
+
+Run with: pytest tests/test_build_lock.py -v
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+import codrag.server as server
+from codrag.core import CodeIndex, FakeEmbedder
+from codrag.core.index import BuildLocked
+from codrag.core.locking import FileLock
+from codrag.core.project_registry import ProjectRegistry, project_index_dir
+from codrag.server import app
+
+
+def test_file_lock_is_exclusive(tmp_path: Path) -> None:
+    path = tmp_path / "x.lock"
+    a, b = FileLock(path), FileLock(path)
+    assert not a.is_locked()
+
+    assert a.acquire()
+    assert not b.acquire()
+    assert b.is_locked() and a.held() and not b.held()
+
+    a.release()
+    assert not b.is_locked()
+    assert b.acquire()
+    b.release()
+
+
+def test_build_refuses_while_locked(mini_repo: Path, tmp_path: Path) -> None:
+    idx = CodeIndex(index_dir=tmp_path / "index", embedder=FakeEmbedder())
+    holder = FileLock(idx.build_lock_path())
+    assert holder.acquire()
+    try:
+        assert idx.is_build_locked()
+        with pytest.raises(BuildLocked):
+            idx.build(repo_root=mini_repo)
+    finally:
+        holder.release()
+
+    idx.build(repo_root=mini_repo)
+    assert idx.is_loaded() and not idx.is_build_locked()
+
+
+def test_build_endpoint_conflicts_with_other_process(mini_repo: Path, tmp_path: Path) -> None:
+    server._registry = ProjectRegistry(db_path=tmp_path / "registry.db")
+    server._project_indexes.clear()
+    client = TestClient(app)
+    pid = client.post("/projects", json={"path": str(mini_repo), "name": "p", "mode": "embedded"}).json()["data"][
+        "project"
+    ]["id"]
+    proj = server._registry.get_project(pid)
+    holder = FileLock(CodeIndex(index_dir=project_index_dir(proj), embedder=FakeEmbedder()).build_lock_path())
+    assert holder.acquire()
+    try:
+        res = client.post(f"/projects/{pid}/build")
+        assert res.status_code == 409
+        assert res.json()["error"]["code"] == "BUILD_ALREADY_RUNNING"
+        assert client.get(f"/projects/{pid}/status").json()["data"]["building"] is True
+    finally:
+        holder.release()
+    assert client.get(f"/projects/{pid}/status").json()["data"]["building"] is False
+
+
+def test_worker_configures_from_environment(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    saved = dict(server._config)
+    settings = {"index_dir": str(tmp_path / "data"), "model": "worker-model", "warmup_projects": 0}
+    monkeypatch.setenv(server._WORKER_CONFIG_ENV, json.dumps(settings))
+    try:
+        with TestClient(app):
+            assert server._config["model"] == "worker-model"
+            assert server._config["index_dir"] == str(tmp_path / "data")
+    finally:
+        server._config = saved
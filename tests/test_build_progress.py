@@ -0,0 +1,125 @@
+"""
+Tests for structured build progress (phase, counters, throughput, ETA).
+
+Uses FakeEmbedder so no Ollama dependency is required.
+Run with: pytest tests/test_build_progress.py -v
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+import codrag.server as server
+from codrag.core import CodeIndex, FakeEmbedder
+from codrag.core.progress import BUILD_PHASES, BuildProgress
+from codrag.core.project_registry import ProjectRegistry, project_index_dir
+from codrag.server import app
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_progress_throughput_and_eta() -> None:
+    clock = _Clock()
+    p = BuildProgress(clock=clock)
+    p.set_files(0, 4)
+    p.set_chunks(2, total=12, to_embed=10)
+    p.set_phase("embed")
+
+    snap = p.snapshot()
+    assert snap["chunks_per_sec"] is None
+    assert snap["eta_s"] is None
+
+    for _ in range(4):
+        clock.now += 0.5
+        p.chunk_embedded()
+
+    snap = p.snapshot()
+    assert snap["phase"] == "embed"
+    assert snap["chunks"] == {"done": 6, "total": 12, "to_embed": 10, "embedded": 4}
+    assert snap["chunks_per_sec"] == pytest.approx(2.0)
+    assert snap["eta_s"] == pytest.approx(3.0)
+
+    p.finish("succeeded")
+    snap = p.snapshot()
+    assert snap["state"] == "succeeded"
+    assert snap["phase"] == "done"
+    assert snap["eta_s"] is None
+
+
+def test_build_reports_phases_and_counts(mini_repo: Path, tmp_path: Path) -> None:
+    idx = CodeIndex(index_dir=tmp_path / "index", embedder=FakeEmbedder())
+    progress = BuildProgress()
+    seen: list[str] = []
+    progress.add_listener(lambda snap: seen.append(snap["phase"]))
+
+    manifest = idx.build(repo_root=mini_repo, progress=progress)
+
+    assert list(dict.fromkeys(seen)) == list(BUILD_PHASES)
+    snap = progress.snapshot()
+    stats = manifest["build"]
+    assert snap["files"]["total"] == stats["files_total"]
+    assert snap["chunks"]["total"] == stats["chunks_total"]
+    assert snap["chunks"]["embedded"] == stats["chunks_embedded"]
+
+    # Second build reuses every chunk, so nothing is left to embed.
+    progress2 = BuildProgress()
+    idx.build(repo_root=mini_repo, progress=progress2)
+    snap2 = progress2.snapshot()
+    assert snap2["chunks"]["to_embed"] == 0
+    assert snap2["chunks"]["done"] == snap2["chunks"]["total"] == stats["chunks_total"]
+
+
+@pytest.fixture()
+def client(tmp_path: Path) -> TestClient:
+    server._registry = ProjectRegistry(db_path=tmp_path / "registry.db")
+    server._project_indexes.clear()
+    with server._project_build_lock:
+        server._project_build_threads.clear()
+        server._project_last_build_result.clear()
+        server._project_last_build_error.clear()
+        server._project_build_progress.clear()
+    return TestClient(app)
+
+
+def test_status_and_stream_expose_progress(client: TestClient, mini_repo: Path, tmp_path: Path) -> None:
+    repo = tmp_path / "repo"
+    shutil.copytree(mini_repo, repo)
+    res = client.post("/projects", json={"path": str(repo), "name": "p", "mode": "embedded"})
+    pid = res.json()["data"]["project"]["id"]
+
+    body = client.get(f"/projects/{pid}/status").json()
+    assert body["data"]["progress"] is None
+
+    proj = server._get_registry().get_project(pid)
+    server._project_indexes[pid] = CodeIndex(index_dir=project_index_dir(proj), embedder=FakeEmbedder())
+
+    assert client.post(f"/projects/{pid}/build").status_code == 200
+    t = server._project_build_threads.get(pid)
+    if t is not None:
+        t.join(timeout=30)
+
+    progress = client.get(f"/projects/{pid}/status").json()["data"]["progress"]
+    assert progress["state"] == "succeeded"
+    assert progress["chunks"]["total"] > 0
+
+    with client.stream("GET", f"/projects/{pid}/build/stream") as res:
+        assert res.status_code == 200
+        assert res.headers["content-type"].startswith("text/event-stream")
+        text = "".join(res.iter_text())
+
+    events = [e for e in text.split("\n\n") if e]
+    assert len(events) == 1
+    assert events[0].startswith("event: progress\ndata: ")
+    data = json.loads(events[0].split("data: ", 1)[1])
+    assert data["state"] == "succeeded"
@@ -0,0 +1,153 @@
+"""
+Tests for the global build scheduler (limits, priorities, coalescing).
+
+Run with: pytest tests/test_build_scheduler.py -v
+"""
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Callable, List
+
+import pytest
+
+import codrag.server as server
+from codrag.core.project_registry import ProjectRegistry
+from codrag.core.scheduler import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_WATCHER,
+    BuildScheduler,
+)
+
+
+def _blocking(gate: threading.Event, started: threading.Event | None = None) -> Callable[[], None]:
+    def run() -> None:
+        if started is not None:
+            started.set()
+        gate.wait(5)
+
+    return run
+
+
+def test_worker_limit_and_queue_position() -> None:
+    sched = BuildScheduler(max_workers=2)
+    gate = threading.Event()
+    jobs = [sched.submit(("index", f"p{i}"), _blocking(gate)) for i in range(3)]
+
+    assert [j.state for j in jobs] == ["running", "running", "queued"]
+    assert sched.describe(("index", "p2"))["position"] == 1
+    assert sched.describe(("index", "p0"))["position"] is None
+    assert sched.describe(("index", "nope")) is None
+
+    gate.set()
+    for j in jobs:
+        assert j.join(5)
+    assert sched.stats()["running"] == 0
+
+
+def test_priority_order_interactive_first() -> None:
+    sched = BuildScheduler(max_workers=1)
+    gate = threading.Event()
+    order: List[str] = []
+    blocker = sched.submit(("index", "busy"), _blocking(gate))
+
+    sched.submit(("index", "bg"), lambda: order.append("bg"), priority=PRIORITY_BACKGROUND)
+    sched.submit(("index", "watch"), lambda: order.append("watch"), priority=PRIORITY_WATCHER)
+    last = sched.submit(("index", "ui"), lambda: order.append("ui"), priority=PRIORITY_INTERACTIVE)
+    assert sched.describe(("index", "ui"))["position"] == 1
+
+    gate.set()
+    blocker.join(5)
+    for key in ("bg", "watch"):
+        job = sched.get(("index", key))
+        if job is not None:
+            job.join(5)
+    last.join(5)
+    assert order == ["ui", "watch", "bg"]
+
+
+def test_queued_requests_coalesce_and_running_is_rejected() -> None:
+    sched = BuildScheduler(max_workers=1)
+    gate = threading.Event()
+    running = sched.submit(("index", "p"), _blocking(gate))
+    assert sched.submit(("index", "p"), lambda: None) is None
+
+    calls: List[str] = []
+    first = sched.submit(("trace", "p"), lambda: calls.append("first"), priority=PRIORITY_BACKGROUND)
+    second = sched.submit(("trace", "p"), lambda: calls.append("second"), priority=PRIORITY_WATCHER)
+    assert first is second
+    assert sched.describe(("trace", "p"))["priority"] == "watcher"
+
+    gate.set()
+    running.join(5)
+    second.join(5)
+    assert calls == ["second"]
+
+
+def test_kind_limit_lets_other_kinds_through() -> None:
+    sched = BuildScheduler(max_workers=2, kind_limits={"index": 1})
+    gate = threading.Event()
+    a = sched.submit(("index", "a"), _blocking(gate))
+    b = sched.submit(("index", "b"), _blocking(gate))
+    t = sched.submit(("trace", "a"), _blocking(gate))
+
+    assert (a.state, b.state, t.state) == ("running", "queued", "running")
+    gate.set()
+    for j in (a, b, t):
+        assert j.join(5)
+
+
+def test_cancel_queued() -> None:
+    sched = BuildScheduler(max_workers=1)
+    gate = threading.Event()
+    busy = sched.submit(("index", "busy"), _blocking(gate))
+    ran: List[bool] = []
+    queued = sched.submit(("index", "p"), lambda: ran.append(True))
+
+    assert sched.cancel_queued(("index", "p")) is True
+    assert queued.state == "cancelled" and not queued.is_alive()
+    assert sched.cancel_queued(("index", "busy")) is False
+
+    gate.set()
+    busy.join(5)
+    assert ran == []
+
+
+def test_watcher_trace_refresh_queues_behind_manual_builds(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    reg = ProjectRegistry(db_path=tmp_path / "registry.db")
+    repos = [tmp_path / "a", tmp_path / "b"]
+    for repo in repos:
+        repo.mkdir()
+    watched = reg.add_project(path=repos[0], name="a", config={"trace": {"enabled": True}})
+    manual = reg.add_project(path=repos[1], name="b")
+    sched = BuildScheduler(max_workers=1)
+    monkeypatch.setattr(server, "_registry", reg)
+    monkeypatch.setattr(server, "_build_scheduler", sched)
+    monkeypatch.setattr(server, "_project_build_threads", {})
+    monkeypatch.setattr(server, "_project_trace_build_threads", {})
+    monkeypatch.setattr(server, "_project_trace_pending", {})
+    monkeypatch.setattr(server, "_project_build_progress", {})
+    monkeypatch.setattr(server, "_project_build_cancel", {})
+
+    gate = threading.Event()
+    busy = sched.submit(("index", "busy"), _blocking(gate))
+    try:
+        assert server._trigger_watcher_builds(watched, ["x.py"])
+        assert server._start_project_trace_build(manual)
+
+        positions = {
+            key: sched.describe(key)["position"]
+            for key in (("trace", manual.id), ("index", watched.id), ("trace", watched.id))
+        }
+        assert positions == {("trace", manual.id): 1, ("index", watched.id): 2, ("trace", watched.id): 3}
+        assert sched.describe(("trace", watched.id))["priority"] == "background"
+    finally:
+        for key in (("trace", manual.id), ("index", watched.id), ("trace", watched.id)):
+            sched.cancel_queued(key)
+        gate.set()
+        busy.join(5)
+        reg.close()
@@ -0,0 +1,143 @@
+"""
+Tests for fast JSON encoding, compression and the encoded response cache.
+
+Uses FakeEmbedder so no Ollama dependency is required.
+Run with: pytest tests/test_encoding.py -v
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+import codrag.api.encoding as encoding
+import codrag.server as server
+from codrag.api.encoding import EncodedResponseCache, encode_json
+from codrag.core import CodeIndex, EmbeddingResult, FakeEmbedder
+from codrag.core.project_registry import ProjectRegistry, project_index_dir
+from codrag.server import app
+
+
+class CountingEmbedder(FakeEmbedder):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+
+    def embed(self, text: str) -> EmbeddingResult:
+        self.calls += 1
+        return super().embed(text)
+
+
+def test_encode_json_handles_numpy_and_unicode() -> None:
+    body = encode_json({"score": np.float32(0.5), "ids": np.arange(2), "text": "héllo"})
+    assert json.loads(body) == {"score": 0.5, "ids": [0, 1], "text": "héllo"}
+
+
+def test_encoded_response_cache_is_bounded() -> None:
+    cache = EncodedResponseCache(max_entries=2, max_bytes=1024)
+    cache.put(("p", "a"), {"x": 1})
+    cache.put(("p", "b"), {"x": 2})
+    assert cache.get(("p", "a")) is not None
+    cache.put(("q", "c"), {"x": 3})
+    assert cache.get(("p", "b")) is None  # least recently used
+
+    cache.put(("q", "big"), {"x": "y" * 2048})
+    assert cache.get(("q", "big")) is None  # larger than the whole cache
+
+    cache.invalidate(("p",))
+    assert cache.get(("p", "a")) is None and cache.get(("q", "c")) is not None
+
+
+def test_encoded_response_cache_counts_gzip_copies() -> None:
+    cache = EncodedResponseCache(max_entries=8, max_bytes=3000)
+    text = "".join(f"{i:08x}" for i in range(80))  # 640 hex chars: gzip cannot shrink it below ~50%
+    first = cache.put(("p", "a"), {"x": text})
+    cache.put(("p", "b"), {"x": text[::-1]})
+    used = cache.stats()["used_bytes"]
+    assert used == 2 * len(first.body)
+
+    extra = len(first.gzipped())
+    first.gzipped()  # already made: counted once
+    assert cache.stats()["used_bytes"] == used + extra
+
+    cache.put(("p", "c"), {"x": text.upper()}).gzipped()
+    cache.put(("p", "d"), {"x": text.lower()[::-1]}).gzipped()
+    assert cache.stats()["used_bytes"] <= 3000
+    assert cache.get(("p", "a")) is None
+
+    cache.clear()
+    assert cache.stats()["used_bytes"] == 0
+
+
+def test_compression_skips_encoded_bodies_and_event_streams() -> None:
+    demo = FastAPI()
+    demo.add_middleware(encoding.CompressionMiddleware, minimum_size=16)
+    payload = b'{"x": "' + b"y" * 4096 + b'"}'
+
+    @demo.get("/plain")
+    def plain() -> Response:
+        return Response(payload, media_type="application/json")
+
+    @demo.get("/encoded")
+    def encoded() -> Response:
+        return Response(gzip.compress(payload), media_type="application/json", headers={"Content-Encoding": "gzip"})
+
+    @demo.get("/stream")
+    def stream() -> StreamingResponse:
+        return StreamingResponse(iter([b"data: " + b"z" * 64 + b"\n\n"]), media_type="text/event-stream")
+
+    client = TestClient(demo)
+    headers = {"Accept-Encoding": "gzip"}
+    resp = client.get("/plain", headers=headers)
+    assert resp.headers["content-encoding"] == "gzip" and resp.content == payload
+
+    resp = client.get("/encoded", headers=headers)
+    assert resp.headers["content-encoding"] == "gzip" and resp.content == payload  # not compressed twice
+    resp = client.get("/stream", headers=headers)
+    assert "content-encoding" not in resp.headers
+    assert resp.text.startswith("data: z")
+
+
+def test_context_is_cached_compressed_and_invalidated_by_rebuild(
+    mini_repo: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(encoding, "GZIP_MINIMUM_SIZE", 0)  # mini_repo contexts are tiny
+    server._registry = ProjectRegistry(db_path=tmp_path / "registry.db")
+    server._project_indexes.clear()
+    server._response_cache.clear()
+    proj = server._registry.add_project(path=mini_repo, name="p", mode="embedded")
+    embedder = CountingEmbedder()
+    idx = CodeIndex(index_dir=project_index_dir(proj), embedder=embedder)
+    idx.build(repo_root=mini_repo)
+    server._project_indexes[proj.id] = idx
+
+    client = TestClient(app)
+    body = {"query": "add numbers", "min_score": -1.0, "max_chars": 4000}
+    embedder.calls = 0
+    first = client.post(f"/projects/{proj.id}/context", json=body, headers={"Accept-Encoding": "gzip"})
+    assert first.status_code == 200
+    assert first.headers["content-encoding"] == "gzip"
+    assert embedder.calls == 1
+
+    second = client.post(f"/projects/{proj.id}/context", json=body, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in second.headers
+    assert second.json() == first.json()
+    assert embedder.calls == 1
+
+    idx.build(repo_root=mini_repo)
+    embedder.calls = 0
+    client.post(f"/projects/{proj.id}/context", json=body)
+    assert embedder.calls == 1
+
+    client.post(f"/projects/{proj.id}/context?debug=timings", json=body)
+    assert embedder.calls == 2
+
+    metrics = client.get("/metrics").text
+    assert 'codrag_response_cache_lookups_total{endpoint="context",result="hit"}' in metrics
@@ -0,0 +1,150 @@
+"""
+Tests for the in-process event bus and the GET /events SSE stream.
+
+Run with: pytest tests/test_events.py -v
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import pytest
+from fastapi.testclient import TestClient
+
+import codrag.server as server
+from codrag.core.events import EVENT_BUILD_PROGRESS, EVENT_WATCH_STATE, EventBus
+from codrag.core.project_registry import ProjectRegistry
+from codrag.core.watcher import AutoRebuildWatcher
+from codrag.server import app
+
+
+def test_bus_filters_by_type_and_project() -> None:
+    bus = EventBus()
+    sub = bus.subscribe(types=[EVENT_WATCH_STATE], project_id="p1")
+
+    bus.publish(EVENT_BUILD_PROGRESS, "p1", {"phase": "embed"})
+    bus.publish(EVENT_WATCH_STATE, "p2", {"state": "idle"})
+    bus.publish(EVENT_WATCH_STATE, "p1", {"state": "debouncing"})
+
+    ev = sub.get(timeout=0)
+    assert ev is not None
+    assert ev.data == {"state": "debouncing"}
+    assert sub.get(timeout=0) is None
+
+    sub.close()
+    assert bus.subscriber_count() == 0
+
+
+def test_aget_is_woken_by_a_publishing_thread() -> None:
+    bus = EventBus()
+    sub = bus.subscribe()
+
+    async def wait() -> Tuple[Any, Any, float]:
+        assert await sub.aget(timeout=0.01) is None
+        loop = asyncio.get_running_loop()
+        publisher = threading.Timer(0.05, bus.publish, args=(EVENT_WATCH_STATE, "p1", {"state": "idle"}))
+        started = loop.time()
+        publisher.start()
+        event = await sub.aget(timeout=5)
+        return event, publisher, loop.time() - started
+
+    event, publisher, waited = asyncio.run(wait())
+    publisher.join()
+    assert event is not None and event.data == {"state": "idle"}
+    assert waited < 1.0  # woken by the publish, not by the timeout
+    sub.close()
+
+
+def test_slow_subscriber_drops_oldest() -> None:
+    bus = EventBus()
+    sub = bus.subscribe(max_queue=2)
+    for i in range(5):
+        bus.publish(EVENT_BUILD_PROGRESS, None, {"i": i})
+
+    assert sub.dropped == 3
+    assert [sub.get(timeout=0).data["i"], sub.get(timeout=0).data["i"]] == [3, 4]
+
+
+def test_subscribe_replays_after_last_event_id() -> None:
+    bus = EventBus(history=10)
+    first = bus.publish(EVENT_BUILD_PROGRESS, None, {"i": 0})
+    bus.publish(EVENT_BUILD_PROGRESS, None, {"i": 1})
+
+    sub = bus.subscribe(last_event_id=first.id)
+    ev = sub.get(timeout=0)
+    assert ev is not None and ev.data == {"i": 1}
+    assert sub.get(timeout=0) is None
+
+
+def test_watcher_reports_state_transitions(tmp_path: Path) -> None:
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "main.py").write_text("def main(): pass\n")
+
+    seen: List[Dict[str, Any]] = []
+    watcher = AutoRebuildWatcher(
+        repo_root=repo,
+        index_dir=tmp_path / "index",
+        on_trigger_build=lambda paths: True,
+        is_building=lambda: False,
+        on_state_change=seen.append,
+    )
+    watcher.start()
+    watcher.start()
+    watcher.stop()
+
+    assert [s["state"] for s in seen] == ["idle", "disabled"]
+
+
+@pytest.fixture()
+def client(tmp_path: Path) -> TestClient:
+    server._registry = ProjectRegistry(db_path=tmp_path / "registry.db")
+    server._events = EventBus()
+    return TestClient(app)
+
+
+def _parse_sse(text: str) -> List[Dict[str, str]]:
+    out = []
+    for block in text.split("\n\n"):
+        fields = {}
+        for line in block.splitlines():
+            if line.startswith(":") or ": " not in line:
+                continue
+            k, v = line.split(": ", 1)
+            fields[k] = v
+        if fields:
+            out.append(fields)
+    return out
+
+
+def test_events_endpoint_streams_and_resumes(client: TestClient) -> None:
+    first = server._events.publish(EVENT_BUILD_PROGRESS, "p1", {"phase": "read"})
+    server._events.publish(EVENT_WATCH_STATE, "p1", {"state": "idle"})
+    server._events.publish(EVENT_BUILD_PROGRESS, "p1", {"phase": "embed"})
+
+    with client.stream(
+        "GET",
+        "/events",
+        params={"types": EVENT_BUILD_PROGRESS, "max_events": 1},
+        headers={"Last-Event-ID": str(first.id)},
+    ) as res:
+        assert res.status_code == 200
+        assert res.headers["content-type"].startswith("text/event-stream")
+        events = _parse_sse("".join(res.iter_text()))
+
+    assert len(events) == 1
+    assert events[0]["event"] == EVENT_BUILD_PROGRESS
+    payload = json.loads(events[0]["data"])
+    assert payload["project_id"] == "p1"
+    assert payload["data"] == {"phase": "embed"}
+    assert server._events.subscriber_count() == 0
+
+
+def test_events_endpoint_rejects_unknown_type(client: TestClient) -> None:
+    res = client.get("/events", params={"types": "nope"})
+    assert res.status_code == 400
+    assert res.json()["error"]["code"] == "VALIDATION_ERROR"
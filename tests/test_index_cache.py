@@ -0,0 +1,105 @@
+"""
+Tests for the memory-budgeted LRU of loaded indexes.
+
+Run with: pytest tests/test_index_cache.py -v
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+import codrag.server as server
+from codrag.core import CodeIndex, FakeEmbedder
+from codrag.core.cache import IndexCache, MemoryBudget
+from codrag.core.project_registry import ProjectRegistry
+from codrag.server import app
+
+
+class Blob:
+    def __init__(self, size: int) -> None:
+        self.size = size
+
+    def memory_footprint(self) -> int:
+        return self.size
+
+
+def test_evicts_least_recently_used_across_caches() -> None:
+    evicted: List[Tuple[str, str]] = []
+    budget = MemoryBudget(250, on_evict=lambda c, k: evicted.append((c, k)))
+    indexes: IndexCache[Blob] = IndexCache("index", budget)
+    traces: IndexCache[Blob] = IndexCache("trace", budget)
+
+    indexes["a"] = Blob(100)
+    traces["a"] = Blob(100)
+    assert indexes.get("a") is not None  # "a" index is now more recent than "a" trace
+
+    indexes["b"] = Blob(100)
+    assert evicted == [("trace", "a")]
+    assert "a" in indexes and "b" in indexes
+    assert budget.usage()["used_bytes"] == 200
+    assert budget.evictions == 1
+
+
+def test_oversized_entry_is_kept_until_something_else_is_used() -> None:
+    budget = MemoryBudget(50)
+    cache: IndexCache[Blob] = IndexCache("index", budget)
+    cache["big"] = Blob(500)
+    assert "big" in cache
+
+    cache["small"] = Blob(10)
+    assert "big" not in cache and "small" in cache
+
+
+def test_zero_budget_disables_eviction() -> None:
+    budget = MemoryBudget(0)
+    cache: IndexCache[Blob] = IndexCache("index", budget)
+    for i in range(5):
+        cache[str(i)] = Blob(1_000_000)
+    assert len(cache) == 5
+
+
+def test_code_index_memory_maps_embeddings(mini_repo: Path, tmp_path: Path) -> None:
+    idx_dir = tmp_path / "index"
+    CodeIndex(index_dir=idx_dir, embedder=FakeEmbedder()).build(repo_root=mini_repo)
+
+    idx = CodeIndex(index_dir=idx_dir, embedder=FakeEmbedder())
+    assert isinstance(idx._embeddings, np.memmap)
+    assert idx.memory_footprint() >= idx._embeddings.nbytes
+    assert idx.search("add numbers", k=2, min_score=-1.0)
+
+
+def test_project_status_reports_memory(tmp_path: Path) -> None:
+    server._registry = ProjectRegistry(db_path=tmp_path / "registry.db")
+    server._project_indexes.clear()
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    client = TestClient(app)
+    pid = client.post("/projects", json={"path": str(repo), "name": "p", "mode": "embedded"}).json()["data"][
+        "project"
+    ]["id"]
+
+    memory = client.get(f"/projects/{pid}/status").json()["data"]["memory"]
+    assert memory["budget_bytes"] == server._index_memory_budget.limit_bytes
+    assert memory["project_bytes"] == 0
+    assert set(memory) == {"budget_bytes", "used_bytes", "evictions", "project_bytes"}
+
+
+def test_reloaded_indexes_share_one_embedder(tmp_path: Path) -> None:
+    server._registry = ProjectRegistry(db_path=tmp_path / "registry.db")
+    server._project_indexes.clear()
+    projects = []
+    for name in ("a", "b"):
+        (tmp_path / name).mkdir()
+        projects.append(server._registry.add_project(path=tmp_path / name, name=name))
+
+    first = server._get_project_index(projects[0])
+    server._project_indexes.clear()  # as if evicted; the next lookup builds a new CodeIndex
+    reloaded = server._get_project_index(projects[0])
+    other = server._get_project_index(projects[1])
+
+    assert reloaded is not first
+    assert first.embedder is reloaded.embedder is other.embedder is server._get_embedder()
@@ -0,0 +1,86 @@
+"""
+Tests for hot reload of indexes rebuilt by another process.
+
+Uses FakeEmbedder so no Ollama dependency is required.
+Run with: pytest tests/test_index_reload.py -v
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+from typing import List
+
+from codrag.core import CodeIndex, FakeEmbedder, IndexSnapshot
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_reload_picks_up_external_build(mini_repo: Path, tmp_path: Path) -> None:
+    idx_dir = tmp_path / "index"
+    writer = CodeIndex(index_dir=idx_dir, embedder=FakeEmbedder())
+    writer.build(repo_root=mini_repo)
+
+    reloaded: List[IndexSnapshot] = []
+    reader = CodeIndex(index_dir=idx_dir, embedder=FakeEmbedder(), on_reload=reloaded.append)
+    before = reader.snapshot()
+    assert reader.reload_if_changed() is False
+
+    (mini_repo / "extra.py").write_text("def extra(a):\n    return a * 2\n")
+    writer.build(repo_root=mini_repo)
+
+    assert reader.reload_if_changed() is True
+    after = reader.snapshot()
+    assert after.generation == before.generation + 1
+    assert len(after.documents or []) == len(writer.snapshot().documents or [])
+    assert reloaded == [after]
+
+
+def test_unchanged_build_time_does_not_reload(mini_repo: Path, tmp_path: Path) -> None:
+    idx_dir = tmp_path / "index"
+    CodeIndex(index_dir=idx_dir, embedder=FakeEmbedder()).build(repo_root=mini_repo)
+    reader = CodeIndex(index_dir=idx_dir, embedder=FakeEmbedder())
+    generation = reader.snapshot().generation
+
+    manifest = idx_dir / "manifest.json"
+    st = manifest.stat()
+    os.utime(manifest, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+
+    assert reader.reload_if_changed() is False
+    assert reader.snapshot().generation == generation
+
+
+def test_queries_trigger_background_reload(mini_repo: Path, tmp_path: Path) -> None:
+    idx_dir = tmp_path / "index"
+    writer = CodeIndex(index_dir=idx_dir, embedder=FakeEmbedder())
+    writer.build(repo_root=mini_repo)
+    reader = CodeIndex(index_dir=idx_dir, embedder=FakeEmbedder(), reload_interval_ms=1)
+    frozen = CodeIndex(index_dir=idx_dir, embedder=FakeEmbedder(), reload_interval_ms=0)
+    generation = reader.snapshot().generation
+
+    (mini_repo / "extra.py").write_text("def extra(a):\n    return a * 2\n")
+    writer.build(repo_root=mini_repo)
+
+    def reloaded() -> bool:
+        reader.search("add numbers", k=1, min_score=-1.0)
+        return reader.snapshot().generation > generation
+
+    assert _wait_for(reloaded)
+    frozen.search("add numbers", k=1, min_score=-1.0)
+    assert frozen.snapshot().generation == 1
+
+
+def test_own_build_is_not_reloaded(mini_repo: Path, tmp_path: Path) -> None:
+    idx = CodeIndex(index_dir=tmp_path / "index", embedder=FakeEmbedder())
+    idx.build(repo_root=mini_repo)
+    generation = idx.snapshot().generation
+    assert idx.reload_if_changed() is False
+    assert idx.snapshot().generation == generation
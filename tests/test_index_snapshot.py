@@ -0,0 +1,66 @@
+"""
+Tests for atomic index snapshots (queries never mix two builds).
+
+Uses FakeEmbedder so no Ollama dependency is required.
+Run with: pytest tests/test_index_snapshot.py -v
+"""
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import List
+
+from codrag.core import CodeIndex, FakeEmbedder
+
+
+def test_snapshot_survives_rebuild(mini_repo: Path, tmp_path: Path) -> None:
+    idx = CodeIndex(index_dir=tmp_path / "index", embedder=FakeEmbedder())
+    idx.build(repo_root=mini_repo)
+    old = idx.snapshot()
+    assert old.is_loaded()
+    old_docs = len(old.documents or [])
+
+    (mini_repo / "extra.py").write_text("def extra(a):\n    return a * 2\n")
+    idx.build(repo_root=mini_repo)
+    new = idx.snapshot()
+
+    assert new is not old
+    assert new.generation == old.generation + 1
+    assert len(new.documents or []) > old_docs
+    # The old generation is untouched and still searchable on its own.
+    assert len(old.documents or []) == old_docs == old.embeddings.shape[0]
+    results = idx._search_snapshot(old, "add numbers", 3, -1.0, None)
+    assert results and all(r.doc in old.documents for r in results)
+
+
+def test_queries_during_rebuilds_see_one_generation(mini_repo: Path, tmp_path: Path) -> None:
+    idx = CodeIndex(index_dir=tmp_path / "index", embedder=FakeEmbedder())
+    idx.build(repo_root=mini_repo)
+    errors: List[BaseException] = []
+    stop = threading.Event()
+
+    def query_loop() -> None:
+        while not stop.is_set():
+            try:
+                snap = idx.snapshot()
+                assert len(snap.documents or []) == snap.embeddings.shape[0]
+                idx.get_context_structured("add numbers", k=3, min_score=-1.0)
+            except BaseException as e:  # pragma: no cover - reported below
+                errors.append(e)
+                return
+
+    readers = [threading.Thread(target=query_loop) for _ in range(3)]
+    for t in readers:
+        t.start()
+    try:
+        for i in range(4):
+            (mini_repo / f"gen_{i}.py").write_text(f"def gen_{i}():\n    return {i}\n")
+            idx.build(repo_root=mini_repo)
+    finally:
+        stop.set()
+        for t in readers:
+            t.join(5)
+
+    assert errors == []
+    assert idx.stats()["generation"] == idx.snapshot().generation
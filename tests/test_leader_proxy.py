@@ -0,0 +1,86 @@
+"""
+Tests for forwarding control-plane requests from workers to the leader.
+
+Run with: pytest tests/test_leader_proxy.py -v
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from codrag.api.leader import LeaderProxyMiddleware
+from codrag.server import _routes_to_leader
+
+
+def _app(name: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/projects/{project_id}/build")
+    def build(project_id: str, full: bool = False) -> dict:
+        return {"served_by": name, "project_id": project_id, "full": full}
+
+    @app.post("/projects/{project_id}/search")
+    def search(project_id: str) -> dict:
+        return {"served_by": name}
+
+    return app
+
+
+class _DownTransport(httpx.AsyncBaseTransport):
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("connection refused", request=request)
+
+
+def _worker(leader_url: Optional[str], transport: httpx.AsyncBaseTransport) -> TestClient:
+    worker = _app("worker")
+    worker.add_middleware(
+        LeaderProxyMiddleware,
+        leader_url=lambda: leader_url,
+        routes=_routes_to_leader,
+        transport=transport,
+    )
+    return TestClient(worker)
+
+
+def test_control_routes_go_to_leader_and_queries_stay_local() -> None:
+    client = _worker("http://leader", httpx.ASGITransport(app=_app("leader")))
+
+    resp = client.post("/projects/p1/build", params={"full": "true"})
+    assert resp.status_code == 200
+    assert resp.json() == {"served_by": "leader", "project_id": "p1", "full": True}
+
+    assert client.post("/projects/p1/search").json() == {"served_by": "worker"}
+
+
+def test_nothing_is_forwarded_without_a_leader() -> None:
+    client = _worker(None, _DownTransport())
+    assert client.post("/projects/p1/build").json()["served_by"] == "worker"
+
+
+def test_unreachable_leader_is_a_503_envelope() -> None:
+    client = _worker("http://leader", _DownTransport())
+
+    resp = client.post("/projects/p1/build")
+    assert resp.status_code == 503
+    assert resp.headers["retry-after"] == "1"
+    body = resp.json()
+    assert body["success"] is False
+    assert body["error"]["code"] == "LEADER_UNAVAILABLE"
+
+
+def test_routes_to_leader() -> None:
+    assert _routes_to_leader("GET", "/events")
+    assert _routes_to_leader("POST", "/projects/p1/build/cancel")
+    assert _routes_to_leader("GET", "/projects/p1/build/stream")
+    assert _routes_to_leader("POST", "/projects/p1/watch/start")
+    assert _routes_to_leader("DELETE", "/projects/p1")
+    assert _routes_to_leader("POST", "/api/code-index/build")
+
+    assert not _routes_to_leader("GET", "/projects/p1")
+    assert not _routes_to_leader("POST", "/projects/p1/search")
+    assert not _routes_to_leader("GET", "/projects/p1/trace/search")
+    assert not _routes_to_leader("GET", "/health")
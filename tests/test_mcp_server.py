@@ -8,6 +8,7 @@ Tests cover:
 """
 
 import json
+import httpx
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 
@@ -17,6 +18,7 @@ from codrag.mcp_server import (
     MCP_PROTOCOL_VERSION,
     JSONRPC_VERSION,
     BuildInProgressError,
+    DaemonBusyError,
     DaemonUnavailableError,
     InvalidParamsError,
     MethodNotFoundError,
@@ -85,6 +87,24 @@ def mock_context_response():
     }
 
 
+def _busy_client(statuses):
+    """httpx client whose daemon answers with `statuses` in turn (then 200)."""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        status = statuses[len(calls) - 1] if len(calls) <= len(statuses) else 200
+        if status == 200:
+            return httpx.Response(200, json={"success": True, "data": {"results": []}, "error": None})
+        return httpx.Response(
+            status,
+            headers={"Retry-After": "0"},
+            json={"success": False, "data": None, "error": {"code": "SERVER_OVERLOADED", "message": "busy"}},
+        )
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler)), calls
+
+
 # =============================================================================
 # Protocol Tests
 # =============================================================================
@@ -524,3 +544,37 @@ class TestToolSchemas:
         """Test build tool has no required parameters."""
         build_tool = next(t for t in TOOLS if t["name"] == "codrag_build")
         assert build_tool["inputSchema"]["required"] == []
+
+
+# =============================================================================
+# Load Shedding Tests
+# =============================================================================
+
+class TestDaemonBusy:
+    """Test the client honours Retry-After when the daemon sheds load."""
+
+    @pytest.mark.asyncio
+    async def test_retries_after_busy_response(self, server):
+        """Test a 503/429 with Retry-After is retried and then succeeds."""
+        server._client, calls = _busy_client([503, 429])
+        result = await server.tool_search("hello")
+        assert result["count"] == 0
+        assert len(calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_gives_up_with_busy_error(self, server):
+        """Test persistent shedding surfaces as a DAEMON_BUSY tool error, not a timeout."""
+        server._client, calls = _busy_client([503, 503, 503, 503])
+        with pytest.raises(DaemonBusyError):
+            await server.tool_search("hello")
+        assert len(calls) == 3
+
+        server._client, _ = _busy_client([503, 503, 503, 503])
+        response = await server.handle_request({
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "tools/call",
+            "params": {"name": "codrag_search", "arguments": {"query": "hello"}},
+        })
+        assert response["result"]["isError"] is True
+        assert "busy" in response["result"]["content"][0]["text"]
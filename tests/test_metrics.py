@@ -0,0 +1,77 @@
+"""
+Tests for the in-process metrics registry and /metrics endpoint.
+
+Run with: pytest tests/test_metrics.py -v
+"""
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import requests
+from fastapi.testclient import TestClient
+
+import codrag.server as server
+from codrag.core.embedder import OllamaEmbedder
+from codrag.core.metrics import EMBED_ERRORS, EMBED_REQUESTS, EMBED_RETRIES, MetricsRegistry
+from codrag.core.project_registry import ProjectRegistry
+
+
+def test_registry_renders_prometheus_text() -> None:
+    reg = MetricsRegistry()
+    c = reg.counter("t_requests_total", "Requests.", ["route"])
+    g = reg.gauge("t_queue_depth", "Depth.")
+    h = reg.histogram("t_latency_seconds", "Latency.", buckets=(0.1, 1.0))
+
+    c.inc(route="/a")
+    c.inc(2, route="/a")
+    g.set(7)
+    h.observe(0.05)
+    h.observe(0.5)
+    h.observe(5.0)
+
+    text = reg.render()
+    assert "# TYPE t_requests_total counter" in text
+    assert 't_requests_total{route="/a"} 3' in text
+    assert "t_queue_depth 7" in text
+    assert 't_latency_seconds_bucket{le="0.1"} 1' in text
+    assert 't_latency_seconds_bucket{le="1"} 2' in text
+    assert 't_latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "t_latency_seconds_count 3" in text
+
+
+def test_registry_rejects_mismatched_labels() -> None:
+    reg = MetricsRegistry()
+    c = reg.counter("t_total", "Total.", ["a"])
+    with pytest.raises(ValueError):
+        c.inc(b="x")
+    assert reg.counter("t_total", "Total.", ["a"]) is c
+
+
+def test_ollama_embedder_counts_requests_errors_and_retries() -> None:
+    emb = OllamaEmbedder(model="metrics-test-model", max_retries=3)
+    before = (
+        EMBED_REQUESTS.value(model="metrics-test-model"),
+        EMBED_ERRORS.value(model="metrics-test-model"),
+        EMBED_RETRIES.value(model="metrics-test-model"),
+    )
+
+    with patch("codrag.core.embedder.requests.post", side_effect=requests.ConnectionError("down")):
+        with patch("codrag.core.embedder.time.sleep"):
+            with pytest.raises(requests.ConnectionError):
+                emb.embed("hello")
+
+    assert EMBED_REQUESTS.value(model="metrics-test-model") - before[0] == 3
+    assert EMBED_ERRORS.value(model="metrics-test-model") - before[1] == 3
+    assert EMBED_RETRIES.value(model="metrics-test-model") - before[2] == 2
+
+
+def test_metrics_endpoint(tmp_path: Path) -> None:
+    server._registry = ProjectRegistry(db_path=tmp_path / "registry.db")
+    client = TestClient(server.app)
+
+    res = client.get("/metrics")
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain")
+    assert "codrag_builds_running" in res.text
+    assert "# TYPE codrag_search_duration_seconds histogram" in res.text
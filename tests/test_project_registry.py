@@ -0,0 +1,79 @@
+"""
+Tests for ProjectRegistry connection reuse and the in-process project cache.
+
+Run with: pytest tests/test_project_registry.py -v
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from codrag.core.project_registry import ProjectRegistry
+
+
+def test_connection_is_reused_per_thread(tmp_path: Path) -> None:
+    reg = ProjectRegistry(db_path=tmp_path / "registry.db")
+    assert reg._connect() is reg._connect()
+
+    other: List[object] = []
+    t = threading.Thread(target=lambda: other.append(reg._connect()))
+    t.start()
+    t.join()
+    assert other[0] is not reg._connect()
+
+    reg.close()
+    assert reg.list_projects() == []
+
+
+def test_thread_connection_is_closed_when_thread_exits(tmp_path: Path) -> None:
+    reg = ProjectRegistry(db_path=tmp_path / "registry.db")
+    before = len(reg._conns)
+
+    other: List[sqlite3.Connection] = []
+    t = threading.Thread(target=lambda: other.append(reg._connect()))
+    t.start()
+    t.join()
+
+    assert len(reg._conns) == before
+    with pytest.raises(sqlite3.ProgrammingError):
+        other[0].execute("SELECT 1")
+
+
+def test_cached_lookup_does_not_query_projects(tmp_path: Path) -> None:
+    reg = ProjectRegistry(db_path=tmp_path / "registry.db")
+    proj = reg.add_project(path=tmp_path, name="p")
+    assert reg.get_project(proj.id) == proj
+
+    statements: List[str] = []
+    reg._probe.set_trace_callback(statements.append)
+    assert reg.get_project(proj.id) == proj
+    assert [p.id for p in reg.list_projects()] == [proj.id]
+    assert statements == ["PRAGMA data_version", "PRAGMA data_version"]
+
+
+def test_cache_follows_own_and_foreign_writes(tmp_path: Path) -> None:
+    db = tmp_path / "registry.db"
+    reg = ProjectRegistry(db_path=db)
+    a = reg.add_project(path=tmp_path / "a", name="a")
+    assert reg.get_project(a.id).name == "a"
+
+    reg.update_project(a.id, name="renamed", config={"k": 1})
+    assert reg.get_project(a.id).name == "renamed"
+    assert reg.get_project(a.id).config == {"k": 1}
+
+    # Another process (here: another registry on the same file) adds and removes.
+    foreign = ProjectRegistry(db_path=db)
+    b = foreign.add_project(path=tmp_path / "b", name="b")
+    assert reg.get_project(b.id) == b
+    assert [p.id for p in reg.list_projects()] == [b.id, a.id]
+
+    foreign.remove_project(a.id)
+    assert reg.get_project(a.id) is None
+
+    reg.remove_project(b.id)
+    assert reg.list_projects() == [] and foreign.list_projects() == []
@@ -0,0 +1,51 @@
+"""
+Tests for per-stage search/context timings.
+
+Uses FakeEmbedder so no Ollama dependency is required.
+Run with: pytest tests/test_search_timings.py -v
+"""
+
+from pathlib import Path
+
+from codrag.core import CodeIndex, FakeEmbedder
+from codrag.core.timing import StageTimings
+
+
+def test_stage_timings_accumulate_and_aggregate() -> None:
+    t = StageTimings()
+    t.add("vector", 2.0)
+    t.add("vector", 1.0)
+    t.add("fts", 0.5)
+    t.add("topk", 0.25)
+
+    d = t.as_dict()
+    assert d["vector_ms"] == 3.0
+    assert d["retrieval_ms"] == 3.5
+    assert d["rerank_ms"] == 0.25
+    assert d["total_ms"] >= 0.0
+
+
+def test_search_records_stage_spans(mini_repo: Path, tmp_path: Path) -> None:
+    idx = CodeIndex(index_dir=tmp_path / "index", embedder=FakeEmbedder())
+    idx.build(repo_root=mini_repo)
+
+    t = StageTimings()
+    idx.search("add numbers", k=3, min_score=-1.0, timings=t)
+
+    spans = t.spans()
+    for stage in ("embedding", "vector", "keyword", "fts", "boosts", "topk"):
+        assert stage in spans
+
+
+def test_context_structured_timings_are_optional(mini_repo: Path, tmp_path: Path) -> None:
+    idx = CodeIndex(index_dir=tmp_path / "index", embedder=FakeEmbedder())
+    idx.build(repo_root=mini_repo)
+
+    plain = idx.get_context_structured("add numbers", k=3, min_score=-1.0)
+    assert "timings" not in plain["meta"]
+
+    timed = idx.get_context_structured("add numbers", k=3, min_score=-1.0, include_timings=True)
+    timings = timed["meta"]["timings"]
+    assert "pack_ms" in timings
+    assert "embedding_ms" in timings
+    assert timings["total_ms"] >= timings["pack_ms"]
@@ -0,0 +1,95 @@
+"""
+Tests for `calls` edges (PythonAnalyzer call sites resolved at build time).
+
+Run with: pytest tests/test_trace_calls.py -v
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict, Tuple
+
+from codrag.core.trace import CALL_CONFIDENCE, METHOD_CALL_CONFIDENCE, TraceBuilder
+
+
+def _make_repo(root: Path) -> None:
+    pkg = root / "pkg"
+    pkg.mkdir(parents=True)
+    (pkg / "__init__.py").write_text("")
+    (pkg / "util.py").write_text("def helper():\n    return 1\n\n\nclass Tool:\n    def run(self):\n        return 2\n")
+    (pkg / "main.py").write_text(
+        "import pkg.util as u\n"
+        "from pkg import util\n"
+        "from .util import Tool, helper\n"
+        "\n"
+        "\n"
+        "def local():\n"
+        "    return 0\n"
+        "\n"
+        "\n"
+        "class App:\n"
+        "    def start(self, local=None):\n"
+        "        helper()\n"
+        "        helper()\n"
+        "        u.helper()\n"
+        "        util.Tool.run(None)\n"
+        "        Tool().run()\n"
+        "        self.stop()\n"
+        "        local()\n"
+        "        return unknown()\n"
+        "\n"
+        "    def stop(self):\n"
+        "        return local()\n"
+    )
+
+
+def _calls(out: Path) -> Dict[Tuple[str, str], dict]:
+    edges = [json.loads(line) for line in (out / "trace_edges.jsonl").read_text().splitlines()]
+    short = lambda node_id: node_id.split(":", 1)[1].split("@")[0]
+    return {(short(e["source"]), short(e["target"])): e["metadata"] for e in edges if e["kind"] == "calls"}
+
+
+def test_calls_resolve_through_scope_and_imports(tmp_path: Path) -> None:
+    repo = tmp_path / "repo"
+    _make_repo(repo)
+    out = tmp_path / "out"
+    manifest = TraceBuilder(repo_root=repo, index_dir=out, workers=1).build()
+    assert manifest["last_error"] is None
+
+    calls = _calls(out)
+    assert set(calls) == {
+        ("App.start", "helper"),
+        ("App.start", "Tool.run"),
+        ("App.start", "Tool"),
+        ("App.start", "App.stop"),
+        ("App.stop", "local"),
+    }
+    # helper() twice plus u.helper(): one edge, three call sites.
+    assert calls[("App.start", "helper")] == {"call_sites": 3, "confidence": CALL_CONFIDENCE, "line": 12}
+    assert calls[("App.start", "App.stop")]["confidence"] == METHOD_CALL_CONFIDENCE
+    # `local` is a parameter of start(), so local() there is not the module function.
+    assert ("App.start", "local") not in calls
+    assert manifest["build"]["call_edges"] == 5
+
+
+def test_calls_follow_edits_and_respect_max_edges(tmp_path: Path) -> None:
+    repo = tmp_path / "repo"
+    _make_repo(repo)
+    out = tmp_path / "out"
+    TraceBuilder(repo_root=repo, index_dir=out, workers=1).build()
+
+    # Only util.py changes; main.py is reused from the cache, and its calls
+    # must now point at the moved helper.
+    util = repo / "pkg" / "util.py"
+    util.write_text("\n\n" + util.read_text())
+    manifest = TraceBuilder(repo_root=repo, index_dir=out, workers=1).build(changed_paths={"pkg/util.py"})
+    assert manifest["build"]["files_reused"] == 2
+    edges = [json.loads(line) for line in (out / "trace_edges.jsonl").read_text().splitlines()]
+    targets = {e["target"] for e in edges if e["kind"] == "calls"}
+    assert "sym:helper@pkg/util.py:3" in targets
+
+    small = TraceBuilder(repo_root=repo, index_dir=tmp_path / "small", workers=1, max_edges=12).build()
+    assert small["last_error"] is None
+    assert small["counts"]["edges"] <= 12
+    assert small["build"]["call_edges_dropped"] > 0
@@ -169,3 +169,55 @@ def test_trace_search_node_and_neighbors_endpoints(client: TestClient, tmp_path:
     assert body_neighbors_alias["success"] is True
     assert "nodes" in body_neighbors_alias["data"]
     assert "edges" in body_neighbors_alias["data"]
+
+
+def test_trace_neighbors_endpoint_expands_multiple_hops(client: TestClient, tmp_path: Path) -> None:
+    repo_root = tmp_path / "repo"
+    repo_root.mkdir(parents=True, exist_ok=True)
+    (repo_root / "a.py").write_text("import b\n")
+    (repo_root / "b.py").write_text("import c\n")
+    (repo_root / "c.py").write_text("X = 1\n")
+
+    project_id = _add_embedded_project(client, repo_root)
+    _enable_trace(client, project_id)
+    _build_trace_index(project_id, repo_root)
+
+    file_node_id = quote(stable_file_node_id("a.py"), safe="")
+    res = client.get(f"/projects/{project_id}/trace/neighbors/{file_node_id}", params={"hops": 1})
+    assert res.status_code == 200
+    assert {n["id"] for n in res.json()["data"]["nodes"]} == {"file:a.py", "file:b.py"}
+
+    res2 = client.get(
+        f"/projects/{project_id}/trace/neighbors/{file_node_id}",
+        params={"hops": 2, "direction": "out"},
+    )
+    assert res2.status_code == 200
+    data = res2.json()["data"]
+    assert [n["id"] for n in data["nodes"]] == ["file:a.py", "file:b.py", "file:c.py"]
+    assert len(data["edges"]) == 2
+    assert data["hops"] == 2 and data["truncated"] is False
+
+
+def test_trace_stats_endpoint(client: TestClient, tmp_path: Path) -> None:
+    repo_root = tmp_path / "repo"
+    repo_root.mkdir(parents=True, exist_ok=True)
+    (repo_root / "a.py").write_text("import b\n")
+    (repo_root / "b.py").write_text("X = 1\n")
+
+    project_id = _add_embedded_project(client, repo_root)
+    res = client.get(f"/projects/{project_id}/trace/stats")
+    assert res.status_code == 409
+    assert res.json()["error"]["code"] == "TRACE_DISABLED"
+
+    _enable_trace(client, project_id)
+    _build_trace_index(project_id, repo_root)
+
+    res = client.get(f"/projects/{project_id}/trace/stats")
+    assert res.status_code == 200
+    data = res.json()["data"]
+    assert data["node_count"] >= 2 and "avg_degree" in data and "components" in data
+    assert data["top_files"][0]["file_path"] == "b.py"
+    assert "file_importance" not in data
+
+    res2 = client.get(f"/projects/{project_id}/trace/stats", params={"include_files": True})
+    assert res2.json()["data"]["file_importance"]["b.py"] == 1.0
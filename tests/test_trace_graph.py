@@ -0,0 +1,82 @@
+"""
+Tests for the compact TraceGraph behind TraceIndex.
+
+Run with: pytest tests/test_trace_graph.py -v
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from codrag.core.trace import TraceBuilder, TraceIndex
+from codrag.core.trace_graph import TraceGraph
+
+
+def _build(mini_repo: Path, out: Path) -> None:
+    manifest = TraceBuilder(repo_root=mini_repo, index_dir=out, workers=1).build()
+    assert manifest["last_error"] is None
+
+
+def test_graph_materializes_rows_unchanged(mini_repo: Path, tmp_path: Path) -> None:
+    _build(mini_repo, tmp_path)
+    nodes = [json.loads(line) for line in (tmp_path / "trace_nodes.jsonl").read_text().splitlines()]
+    edges = [json.loads(line) for line in (tmp_path / "trace_edges.jsonl").read_text().splitlines()]
+
+    graph = TraceGraph.from_jsonl(tmp_path / "trace_nodes.jsonl", tmp_path / "trace_edges.jsonl")
+    assert graph.node_count == len(nodes) and graph.edge_count == len(edges)
+    assert [json.dumps(graph.node_dict(i)) for i in range(graph.node_count)] == [json.dumps(n) for n in nodes]
+    assert [json.dumps(graph.edge_dict(i)) for i in range(graph.edge_count)] == [json.dumps(e) for e in edges]
+
+
+def test_index_neighbors_and_degree_use_csr(mini_repo: Path, tmp_path: Path) -> None:
+    _build(mini_repo, tmp_path)
+    edges = [json.loads(line) for line in (tmp_path / "trace_edges.jsonl").read_text().splitlines()]
+    idx = TraceIndex(tmp_path)
+    assert idx.load()
+
+    source = edges[0]["source"]
+    out_edges = [e for e in edges if e["source"] == source]
+    in_edges = [e for e in edges if e["target"] == source]
+    assert idx.degree(source) == (len(in_edges), len(out_edges))
+    assert idx.degree("file:missing.py") == (0, 0)
+
+    got = idx.get_neighbors(source, direction="out", edge_kinds=["contains"], max_nodes=100)
+    assert got["out_edges"] == [e for e in out_edges if e["kind"] == "contains"]
+    assert [n["id"] for n in got["out_nodes"]] == [e["target"] for e in got["out_edges"]]
+    assert got["in_edges"] == [] and got["in_nodes"] == []
+    assert idx.get_neighbors(source, edge_kinds=["no-such-kind"])["out_edges"] == []
+
+    assert idx.memory_footprint() > 0
+
+
+def test_binary_graph_round_trips_and_is_memory_mapped(mini_repo: Path, tmp_path: Path) -> None:
+    _build(mini_repo, tmp_path)
+    built = TraceGraph.from_jsonl(tmp_path / "trace_nodes.jsonl", tmp_path / "trace_edges.jsonl")
+    opened = TraceGraph.open(tmp_path / "trace_graph.bin")
+
+    # Views over the read-only mapping, not copies.
+    assert not opened.edge_src.flags.writeable and not opened.names.data.flags.writeable
+    assert opened.nodes(range(opened.node_count)) == built.nodes(range(built.node_count))
+    assert opened.edges(range(opened.edge_count)) == built.edges(range(built.edge_count))
+    some_id = built.node_dict(built.node_count - 1)["id"]
+    assert opened.index_of(some_id) == built.node_count - 1
+    assert opened.index_of("file:nope.py") is None
+
+    (tmp_path / "bad.bin").write_bytes(b"not a graph at all")
+    with pytest.raises(ValueError):
+        TraceGraph.open(tmp_path / "bad.bin")
+
+
+def test_index_loads_without_jsonl_and_status_skips_graph(mini_repo: Path, tmp_path: Path) -> None:
+    _build(mini_repo, tmp_path)
+    manifest = TraceBuilder(repo_root=mini_repo, index_dir=tmp_path, workers=1, write_jsonl=False).build()
+    assert not (tmp_path / "trace_nodes.jsonl").exists()
+
+    idx = TraceIndex(tmp_path)
+    assert idx.status()["counts"]["nodes"] == manifest["counts"]["nodes"]
+    assert not idx.is_loaded()
+    assert idx.load()
+    assert idx.search_nodes("add", limit=1)
@@ -0,0 +1,140 @@
+"""
+Tests for the TS/JS, Go and Rust import scanners and their resolution.
+
+Run with: pytest tests/test_trace_imports.py -v
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict
+
+from codrag.core.trace import TraceBuilder
+from codrag.core.trace_imports import expand_use_tree, scan_source
+
+
+def _write(root: Path, files: Dict[str, str]) -> None:
+    for rel, text in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+
+
+def _make_repo(root: Path) -> None:
+    _write(
+        root,
+        {
+            "tsconfig.json": '{\n  // shared\n  "compilerOptions": {"baseUrl": ".", "paths": {"@lib/*": ["web/lib/*"],},},\n}\n',
+            "web/tsconfig.json": '{"extends": "../tsconfig.json"}\n',
+            "web/app.ts": (
+                'import React from "react";\n'
+                'import { add } from "@lib/math";\n'
+                'import { Button } from "@acme/ui";\n'
+                'import "./side.js";\n'
+                "export const main = () => add(1, 2);\n"
+            ),
+            "web/side.ts": "export {}\n",
+            "web/lib/math.ts": "export function add(a: number, b: number) {\n  return a + b;\n}\n",
+            "packages/ui/package.json": '{"name": "@acme/ui", "source": "src/index.ts"}\n',
+            "packages/ui/src/index.ts": 'export { Button } from "./button";\n',
+            "packages/ui/src/button.tsx": "export class Button {}\n",
+            "svc/go.mod": "module example.com/svc\n\ngo 1.21\n",
+            "svc/main.go": 'package main\n\nimport (\n\t"fmt"\n\tdb "example.com/svc/db"\n)\n\nfunc main() {}\n',
+            "svc/db/db.go": "package db\n\ntype Store struct{}\n\nfunc (s *Store) Get() int {\n\treturn 0\n}\n",
+            "svc/db/db_test.go": "package db\n",
+            "crates/core/Cargo.toml": '[package]\nname = "acme-core"\n',
+            "crates/core/src/lib.rs": "pub mod net;\nuse std::io::{Read, Write};\npub fn core() {}\n",
+            "crates/core/src/net.rs": "use super::core;\npub struct Conn;\n",
+            "crates/app/Cargo.toml": '[package]\nname = "app"\n',
+            "crates/app/src/main.rs": "use acme_core::net::Conn;\nfn main() {}\n",
+        },
+    )
+
+
+def _imports(out: Path) -> Dict[str, Dict[str, str]]:
+    edges = [json.loads(line) for line in (out / "trace_edges.jsonl").read_text().splitlines()]
+    by_source: Dict[str, Dict[str, str]] = {}
+    for e in edges:
+        if e["kind"] == "imports":
+            by_source.setdefault(e["source"][len("file:") :], {})[e["metadata"]["import"]] = e["target"]
+    return by_source
+
+
+def test_scanners_skip_comments_and_strings() -> None:
+    js = (
+        '/* import a from "./nope" */\n'
+        "const s = \"import b from './nope'\";\n"
+        'import x, { y as z } from "./x";\n'
+        'export * from "./all";\n'
+        'const lazy = import("./lazy"), old = require("./old");\n'
+        "export default class Widget {\n  render() {}\n}\n"
+    )
+    imports, symbols = scan_source(js, "typescript")
+    assert imports == [("./x", 3), ("./all", 4), ("./lazy", 5), ("./old", 5)]
+    assert [(s[0], s[2], s[3], s[4]) for s in symbols] == [("Widget", "class", 6, 8)]
+
+    go = 'package p\n\n// import "nope"\nimport (\n\t"fmt"\n\t_ "embed"\n)\n\nfunc (t *T) Run() {}\n'
+    imports, symbols = scan_source(go, "go")
+    assert imports == [("fmt", 5), ("embed", 6)]
+    assert [(s[1], s[2], s[5]) for s in symbols] == [("T.Run", "method", True)]
+
+    rust = "mod a;\nuse crate::{b::{self, C as D}, e::*};\nfn f<'x>(c: &'x str) { let q = '\"'; }\n"
+    imports, symbols = scan_source(rust, "rust")
+    assert imports == [("self::a", 1), ("crate::b", 2), ("crate::b::C", 2), ("crate::e", 2)]
+    assert [(s[0], s[5]) for s in symbols] == [("f", False)]
+    assert expand_use_tree("::std::{io, fmt::Write}") == ["std::io", "std::fmt::Write"]
+
+
+def test_build_resolves_tsconfig_packages_go_modules_and_crates(tmp_path: Path) -> None:
+    repo = tmp_path / "repo"
+    _make_repo(repo)
+    out = tmp_path / "out"
+    manifest = TraceBuilder(repo_root=repo, index_dir=out, workers=1).build()
+    assert manifest["last_error"] is None
+
+    imports = _imports(out)
+    assert imports["web/app.ts"] == {
+        "react": "ext:react",
+        "@lib/math": "file:web/lib/math.ts",
+        "@acme/ui": "file:packages/ui/src/index.ts",
+        "./side.js": "file:web/side.ts",
+    }
+    assert imports["packages/ui/src/index.ts"] == {"./button": "file:packages/ui/src/button.tsx"}
+    # A Go import points at every non-test file of the package.
+    assert imports["svc/main.go"] == {"fmt": "ext:fmt", "example.com/svc/db": "file:svc/db/db.go"}
+    assert imports["crates/core/src/lib.rs"] == {
+        "self::net": "file:crates/core/src/net.rs",
+        "std::io::Read": "ext:std",
+        "std::io::Write": "ext:std",
+    }
+    assert imports["crates/core/src/net.rs"] == {"super::core": "file:crates/core/src/lib.rs"}
+    assert imports["crates/app/src/main.rs"] == {"acme_core::net::Conn": "file:crates/core/src/net.rs"}
+
+    nodes = [json.loads(line) for line in (out / "trace_nodes.jsonl").read_text().splitlines()]
+    get = next(n for n in nodes if n["id"] == "sym:Store.Get@svc/db/db.go:5")
+    assert get["language"] == "go" and get["span"] == {"start_line": 5, "end_line": 7}
+    assert {n["name"] for n in nodes if n["kind"] == "external_module"} == {"fmt", "react", "std"}
+
+
+def test_incremental_build_follows_new_files_and_config(tmp_path: Path) -> None:
+    repo = tmp_path / "repo"
+    _make_repo(repo)
+    out = tmp_path / "out"
+    TraceBuilder(repo_root=repo, index_dir=out, workers=1).build()
+
+    (repo / "svc" / "db" / "more.go").write_text("package db\n")
+    (repo / "tsconfig.json").write_text('{"compilerOptions": {"paths": {"@lib/*": ["packages/ui/src/*"]}}}')
+    (repo / "packages" / "ui" / "src" / "math.ts").write_text("export const add = 1;\n")
+    manifest = TraceBuilder(repo_root=repo, index_dir=out, workers=1).build()
+    assert manifest["build"]["mode"] == "incremental"
+    assert manifest["build"]["files_analyzed"] == 2
+
+    fresh = tmp_path / "fresh"
+    TraceBuilder(repo_root=repo, index_dir=fresh, workers=1).build()
+    for name in ("trace_nodes.jsonl", "trace_edges.jsonl"):
+        assert (out / name).read_bytes() == (fresh / name).read_bytes()
+    imports = _imports(out)
+    assert imports["web/app.ts"]["@lib/math"] == "file:packages/ui/src/math.ts"
+    edges = (out / "trace_edges.jsonl").read_text()
+    assert "file:svc/main.go:file:svc/db/more.go" in edges
@@ -0,0 +1,91 @@
+"""
+Tests for incremental trace builds (per-file cache, changed_paths).
+
+Run with: pytest tests/test_trace_incremental.py -v
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+from codrag.core.trace import TraceBuilder
+
+
+def _make_repo(root: Path) -> None:
+    pkg = root / "pkg"
+    pkg.mkdir(parents=True)
+    (pkg / "__init__.py").write_text("")
+    (pkg / "a.py").write_text("from . import b\nimport pkg.helpers\n\n\ndef a():\n    return b.b()\n")
+    (pkg / "b.py").write_text("def b():\n    return 1\n")
+    (pkg / "c.py").write_text("from .gone import x\n\n\nclass C:\n    pass\n")
+    (pkg / "gone.py").write_text("x = 1\n")
+
+
+def _build(repo: Path, out: Path, **kwargs) -> dict:
+    return TraceBuilder(repo_root=repo, index_dir=out, workers=1).build(**kwargs)
+
+
+def _outputs(out: Path) -> tuple:
+    return (out / "trace_nodes.jsonl").read_bytes(), (out / "trace_edges.jsonl").read_bytes()
+
+
+def test_incremental_build_matches_full_build(tmp_path: Path) -> None:
+    repo = tmp_path / "repo"
+    _make_repo(repo)
+    out = tmp_path / "incremental"
+    first = _build(repo, out)
+    assert first["build"]["mode"] == "full"
+    assert first["build"]["files_analyzed"] == 5
+
+    (repo / "pkg" / "b.py").write_text("def b():\n    return 2\n\n\ndef b2():\n    return 3\n")
+    (repo / "pkg" / "helpers.py").write_text("def help():\n    pass\n")
+    (repo / "pkg" / "gone.py").unlink()
+    changed = {"pkg/b.py", "pkg/helpers.py", "pkg/gone.py"}
+
+    manifest = _build(repo, out, changed_paths=changed)
+    assert manifest["last_error"] is None
+    assert manifest["build"] == {
+        "mode": "incremental",
+        "files_analyzed": 2,
+        "files_reused": 3,
+        # a.py gains pkg/helpers.py, c.py loses pkg/gone.py.
+        "importers_reresolved": 2,
+        # a() -> b.b() through `from . import b`.
+        "call_edges": 1,
+        "call_edges_dropped": 0,
+    }
+
+    fresh = tmp_path / "fresh"
+    _build(repo, fresh)
+    assert _outputs(out) == _outputs(fresh)
+
+    edges = [json.loads(line) for line in (out / "trace_edges.jsonl").read_text().splitlines()]
+    targets = {e["metadata"]["import"]: e["target"] for e in edges if e["kind"] == "imports"}
+    assert targets["pkg.helpers"] == "file:pkg/helpers.py"
+    assert ".gone" not in targets
+
+
+def test_rebuild_without_changed_paths_uses_content_hash(tmp_path: Path) -> None:
+    repo = tmp_path / "repo"
+    _make_repo(repo)
+    out = tmp_path / "out"
+    _build(repo, out)
+
+    # Same content, new mtime: reused after a hash check.
+    b = repo / "pkg" / "b.py"
+    b.write_text(b.read_text())
+    os.utime(b, ns=(1, 1))
+    # New content: re-analyzed even though nobody said it changed.
+    (repo / "pkg" / "c.py").write_text("class C:\n    pass\n\n\nclass D(C):\n    pass\n")
+
+    manifest = _build(repo, out)
+    assert manifest["build"]["files_analyzed"] == 1
+    assert manifest["build"]["files_reused"] == 4
+    nodes = (out / "trace_nodes.jsonl").read_text()
+    assert '"name": "D"' in nodes
+
+    full = _build(repo, out, full=True)
+    assert full["build"]["mode"] == "full"
+    assert full["build"]["files_analyzed"] == 5
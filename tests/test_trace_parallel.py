@@ -0,0 +1,75 @@
+"""
+Tests for parallel Python parsing in TraceBuilder.
+
+Run with: pytest tests/test_trace_parallel.py -v
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+import codrag.core.trace as trace
+from codrag.core.trace import TraceBuilder
+
+
+def _make_repo(root: Path, n: int = 40) -> None:
+    pkg = root / "pkg"
+    pkg.mkdir(parents=True)
+    (pkg / "__init__.py").write_text("")
+    for i in range(n):
+        (pkg / f"mod{i:02d}.py").write_text(
+            f"import os\n"
+            f"from . import mod{(i + 1) % n:02d}\n"
+            f"from pkg.mod{(i + 2) % n:02d} import thing\n\n"
+            f"class C{i}:\n"
+            f'    """Class {i}."""\n\n'
+            f"    async def run(self):\n"
+            f"        return {i}\n\n\n"
+            f"def thing():\n"
+            f"    return C{i}()\n"
+        )
+    (pkg / "broken.py").write_text("def oops(:\n")
+    (root / "README.md").write_text("# repo\n")
+    (root / "web.ts").write_text("export const x = 1;\n")
+
+
+def _build(repo: Path, out: Path, workers: int) -> dict:
+    manifest = TraceBuilder(repo_root=repo, index_dir=out, workers=workers).build()
+    manifest.pop("built_at")
+    manifest.pop("project")
+    return manifest
+
+
+def test_parallel_build_is_byte_identical_to_serial(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    repo = tmp_path / "repo"
+    _make_repo(repo)
+    monkeypatch.setattr(trace, "PARALLEL_MIN_FILES", 1)
+
+    serial = _build(repo, tmp_path / "serial", workers=1)
+    parallel = _build(repo, tmp_path / "parallel", workers=3)
+
+    assert serial == parallel
+    assert serial["counts"]["files_failed"] == 1 and serial["last_error"] is None
+    for name in ("trace_nodes.jsonl", "trace_edges.jsonl"):
+        assert (tmp_path / "serial" / name).read_bytes() == (tmp_path / "parallel" / name).read_bytes()
+
+    nodes = [json.loads(line) for line in (tmp_path / "parallel" / "trace_nodes.jsonl").read_text().splitlines()]
+    assert sum(1 for n in nodes if n["kind"] == "symbol" and n["language"] == "python") == 40 * 3
+    assert [n["name"] for n in nodes if n["language"] == "typescript" and n["kind"] == "symbol"] == ["x"]
+
+
+def test_parallel_build_respects_node_cap(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    repo = tmp_path / "repo"
+    _make_repo(repo)
+    monkeypatch.setattr(trace, "PARALLEL_MIN_FILES", 1)
+
+    def capped(out: Path, workers: int) -> dict:
+        manifest = TraceBuilder(repo_root=repo, index_dir=out, workers=workers, max_nodes=30).build()
+        manifest.pop("built_at")
+        return manifest
+
+    # Stopping early is decided in path order, so both builds stop at the same file.
+    assert capped(tmp_path / "serial", 1) == capped(tmp_path / "parallel", 2)
@@ -0,0 +1,64 @@
+"""
+Tests for ModuleResolver (file-list based Python import resolution).
+
+Run with: pytest tests/test_trace_resolver.py -v
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from codrag.core.trace import ModuleResolver, TraceBuilder
+
+
+def test_resolver_maps_modules_packages_and_src_roots() -> None:
+    resolver = ModuleResolver(
+        [
+            "setup.py",
+            "src/app/__init__.py",
+            "src/app/core.py",
+            "src/app/util/__init__.py",
+            "dup.py",
+            "dup/__init__.py",
+            "libs/tool/src/tool/__init__.py",
+            "weird/src/__init__.py",
+            "weird/src/x.py",
+        ]
+    )
+    assert resolver.roots == ["", "libs/tool/src", "src"]
+    assert resolver.resolve("app.core") == "src/app/core.py"
+    assert resolver.resolve("app.util") == "src/app/util/__init__.py"
+    assert resolver.resolve("tool") == "libs/tool/src/tool/__init__.py"
+    # Module file wins over the package directory, like the old disk probe.
+    assert resolver.resolve("dup") == "dup.py"
+    # weird/src is a package, so it is not a root.
+    assert resolver.resolve("x") is None
+    assert resolver.resolve("weird.src.x") == "weird/src/x.py"
+    assert resolver.resolve("os") is None
+
+    assert resolver.resolve_relative("src/app/core.py", "util", 1) == "src/app/util/__init__.py"
+    assert resolver.resolve_relative("src/app/util/__init__.py", "core", 2) == "src/app/core.py"
+    assert resolver.resolve_relative("src/app/core.py", "", 1) == "src/app/__init__.py"
+    assert resolver.resolve_relative("setup.py", "dup", 1) == "dup.py"
+
+
+def test_build_resolves_against_enumerated_files_only(tmp_path: Path) -> None:
+    repo = tmp_path / "repo"
+    (repo / "src" / "app").mkdir(parents=True)
+    (repo / "src" / "app" / "__init__.py").write_text("")
+    (repo / "src" / "app" / "main.py").write_text("import app.secret\nfrom app import helpers\n")
+    (repo / "src" / "app" / "helpers.py").write_text("def h():\n    pass\n")
+    # Exists on disk but excluded from the trace: must not become an edge target.
+    (repo / "src" / "app" / "secret.py").write_text("KEY = 1\n")
+
+    out = tmp_path / "out"
+    manifest = TraceBuilder(
+        repo_root=repo, index_dir=out, exclude_globs=["**/secret.py"], workers=1
+    ).build()
+    assert manifest["last_error"] is None
+
+    edges = [json.loads(line) for line in (out / "trace_edges.jsonl").read_text().splitlines()]
+    targets = {e["metadata"]["import"]: e["target"] for e in edges if e["kind"] == "imports"}
+    assert targets["app"] == "file:src/app/__init__.py"
+    assert targets["app.secret"] == "ext:app.secret"
@@ -0,0 +1,84 @@
+"""
+Tests for trace graph statistics (PageRank, components, file importance).
+
+Run with: pytest tests/test_trace_stats.py -v
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from codrag.core import CodeIndex, FakeEmbedder
+from codrag.core.trace import TraceBuilder, TraceIndex
+from codrag.core.trace_stats import connected_components, pagerank
+
+
+def _make_repo(root: Path) -> Path:
+    root.mkdir()
+    (root / "core.py").write_text("def base():\n    return 1\n")
+    (root / "a.py").write_text("import core\n\n\ndef alpha():\n    return core.base()\n")
+    (root / "b.py").write_text("import core\n\n\ndef beta():\n    return core.base()\n")
+    (root / "c.py").write_text("import a\n\n\ndef gamma():\n    return a.alpha()\n")
+    (root / "lonely.py").write_text("def lonely():\n    return 0\n")
+    return root
+
+
+def test_pagerank_and_components() -> None:
+    # 0 -> 1 -> 2 and 3 -> 2; 4 and 5 linked; 6 alone.
+    src = np.array([0, 1, 3, 4])
+    dst = np.array([1, 2, 2, 5])
+    rank, _iterations, converged = pagerank(src, dst, 7)
+    assert converged
+    assert abs(rank.sum() - 1.0) < 1e-9
+    assert int(np.argmax(rank)) == 2
+    assert rank[1] > rank[0]
+
+    labels = connected_components(src, dst, 7)
+    assert labels.tolist() == [0, 0, 0, 0, 4, 4, 6]
+
+
+def test_build_stores_stats_and_file_importance(tmp_path: Path) -> None:
+    repo = _make_repo(tmp_path / "repo")
+    out = tmp_path / "out"
+    TraceBuilder(repo_root=repo, index_dir=out, workers=1).build()
+
+    stored = json.loads((out / "trace_stats.json").read_text())
+    assert stored["node_count"] > 0 and stored["pagerank"]["converged"]
+    importance = stored["file_importance"]
+    assert importance["core.py"] == 1.0
+    assert importance["core.py"] > importance["a.py"] > importance["c.py"]
+    assert stored["top_files"][0] == {"file_path": "core.py", "importance": 1.0}
+    # lonely.py and its symbol are their own component.
+    assert stored["components"]["count"] >= 2
+    assert stored["top_hubs"][0]["degree"] >= stored["top_hubs"][-1]["degree"]
+
+    idx = TraceIndex(out)
+    assert idx.file_importance() == importance
+
+    # Traces built before trace_stats.json: computed from the graph.
+    (out / "trace_stats.json").unlink()
+    assert TraceIndex(out).stats() == stored
+
+
+def test_file_prior_shifts_search_scores(tmp_path: Path) -> None:
+    repo = _make_repo(tmp_path / "repo")
+    idx = CodeIndex(index_dir=tmp_path / "index", embedder=FakeEmbedder(model="test-embed", dim=384))
+    idx.build(repo_root=repo)
+
+    plain = {r.doc["source_path"]: r.score for r in idx.search("function", k=10, min_score=-1.0)}
+    idx.set_file_prior({"lonely.py": 1.0, "core.py": 0.5}, weight=0.2, key=("t", 0.2))
+    boosted = {r.doc["source_path"]: r.score for r in idx.search("function", k=10, min_score=-1.0)}
+    assert idx.file_prior_key == ("t", 0.2)
+    # Added like the primer boost, before role weighting: scales with importance.
+    lonely = boosted["lonely.py"] - plain["lonely.py"]
+    core = boosted["core.py"] - plain["core.py"]
+    assert lonely > 0.15
+    assert abs(lonely - 2 * core) < 1e-5
+    assert abs(boosted["a.py"] - plain["a.py"]) < 1e-6
+
+    idx.set_file_prior(None)
+    assert idx.file_prior_key is None
+    assert {r.doc["source_path"]: r.score for r in idx.search("function", k=10, min_score=-1.0)} == plain
@@ -0,0 +1,92 @@
+"""
+Tests for SymbolIndex (indexed name search behind TraceIndex.search_nodes).
+
+Run with: pytest tests/test_trace_symbols.py -v
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List, Optional
+
+from codrag.core.trace import TraceIndex
+from codrag.core.trace_graph import TraceGraph
+
+
+def _graph() -> TraceGraph:
+    graph = TraceGraph()
+    symbols = [
+        ("b.py", "parse", "Reader.parse"),
+        ("a.py", "parse", None),
+        ("a.py", "Parser", None),
+        ("a.py", "parse_file", "Loader.parse_file"),
+        ("c.py", "reparse", None),
+        ("c.py", "load", "Parser.load"),
+        ("c.py", "ab", None),
+        ("c.py", "tab", None),
+        ("c.py", "ünïcode", None),
+    ]
+    for i, (path, name, qualname) in enumerate(symbols):
+        graph.add_node(
+            {
+                "id": f"sym:{name}@{path}:{i}",
+                "kind": "symbol",
+                "name": name,
+                "file_path": path,
+                "metadata": {"qualname": qualname} if qualname else {},
+            }
+        )
+    for path in ("a.py", "b.py", "c.py"):
+        graph.add_node({"id": f"file:{path}", "kind": "file", "name": path, "file_path": path})
+    graph.finalize()
+    return graph
+
+
+def _scan(graph: TraceGraph, query: str, kind_code: Optional[int] = None, limit: int = 50) -> List[int]:
+    """The plain per-node scan the index replaces."""
+    q = query.lower()
+    scored = []
+    for i in range(graph.node_count):
+        name = graph.node_name_str(i).lower()
+        qual_code = int(graph.node_qualname[i])
+        qualname = graph.names[qual_code].lower() if qual_code >= 0 else ""
+        if kind_code is not None and int(graph.node_kind[i]) != kind_code:
+            continue
+        score = 1.0 if name == q else 0.8 if name.startswith(q) else 0.6 if q in name else 0.4 if q in qualname else 0
+        if score:
+            scored.append((-score, graph.node_file_path(i), graph.node_name_str(i), i))
+    return [i for *_, i in sorted(scored)[:limit]]
+
+
+def test_symbol_index_matches_scan_tiers_and_order(tmp_path: Path) -> None:
+    graph = _graph()
+    names = [graph.node_name_str(i) for i in range(graph.node_count)]
+    assert [names[i] for i in graph.symbols.search("parse")] == [
+        "parse", "parse", "Parser", "parse_file", "reparse", "load",
+    ]
+
+    symbol = graph.labels.lookup("symbol")
+    queries = ["parse", "PARSE", "pars", "arse", "rse_f", "a", "ab", "b", "y", ".", "ünï", "NÏC", "zzz", ""]
+    for query in queries:
+        for kind_code in (None, symbol):
+            for limit in (1, 3, 50):
+                assert graph.symbols.search(query, kind_code, limit) == _scan(graph, query, kind_code, limit), query
+
+    # Same answers from a memory-mapped copy.
+    graph.save(tmp_path / "g.bin")
+    opened = TraceGraph.open(tmp_path / "g.bin")
+    assert all(opened.symbols.search(q) == graph.symbols.search(q) for q in queries)
+
+
+def test_graph_files_without_symbol_index_still_search(tmp_path: Path) -> None:
+    graph = _graph()
+    for name in [n for n in graph.arrays if n.startswith("sym_")]:
+        del graph.arrays[name]
+    graph.save(tmp_path / "trace_graph.bin")
+
+    idx = TraceIndex(tmp_path)
+    (tmp_path / "trace_manifest.json").write_text("{}")
+    assert idx.load()
+    assert [n["name"] for n in idx.search_nodes("parse", kind="symbol", limit=2)] == ["parse", "parse"]
+    assert [n["file_path"] for n in idx.search_nodes("parse", limit=2)] == ["a.py", "b.py"]
+    assert idx.search_nodes("parse", kind="no-such-kind") == []
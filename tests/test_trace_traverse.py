@@ -0,0 +1,70 @@
+"""
+Tests for multi-hop trace traversal (TraceIndex.traverse).
+
+Run with: pytest tests/test_trace_traverse.py -v
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from codrag.core.trace import TraceBuilder, TraceIndex
+
+
+def _chain_repo(root: Path) -> TraceIndex:
+    repo = root / "repo"
+    repo.mkdir()
+    # a -> b -> c -> d, and hub imports four leaves.
+    (repo / "a.py").write_text("import b\n")
+    (repo / "b.py").write_text("import c\n")
+    (repo / "c.py").write_text("import d\n")
+    (repo / "d.py").write_text("X = 1\n")
+    (repo / "hub.py").write_text("import a\nimport b\nimport c\nimport d\n")
+    out = root / "out"
+    assert TraceBuilder(repo_root=repo, index_dir=out, workers=1).build()["last_error"] is None
+    idx = TraceIndex(out)
+    assert idx.load()
+    return idx
+
+
+def _ids(result: dict) -> list:
+    return [n["id"] for n in result["nodes"]]
+
+
+def test_traverse_follows_hops_in_bfs_order(tmp_path: Path) -> None:
+    idx = _chain_repo(tmp_path)
+
+    one = idx.traverse(["file:a.py"], direction="out", edge_kinds=["imports"], hops=1)
+    assert _ids(one) == ["file:a.py", "file:b.py"]
+    assert one["hops"] == 1 and not one["truncated"]
+
+    three = idx.traverse(["file:a.py"], direction="out", edge_kinds=["imports"], hops=3)
+    assert _ids(three) == ["file:a.py", "file:b.py", "file:c.py", "file:d.py"]
+    assert [(e["source"], e["target"]) for e in three["edges"]] == [
+        ("file:a.py", "file:b.py"),
+        ("file:b.py", "file:c.py"),
+        ("file:c.py", "file:d.py"),
+    ]
+
+    # Runs out of graph before running out of hops.
+    deep = idx.traverse(["file:d.py"], direction="in", edge_kinds=["imports"], hops=5)
+    assert set(_ids(deep)) == {"file:a.py", "file:b.py", "file:c.py", "file:d.py", "file:hub.py"}
+    assert deep["hops"] < 5 and not deep["truncated"]
+    # Edges between visited nodes are returned once each.
+    pairs = [(e["source"], e["target"]) for e in deep["edges"]]
+    assert len(pairs) == len(set(pairs))
+
+    assert idx.traverse(["file:missing.py"], hops=2)["nodes"] == []
+
+
+def test_traverse_budgets_and_fanout(tmp_path: Path) -> None:
+    idx = _chain_repo(tmp_path)
+
+    capped = idx.traverse(["file:hub.py"], direction="out", edge_kinds=["imports"], hops=2, max_nodes=3)
+    assert len(capped["nodes"]) == 3 and capped["truncated"]
+
+    few_edges = idx.traverse(["file:hub.py"], direction="out", edge_kinds=["imports"], hops=2, max_edges=2)
+    assert len(few_edges["edges"]) == 2 and few_edges["truncated"]
+
+    fanned = idx.traverse(["file:hub.py"], direction="out", edge_kinds=["imports"], hops=1, max_fanout=2)
+    assert len(fanned["nodes"]) == 3 and not fanned["truncated"]
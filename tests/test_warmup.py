@@ -0,0 +1,71 @@
+"""
+Tests for start-up warm-up of recently used projects.
+
+Uses FakeEmbedder so no Ollama dependency is required.
+Run with: pytest tests/test_warmup.py -v
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+import codrag.server as server
+from codrag.core import CodeIndex, EmbeddingResult, FakeEmbedder
+from codrag.core.project_registry import ProjectRegistry, project_index_dir
+from codrag.server import app
+
+
+class RecordingEmbedder(FakeEmbedder):
+    def __init__(self) -> None:
+        super().__init__()
+        self.texts: list[str] = []
+
+    def embed(self, text: str) -> EmbeddingResult:
+        self.texts.append(text)
+        return super().embed(text)
+
+
+def test_code_index_warm(mini_repo: Path, tmp_path: Path) -> None:
+    idx = CodeIndex(index_dir=tmp_path / "index", embedder=FakeEmbedder())
+    assert idx.warm() == {"loaded": False, "documents": 0, "fts": False}
+
+    idx.build(repo_root=mini_repo)
+    warmed = idx.warm()
+    assert warmed["loaded"] and warmed["fts"] and warmed["documents"] > 0
+    assert len(idx.snapshot().fts_pool) == 1
+
+
+def test_warmup_preloads_recent_projects(mini_repo: Path, tmp_path: Path) -> None:
+    server._registry = ProjectRegistry(db_path=tmp_path / "registry.db")
+    server._project_indexes.clear()
+    old = server._registry.add_project(path=tmp_path, name="old", mode="embedded")
+    proj = server._registry.add_project(path=mini_repo, name="recent", mode="embedded")
+
+    embedder = RecordingEmbedder()
+    idx = CodeIndex(index_dir=project_index_dir(proj), embedder=embedder)
+    idx.build(repo_root=mini_repo)
+    server._project_indexes[proj.id] = idx
+    embedder.texts.clear()
+
+    thread = server._start_warmup(1)
+    assert thread is not None
+    thread.join(10)
+
+    health = TestClient(app).get("/health").json()
+    assert health["status"] == "ok" and health["ready"] is True
+    warmup = health["warmup"]
+    assert warmup["state"] == "ready"
+    assert (warmup["projects_total"], warmup["projects_warmed"]) == (1, 1)
+    assert warmup["embedder"] == "ready" and warmup["errors"] == []
+    assert embedder.texts == ["warmup"]
+    assert old.id not in server._project_indexes
+    assert len(idx.snapshot().fts_pool) >= 1
+
+
+def test_warmup_disabled() -> None:
+    assert server._start_warmup(0) is None
+    health = TestClient(app).get("/health").json()
+    assert health["ready"] is True
+    assert health["warmup"] == {"state": "disabled"}